@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Binary vs Ternary 9x9 Comparison Harness
+========================================
+
+Runs matched workloads through the binary (simulate_binary_9x9.py) and
+ternary (NRadix_Accelerator/circuit_sim/simulate_9x9.py) circuit simulators
+in batch and reports, side by side:
+
+  - decode accuracy against the expected arithmetic
+  - detection margin of every SFG product above detector sensitivity
+  - throughput per watt of the chip, per MAC and per operand bit
+  - simulator speed (problems/s) of the batched path
+
+Both radices share the same glass, geometry and physics kernels
+(models/kernels.py); they differ only in the wavelength alphabet, the
+mixer model and the output demux. Workloads are matched: the same seed
+and batch size, with random symbols drawn from each radix's alphabet.
+
+Workloads:
+  random    - uniform random inputs and weights
+  identity  - random inputs, identity weights (y = x)
+  all_ones  - all inputs and weights at the "one" symbol
+
+Usage:
+  python compare_radix_9x9.py                      # 10k problems per workload
+  python compare_radix_9x9.py --samples 100000 --laser-dbm 6
+
+Author: Binary Optical Chip Project
+"""
+
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from simulate_binary_9x9 import (
+    DETECTOR_SENSITIVITY, WDM_CHANNELS,
+    simulate_binary_array_9x9, simulate_binary_array_9x9_batch,
+)
+from simulate_9x9 import simulate_array_9x9, simulate_array_9x9_batch
+from models.components import AWG_CHANNELS
+from models.kernels import detection_margin_db
+
+
+# =============================================================================
+# Radix and power descriptions
+# =============================================================================
+
+@dataclass(frozen=True)
+class Radix:
+    """One side of the comparison: alphabet, optics and simulators."""
+    name: str
+    symbols: tuple[int, ...]
+    one: int                        # symbol used for the all-ones workload
+    n_wavelengths: int              # lasers per encoder
+    n_detector_channels: int        # demux channels per column
+    simulate_batch: Callable
+    simulate_scalar: Callable
+
+    @property
+    def bits_per_symbol(self) -> float:
+        return math.log2(len(self.symbols))
+
+
+BINARY = Radix(
+    name="binary", symbols=(0, 1), one=1,
+    n_wavelengths=2, n_detector_channels=len(WDM_CHANNELS),
+    simulate_batch=simulate_binary_array_9x9_batch,
+    simulate_scalar=simulate_binary_array_9x9,
+)
+
+TERNARY = Radix(
+    name="ternary", symbols=(-1, 0, +1), one=+1,
+    n_wavelengths=3, n_detector_channels=len(AWG_CHANNELS),
+    simulate_batch=simulate_array_9x9_batch,
+    simulate_scalar=simulate_array_9x9,
+)
+
+RADICES = (BINARY, TERNARY)
+
+
+@dataclass
+class PowerModel:
+    """
+    Nominal wall-plug power of a 9x9 chip plus its lasers and receivers.
+
+    Every simulated signal (9 activation rows + 81 weight drops) has its
+    own wavelength-selecting encoder fed by one laser per wavelength, as
+    in the circuit simulators' signal path.
+    """
+    clock_hz: float = 617e6                 # Kerr optical clock
+    laser_wall_plug_efficiency: float = 0.20
+    detector_channel_power_mw: float = 10.0  # TIA + comparator per channel
+    n_encoders: int = 9 + 81
+
+    def chip_power_w(self, radix: Radix, laser_power_dbm: float) -> float:
+        laser_mw = 10 ** (laser_power_dbm / 10)
+        lasers_w = (self.n_encoders * radix.n_wavelengths * laser_mw
+                    / self.laser_wall_plug_efficiency) * 1e-3
+        receivers_w = 9 * radix.n_detector_channels * self.detector_channel_power_mw * 1e-3
+        return lasers_w + receivers_w
+
+
+# =============================================================================
+# Workloads
+# =============================================================================
+
+def make_workload(name: str, radix: Radix, n: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """(x, W) with shapes (n, 9) and (n, 9, 9) drawn from radix.symbols."""
+    rng = np.random.default_rng(seed)
+    symbols = np.array(radix.symbols)
+    if name == "random":
+        return symbols[rng.integers(0, len(symbols), (n, 9))], \
+            symbols[rng.integers(0, len(symbols), (n, 9, 9))]
+    if name == "identity":
+        W = np.eye(9, dtype=np.int64) * radix.one
+        return symbols[rng.integers(0, len(symbols), (n, 9))], \
+            np.broadcast_to(W, (n, 9, 9))
+    if name == "all_ones":
+        return np.full((n, 9), radix.one), np.full((n, 9, 9), radix.one)
+    raise ValueError(f"Unknown workload {name!r}; expected one of {WORKLOADS}")
+
+
+WORKLOADS = ("random", "identity", "all_ones")
+
+
+# =============================================================================
+# Harness
+# =============================================================================
+
+@dataclass
+class RadixReport:
+    """Metrics for one radix on one workload."""
+    radix: str
+    workload: str
+    n_samples: int
+    accuracy: float                 # fraction of problems fully correct
+    min_margin_db: float            # over every decoded SFG product
+    median_margin_db: float         # median over decoded SFG products
+    min_signal_margin_db: float     # over products decoding to a non-zero value
+    chip_power_w: float
+    gmac_per_s_per_w: float
+    gbit_ops_per_s_per_w: float     # MACs weighted by operand bits/symbol
+    sim_problems_per_s: float
+
+
+def evaluate(
+    radix: Radix,
+    workload: str,
+    n_samples: int,
+    seed: int = 0,
+    laser_power_dbm: float = 10.0,
+    power: PowerModel | None = None,
+) -> RadixReport:
+    """Run one workload through one radix in batch and summarize it."""
+    power = power or PowerModel()
+    x, W = make_workload(workload, radix, n_samples, seed)
+
+    start = time.perf_counter()
+    res = radix.simulate_batch(x, W, laser_power_dbm=laser_power_dbm)
+    elapsed = time.perf_counter() - start
+
+    margins = detection_margin_db(res.decoded_power_dbm, DETECTOR_SENSITIVITY)
+    valid = margins[~np.isnan(margins)]
+    signal = margins[(res.decoded_value != 0) & ~np.isnan(margins)]
+
+    chip_w = power.chip_power_w(radix, laser_power_dbm)
+    macs_per_s = 81 * power.clock_hz
+
+    return RadixReport(
+        radix=radix.name,
+        workload=workload,
+        n_samples=n_samples,
+        accuracy=float(res.all_correct.mean()),
+        min_margin_db=float(valid.min()) if valid.size else math.nan,
+        median_margin_db=float(np.median(valid)) if valid.size else math.nan,
+        min_signal_margin_db=float(signal.min()) if signal.size else math.nan,
+        chip_power_w=chip_w,
+        gmac_per_s_per_w=macs_per_s / chip_w / 1e9,
+        gbit_ops_per_s_per_w=macs_per_s * radix.bits_per_symbol / chip_w / 1e9,
+        sim_problems_per_s=n_samples / max(elapsed, 1e-12),
+    )
+
+
+def check_against_scalar(radix: Radix, workload: str, n_check: int, seed: int = 0,
+                         laser_power_dbm: float = 10.0) -> bool:
+    """The batched path decodes the first n_check problems like the scalar one."""
+    x, W = make_workload(workload, radix, n_check, seed)
+    res = radix.simulate_batch(x, W, laser_power_dbm=laser_power_dbm)
+    return all(
+        res.detected_output[b].tolist() == radix.simulate_scalar(
+            x[b].tolist(), W[b].tolist(),
+            laser_power_dbm=laser_power_dbm, verbose=False).detected_output
+        for b in range(n_check)
+    )
+
+
+def run_comparison(
+    n_samples: int = 10_000,
+    seed: int = 0,
+    workloads: tuple[str, ...] = WORKLOADS,
+    laser_power_dbm: float = 10.0,
+    power: PowerModel | None = None,
+) -> dict[str, dict[str, RadixReport]]:
+    """reports[workload][radix_name] for every matched workload."""
+    return {
+        wl: {r.name: evaluate(r, wl, n_samples, seed, laser_power_dbm, power)
+             for r in RADICES}
+        for wl in workloads
+    }
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+REPORT_ROWS = (
+    ("Accuracy",                  "accuracy",             "{:.2%}"),
+    ("Min margin (dB)",           "min_margin_db",        "{:.2f}"),
+    ("Median margin (dB)",        "median_margin_db",     "{:.2f}"),
+    ("Min signal margin (dB)",    "min_signal_margin_db", "{:.2f}"),
+    ("Chip power (W)",            "chip_power_w",         "{:.2f}"),
+    ("GMAC/s per W",              "gmac_per_s_per_w",     "{:.2f}"),
+    ("Gbit-op/s per W",           "gbit_ops_per_s_per_w", "{:.2f}"),
+    ("Sim problems/s",            "sim_problems_per_s",   "{:,.0f}"),
+)
+
+
+def print_comparison(reports: dict[str, dict[str, RadixReport]]) -> None:
+    print("=" * 70)
+    print("  BINARY vs TERNARY 9x9 — MATCHED WORKLOADS")
+    print("=" * 70)
+    for workload, by_radix in reports.items():
+        n = next(iter(by_radix.values())).n_samples
+        print(f"\n  Workload: {workload} ({n:,} problems)")
+        print(f"  {'Metric':<26} {'Binary':>14} {'Ternary':>14}")
+        print(f"  {'-' * 26} {'-' * 14} {'-' * 14}")
+        for label, attr, fmt in REPORT_ROWS:
+            cells = [fmt.format(getattr(by_radix[r.name], attr)) for r in RADICES]
+            print(f"  {label:<26} {cells[0]:>14} {cells[1]:>14}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--samples", type=int, default=10_000,
+                        help="Problems per workload and radix (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--laser-dbm", type=float, default=10.0,
+                        help="Laser power per channel (default: 10 dBm)")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--check", type=int, default=16,
+                        help="Cross-check this many problems per workload against "
+                             "the scalar simulators (0 = skip)")
+    args = parser.parse_args(argv)
+
+    ok = True
+    if args.check:
+        for wl in args.workloads:
+            for r in RADICES:
+                if not check_against_scalar(r, wl, args.check, args.seed, args.laser_dbm):
+                    print(f"  MISMATCH: batched {r.name} '{wl}' disagrees with scalar simulator")
+                    ok = False
+
+    reports = run_comparison(args.samples, args.seed, tuple(args.workloads), args.laser_dbm)
+    print_comparison(reports)
+
+    ok &= all(rep.accuracy == 1.0 for by_radix in reports.values()
+              for rep in by_radix.values())
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
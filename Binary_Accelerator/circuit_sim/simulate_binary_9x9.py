@@ -33,6 +33,15 @@ import os
 import numpy as np
 from dataclasses import dataclass, field
 
+# Shared signal model and physics kernels live with the ternary circuit sim
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "..", "NRadix_Accelerator", "circuit_sim"))
+from models.components import OpticalSignal, waveguide_transfer
+from models.components import photodetector as shared_photodetector
+from models.kernels import (
+    dbm_to_mw, mw_to_dbm, propagation_loss_db, cascade_power_dbm,
+)
+
 # =============================================================================
 # Constants
 # =============================================================================
@@ -47,6 +56,7 @@ WG_LOSS_DB_CM     = 2.0     # dB/cm
 EDGE_COUPLING_LOSS = 1.0    # dB per facet
 DETECTOR_SENSITIVITY = -30.0  # dBm
 DETECTOR_THRESHOLD_UA = 0.5   # μA — above this = "detected"
+DETECTOR_RESPONSIVITY = 0.8   # A/W (the ternary model's default is 0.5)
 
 # Binary wavelength encoding
 BIT_TO_WL = {
@@ -81,22 +91,12 @@ WDM_CHANNELS = {
 
 
 # =============================================================================
-# Optical signal model (mirrors ternary components)
+# Binary components (OpticalSignal and waveguide are shared)
 # =============================================================================
 
-@dataclass
-class OpticalSignal:
-    wavelength_nm: float
-    power_dbm: float
-
-    def attenuate(self, loss_db: float) -> "OpticalSignal":
-        return OpticalSignal(self.wavelength_nm, self.power_dbm - loss_db)
-
-
-def waveguide_transfer(sig: OpticalSignal, length_um: float, loss_db_cm: float) -> OpticalSignal:
-    """Apply waveguide propagation loss over length_um."""
-    loss = loss_db_cm * (length_um / 1e4)
-    return sig.attenuate(loss)
+def photodetector(power_dbm: float, responsivity_a_w: float = DETECTOR_RESPONSIVITY) -> float:
+    """Convert optical power (dBm) to photocurrent (μA); no dark current."""
+    return shared_photodetector(power_dbm, responsivity_a_w, dark_current_na=0.0)
 
 
 def mzi_encode_binary(bit: int, power_dbm: float) -> OpticalSignal:
@@ -133,10 +133,8 @@ def sfg_mixer_binary(
         return None, pass_a, pass_b
 
     # SFG power: conversion_efficiency * min(P_a, P_b) - insertion_loss
-    p_a_lin = 10 ** (sig_a.power_dbm / 10)
-    p_b_lin = 10 ** (sig_b.power_dbm / 10)
-    sfg_power_lin = conversion_efficiency * min(p_a_lin, p_b_lin)
-    sfg_power_dbm = 10 * np.log10(sfg_power_lin) - insertion_loss_db
+    sfg_power_lin = conversion_efficiency * min(sig_a.power_mw, sig_b.power_mw)
+    sfg_power_dbm = mw_to_dbm(sfg_power_lin, floor_mw=0.0) - insertion_loss_db
 
     sfg_out = OpticalSignal(wavelength_nm=sfg_wl, power_dbm=sfg_power_dbm)
     return sfg_out, pass_a, pass_b
@@ -152,12 +150,6 @@ def wdm_demux(sig: OpticalSignal) -> dict[str, float]:
     return powers
 
 
-def photodetector(power_dbm: float, responsivity_a_w: float = 0.8) -> float:
-    """Convert optical power (dBm) to photocurrent (μA)."""
-    power_w = 10 ** (power_dbm / 10) * 1e-3
-    return power_w * responsivity_a_w * 1e6  # μA
-
-
 # =============================================================================
 # IOC — Binary mode
 # =============================================================================
@@ -408,6 +400,99 @@ def simulate_binary_array_9x9(
     return result
 
 
+# =============================================================================
+# Batched 9x9 array simulation (mirrors ternary simulate_array_9x9_batch)
+# =============================================================================
+
+@dataclass
+class BinaryBatchResult:
+    """
+    Columnar result of simulate_binary_array_9x9_batch for B problems.
+
+    Per-PE arrays are (B, 9, 9) indexed [sample, row, col]; per-column
+    arrays are (B, 9).
+    """
+    expected_output: np.ndarray     # (B, 9) int
+    detected_output: np.ndarray     # (B, 9) int
+    sfg_power_dbm: np.ndarray       # (B, 9, 9) at the PE output
+    decoded_power_dbm: np.ndarray   # (B, 9, 9) on the winning WDM channel
+    decoded_value: np.ndarray       # (B, 9, 9) bit read back per product
+
+    @property
+    def all_correct(self) -> np.ndarray:
+        """(B,) bool: every column of the sample decoded correctly."""
+        return (self.detected_output == self.expected_output).all(axis=1)
+
+
+def simulate_binary_array_9x9_batch(
+    input_bits,
+    weight_matrices,
+    laser_power_dbm: float = 10.0,
+    conversion_efficiency: float = 0.10,
+    insertion_loss_db: float = 1.0,
+) -> BinaryBatchResult:
+    """
+    Simulate B independent binary 9x9 OR-of-AND products in one pass.
+
+    Same signal path as simulate_binary_array_9x9, with the per-bit
+    wavelengths and readouts taken from the scalar models and the power
+    propagation done by the shared kernels.
+
+    Args:
+        input_bits: (B, 9) or (9,) bits
+        weight_matrices: (B, 9, 9) or (9, 9) bits W[row][col]
+        laser_power_dbm: Laser power per channel
+        conversion_efficiency: SFG conversion efficiency per PE
+        insertion_loss_db: PE insertion loss
+
+    Returns:
+        BinaryBatchResult; detected_output[b] equals
+        simulate_binary_array_9x9(input_bits[b], weight_matrices[b]).detected_output
+    """
+    x = np.asarray(input_bits, dtype=np.int64)
+    W = np.asarray(weight_matrices, dtype=np.int64)
+    if x.ndim == 1:
+        x = x[None]
+    if W.ndim == 2:
+        W = np.broadcast_to(W, (len(x), 9, 9))
+    assert x.shape[1:] == (9,) and W.shape[1:] == (9, 9) and len(x) == len(W), \
+        "Expected (B, 9) inputs and (B, 9, 9) weights"
+
+    # Readout per bit pair: nearest WDM channel decides the bit
+    decode_value = np.zeros((2, 2), dtype=np.int64)
+    for a in (0, 1):
+        for b in (0, 1):
+            ch_powers = wdm_demux(OpticalSignal(SFG_TABLE[(BIT_TO_WL[a], BIT_TO_WL[b])], 0.0))
+            best_ch = max(ch_powers, key=ch_powers.get)
+            decode_value[a, b] = SFG_RESULT.get(round(WDM_CHANNELS[best_ch], 1), 0)
+
+    act_dbm = (laser_power_dbm
+               - propagation_loss_db(IOC_INPUT_WIDTH + ROUTING_GAP, WG_LOSS_DB_CM)
+               - EDGE_COUPLING_LOSS)
+    wt_dbm = laser_power_dbm - propagation_loss_db(
+        np.arange(9) * PE_PITCH + 40, WG_LOSS_DB_CM)                   # per row
+
+    # Binary PEs pass activations with insertion loss only (no depletion)
+    gap_loss_db = propagation_loss_db(PE_PITCH - PE_WIDTH, WG_LOSS_DB_CM)
+    act_in = cascade_power_dbm(np.full((len(x), 9), act_dbm),
+                               np.full(W.shape, insertion_loss_db), gap_loss_db)
+    wt_in = np.broadcast_to(wt_dbm[:, None], W.shape)
+
+    sfg_mw = conversion_efficiency * np.minimum(dbm_to_mw(act_in), dbm_to_mw(wt_in))
+    sfg_dbm = mw_to_dbm(sfg_mw, floor_mw=0.0) - insertion_loss_db
+    decoded_dbm = sfg_dbm - propagation_loss_db(
+        ROUTING_GAP + IOC_OUTPUT_WIDTH * 0.3, WG_LOSS_DB_CM)
+
+    value = decode_value[np.broadcast_to(x[:, :, None], W.shape), W]
+    return BinaryBatchResult(
+        expected_output=(x[:, :, None] & W).any(axis=1).astype(np.int64),
+        detected_output=value.any(axis=1).astype(np.int64),
+        sfg_power_dbm=sfg_dbm,
+        decoded_power_dbm=decoded_dbm,
+        decoded_value=value,
+    )
+
+
 # =============================================================================
 # Test cases (mirrors ternary tests)
 # =============================================================================
@@ -609,6 +694,8 @@ def test_radix_comparison():
     print(f"    Ternary needs only {n_ternary} PEs ({100 - n_ternary}% fewer)")
     print(f"\n  Conclusion: Ternary strictly dominates binary on this photonic platform.")
     print(f"  The wavelength cost is O(1) per added state — no transistor penalty.")
+    print(f"\n  Measured margins and throughput/W on matched workloads:")
+    print(f"    python compare_radix_9x9.py")
 
     return True
 
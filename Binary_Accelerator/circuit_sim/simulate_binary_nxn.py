@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Bit-Packed NxN Binary Array Engine
+==================================
+
+Batched simulation of the binary optical systolic array at arbitrary size
+(64x64 to 256x256 and beyond), for inner-product workloads
+
+    y[j] = OR_i( x[i] AND W[i][j] )
+
+Logic is evaluated on bit-packed uint64 words: input vectors are packed
+along i, weight columns are packed along i, and each output bit is one
+AND of word vectors followed by an any-nonzero test (the OR). A 256-bit
+column is 4 words instead of 256 PE evaluations.
+
+Optics are only computed where they matter: the 775 nm (1 AND 1) paths.
+The margin of each PE's 775 nm product at the detector is fixed by the
+geometry (same signal path as simulate_binary_9x9.py), so it is a single
+(N, N) grid. Within a column the weight drop line lengthens with the row,
+so the first active row carries the strongest 775 nm product; that row
+is found from the packed words with a lowest-set-bit scan, giving each
+"1" output's detection margin without unpacking.
+
+Usage:
+  python simulate_binary_nxn.py                      # 64/128/256, 10k vectors
+  python simulate_binary_nxn.py --sizes 256 --batch 100000 --il-db 0.1
+
+Author: Binary Optical Chip Project
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulate_binary_9x9 import (
+    PE_PITCH, PE_WIDTH, ROUTING_GAP, IOC_INPUT_WIDTH, IOC_OUTPUT_WIDTH,
+    WG_LOSS_DB_CM, EDGE_COUPLING_LOSS, DETECTOR_SENSITIVITY,
+    simulate_binary_array_9x9_batch,
+)
+from models.kernels import propagation_loss_db, cascade_power_dbm, detection_margin_db
+
+
+WORD_BITS = 64
+
+# Working-set cap for one (batch, column, word) AND block
+CHUNK_BYTES = 64 * 2**20
+
+
+# =============================================================================
+# Bit packing
+# =============================================================================
+
+def n_words(n_bits: int) -> int:
+    """uint64 words needed to hold n_bits."""
+    return -(-n_bits // WORD_BITS)
+
+
+def pack_bits(bits) -> np.ndarray:
+    """
+    Pack the last axis of a 0/1 array into little-endian uint64 words.
+
+    Bit i of the vector is bit (i % 64) of word (i // 64).
+    (..., N) -> (..., ceil(N / 64)) uint64.
+    """
+    bits = np.asarray(bits).astype(bool, copy=False)
+    n = bits.shape[-1]
+    pad = n_words(n) * WORD_BITS - n
+    if pad:
+        bits = np.concatenate(
+            [bits, np.zeros(bits.shape[:-1] + (pad,), dtype=bool)], axis=-1)
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8")
+
+
+def unpack_bits(words, n_bits: int) -> np.ndarray:
+    """Inverse of pack_bits: (..., words) uint64 -> (..., n_bits) uint8."""
+    as_bytes = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1, count=n_bits, bitorder="little")
+
+
+def pack_weight_columns(weight_matrix) -> np.ndarray:
+    """(N_in, N_out) bits -> (N_out, ceil(N_in / 64)) words, one per column."""
+    return pack_bits(np.asarray(weight_matrix).T)
+
+
+def first_active_row(x_words: np.ndarray, w_words: np.ndarray) -> np.ndarray:
+    """
+    Lowest i with x[i] AND W[i][j] for every (vector, column), -1 if none.
+
+    Args:
+        x_words: (n_words, B) packed inputs, word-major
+        w_words: (n_words, N_out) packed weight columns, word-major
+
+    Returns:
+        (B, N_out) int64
+    """
+    first = np.full((x_words.shape[1], w_words.shape[1]), -1, dtype=np.int64)
+    # Walk words high to low so the lowest non-zero word writes last
+    for k in range(len(x_words) - 1, -1, -1):
+        hits = x_words[k][:, None] & w_words[k][None, :]
+        isolated = hits & np.negative(hits)                # lowest set bit
+        # Powers of two are exact in float64: frexp gives exponent = bit + 1
+        _, exponent = np.frexp(isolated.astype(np.float64))
+        np.copyto(first, exponent + (k * WORD_BITS - 1), where=hits != 0)
+    return first
+
+
+# =============================================================================
+# 775 nm path margins
+# =============================================================================
+
+def margin_grid_775_db(
+    n_rows: int,
+    n_cols: int,
+    laser_power_dbm: float = 10.0,
+    conversion_efficiency: float = 0.10,
+    insertion_loss_db: float = 1.0,
+) -> np.ndarray:
+    """
+    Detection margin (dB) of the 775 nm product of PE[i][j], shape (n_rows, n_cols).
+
+    Same path as simulate_binary_array_9x9: the activation enters row i
+    after the IOC and input facet and loses one PE insertion loss plus an
+    inter-PE gap per column; the weight reaches row i over a drop line of
+    i * PE_PITCH + 40 μm; the product is routed to the column's WDM demux.
+    """
+    act_dbm = (laser_power_dbm
+               - propagation_loss_db(IOC_INPUT_WIDTH + ROUTING_GAP, WG_LOSS_DB_CM)
+               - EDGE_COUPLING_LOSS)
+    act_in = cascade_power_dbm(
+        act_dbm, np.full(n_cols, insertion_loss_db),
+        propagation_loss_db(PE_PITCH - PE_WIDTH, WG_LOSS_DB_CM))       # (n_cols,)
+    wt_in = laser_power_dbm - propagation_loss_db(
+        np.arange(n_rows) * PE_PITCH + 40, WG_LOSS_DB_CM)              # (n_rows,)
+
+    # eta * min(P_a, P_b) in dB, so hundreds of PE losses do not underflow
+    sfg_dbm = 10 * np.log10(conversion_efficiency) + np.minimum(act_in[None, :],
+                                                                 wt_in[:, None])
+    decoded_dbm = (sfg_dbm - insertion_loss_db
+                   - propagation_loss_db(ROUTING_GAP + IOC_OUTPUT_WIDTH * 0.3, WG_LOSS_DB_CM))
+    return detection_margin_db(decoded_dbm, DETECTOR_SENSITIVITY)
+
+
+# =============================================================================
+# Packed array simulation
+# =============================================================================
+
+@dataclass
+class PackedArrayResult:
+    """
+    Result of simulate_binary_array_packed for B input vectors.
+
+    output_packed holds y bit-packed like the inputs. column_margin_db is the
+    margin of the strongest 775 nm product feeding each output column, NaN
+    where the column outputs 0 (no 775 nm path is lit).
+    """
+    output_packed: np.ndarray       # (B, ceil(N_out / 64)) uint64
+    first_active_row: np.ndarray    # (B, N_out) int, -1 where y[j] = 0
+    column_margin_db: np.ndarray    # (B, N_out) float
+    n_outputs: int
+
+    @property
+    def output(self) -> np.ndarray:
+        """(B, N_out) unpacked output bits."""
+        return unpack_bits(self.output_packed, self.n_outputs)
+
+    @property
+    def worst_margin_db(self) -> np.ndarray:
+        """(B,) weakest margin over the sample's "1" outputs (NaN if none)."""
+        m = np.where(np.isnan(self.column_margin_db), np.inf, self.column_margin_db)
+        worst = m.min(axis=1)
+        return np.where(np.isinf(worst), np.nan, worst)
+
+
+def simulate_binary_array_packed(
+    x_packed: np.ndarray,
+    w_columns: np.ndarray,
+    n_rows: int,
+    margin_grid_db: np.ndarray | None = None,
+    chunk_size: int | None = None,
+) -> PackedArrayResult:
+    """
+    OR-of-AND for a batch of packed input vectors against one weight matrix.
+
+    Args:
+        x_packed: (B, ceil(n_rows / 64)) packed input vectors
+        w_columns: (N_out, ceil(n_rows / 64)) packed weight columns
+            (see pack_weight_columns)
+        n_rows: Input vector length N_in
+        margin_grid_db: (n_rows, N_out) 775 nm margins; default
+            margin_grid_775_db at nominal parameters
+        chunk_size: Vectors per AND block (default: sized to CHUNK_BYTES)
+
+    Returns:
+        PackedArrayResult
+    """
+    x_packed = np.atleast_2d(np.asarray(x_packed, dtype=np.uint64))
+    w_columns = np.asarray(w_columns, dtype=np.uint64)
+    n_out, words = w_columns.shape
+    assert x_packed.shape[1] == words == n_words(n_rows), \
+        "Input and weight columns must be packed to the same word count"
+    if margin_grid_db is None:
+        margin_grid_db = margin_grid_775_db(n_rows, n_out)
+
+    n = len(x_packed)
+    if chunk_size is None:
+        # ~5 (chunk, N_out) 8-byte temporaries per word step
+        chunk_size = max(1, CHUNK_BYTES // (n_out * 8 * 5))
+
+    x_words = np.ascontiguousarray(x_packed.T)
+    w_words = np.ascontiguousarray(w_columns.T)
+    first = np.empty((n, n_out), dtype=np.int64)
+    for lo in range(0, n, chunk_size):
+        first[lo:lo + chunk_size] = first_active_row(
+            x_words[:, lo:lo + chunk_size], w_words)
+
+    lit = first >= 0
+    cols = np.broadcast_to(np.arange(n_out), first.shape)
+    margins = np.where(lit, margin_grid_db[np.maximum(first, 0), cols], np.nan)
+
+    return PackedArrayResult(
+        output_packed=pack_bits(lit),
+        first_active_row=first,
+        column_margin_db=margins,
+        n_outputs=n_out,
+    )
+
+
+def simulate_binary_array_nxn(
+    input_bits,
+    weight_matrix,
+    laser_power_dbm: float = 10.0,
+    conversion_efficiency: float = 0.10,
+    insertion_loss_db: float = 1.0,
+) -> PackedArrayResult:
+    """
+    Unpacked convenience wrapper: (B, N_in) bits against (N_in, N_out) bits.
+    """
+    input_bits = np.atleast_2d(input_bits)
+    weight_matrix = np.asarray(weight_matrix)
+    n_rows, n_out = weight_matrix.shape
+    grid = margin_grid_775_db(n_rows, n_out, laser_power_dbm,
+                              conversion_efficiency, insertion_loss_db)
+    return simulate_binary_array_packed(
+        pack_bits(input_bits), pack_weight_columns(weight_matrix), n_rows, grid)
+
+
+# =============================================================================
+# Checks and benchmark
+# =============================================================================
+
+def reference_or_and(input_bits, weight_matrix) -> np.ndarray:
+    """Unpacked NumPy reference for y = OR_i(x[i] AND W[i][j])."""
+    return (np.atleast_2d(input_bits).astype(bool) @ np.asarray(weight_matrix, dtype=bool)
+            ).astype(np.uint8)
+
+
+def check_against_9x9(n_samples: int = 200, seed: int = 0) -> bool:
+    """Outputs and 775 nm margins agree with the batched 9x9 simulator."""
+    rng = np.random.default_rng(seed)
+    ok = True
+    for _ in range(n_samples // 20):
+        W = rng.integers(0, 2, (9, 9))
+        x = rng.integers(0, 2, (20, 9))
+        packed = simulate_binary_array_nxn(x, W)
+        ref = simulate_binary_array_9x9_batch(x, W)
+        ok &= np.array_equal(packed.output, ref.detected_output)
+
+        active = (x[:, :, None] == 1) & (W[None] == 1)
+        best = np.where(active, ref.decoded_power_dbm, -np.inf).max(axis=1)
+        expect = np.where(np.isinf(best), np.nan, best - DETECTOR_SENSITIVITY)
+        ok &= np.allclose(packed.column_margin_db, expect, equal_nan=True)
+    return ok
+
+
+def benchmark(n: int, batch: int, density: float, seed: int,
+              insertion_loss_db: float) -> dict:
+    rng = np.random.default_rng(seed)
+    W = rng.random((n, n)) < density
+    x = rng.random((batch, n)) < density
+
+    x_packed, w_columns = pack_bits(x), pack_weight_columns(W)
+    grid = margin_grid_775_db(n, n, insertion_loss_db=insertion_loss_db)
+
+    start = time.perf_counter()
+    res = simulate_binary_array_packed(x_packed, w_columns, n, grid)
+    elapsed = time.perf_counter() - start
+
+    correct = np.array_equal(res.output, reference_or_and(x, W))
+    lit_margins = res.column_margin_db[~np.isnan(res.column_margin_db)]
+    return {
+        "n": n,
+        "batch": batch,
+        "seconds": elapsed,
+        "vectors_per_s": batch / max(elapsed, 1e-12),
+        "correct": correct,
+        "ones_fraction": float(res.output.mean()),
+        "worst_margin_db": float(lit_margins.min()) if lit_margins.size else float("nan"),
+        "grid_worst_db": float(grid.min()),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bit-packed NxN binary array engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--batch", type=int, default=10_000,
+                        help="Input vectors per size (default: 10000)")
+    parser.add_argument("--density", type=float, default=0.05,
+                        help="Probability of a 1 bit in x and W (default: 0.05)")
+    parser.add_argument("--il-db", type=float, default=1.0,
+                        help="PE insertion loss in dB (default: 1.0, as the 9x9 model)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("  BIT-PACKED BINARY ARRAY — y = OR(x AND W)")
+    print("=" * 70)
+
+    ok = check_against_9x9(seed=args.seed)
+    print(f"\n  9x9 cross-check vs simulate_binary_array_9x9_batch: "
+          f"{'PASS' if ok else 'FAIL'}")
+
+    print(f"\n  PE insertion loss {args.il_db} dB, bit density {args.density}")
+    print(f"  {'N':>5} {'Batch':>8} {'Time (s)':>9} {'Vectors/s':>12} "
+          f"{'Ones':>6} {'Worst lit (dB)':>15} {'Grid worst (dB)':>16} {'Logic':>6}")
+    for n in args.sizes:
+        r = benchmark(n, args.batch, args.density, args.seed, args.il_db)
+        ok &= r["correct"]
+        print(f"  {r['n']:>5} {r['batch']:>8,} {r['seconds']:>9.3f} "
+              f"{r['vectors_per_s']:>12,.0f} {r['ones_fraction']:>6.1%} "
+              f"{r['worst_margin_db']:>15.1f} {r['grid_worst_db']:>16.1f} "
+              f"{'PASS' if r['correct'] else 'FAIL':>6}")
+
+    print("\n  Negative margins mean the 775 nm product is below detector")
+    print("  sensitivity: at large N the activation's per-PE insertion loss")
+    print("  dominates, so --il-db sets the largest array that still detects.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,9 @@ PURPOSE:
     6 QPM conditions to all hit simultaneously).
 
 METHOD:
-    Monte Carlo simulation — 10,000 trials. Each trial picks random fab
-    parameter values from Gaussian distributions centered on the nominal design.
+    Monte Carlo simulation — --trials trials, 10,000 by default. Each trial
+    picks random fab parameter values from Gaussian distributions centered on
+    the nominal design.
     For each "virtual chip," we re-run all design validation checks.
     Yield = fraction of trials that pass ALL checks.
 
@@ -47,16 +48,30 @@ Usage:
 
     Output: terminal summary + plots saved to ../docs/monte_carlo_binary_plots/
 
+    python3 monte_carlo_binary_9x9.py --sensitivity --what-if ppln_period_um=0.5
+
+    Sensitivity mode: Sobol indices per check and surrogate yields with one
+    sigma halved (NRadix_Accelerator/simulations/mc_sensitivity.py).
+
 Author: Binary Optical Chip Project
 Date: 2026-02-27
 """
 
+import argparse
 import numpy as np
 import sys
 import os
 import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from multiprocessing import Pool
+from typing import Dict, Tuple
+
+# Streaming reducers shared with the N-Radix Monte Carlo engine
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "..", "NRadix_Accelerator", "simulations"))
+from mc_stats import MonteCarloStats, pilot_ranges
+from mc_sensitivity import (SensitivityProblem, PolynomialChaos, sobol_indices,
+                            parse_what_if, print_sobol, print_what_if)
 
 try:
     import matplotlib
@@ -148,6 +163,26 @@ class FabVariation:
             edge_coupling_loss_db = max(0.0, nominal.edge_coupling_loss_db + rng.normal(0, self.sigma_edge_coupling_db)),
         )
 
+    def sample_population(self, rng: np.random.Generator, nominal: NominalDesign,
+                          n_chips: int) -> "SampledChip":
+        """
+        Sample n_chips chips at once: a SampledChip with array fields.
+
+        Draws the same trial-major stream as n_chips successive sample() calls.
+        """
+        return self.chips_from_normals(nominal, rng.standard_normal((n_chips, 6)))
+
+    def chips_from_normals(self, nominal: NominalDesign, z: np.ndarray) -> "SampledChip":
+        """Chips for an (n_chips, 6) block of standard normals, one column per SampledChip field."""
+        return SampledChip(
+            waveguide_width_nm    = nominal.waveguide_width_nm + self.sigma_waveguide_width_nm * z[:, 0],
+            etch_depth_nm         = nominal.etch_depth_nm + self.sigma_etch_depth_nm * z[:, 1],
+            waveguide_loss_db_cm  = np.maximum(0.1, nominal.waveguide_loss_db_cm + self.sigma_loss_db_cm * z[:, 2]),
+            ppln_period_um        = nominal.ppln_period_um + self.sigma_ppln_period_um * z[:, 3],
+            sfg_conversion_frac   = np.maximum(0.001, nominal.sfg_conversion_pct/100 + self.sigma_sfg_conversion_rel * nominal.sfg_conversion_pct/100 * z[:, 4]),
+            edge_coupling_loss_db = np.maximum(0.0, nominal.edge_coupling_loss_db + self.sigma_edge_coupling_db * z[:, 5]),
+        )
+
 
 @dataclass
 class SampledChip:
@@ -163,6 +198,24 @@ class SampledChip:
 # =============================================================================
 # VALIDATION CHECKS
 # =============================================================================
+#
+# Each check also accepts a population from FabVariation.sample_population()
+# and then returns one (passed, metric) entry per chip as arrays.
+
+# Pass thresholds
+MIN_PPLN_EFFICIENCY   = 0.03    # 3% minimum conversion (vs nominal 10%)
+MIN_WAVELENGTH_SEP_NM = 10.0    # nm, minimum for the WDM coupler
+MAX_TIMING_SKEW_PS    = 0.5     # ps, meander equalization tolerance
+
+
+def _ppln_sinc_sq(chip: SampledChip, nominal: NominalDesign):
+    """sinc² phase-matching factor of the chip's PPLN period (0 if period <= 0)."""
+    valid = chip.ppln_period_um > 0
+    period_um = np.where(valid, chip.ppln_period_um, np.inf)
+    delta_k_per_um = 2 * np.pi * (1/nominal.ppln_period_um - 1/period_um)
+    delta_phi = delta_k_per_um * nominal.ppln_length_um
+    return np.where(valid, np.sinc(delta_phi / (2 * np.pi)) ** 2, 0.0)[()]
+
 
 def check_loss_budget(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float]:
     """
@@ -190,28 +243,23 @@ def check_loss_budget(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool,
     # SFG conversion at PE[0, 8]
     pump_w = 10 ** (p / 10) * 1e-3
     # PPLN period variation → phase mismatch → sinc² penalty
-    delta_period_um = abs(chip.ppln_period_um - nominal.ppln_period_um)
     # Phase mismatch accumulated over PPLN length
     # Δφ = (2π/Λ_nominal - 2π/Λ_actual) * L
-    if chip.ppln_period_um > 0:
-        delta_k_per_um = 2 * np.pi * (1/nominal.ppln_period_um - 1/chip.ppln_period_um)
-        delta_phi = delta_k_per_um * nominal.ppln_length_um
-        sinc_sq = np.sinc(delta_phi / (2 * np.pi)) ** 2
-    else:
-        sinc_sq = 0.0
+    sinc_sq = _ppln_sinc_sq(chip, nominal)
 
     sfg_eff = chip.sfg_conversion_frac * sinc_sq
     sfg_power_w = sfg_eff * pump_w
-    if sfg_power_w <= 0:
-        return False, -99.0
-    sfg_power_dbm = 10 * np.log10(sfg_power_w * 1e3)
+    with np.errstate(divide='ignore'):
+        sfg_power_dbm = 10 * np.log10(sfg_power_w * 1e3)
 
     # Routing to output
     out_path_um = nominal.routing_gap_um + nominal.ioc_output_um
     sfg_power_dbm -= chip.waveguide_loss_db_cm * (out_path_um / 1e4)
     sfg_power_dbm -= chip.edge_coupling_loss_db
 
-    margin = sfg_power_dbm - nominal.detector_sensitivity_dbm
+    # No SFG power at all is reported as a -99 dB margin
+    margin = np.where(sfg_power_w > 0,
+                      sfg_power_dbm - nominal.detector_sensitivity_dbm, -99.0)[()]
     return margin > 0, margin
 
 
@@ -221,14 +269,10 @@ def check_ppln_efficiency(chip: SampledChip, nominal: NominalDesign) -> Tuple[bo
     Does the period variation reduce SFG efficiency below threshold?
     Minimum acceptable: 5% conversion (half of nominal 10%).
     """
-    if chip.ppln_period_um <= 0:
-        return False, 0.0
-    delta_k_per_um = abs(2 * np.pi * (1/nominal.ppln_period_um - 1/chip.ppln_period_um))
-    delta_phi = delta_k_per_um * nominal.ppln_length_um
-    sinc_sq = float(np.sinc(delta_phi / (2 * np.pi)) ** 2)
+    # sinc² is even, so the sign of the mismatch does not matter
+    sinc_sq = _ppln_sinc_sq(chip, nominal)
     effective_eff = chip.sfg_conversion_frac * sinc_sq
-    threshold = 0.03  # 3% minimum (vs nominal 10%)
-    return effective_eff >= threshold, effective_eff
+    return effective_eff >= MIN_PPLN_EFFICIENCY, effective_eff
 
 
 def check_wavelength_separation(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float]:
@@ -249,14 +293,14 @@ def check_wavelength_separation(chip: SampledChip, nominal: NominalDesign) -> Tu
     # dn_eff/dW ≈ 0.02 per nm for TFLN 500nm waveguides (from simulation)
     dn_eff = 0.02 * width_delta_nm / 1000.0  # fractional
     # λ shift for SFG output
-    sfg_shift_nm = abs(dn_eff * nominal.wl_sfg_nm)
+    sfg_shift_nm = np.abs(dn_eff * nominal.wl_sfg_nm)
 
     effective_sfg_nm  = nominal.wl_sfg_nm + sfg_shift_nm
-    min_sep = min(
-        abs(nominal.wl_bit0_nm - effective_sfg_nm),
-        abs(nominal.wl_bit1_nm - effective_sfg_nm),
+    min_sep = np.minimum(
+        np.abs(nominal.wl_bit0_nm - effective_sfg_nm),
+        np.abs(nominal.wl_bit1_nm - effective_sfg_nm),
     )
-    return min_sep > 10.0, min_sep  # 10 nm minimum for WDM coupler
+    return min_sep > MIN_WAVELENGTH_SEP_NM, min_sep
 
 
 def check_timing(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float]:
@@ -274,8 +318,8 @@ def check_timing(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float
     path_um = nominal.ioc_input_um + nominal.routing_gap_um + (nominal.n_pe_cols - 1) * nominal.pe_pitch_um
     # Time variation: Δt = path × Δn / c
     c_um_ps = 299.792
-    delta_t_ps = path_um * abs(dn_rel) * 2.138 / c_um_ps
-    return delta_t_ps < 0.5, delta_t_ps  # 0.5 ps tolerance
+    delta_t_ps = path_um * np.abs(dn_rel) * 2.138 / c_um_ps
+    return delta_t_ps < MAX_TIMING_SKEW_PS, delta_t_ps
 
 
 def check_detector(chip: SampledChip, nominal: NominalDesign, margin_db: float) -> Tuple[bool, float]:
@@ -283,12 +327,11 @@ def check_detector(chip: SampledChip, nominal: NominalDesign, margin_db: float)
     Check 5: Detector photocurrent.
     Does the detected 775nm signal exceed the 0.5μA threshold?
     """
-    if margin_db < 0:
-        return False, 0.0
     power_dbm = nominal.detector_sensitivity_dbm + margin_db
     power_w = 10 ** (power_dbm / 10) * 1e-3
     responsivity = 0.8  # A/W at 775 nm (Ge or InGaAs PD)
-    current_ua = power_w * responsivity * 1e6
+    # Below sensitivity (negative margin) nothing is detected
+    current_ua = np.where(margin_db < 0, 0.0, power_w * responsivity * 1e6)[()]
     return current_ua >= nominal.detector_threshold_ua, current_ua
 
 
@@ -296,40 +339,119 @@ def check_detector(chip: SampledChip, nominal: NominalDesign, margin_db: float)
 # MONTE CARLO ENGINE
 # =============================================================================
 
-@dataclass
-class TrialResult:
-    """Results for one Monte Carlo trial."""
-    loss_budget_pass:       bool
-    ppln_efficiency_pass:   bool
-    wavelength_sep_pass:    bool
-    timing_pass:            bool
-    detector_pass:          bool
-    power_margin_db:        float
-    ppln_efficiency:        float
-    min_wavelength_sep_nm:  float
-    timing_skew_ps:         float
-    detector_current_ua:    float
-
-    @property
-    def all_pass(self) -> bool:
-        return (self.loss_budget_pass and
-                self.ppln_efficiency_pass and
-                self.wavelength_sep_pass and
-                self.timing_pass and
-                self.detector_pass)
+# (check name, result column) — pass flags are stored as <check>_passed
+CHECK_METRICS = [
+    ("loss_budget",     "power_margin_db"),
+    ("ppln_efficiency", "ppln_efficiency"),
+    ("wavelength_sep",  "min_wavelength_sep_nm"),
+    ("timing",          "timing_skew_ps"),
+    ("detector",        "detector_current_ua"),
+]
+
+# Histogram bin counts for the streamed metric columns. The edges come from
+# a pilot batch drawn at the run's FabVariation (see histogram_ranges);
+# values outside land in the under/overflow counts.
+HISTOGRAM_BINS = {
+    "power_margin_db":       450,
+    "ppln_efficiency":       400,
+    "min_wavelength_sep_nm": 120,
+    "timing_skew_ps":        200,
+    "detector_current_ua":   400,
+}
+PILOT_TRIALS = 20_000
+PILOT_STREAM = 0x9111   # keeps the pilot draws off the shards' seed streams
+
+
+def evaluate_population(chips: SampledChip, nominal: NominalDesign) -> Dict[str, np.ndarray]:
+    """Run all checks on a population; returns a columnar table {column: array}."""
+    lb_pass, margin = check_loss_budget(chips, nominal)
+    pp_pass, eff    = check_ppln_efficiency(chips, nominal)
+    ws_pass, sep    = check_wavelength_separation(chips, nominal)
+    tm_pass, skew   = check_timing(chips, nominal)
+    dt_pass, curr   = check_detector(chips, nominal, margin)
+
+    table = dict(vars(chips))
+    table.update({
+        "loss_budget_passed":     lb_pass,
+        "ppln_efficiency_passed": pp_pass,
+        "wavelength_sep_passed":  ws_pass,
+        "timing_passed":          tm_pass,
+        "detector_passed":        dt_pass,
+        "all_passed":             lb_pass & pp_pass & ws_pass & tm_pass & dt_pass,
+        "power_margin_db":        margin,
+        "ppln_efficiency":        eff,
+        "min_wavelength_sep_nm":  sep,
+        "timing_skew_ps":         skew,
+        "detector_current_ua":    curr,
+    })
+    return table
+
+
+def histogram_ranges(nominal: NominalDesign, variation: FabVariation,
+                     seed: int = 42) -> Dict[str, Tuple[float, float, int]]:
+    """Histogram (low, high, n_bins) for HISTOGRAM_BINS from a PILOT_TRIALS batch."""
+    rng = np.random.default_rng([PILOT_STREAM, seed])
+    chips = variation.sample_population(rng, nominal, PILOT_TRIALS)
+    return pilot_ranges(evaluate_population(chips, nominal), HISTOGRAM_BINS)
+
+
+def new_stats(ranges: Dict[str, Tuple[float, float, int]],
+              sample_size: int = 10_000) -> MonteCarloStats:
+    """Empty accumulator for the evaluate_population() table."""
+    return MonteCarloStats(
+        ranges,
+        worst_case_columns=["power_margin_db", "ppln_efficiency", "detector_current_ua"],
+        sample_size=sample_size,
+    )
+
+
+def _run_shard(task) -> MonteCarloStats:
+    """Sample, check and reduce one shard, chunk by chunk (runs in a worker)."""
+    n_chips, seed_seq, ranges, sample_size, chunk_size = task
+    rng = np.random.default_rng(seed_seq)
+    nominal = NominalDesign()
+    variation = FabVariation()
+    stats = new_stats(ranges, sample_size)
+    for start in range(0, n_chips, chunk_size):
+        chips = variation.sample_population(rng, nominal, min(chunk_size, n_chips - start))
+        stats.add(evaluate_population(chips, nominal))
+    return stats
 
 
 def run_monte_carlo(
     n_trials: int = 10_000,
     seed: int = 42,
     verbose: bool = True,
-) -> List[TrialResult]:
-    """Run Monte Carlo process variation analysis."""
-    rng = np.random.default_rng(seed)
+    workers: int = 1,
+    shard_size: int = 1_000_000,
+    sample_size: int = 10_000,
+    chunk_size: int = 100_000,
+) -> MonteCarloStats:
+    """
+    Run Monte Carlo process variation analysis.
+
+    Trials are split into shards of shard_size chips, each with its own
+    np.random.SeedSequence(seed).spawn() child. A worker evaluates its shard
+    chunk_size chips at a time and folds each chunk into a MonteCarloStats,
+    so memory stays constant. Partials are merged in shard order, so results
+    are bit-identical for any worker count. Histogram edges are fixed up
+    front from a pilot batch at the same variation (histogram_ranges). The
+    first sample_size trials are also kept per-trial (for plots).
+    """
     nominal = NominalDesign()
     variation = FabVariation()
 
-    results = []
+    sizes = [shard_size] * (n_trials // shard_size)
+    if n_trials % shard_size:
+        sizes.append(n_trials % shard_size)
+    starts = np.cumsum([0] + sizes[:-1])
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    ranges = histogram_ranges(nominal, variation, seed)
+    tasks = [(size, child, ranges, max(0, sample_size - int(start)), chunk_size)
+             for size, child, start in zip(sizes, children, starts)]
+    workers = max(1, min(workers, len(tasks)))
+
+    stats = new_stats(ranges, sample_size)
     t0 = time.time()
 
     if verbose:
@@ -338,90 +460,116 @@ def run_monte_carlo(
         print(f"  PPLN σ: {variation.sigma_ppln_period_um} μm ({variation.sigma_ppln_period_um/nominal.ppln_period_um*100:.2f}%)")
         print(f"  WG width σ: {variation.sigma_waveguide_width_nm} nm")
         print(f"  Loss σ: {variation.sigma_loss_db_cm} dB/cm")
+        print(f"  Shards: {len(tasks)} × ≤{shard_size:,} trials on {workers} worker(s)")
         print()
 
-    for i in range(n_trials):
-        chip = variation.sample(rng, nominal)
-
-        lb_pass, margin = check_loss_budget(chip, nominal)
-        pp_pass, eff    = check_ppln_efficiency(chip, nominal)
-        ws_pass, sep    = check_wavelength_separation(chip, nominal)
-        tm_pass, skew   = check_timing(chip, nominal)
-        dt_pass, curr   = check_detector(chip, nominal, margin)
-
-        results.append(TrialResult(
-            loss_budget_pass      = lb_pass,
-            ppln_efficiency_pass  = pp_pass,
-            wavelength_sep_pass   = ws_pass,
-            timing_pass           = tm_pass,
-            detector_pass         = dt_pass,
-            power_margin_db       = margin,
-            ppln_efficiency       = eff,
-            min_wavelength_sep_nm = sep,
-            timing_skew_ps        = skew,
-            detector_current_ua   = curr,
-        ))
-
-        if verbose and (i + 1) % 2000 == 0:
-            elapsed = time.time() - t0
-            n_pass = sum(1 for r in results if r.all_pass)
-            yield_pct = n_pass / (i + 1) * 100
-            print(f"  [{i+1:6,}/{n_trials:,}]  Running yield: {yield_pct:.2f}%  ({elapsed:.1f}s)")
-
-    return results
-
-
-def summarize(results: List[TrialResult]) -> dict:
-    """Compute summary statistics from Monte Carlo results."""
-    n = len(results)
-    n_pass = sum(1 for r in results if r.all_pass)
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        completed = pool.imap(_run_shard, tasks) if pool else map(_run_shard, tasks)
+        for partial in completed:
+            stats.merge(partial)
+            if verbose:
+                elapsed = time.time() - t0
+                yield_pct = stats.yield_fraction() * 100
+                low, high = stats.yield_interval()
+                print(f"  [{stats.n_trials:6,}/{n_trials:,}]  Running yield: {yield_pct:.4f}%  "
+                      f"95% CI [{low*100:.4f}, {high*100:.4f}]  ({elapsed:.1f}s)")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return stats
 
-    # Per-check yields
-    checks = {
-        "loss_budget":        sum(1 for r in results if r.loss_budget_pass) / n * 100,
-        "ppln_efficiency":    sum(1 for r in results if r.ppln_efficiency_pass) / n * 100,
-        "wavelength_sep":     sum(1 for r in results if r.wavelength_sep_pass) / n * 100,
-        "timing":             sum(1 for r in results if r.timing_pass) / n * 100,
-        "detector":           sum(1 for r in results if r.detector_pass) / n * 100,
+
+# =============================================================================
+# GLOBAL SENSITIVITY (Sobol indices + polynomial-chaos surrogate)
+# =============================================================================
+
+PARAMETER_COLUMNS = list(SampledChip.__dataclass_fields__)
+
+
+def check_margins(table: Dict[str, np.ndarray], nominal: NominalDesign) -> Dict[str, np.ndarray]:
+    """Signed margin per check (pass <=> margin > 0) from an evaluate_population() table."""
+    return {
+        "loss_budget_margin":     table["power_margin_db"],
+        "ppln_efficiency_margin": table["ppln_efficiency"] - MIN_PPLN_EFFICIENCY,
+        "wavelength_sep_margin":  table["min_wavelength_sep_nm"] - MIN_WAVELENGTH_SEP_NM,
+        "timing_margin":          MAX_TIMING_SKEW_PS - table["timing_skew_ps"],
+        "detector_margin":        table["detector_current_ua"] - nominal.detector_threshold_ua,
     }
 
+
+def sensitivity_problem(nominal: NominalDesign, variation: FabVariation) -> SensitivityProblem:
+    """The five check margins as a function of the 6 latent draws, for mc_sensitivity."""
+    def margins(z: np.ndarray) -> Dict[str, np.ndarray]:
+        table = evaluate_population(variation.chips_from_normals(nominal, z), nominal)
+        return check_margins(table, nominal)
+
+    return SensitivityProblem(PARAMETER_COLUMNS, margins)
+
+
+def run_sensitivity(n_base: int = 20_000, seed: int = 42,
+                    what_if: Dict[str, float] = None) -> PolynomialChaos:
+    """Print Sobol indices and single-sigma-halved what-if yields; returns the surrogate."""
+    problem = sensitivity_problem(NominalDesign(), FabVariation())
+
+    t_start = time.time()
+    print_sobol(sobol_indices(problem, n_base, seed), width=24)
+    surrogate = PolynomialChaos.fit(problem, seed=seed)
+    print_what_if(surrogate, 0.5, width=24, extra=what_if)
+    print(f"\n  Sensitivity analysis done in {time.time() - t_start:.1f}s")
+    return surrogate
+
+
+def summarize(stats: MonteCarloStats) -> dict:
+    """Compute summary statistics from the merged Monte Carlo stats."""
+    n = stats.n_trials
+    n_pass = stats.pass_counts.get("all", 0)
+
+    # Per-check yields
+    checks = {name: stats.yield_fraction(name) * 100 for name, _ in CHECK_METRICS}
+
     # Key metrics
-    margins     = [r.power_margin_db for r in results]
-    efficiencies = [r.ppln_efficiency for r in results]
-    seps        = [r.min_wavelength_sep_nm for r in results]
-    skews       = [r.timing_skew_ps for r in results]
-    currents    = [r.detector_current_ua for r in results]
+    margins      = stats.moments["power_margin_db"]
+    efficiencies = stats.moments["ppln_efficiency"]
+    seps         = stats.moments["min_wavelength_sep_nm"]
+    skews        = stats.moments["timing_skew_ps"]
+    currents     = stats.moments["detector_current_ua"]
 
     return {
         "n_trials":       n,
         "n_pass":         n_pass,
         "yield_pct":      n_pass / n * 100,
+        "yield_ci_pct":   tuple(100 * y for y in stats.yield_interval()),
         "check_yields":   checks,
         "power_margin": {
-            "mean_db":  float(np.mean(margins)),
-            "std_db":   float(np.std(margins)),
-            "min_db":   float(np.min(margins)),
-            "p01_db":   float(np.percentile(margins, 1)),
+            "mean_db":  margins.mean,
+            "std_db":   margins.std,
+            "min_db":   margins.minimum,
+            "p01_db":   stats.quantile("power_margin_db", 0.01),
         },
         "ppln_efficiency": {
-            "mean_pct":   float(np.mean(efficiencies)) * 100,
-            "std_pct":    float(np.std(efficiencies)) * 100,
-            "min_pct":    float(np.min(efficiencies)) * 100,
-            "p01_pct":    float(np.percentile(efficiencies, 1)) * 100,
+            "mean_pct":   efficiencies.mean * 100,
+            "std_pct":    efficiencies.std * 100,
+            "min_pct":    efficiencies.minimum * 100,
+            "p01_pct":    stats.quantile("ppln_efficiency", 0.01) * 100,
         },
         "wavelength_separation": {
-            "mean_nm":  float(np.mean(seps)),
-            "min_nm":   float(np.min(seps)),
+            "mean_nm":  seps.mean,
+            "min_nm":   seps.minimum,
         },
         "timing_skew": {
-            "mean_ps":  float(np.mean(skews)),
-            "max_ps":   float(np.max(skews)),
+            "mean_ps":  skews.mean,
+            "max_ps":   skews.maximum,
         },
         "detector_current": {
-            "mean_ua":  float(np.mean(currents)),
-            "min_ua":   float(np.min(currents)),
-            "p01_ua":   float(np.percentile(currents, 1)),
+            "mean_ua":  currents.mean,
+            "min_ua":   currents.minimum,
+            "p01_ua":   stats.quantile("detector_current_ua", 0.01),
         },
+        "worst_chip": stats.worst_case["power_margin_db"],
+        "out_of_range": stats.out_of_range(),
     }
 
 
@@ -432,6 +580,8 @@ def print_summary(summary: dict):
     print(f"║  Trials:   {summary['n_trials']:>10,}                                          ║")
     print(f"║  Passing:  {summary['n_pass']:>10,}                                          ║")
     print(f"║  YIELD:    {summary['yield_pct']:>9.2f}%                                         ║")
+    low, high = summary["yield_ci_pct"]
+    print(f"║  95% CI:   [{low:.2f}%, {high:.2f}%]                                     ║")
     print("╠" + "═" * 68 + "╣")
     print("║  Per-check yields:                                               ║")
     for name, pct in summary["check_yields"].items():
@@ -446,6 +596,11 @@ def print_summary(summary: dict):
     print(f"║  WDM separation:     mean={w['mean_nm']:.0f}nm  min={w['min_nm']:.0f}nm  (binary: huge)                ║")
     t = summary["timing_skew"]
     print(f"║  Timing skew:        mean={t['mean_ps']:.4f}ps  max={t['max_ps']:.4f}ps                         ║")
+    w = summary["worst_chip"]
+    print(f"║  Worst chip:         margin={w['power_margin_db']:+.1f}dB  PPLN={w['ppln_period_um']:.3f}μm  "
+          f"η={w['sfg_conversion_frac']*100:.1f}%  ║")
+    for column, (under, over) in summary["out_of_range"].items():
+        print(f"║  {f'Off histogram: {column} {under:,} below, {over:,} above':<66}║")
     print("╠" + "═" * 68 + "╣")
     yield_pct = summary["yield_pct"]
     if yield_pct >= 99.0:
@@ -460,17 +615,18 @@ def print_summary(summary: dict):
     print("╚" + "═" * 68 + "╝")
 
 
-def generate_plots(results: List[TrialResult], summary: dict, output_dir: str):
+def generate_plots(stats: MonteCarloStats, summary: dict, output_dir: str):
     """Generate publication-quality plots."""
     if not MATPLOTLIB_AVAILABLE:
         return
 
     os.makedirs(output_dir, exist_ok=True)
 
-    margins     = np.array([r.power_margin_db for r in results])
-    efficiencies = np.array([r.ppln_efficiency * 100 for r in results])
-    seps        = np.array([r.min_wavelength_sep_nm for r in results])
-    passing     = np.array([r.all_pass for r in results])
+    # Pass/fail split from the per-trial sample; distributions from all trials
+    margins     = stats.sample["power_margin_db"]
+    passing     = stats.sample["all_passed"]
+    eff_hist    = stats.histograms["ppln_efficiency"]
+    sep_hist    = stats.histograms["min_wavelength_sep_nm"]
 
     # Plot 1: Power margin distribution
     fig, ax = plt.subplots(figsize=(8, 5))
@@ -488,7 +644,7 @@ def generate_plots(results: List[TrialResult], summary: dict, output_dir: str):
 
     # Plot 2: PPLN efficiency distribution
     fig, ax = plt.subplots(figsize=(8, 5))
-    ax.hist(efficiencies, bins=60, color='#4CAF50', alpha=0.8, edgecolor='white')
+    ax.stairs(eff_hist.counts, eff_hist.edges * 100, fill=True, color='#4CAF50', alpha=0.8)
     ax.axvline(3.0, color='red', lw=2, ls='--', label='Threshold (3%)')
     ax.set_xlabel("SFG Conversion Efficiency (%)", fontsize=12)
     ax.set_ylabel("Count", fontsize=12)
@@ -521,7 +677,7 @@ def generate_plots(results: List[TrialResult], summary: dict, output_dir: str):
 
     # Plot 4: WDM separation (should be nearly constant for binary — shown to validate)
     fig, ax = plt.subplots(figsize=(8, 5))
-    ax.hist(seps, bins=60, color='#9C27B0', alpha=0.8)
+    ax.stairs(sep_hist.counts, sep_hist.edges, fill=True, color='#9C27B0', alpha=0.8)
     ax.axvline(10.0, color='red', lw=2, ls='--', label='Minimum (10 nm)')
     ax.set_xlabel("Min WDM Channel Separation (nm)", fontsize=12)
     ax.set_ylabel("Count", fontsize=12)
@@ -540,18 +696,39 @@ def generate_plots(results: List[TrialResult], summary: dict, output_dir: str):
 # =============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo yield analysis, binary 9x9 chip")
+    parser.add_argument("--trials", type=int, default=10_000, help="Number of trials")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--shard-size", type=int, default=1_000_000, help="Trials per shard")
+    parser.add_argument("--sensitivity", action="store_true",
+                        help="Sobol indices and surrogate what-if yields instead of MC")
+    parser.add_argument("--what-if", type=str, default=None,
+                        help="Extra surrogate query, e.g. 'ppln_period_um=0.5'")
+    args = parser.parse_args()
+
     print("╔" + "═" * 68 + "╗")
     print("║  MONTE CARLO YIELD ANALYSIS — Binary Optical Chip 9×9            ║")
-    print("║  10,000 trials — TFLN process variation model                    ║")
+    print(f"║  {f'{args.trials:,} trials — TFLN process variation model':<66}║")
     print("╚" + "═" * 68 + "╝")
 
-    n_trials = 10_000
-    results = run_monte_carlo(n_trials=n_trials, verbose=True)
-    summary = summarize(results)
+    if args.sensitivity:
+        what_if = None
+        if args.what_if:
+            try:
+                what_if = parse_what_if(args.what_if, PARAMETER_COLUMNS)
+            except ValueError as e:
+                parser.error(f"--what-if: {e}")
+        run_sensitivity(seed=args.seed, what_if=what_if)
+        return True
+
+    stats = run_monte_carlo(n_trials=args.trials, seed=args.seed, verbose=True,
+                            workers=args.workers, shard_size=args.shard_size)
+    summary = summarize(stats)
     print_summary(summary)
 
     output_dir = os.path.join(os.path.dirname(__file__), "..", "docs", "monte_carlo_binary_plots")
-    generate_plots(results, summary, output_dir)
+    generate_plots(stats, summary, output_dir)
 
     # Save text summary
     os.makedirs(output_dir, exist_ok=True)
@@ -567,6 +744,8 @@ def main():
                 f"min={summary['power_margin']['min_db']:+.2f} dB\n")
         f.write(f"PPLN eff:     mean={summary['ppln_efficiency']['mean_pct']:.2f}%, "
                 f"min={summary['ppln_efficiency']['min_pct']:.2f}%\n")
+        for column, (under, over) in summary["out_of_range"].items():
+            f.write(f"Off histogram range: {column}: {under:,} below, {over:,} above\n")
     print(f"\nText summary: {summary_path}")
 
     return summary["yield_pct"] >= 95.0
@@ -30,6 +30,7 @@ Sources:
 
 Usage:
     python3 thermal_sweep_binary_9x9.py
+    python3 thermal_sweep_binary_9x9.py --t-step 0.001   # millikelvin-resolution sweep
 
 Output:
     - Terminal summary with operating window
@@ -40,6 +41,7 @@ Author: Binary Optical Chip Project
 Date: 2026-02-27
 """
 
+import argparse
 import numpy as np
 import sys
 import os
@@ -93,6 +95,20 @@ WL_BIT0 = 1310.0   # nm
 WL_BIT1 = 1550.0   # nm
 WL_SFG  = 775.0    # nm
 
+# One record per temperature point, as returned by thermal_sweep()
+THERMAL_SWEEP_DTYPE = np.dtype([
+    ("temp_c",             "f8"),
+    ("sfg_efficiency_pct", "f8"),
+    ("pm_wavelength_nm",   "f8"),
+    ("sep_775_1310_nm",    "f8"),
+    ("sep_775_1550_nm",    "f8"),
+    ("sep_1310_1550_nm",   "f8"),
+    ("min_sep_nm",         "f8"),
+    ("mzi_voltage_v",      "f8"),
+    ("loss_db_cm",         "f8"),
+    ("pass",               "?"),
+])
+
 
 # =============================================================================
 # THERMAL MODELS
@@ -133,13 +149,13 @@ def sfg_conversion_at_temp(temp_c: float, pump_wavelength_nm: float = WL_BIT1) -
     """
     pm_wl = ppln_phase_match_wavelength(temp_c)
     # Phase mismatch from wavelength detuning
-    delta_wl = abs(pump_wavelength_nm - pm_wl)
+    delta_wl = np.abs(pump_wavelength_nm - pm_wl)
     # Convert to Δk (approximate, first-order in wavelength)
     # Δk ≈ 2π × Δλ / (λ² × group_index_difference)
     group_index = 2.2  # approximate group index for TFLN
     delta_k_per_um = 2 * np.pi * delta_wl / (pump_wavelength_nm ** 2 / 1e3) / group_index
     delta_phi = delta_k_per_um * PPLN_LENGTH_UM
-    sinc_sq = float(np.sinc(delta_phi / (2 * np.pi)) ** 2)
+    sinc_sq = np.sinc(delta_phi / (2 * np.pi)) ** 2
     return SFG_EFF_NOM * sinc_sq
 
 
@@ -167,10 +183,10 @@ def wdm_separation_at_temp(temp_c: float) -> dict:
         "eff_1310_nm": eff_1310,
         "eff_1550_nm": eff_1550,
         "eff_775_nm":  eff_775,
-        "sep_775_to_1310_nm": abs(eff_1310 - eff_775),
-        "sep_775_to_1550_nm": abs(eff_1550 - eff_775),
-        "sep_1310_to_1550_nm": abs(eff_1550 - eff_1310),
-        "min_sep_nm": min(abs(eff_1310 - eff_775), abs(eff_1550 - eff_775)),
+        "sep_775_to_1310_nm": np.abs(eff_1310 - eff_775),
+        "sep_775_to_1550_nm": np.abs(eff_1550 - eff_775),
+        "sep_1310_to_1550_nm": np.abs(eff_1550 - eff_1310),
+        "min_sep_nm": np.minimum(np.abs(eff_1310 - eff_775), np.abs(eff_1550 - eff_775)),
     }
 
 
@@ -192,7 +208,7 @@ def mzi_voltage_drift(temp_c: float) -> dict:
     return {
         "passive_phase_rad": delta_phi,
         "voltage_offset_v": v_offset,
-        "tunable_without_feedback": abs(v_offset) < 0.1,  # <5% of V_pi is negligible
+        "tunable_without_feedback": np.abs(v_offset) < 0.1,  # <5% of V_pi is negligible
     }
 
 
@@ -214,46 +230,47 @@ def thermal_sweep(
     t_min: float = 15.0,
     t_max: float = 55.0,
     n_steps: int = 41,
-) -> list:
-    """Run thermal sweep from t_min to t_max."""
-    temps = np.linspace(t_min, t_max, n_steps)
-    rows = []
-    for t in temps:
-        eff = sfg_conversion_at_temp(t)
-        wdm = wdm_separation_at_temp(t)
-        mzi = mzi_voltage_drift(t)
-        loss = loss_vs_temp(t)
-        pm_wl = ppln_phase_match_wavelength(t)
-
-        rows.append({
-            "temp_c":            round(t, 2),
-            "sfg_efficiency_pct": round(eff * 100, 3),
-            "pm_wavelength_nm":  round(pm_wl, 4),
-            "sep_775_1310_nm":   round(wdm["sep_775_to_1310_nm"], 2),
-            "sep_775_1550_nm":   round(wdm["sep_775_to_1550_nm"], 2),
-            "sep_1310_1550_nm":  round(wdm["sep_1310_to_1550_nm"], 2),
-            "min_sep_nm":        round(wdm["min_sep_nm"], 2),
-            "mzi_voltage_v":     round(mzi["voltage_offset_v"], 3),
-            "loss_db_cm":        round(loss, 4),
-            "pass": (eff > 0.01 and wdm["min_sep_nm"] > 10.0),  # min criteria
-        })
+    temperatures: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Run thermal sweep from t_min to t_max (or over an explicit temperature grid).
+
+    All models are evaluated on the whole temperature vector at once and
+    returned as one THERMAL_SWEEP_DTYPE record per temperature.
+    """
+    temps = np.linspace(t_min, t_max, n_steps) if temperatures is None else np.asarray(temperatures, float)
+    eff = sfg_conversion_at_temp(temps)
+    wdm = wdm_separation_at_temp(temps)
+    mzi = mzi_voltage_drift(temps)
+
+    rows = np.empty(len(temps), dtype=THERMAL_SWEEP_DTYPE)
+    rows["temp_c"]             = np.round(temps, 4)
+    rows["sfg_efficiency_pct"] = np.round(eff * 100, 3)
+    rows["pm_wavelength_nm"]   = np.round(ppln_phase_match_wavelength(temps), 4)
+    rows["sep_775_1310_nm"]    = np.round(wdm["sep_775_to_1310_nm"], 2)
+    rows["sep_775_1550_nm"]    = np.round(wdm["sep_775_to_1550_nm"], 2)
+    rows["sep_1310_1550_nm"]   = np.round(wdm["sep_1310_to_1550_nm"], 2)
+    rows["min_sep_nm"]         = np.round(wdm["min_sep_nm"], 2)
+    rows["mzi_voltage_v"]      = np.round(mzi["voltage_offset_v"], 3)
+    rows["loss_db_cm"]         = np.round(loss_vs_temp(temps), 4)
+    rows["pass"]               = (eff > 0.01) & (wdm["min_sep_nm"] > 10.0)  # min criteria
     return rows
 
 
-def find_operating_window(rows: list) -> dict:
+def find_operating_window(rows: np.ndarray) -> dict:
     """Find the contiguous temperature range where all checks pass."""
-    passing_temps = [r["temp_c"] for r in rows if r["pass"]]
-    if not passing_temps:
+    passing_temps = rows["temp_c"][rows["pass"]]
+    if not passing_temps.size:
         return {"t_min": None, "t_max": None, "width_c": 0, "pass": False}
     return {
-        "t_min": min(passing_temps),
-        "t_max": max(passing_temps),
-        "width_c": max(passing_temps) - min(passing_temps),
+        "t_min": float(passing_temps.min()),
+        "t_max": float(passing_temps.max()),
+        "width_c": float(passing_temps.max() - passing_temps.min()),
         "pass": True,
     }
 
 
-def print_summary(rows: list, window: dict):
+def print_summary(rows: np.ndarray, window: dict):
     """Print human-readable thermal analysis summary."""
     print("\n" + "=" * 70)
     print("  THERMAL SENSITIVITY ANALYSIS — Binary Optical Chip 9×9")
@@ -264,7 +281,7 @@ def print_summary(rows: list, window: dict):
     # Print table header
     print(f"  {'Temp':>6}  {'SFG Eff':>8}  {'PM λ':>8}  {'Sep 775-1310':>13}  {'Sep 775-1550':>13}  {'Pass':>6}")
     print("  " + "-" * 65)
-    for r in rows[::4]:  # print every 4th step
+    for r in rows[::max(1, len(rows) // 10)]:  # ~10 table lines whatever the step
         flag = "✓" if r["pass"] else "✗"
         print(f"  {r['temp_c']:>5.0f}C  {r['sfg_efficiency_pct']:>7.2f}%  "
               f"{r['pm_wavelength_nm']:>7.3f}nm  "
@@ -289,21 +306,22 @@ def print_summary(rows: list, window: dict):
     print("\n" + "=" * 70)
 
 
-def generate_plots(rows: list, window: dict, output_dir: str):
+def generate_plots(rows: np.ndarray, window: dict, output_dir: str):
     if not MATPLOTLIB_AVAILABLE:
         return
 
     os.makedirs(output_dir, exist_ok=True)
-    temps = [r["temp_c"] for r in rows]
-    effs  = [r["sfg_efficiency_pct"] for r in rows]
-    pm_wls = [r["pm_wavelength_nm"] for r in rows]
-    sep_775_1310 = [r["sep_775_1310_nm"] for r in rows]
-    sep_775_1550 = [r["sep_775_1550_nm"] for r in rows]
-    mzi_v = [r["mzi_voltage_v"] for r in rows]
+    temps = rows["temp_c"]
+    effs  = rows["sfg_efficiency_pct"]
+    pm_wls = rows["pm_wavelength_nm"]
+    sep_775_1310 = rows["sep_775_1310_nm"]
+    sep_775_1550 = rows["sep_775_1550_nm"]
+    mzi_v = rows["mzi_voltage_v"]
+    ms = 4 if len(rows) <= 200 else 0  # markers only on coarse sweeps
 
     # Plot 1: SFG conversion efficiency vs temperature
     fig, ax = plt.subplots(figsize=(8, 5))
-    ax.plot(temps, effs, 'b-o', ms=4)
+    ax.plot(temps, effs, 'b-o', ms=ms)
     if window["pass"]:
         ax.axvspan(window["t_min"], window["t_max"], alpha=0.1, color='green', label=f'Operating window ({window["t_min"]:.0f}-{window["t_max"]:.0f}°C)')
     ax.axhline(1.0, color='red', ls='--', lw=1.5, label='Threshold (1%)')
@@ -319,7 +337,7 @@ def generate_plots(rows: list, window: dict, output_dir: str):
 
     # Plot 2: PPLN phase-match wavelength drift
     fig, ax = plt.subplots(figsize=(8, 5))
-    ax.plot(temps, pm_wls, 'g-o', ms=4)
+    ax.plot(temps, pm_wls, 'g-o', ms=ms)
     ax.axhline(WL_BIT1, color='blue', ls='--', lw=1.5, label='Pump wavelength (1550 nm)')
     ax.set_xlabel("Temperature (°C)", fontsize=12)
     ax.set_ylabel("Phase-Match Pump Wavelength (nm)", fontsize=12)
@@ -361,15 +379,15 @@ def generate_plots(rows: list, window: dict, output_dir: str):
     print(f"\nPlots saved to: {output_dir}")
 
 
-def save_csv(rows: list, output_dir: str):
+def save_csv(rows: np.ndarray, output_dir: str):
     """Save sweep data to CSV."""
     os.makedirs(output_dir, exist_ok=True)
     csv_path = os.path.join(output_dir, "thermal_sweep_data.csv")
-    if rows:
+    if len(rows):
         with open(csv_path, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
+            writer = csv.writer(f)
+            writer.writerow(rows.dtype.names)
+            writer.writerows(rows.tolist())
     print(f"CSV saved to: {csv_path}")
 
 
@@ -378,11 +396,18 @@ def save_csv(rows: list, output_dir: str):
 # =============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description="Thermal sensitivity sweep, binary 9x9 chip")
+    parser.add_argument("--t-min", type=float, default=15.0, help="Sweep start [°C] (default: 15)")
+    parser.add_argument("--t-max", type=float, default=55.0, help="Sweep end [°C] (default: 55)")
+    parser.add_argument("--t-step", type=float, default=1.0, help="Sweep step [°C] (default: 1)")
+    args = parser.parse_args()
+
     print("╔" + "═" * 68 + "╗")
     print("║  THERMAL SENSITIVITY ANALYSIS — Binary Optical Chip 9×9          ║")
     print("╚" + "═" * 68 + "╝")
 
-    rows = thermal_sweep(t_min=15.0, t_max=55.0, n_steps=41)
+    n_steps = int(round((args.t_max - args.t_min) / args.t_step)) + 1
+    rows = thermal_sweep(t_min=args.t_min, t_max=args.t_max, n_steps=n_steps)
     window = find_operating_window(rows)
     print_summary(rows, window)
 
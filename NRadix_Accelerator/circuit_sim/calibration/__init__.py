@@ -1 +1,4 @@
 # S-parameter calibration data from Meep FDTD
+from .cache import (
+    CACHE_VERSION, CalibrationCache, CalibrationEntry, geometry_key, load_calibration,
+)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Build the FDTD calibration cache from stored Meep results.
+
+Scans CSV/NPZ outputs of the FDTD scripts, fits the compact component
+models in calibration/fits.py and writes them to the calibration cache
+that models/components.py loads at import.
+
+Recognized files (by name, as written by the simulation scripts):
+  mixer_data_<C1>_<C2>.csv          universal_mixer.py   -> sfg_mixer
+  awg_response_<wl>nm.csv,
+  awg_broadband*.csv                awg_demux_sim.py     -> awg_demux
+  coupler_param_sweep_<wl>nm.csv,
+  coupler_gap_sweep_<wl>nm.csv      directional_coupler_sim.py
+                                                         -> directional_coupler
+
+Mixer runs named by color were made at the FDTD scripts' wavelengths
+(MIXER_COLOR_NM), which differ from the circuit simulator's trit
+wavelengths (models.components.TRIT_TO_WL). The efficiency is fitted at
+the run wavelengths but stored under the simulator's wavelengths for the
+same colors, so sfg_conversion_efficiency() finds it. Mixer files named by
+wavelength (mixer_data_1040nm_1000nm.csv) are stored as given.
+Directional-coupler fits are kept in the cache for reference; no circuit
+model reads them yet.
+
+Usage:
+    python calibration/build_cache.py Research/programs/data/csv
+    python calibration/build_cache.py mixer_data_RED_BLUE.csv --ppln-length 26
+    python calibration/build_cache.py data/ --force      # re-fit unchanged files
+
+Author: N-Radix Project
+"""
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calibration.cache import CalibrationCache, CalibrationEntry, load_calibration
+from calibration.fdtd_io import read_fdtd_table, file_digest
+from calibration.fits import fit_sfg_mixer, fit_awg, fit_directional_coupler
+from models.components import TRIT_TO_WL
+
+
+# Color labels used by universal_mixer.py / optical_simulation.py runs (nm)
+MIXER_COLOR_NM = {"RED": 1550.0, "GREEN": 1216.0, "BLUE": 1000.0}
+
+# Trit each color encodes (models.components.TRIT_TO_WL)
+MIXER_COLOR_TRIT = {"RED": -1, "GREEN": 0, "BLUE": +1}
+
+
+def _mixer_wavelength(label: str) -> float:
+    """Wavelength (nm) the FDTD run used for a file-name label."""
+    if label in MIXER_COLOR_NM:
+        return MIXER_COLOR_NM[label]
+    return float(label.removesuffix("nm"))
+
+
+def _circuit_wavelength(label: str) -> float:
+    """Wavelength (nm) the circuit simulator uses for a file-name label."""
+    if label in MIXER_COLOR_TRIT:
+        return float(TRIT_TO_WL[MIXER_COLOR_TRIT[label]])
+    return float(label.removesuffix("nm"))
+
+
+def ingest_file(
+    cache: CalibrationCache,
+    path: str | Path,
+    ppln_length_um: float = 26.0,
+    coupler_length_um: float = 6.0,
+    force: bool = False,
+) -> CalibrationEntry | None:
+    """
+    Fit one FDTD result file and store the result in cache.
+
+    Returns:
+        The new entry, or None if the file is not a recognized FDTD output
+        or was already fitted (same SHA-256) and force is False.
+    """
+    path = Path(path)
+    stem = path.stem
+
+    if stem.startswith("mixer_data_"):
+        component = "sfg_mixer"
+    elif stem.startswith(("awg_response", "awg_broadband")) and not stem.endswith("_crosstalk"):
+        component = "awg_demux"
+    elif stem.startswith(("coupler_param_sweep_", "coupler_gap_sweep_")):
+        component = "directional_coupler"
+    else:
+        return None
+
+    digest = file_digest(path)
+    if not force and cache.has_source(component, digest):
+        return None
+
+    table = read_fdtd_table(path)
+
+    if component == "sfg_mixer":
+        labels = stem.removeprefix("mixer_data_").split("_")
+        if len(labels) != 2:
+            raise ValueError(f"{path.name}: expected mixer_data_<A>_<B>")
+        wl_a, wl_b = (_mixer_wavelength(label) for label in labels)
+        fit = fit_sfg_mixer(table, wl_a, wl_b)
+        circuit_wl = sorted(_circuit_wavelength(label) for label in labels)
+        geometry = {
+            "ppln_length_um": ppln_length_um,
+            "wl_short_nm": circuit_wl[0],
+            "wl_long_nm": circuit_wl[1],
+        }
+    elif component == "awg_demux":
+        fit = fit_awg(table)
+        geometry = {"n_channels": sum(
+            1 for name in table if name.startswith("ch") and name.endswith("_t")
+        )}
+    else:
+        match = re.search(r"(\d+)nm", stem)
+        if match is None:
+            raise ValueError(f"{path.name}: no wavelength in file name")
+        fit = fit_directional_coupler(table, default_length_um=coupler_length_um)
+        geometry = {"wavelength_nm": float(match.group(1))}
+
+    entry = CalibrationEntry(
+        component=component,
+        geometry=geometry,
+        params=fit.params,
+        source=path.name,
+        source_sha256=digest,
+        fit_rms=fit.fit_rms,
+    )
+    cache.put(entry)
+    return entry
+
+
+def _expand(paths: list[str]) -> list[Path]:
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(p.glob("*.csv")) + sorted(p.glob("*.npz")))
+        else:
+            files.append(p)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit circuit-sim models to FDTD results")
+    parser.add_argument("paths", nargs="+", help="FDTD CSV/NPZ files or directories")
+    parser.add_argument("--cache", type=str, default=None, help="Calibration cache path")
+    parser.add_argument("--ppln-length", type=float, default=26.0,
+                        help="PPLN length (um) of the mixer runs")
+    parser.add_argument("--coupler-length", type=float, default=6.0,
+                        help="Coupling length (um) of gap-only coupler sweeps")
+    parser.add_argument("--force", action="store_true", help="Re-fit files already in the cache")
+    args = parser.parse_args()
+
+    cache = load_calibration(args.cache)
+
+    print("=" * 60)
+    print("  FDTD CALIBRATION CACHE")
+    print(f"  Cache: {cache.path}")
+    print("=" * 60)
+
+    n_new = 0
+    for path in _expand(args.paths):
+        try:
+            entry = ingest_file(cache, path, args.ppln_length, args.coupler_length, args.force)
+        except (ValueError, KeyError) as e:
+            print(f"  SKIP  {path.name}: {e}")
+            continue
+        if entry is None:
+            continue
+        n_new += 1
+        params = ", ".join(f"{k}={v:.4g}" for k, v in entry.params.items())
+        print(f"  FIT   {path.name} -> {entry.component}[{entry.key}]")
+        print(f"        {params} (rms={entry.fit_rms:.3g})")
+
+    if n_new:
+        cache.save()
+    print(f"\n  {n_new} new fit(s), {len(cache)} entries in cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Versioned on-disk cache of compact component models fitted to FDTD results.
+
+Layout of the JSON file:
+
+    {
+      "version": 1,
+      "components": {
+        "sfg_mixer": {
+          "ppln_length_um=26,wl_long_nm=1550,wl_short_nm=1064": {
+            "geometry": {...},
+            "params": {"conversion_efficiency": 0.087},
+            "source": "mixer_data_RED_BLUE.csv",
+            "source_sha256": "...",
+            "fit_rms": 0.0
+          }
+        },
+        "awg_demux": {...},
+        "directional_coupler": {...}
+      }
+    }
+
+Entries are keyed by the geometry the FDTD run was made for, so a lookup
+only returns parameters fitted to the same physical structure. A cache
+written by a different CACHE_VERSION is ignored rather than misread.
+"""
+
+import json
+import os
+import warnings
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = Path(__file__).parent / "fdtd_calibration.json"
+CACHE_PATH_ENV = "NRADIX_CALIBRATION_CACHE"
+
+
+def geometry_key(geometry: dict[str, float]) -> str:
+    """Canonical, order-independent key for a geometry dict."""
+    return ",".join(f"{name}={value:g}" for name, value in sorted(geometry.items()))
+
+
+@dataclass
+class CalibrationEntry:
+    """Fitted model parameters for one component geometry."""
+    component: str
+    geometry: dict[str, float]
+    params: dict[str, float]
+    source: str = ""
+    source_sha256: str = ""
+    fit_rms: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return geometry_key(self.geometry)
+
+
+@dataclass
+class CalibrationCache:
+    """In-memory view of the calibration file."""
+    path: Path = DEFAULT_CACHE_PATH
+    components: dict[str, dict[str, CalibrationEntry]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | Path = DEFAULT_CACHE_PATH) -> 'CalibrationCache':
+        """Load a cache file. A missing or stale file gives an empty cache."""
+        cache = cls(Path(path))
+        if not cache.path.exists():
+            return cache
+
+        with open(cache.path) as f:
+            raw = json.load(f)
+
+        if raw.get("version") != CACHE_VERSION:
+            warnings.warn(
+                f"Ignoring calibration cache {cache.path}: version "
+                f"{raw.get('version')} != {CACHE_VERSION}"
+            )
+            return cache
+
+        for component, entries in raw.get("components", {}).items():
+            for key, entry in entries.items():
+                cache.components.setdefault(component, {})[key] = CalibrationEntry(
+                    component=component, **entry,
+                )
+        return cache
+
+    def save(self) -> None:
+        """Write the cache atomically (temp file + rename)."""
+        raw = {"version": CACHE_VERSION, "components": {}}
+        for component, entries in sorted(self.components.items()):
+            raw["components"][component] = {}
+            for key, entry in sorted(entries.items()):
+                data = asdict(entry)
+                del data["component"]
+                raw["components"][component][key] = data
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(raw, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def put(self, entry: CalibrationEntry) -> None:
+        """Insert or replace the entry for entry.geometry."""
+        self.components.setdefault(entry.component, {})[entry.key] = entry
+
+    def get(self, component: str, geometry: dict[str, float]) -> CalibrationEntry | None:
+        """Entry fitted for exactly this geometry, or None."""
+        return self.components.get(component, {}).get(geometry_key(geometry))
+
+    def param(
+        self,
+        component: str,
+        geometry: dict[str, float],
+        name: str,
+        default: float,
+    ) -> float:
+        """Calibrated parameter value, or default if no matching fit exists."""
+        entry = self.get(component, geometry)
+        if entry is None or name not in entry.params:
+            return default
+        return entry.params[name]
+
+    def has_source(self, component: str, source_sha256: str) -> bool:
+        """True if a file with this digest was already fitted for component."""
+        return any(
+            entry.source_sha256 == source_sha256
+            for entry in self.components.get(component, {}).values()
+        )
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.components.values())
+
+
+def load_calibration(path: str | Path | None = None) -> CalibrationCache:
+    """
+    Load the calibration cache used by the circuit-sim component models.
+
+    The path defaults to $NRADIX_CALIBRATION_CACHE, then to
+    calibration/fdtd_calibration.json next to this module.
+    """
+    if path is None:
+        path = os.environ.get(CACHE_PATH_ENV, DEFAULT_CACHE_PATH)
+    return CalibrationCache.load(path)
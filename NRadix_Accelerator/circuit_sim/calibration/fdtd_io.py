@@ -0,0 +1,66 @@
+"""
+Readers for the FDTD result files written by the Meep simulation scripts.
+
+The simulations save their flux spectra and sweep tables with
+np.savetxt(..., header="Frequency (Meep),Wavelength (um),...", comments='').
+Some runs also save the same columns as an .npz archive. Both formats are
+read into a plain {column_name: array} table with normalized column names:
+
+    "Frequency (Meep)"  -> "frequency_meep"
+    "Wavelength (um)"   -> "wavelength_um"
+    "Ch3 T"             -> "ch3_t"
+    "Split Error (%)"   -> "split_error"
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+import numpy as np
+
+
+def normalize_column(name: str) -> str:
+    """Turn a CSV header like 'Gap (um)' into a key like 'gap_um'."""
+    name = name.strip().lower().replace("%", "")
+    name = re.sub(r"[^a-z0-9]+", "_", name)
+    return name.strip("_")
+
+
+def read_fdtd_table(path: str | Path) -> dict[str, np.ndarray]:
+    """
+    Read an FDTD output table (CSV with a header row, or NPZ).
+
+    Args:
+        path: Path to a .csv or .npz file
+
+    Returns:
+        Dict of {normalized_column_name: 1-D float array}
+    """
+    path = Path(path)
+
+    if path.suffix == ".npz":
+        with np.load(path) as archive:
+            return {
+                normalize_column(key): np.asarray(archive[key], dtype=float)
+                for key in archive.files
+            }
+
+    with open(path) as f:
+        header = f.readline()
+    names = [normalize_column(col) for col in header.split(",")]
+
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    if data.shape[1] != len(names):
+        raise ValueError(
+            f"{path}: header has {len(names)} columns but data has {data.shape[1]}"
+        )
+    return {name: data[:, i] for i, name in enumerate(names)}
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of a result file, used to skip re-fitting unchanged data."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,224 @@
+"""
+Compact parametric models fitted to FDTD result tables.
+
+Each fit reduces a full Meep spectrum or sweep to the handful of numbers the
+circuit-sim component models in models/components.py actually take:
+
+    sfg_mixer            conversion_efficiency
+    awg_demux            insertion_loss_db, channel_bandwidth_nm, crosstalk_db
+    directional_coupler  kappa0_per_um, gap_decay_um, excess_loss_db
+
+Tables come from calibration.fdtd_io.read_fdtd_table().
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+FWHM_PER_SIGMA = 2.355
+
+
+@dataclass
+class FitResult:
+    """Fitted parameters plus the RMS residual of the fit (0 if not a fit)."""
+    params: dict[str, float]
+    fit_rms: float = 0.0
+
+
+def _column(table: dict[str, np.ndarray], prefix: str) -> np.ndarray:
+    """First column whose normalized name starts with prefix."""
+    for name, values in table.items():
+        if name.startswith(prefix):
+            return values
+    raise KeyError(f"No '{prefix}*' column in FDTD table (have {sorted(table)})")
+
+
+def _band_power(wl_nm: np.ndarray, flux: np.ndarray, center_nm: float,
+                rel_width: float) -> float:
+    """Integrated |flux| within center_nm * (1 +/- rel_width)."""
+    order = np.argsort(wl_nm)
+    wl_nm, flux = wl_nm[order], np.abs(flux[order])
+    in_band = np.abs(wl_nm - center_nm) <= rel_width * center_nm
+    if in_band.sum() < 2:
+        # Band narrower than the monitor spacing: use the nearest sample
+        return float(flux[np.argmin(np.abs(wl_nm - center_nm))])
+    dwl = np.abs(np.gradient(wl_nm[in_band]))
+    return float(np.sum(flux[in_band] * dwl))
+
+
+# =============================================================================
+# SFG mixer
+# =============================================================================
+
+def fit_sfg_mixer(
+    table: dict[str, np.ndarray],
+    wl_a_nm: float,
+    wl_b_nm: float,
+    rel_band: float = 0.025,
+) -> FitResult:
+    """
+    Conversion efficiency from a universal_mixer output spectrum.
+
+    The circuit model is P_sfg = eta * sqrt(P_a * P_b), so eta is estimated
+    as the band power at the sum wavelength over the geometric mean of the
+    band powers at the two inputs. rel_band matches the 5% fractional
+    source bandwidth used by universal_mixer.py.
+    """
+    wl_nm = _column(table, "wavelength_um") * 1000.0
+    flux = _column(table, "flux")
+    wl_sum_nm = 1.0 / (1.0 / wl_a_nm + 1.0 / wl_b_nm)
+
+    p_a = _band_power(wl_nm, flux, wl_a_nm, rel_band)
+    p_b = _band_power(wl_nm, flux, wl_b_nm, rel_band)
+    p_sum = _band_power(wl_nm, flux, wl_sum_nm, rel_band)
+
+    if p_a <= 0 or p_b <= 0:
+        raise ValueError("Input bands carry no flux; cannot estimate efficiency")
+
+    eta = float(np.clip(p_sum / np.sqrt(p_a * p_b), 0.0, 1.0))
+    return FitResult({"conversion_efficiency": eta})
+
+
+# =============================================================================
+# AWG demultiplexer
+# =============================================================================
+
+def _fit_gaussian_passband(wl_nm: np.ndarray, trans: np.ndarray) -> tuple[float, float, float, float]:
+    """
+    Fit T(wl) = peak * exp(-0.5 * ((wl - center) / sigma)^2) around the peak
+    by a quadratic fit to log T over the half-maximum region.
+
+    Returns:
+        (center_nm, sigma_nm, peak, rms_residual)
+    """
+    i_peak = int(np.argmax(trans))
+    half = trans[i_peak] / 2.0
+
+    lo = i_peak
+    while lo > 0 and trans[lo - 1] >= half:
+        lo -= 1
+    hi = i_peak
+    while hi < len(trans) - 1 and trans[hi + 1] >= half:
+        hi += 1
+    if hi - lo < 2:
+        lo, hi = max(i_peak - 1, 0), min(i_peak + 1, len(trans) - 1)
+
+    sel = slice(lo, hi + 1)
+    x = wl_nm[sel] - wl_nm[i_peak]
+    a, b, c = np.polyfit(x, np.log(np.maximum(trans[sel], 1e-30)), 2)
+    if a >= 0:
+        raise ValueError("AWG channel response has no peak to fit")
+
+    sigma = float(np.sqrt(-1.0 / (2.0 * a)))
+    center = float(wl_nm[i_peak] - b / (2.0 * a))
+    peak = float(np.exp(c - b * b / (4.0 * a)))
+
+    model = peak * np.exp(-0.5 * ((wl_nm[sel] - center) / sigma) ** 2)
+    rms = float(np.sqrt(np.mean((model - trans[sel]) ** 2)))
+    return center, sigma, peak, rms
+
+
+def fit_awg(table: dict[str, np.ndarray]) -> FitResult:
+    """
+    Gaussian passband model from an awg_demux_sim response table.
+
+    Expects the 'Wavelength (um)' column and one 'Ch<i> T' column per
+    output channel.
+    """
+    wl_nm = _column(table, "wavelength_um") * 1000.0
+    order = np.argsort(wl_nm)
+    wl_nm = wl_nm[order]
+
+    channel_cols = sorted(
+        (name for name in table if name.startswith("ch") and name.endswith("_t")),
+        key=lambda name: int(name[2:-2]),
+    )
+    if not channel_cols:
+        raise KeyError("No 'Ch<i> T' columns in AWG table")
+
+    fits = [_fit_gaussian_passband(wl_nm, table[name][order]) for name in channel_cols]
+    centers = np.array([f[0] for f in fits])
+    sigmas = np.array([f[1] for f in fits])
+    peaks = np.array([f[2] for f in fits])
+
+    # Crosstalk: worst leakage of channel j at channel i's center, relative
+    # to channel j's own peak
+    worst_leak = 1e-12
+    for i, center in enumerate(centers):
+        for j, name in enumerate(channel_cols):
+            if i == j:
+                continue
+            leak = np.interp(center, wl_nm, table[name][order]) / peaks[j]
+            worst_leak = max(worst_leak, float(leak))
+
+    params = {
+        "insertion_loss_db": float(-10 * np.log10(np.clip(peaks.mean(), 1e-12, 1.0))),
+        "channel_bandwidth_nm": float(FWHM_PER_SIGMA * sigmas.mean()),
+        "crosstalk_db": float(10 * np.log10(min(worst_leak, 1.0))),
+    }
+    for i, center in enumerate(centers):
+        params[f"ch{i}_center_nm"] = float(center)
+
+    rms = float(np.sqrt(np.mean([f[3] ** 2 for f in fits])))
+    return FitResult(params, rms)
+
+
+# =============================================================================
+# Directional coupler
+# =============================================================================
+
+def coupler_cross_fraction(
+    gap_um: np.ndarray,
+    length_um: np.ndarray,
+    kappa0_per_um: float,
+    gap_decay_um: float,
+) -> np.ndarray:
+    """Coupled-mode cross-port fraction sin^2(kappa(gap) * L)."""
+    kappa = kappa0_per_um * np.exp(-np.asarray(gap_um) / gap_decay_um)
+    return np.sin(kappa * np.asarray(length_um)) ** 2
+
+
+def fit_directional_coupler(
+    table: dict[str, np.ndarray],
+    default_length_um: float = 6.0,
+) -> FitResult:
+    """
+    Exponential-gap coupled-mode model from a coupler gap or 2D sweep table.
+
+    Gap-only sweeps (run_gap_sweep) do not record the length, so
+    default_length_um should match the coupling_length they were run at.
+    """
+    from scipy.optimize import curve_fit
+
+    gap = _column(table, "gap_um")
+    length = table.get("length_um", np.full_like(gap, default_length_um))
+    through = _column(table, "through_t")
+    cross = _column(table, "cross_t")
+    total = through + cross
+    ratio = cross / np.where(total > 0, total, 1.0)
+
+    def model(xy, kappa0, decay):
+        return coupler_cross_fraction(xy[0], xy[1], kappa0, decay)
+
+    # sin^2 is multi-valued in kappa*L: seed curve_fit from a coarse grid
+    best = None
+    for decay in np.linspace(0.05, 0.5, 10):
+        for kl in np.linspace(0.1, 3.0, 30):
+            kappa0 = kl / np.mean(length) * np.exp(np.mean(gap) / decay)
+            err = np.sum((model((gap, length), kappa0, decay) - ratio) ** 2)
+            if best is None or err < best[0]:
+                best = (err, kappa0, decay)
+
+    (kappa0, decay), _ = curve_fit(
+        model, (gap, length), ratio, p0=best[1:],
+        bounds=([0.0, 1e-3], [np.inf, 10.0]),
+    )
+    residual = model((gap, length), kappa0, decay) - ratio
+
+    params = {
+        "kappa0_per_um": float(kappa0),
+        "gap_decay_um": float(decay),
+        "excess_loss_db": float(max(0.0, -10 * np.log10(np.clip(total.mean(), 1e-12, None)))),
+    }
+    return FitResult(params, float(np.sqrt(np.mean(residual ** 2))))
@@ -8,11 +8,25 @@ Material: X-cut LiNbO3 (TFLN)
 Wavelengths: 1064, 1310, 1550 nm (input) → 532-775 nm (SFG output)
 
 Extended to support all 6 WDM triplets (1000-1340 nm input, 500-670 nm SFG).
+
+Default model parameters are replaced by FDTD-fitted values when the
+calibration cache (calibration/build_cache.py) has an entry for the same
+geometry. Without a cache the nominal values below are used.
 """
 
+import os
+import sys
 import numpy as np
 from dataclasses import dataclass
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calibration.cache import load_calibration
+from models.kernels import (
+    dbm_to_mw, mw_to_dbm, propagation_loss_db, propagation_phase_rad,
+    sfg_wavelength_nm, photocurrent_ua,
+)
+
 
 # =============================================================================
 # Physical constants and material properties
@@ -22,6 +36,9 @@ N_LINBO3 = 2.2                    # Bulk refractive index
 C_UM_PS = 299.792                 # Speed of light (μm/ps)
 V_GROUP = C_UM_PS / N_LINBO3      # Group velocity in LiNbO3
 
+# FDTD-fitted component parameters, keyed by geometry (empty if never built)
+CALIBRATION = load_calibration()
+
 
 def neff_sellmeier(wavelength_nm: float) -> float:
     """
@@ -103,7 +120,7 @@ class OpticalSignal:
 
     @property
     def power_mw(self) -> float:
-        return 10 ** (self.power_dbm / 10)
+        return dbm_to_mw(self.power_dbm)
 
     def attenuate(self, loss_db: float) -> 'OpticalSignal':
         return OpticalSignal(
@@ -143,11 +160,8 @@ def waveguide_transfer(
     wl = signal.wavelength_nm
     neff = NEFF.get(round(wl), neff_sellmeier(wl))
 
-    # Loss
-    loss_db = loss_db_per_cm * length_um / 1e4
-
-    # Phase
-    phase = 2 * np.pi * neff * length_um / (wl / 1000)  # wl in μm
+    loss_db = propagation_loss_db(length_um, loss_db_per_cm)
+    phase = propagation_phase_rad(neff, length_um, wl)
 
     return OpticalSignal(wl, signal.power_dbm - loss_db, signal.phase_rad + phase)
 
@@ -156,11 +170,31 @@ def waveguide_transfer(
 # Component: SFG Mixer (PPLN)
 # =============================================================================
 
+SFG_CONVERSION_EFFICIENCY = 0.10  # Nominal, used when no FDTD fit matches
+SFG_MIN_POWER_DBM = -40.0         # Below this on either input there is no SFG
+
+
+def sfg_conversion_efficiency(
+    wl_a_nm: float,
+    wl_b_nm: float,
+    ppln_length_um: float = 26.0,
+) -> float:
+    """FDTD-calibrated conversion efficiency for a wavelength pair, else nominal."""
+    wl_pair = sorted((round(wl_a_nm), round(wl_b_nm)))
+    return CALIBRATION.param(
+        "sfg_mixer",
+        {"ppln_length_um": ppln_length_um,
+         "wl_short_nm": wl_pair[0], "wl_long_nm": wl_pair[1]},
+        "conversion_efficiency",
+        SFG_CONVERSION_EFFICIENCY,
+    )
+
+
 def sfg_mixer(
     signal_a: OpticalSignal,
     signal_b: OpticalSignal,
     ppln_length_um: float = 26.0,
-    conversion_efficiency: float = 0.10,
+    conversion_efficiency: float | None = None,
     insertion_loss_db: float = 1.0,
 ) -> tuple[OpticalSignal | None, OpticalSignal, OpticalSignal]:
     """
@@ -173,16 +207,21 @@ def sfg_mixer(
         signal_a: Activation input (horizontal)
         signal_b: Weight input (vertical)
         ppln_length_um: PPLN interaction length
-        conversion_efficiency: Power fraction converted to SFG (0.0-1.0)
+        conversion_efficiency: Power fraction converted to SFG (0.0-1.0).
+            None = FDTD-calibrated value for this PPLN length and
+            wavelength pair, else SFG_CONVERSION_EFFICIENCY.
         insertion_loss_db: Additional insertion loss
 
     Returns:
         (sfg_output, passthrough_a, passthrough_b)
         sfg_output is None if either input is below detection threshold
     """
+    if conversion_efficiency is None:
+        conversion_efficiency = sfg_conversion_efficiency(
+            signal_a.wavelength_nm, signal_b.wavelength_nm, ppln_length_um)
+
     # SFG only happens if both inputs have meaningful power
-    MIN_POWER_DBM = -40.0
-    if signal_a.power_dbm < MIN_POWER_DBM or signal_b.power_dbm < MIN_POWER_DBM:
+    if signal_a.power_dbm < SFG_MIN_POWER_DBM or signal_b.power_dbm < SFG_MIN_POWER_DBM:
         # No SFG — just pass through with insertion loss
         pass_a = signal_a.attenuate(insertion_loss_db)
         pass_b = signal_b.attenuate(insertion_loss_db)
@@ -191,7 +230,7 @@ def sfg_mixer(
     # Calculate SFG output wavelength
     wl_a = signal_a.wavelength_nm
     wl_b = signal_b.wavelength_nm
-    wl_sfg = 1.0 / (1.0 / wl_a + 1.0 / wl_b)
+    wl_sfg = sfg_wavelength_nm(wl_a, wl_b)
 
     # SFG power: proportional to product of input powers × efficiency
     # In a linearized model: P_sfg = eta * sqrt(P_a * P_b)
@@ -201,7 +240,7 @@ def sfg_mixer(
 
     # SFG output power (simplified: fraction of geometric mean of inputs)
     p_sfg_mw = conversion_efficiency * np.sqrt(p_a_mw * p_b_mw)
-    p_sfg_dbm = 10 * np.log10(max(p_sfg_mw, 1e-10))
+    p_sfg_dbm = mw_to_dbm(p_sfg_mw)
 
     # Passthrough: what doesn't get converted
     pass_fraction = 1.0 - conversion_efficiency
@@ -235,15 +274,24 @@ AWG_CHANNELS = {
     5: 775.0,   # DET_-2 (R+R) → +1
 }
 
+# Nominal AWG parameters, used when no FDTD fit matches
+AWG_INSERTION_LOSS_DB = 3.0
+AWG_CHANNEL_BANDWIDTH_NM = 15.0
+AWG_CROSSTALK_DB = -25.0
+
+
 def awg_demux(
     signal: OpticalSignal,
-    insertion_loss_db: float = 3.0,
-    channel_bandwidth_nm: float = 15.0,
-    crosstalk_db: float = -25.0,
+    insertion_loss_db: float | None = None,
+    channel_bandwidth_nm: float | None = None,
+    crosstalk_db: float | None = None,
 ) -> dict[int, float]:
     """
     Route SFG output to correct detector channel via AWG.
 
+    Parameters left as None take the FDTD-calibrated value for a
+    len(AWG_CHANNELS)-channel AWG if one is cached, else the nominal value.
+
     Args:
         signal: SFG product optical signal
         insertion_loss_db: AWG insertion loss
@@ -253,6 +301,17 @@ def awg_demux(
     Returns:
         Dict of {channel_index: power_dbm} for each detector
     """
+    geometry = {"n_channels": len(AWG_CHANNELS)}
+    if insertion_loss_db is None:
+        insertion_loss_db = CALIBRATION.param(
+            "awg_demux", geometry, "insertion_loss_db", AWG_INSERTION_LOSS_DB)
+    if channel_bandwidth_nm is None:
+        channel_bandwidth_nm = CALIBRATION.param(
+            "awg_demux", geometry, "channel_bandwidth_nm", AWG_CHANNEL_BANDWIDTH_NM)
+    if crosstalk_db is None:
+        crosstalk_db = CALIBRATION.param(
+            "awg_demux", geometry, "crosstalk_db", AWG_CROSSTALK_DB)
+
     results = {}
     sigma_nm = channel_bandwidth_nm / 2.355  # FWHM to Gaussian sigma
 
@@ -291,10 +350,7 @@ def photodetector(
     Returns:
         Photocurrent in μA
     """
-    power_w = 10 ** ((power_dbm - 30) / 10)  # dBm to Watts
-    photocurrent_a = responsivity_a_per_w * power_w
-    photocurrent_ua = photocurrent_a * 1e6 + dark_current_na / 1000
-    return photocurrent_ua
+    return photocurrent_ua(power_dbm, responsivity_a_per_w, dark_current_na)
 
 
 # =============================================================================
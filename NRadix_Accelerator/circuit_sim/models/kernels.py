@@ -0,0 +1,87 @@
+"""
+Vectorized physics kernels shared by the binary and ternary circuit simulators.
+
+Every kernel takes scalars or NumPy arrays and broadcasts, so the same code
+drives the scalar OpticalSignal component models (models/components.py,
+Binary_Accelerator/circuit_sim/simulate_binary_9x9.py) and the batched
+array simulators that push thousands of matrices through in one call.
+
+Units follow the component models: power in dBm / mW, lengths in μm,
+wavelengths in nm, photocurrent in μA.
+"""
+
+import numpy as np
+
+
+# =============================================================================
+# Power units
+# =============================================================================
+
+# Floor applied before taking a log so zero power maps to -100 dBm, not -inf
+POWER_FLOOR_MW = 1e-10
+
+
+def dbm_to_mw(power_dbm):
+    """Optical power in mW from dBm."""
+    return 10 ** (np.asarray(power_dbm) / 10)
+
+
+def mw_to_dbm(power_mw, floor_mw: float = POWER_FLOOR_MW):
+    """Optical power in dBm from mW, clamped at floor_mw."""
+    return 10 * np.log10(np.maximum(power_mw, floor_mw))
+
+
+# =============================================================================
+# Waveguide propagation
+# =============================================================================
+
+def propagation_loss_db(length_um, loss_db_per_cm):
+    """Propagation loss in dB over length_um of waveguide."""
+    return loss_db_per_cm * np.asarray(length_um) / 1e4
+
+
+def propagation_phase_rad(neff, length_um, wavelength_nm):
+    """Accumulated phase 2π·neff·L/λ over length_um of waveguide."""
+    return 2 * np.pi * neff * np.asarray(length_um) / (np.asarray(wavelength_nm) / 1000)
+
+
+def cascade_power_dbm(input_dbm, stage_loss_db, gap_loss_db=0.0):
+    """
+    Power entering each stage of a cascade laid out along the last axis.
+
+    Stage k sees input_dbm minus the loss of every earlier stage and of the
+    gap after it. This is the activation power along a systolic row: each
+    PE's passthrough loss plus the inter-PE waveguide, accumulated.
+
+    Args:
+        input_dbm: Power entering stage 0, shape (...)
+        stage_loss_db: Loss through each stage, shape (..., n_stages)
+        gap_loss_db: Loss between consecutive stages (scalar or broadcastable)
+
+    Returns:
+        Power entering each stage, shape (..., n_stages)
+    """
+    step = np.broadcast_to(np.asarray(stage_loss_db) + gap_loss_db,
+                           np.shape(stage_loss_db))
+    upstream = np.cumsum(step, axis=-1) - step
+    return np.asarray(input_dbm)[..., None] - upstream
+
+
+# =============================================================================
+# SFG and detection
+# =============================================================================
+
+def sfg_wavelength_nm(wl_a_nm, wl_b_nm):
+    """Sum-frequency wavelength 1 / (1/λa + 1/λb)."""
+    return 1.0 / (1.0 / np.asarray(wl_a_nm) + 1.0 / np.asarray(wl_b_nm))
+
+
+def photocurrent_ua(power_dbm, responsivity_a_per_w, dark_current_na=0.0):
+    """Photocurrent in μA for the given optical power plus dark current."""
+    power_w = 10 ** ((np.asarray(power_dbm) - 30) / 10)
+    return responsivity_a_per_w * power_w * 1e6 + dark_current_na / 1000
+
+
+def detection_margin_db(power_dbm, sensitivity_dbm):
+    """Margin of the detected power above the detector sensitivity."""
+    return np.asarray(power_dbm) - sensitivity_dbm
@@ -38,6 +38,7 @@ import os
 import math
 import numpy as np
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 # Add parent to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -182,6 +183,54 @@ def ppln_phase_mismatch_efficiency(
     return (math.sin(x) / x) ** 2
 
 
+def ppln_phase_mismatch_efficiency_array(
+    wl_a_nm: np.ndarray,
+    wl_b_nm: np.ndarray,
+    poling_period_nm: float,
+    ppln_length_nm: float,
+) -> np.ndarray:
+    """
+    Vectorized ppln_phase_mismatch_efficiency over broadcastable arrays of
+    wavelength pairs. Same sinc^2 model, same 1.0 at perfect phase match.
+    """
+    wl_a_nm = np.asarray(wl_a_nm, dtype=float)
+    wl_b_nm = np.asarray(wl_b_nm, dtype=float)
+    wl_sfg = 1.0 / (1.0 / wl_a_nm + 1.0 / wl_b_nm)
+
+    k_a = 2 * math.pi * neff_sellmeier(wl_a_nm) / wl_a_nm
+    k_b = 2 * math.pi * neff_sellmeier(wl_b_nm) / wl_b_nm
+    k_sfg = 2 * math.pi * neff_sellmeier(wl_sfg) / wl_sfg
+
+    delta_k = k_sfg - k_a - k_b - 2 * math.pi / poling_period_nm
+
+    x = delta_k * ppln_length_nm / 2
+    matched = np.abs(x) < 1e-10
+    x_safe = np.where(matched, 1.0, x)
+    return np.where(matched, 1.0, (np.sin(x_safe) / x_safe) ** 2)
+
+
+@lru_cache(maxsize=4096)
+def _phase_match_matrix(
+    wavelengths_nm: tuple[float, ...],
+    design_wavelengths_nm: tuple[float, float, float],
+    ppln_length_um: float,
+) -> np.ndarray:
+    """
+    S x S matrix of phase-matching efficiencies for every pair of the given
+    co-propagating wavelengths, through a PPLN poled for the design triplet.
+
+    Cached per (signal wavelengths, design triplet, PPLN length): across a
+    9x9 array the same few wavelength sets recur at every PE.
+    """
+    poling_period_nm = WDMTriplet(0, *design_wavelengths_nm).ppln_poling_period_nm()
+    wl = np.array(wavelengths_nm)
+    matrix = ppln_phase_mismatch_efficiency_array(
+        wl[:, None], wl[None, :], poling_period_nm, ppln_length_um * 1000.0,
+    )
+    matrix.setflags(write=False)
+    return matrix
+
+
 # =============================================================================
 # Multi-Triplet SFG Mixer
 # =============================================================================
@@ -201,6 +250,10 @@ def multi_triplet_sfg_mixer(
     pairs convert efficiently while cross-triplet pairs are suppressed
     by phase mismatch.
 
+    All S(S-1)/2 pairs are evaluated at once over the upper triangle of a
+    cached phase-matching matrix, so neff_sellmeier is not re-evaluated
+    per pair. Products are returned in (i, j) pair order, i < j.
+
     Args:
         signals: All optical signals entering this PE (from all triplets)
         design_triplet: The triplet this PPLN is phase-matched for
@@ -214,59 +267,46 @@ def multi_triplet_sfg_mixer(
         - passthroughs: list of attenuated passthrough signals
     """
     MIN_POWER_DBM = -40.0
-    ppln_length_nm = ppln_length_um * 1000.0
-    poling_period_nm = design_triplet.ppln_poling_period_nm()
+    n_signals = len(signals)
+    if n_signals == 0:
+        return [], []
 
-    sfg_products = []
-    passthroughs = []
+    wavelengths = tuple(sig.wavelength_nm for sig in signals)
+    power_dbm = np.array([sig.power_dbm for sig in signals])
 
     # Each signal passes through with insertion loss and reduced by total
     # conversion (approximation: small-signal regime, each signal loses
     # a small fraction to all SFG processes it participates in)
-    for sig in signals:
-        pass_sig = sig.attenuate(insertion_loss_db)
-        # Approximate depletion from SFG: small-signal regime
-        pass_sig = OpticalSignal(
-            pass_sig.wavelength_nm,
-            pass_sig.power_dbm + 10 * np.log10(max(1.0 - base_conversion_efficiency, 0.01)),
-            pass_sig.phase_rad,
-        )
-        passthroughs.append(pass_sig)
-
-    # Every pair can produce SFG
-    for i, sig_a in enumerate(signals):
-        for j, sig_b in enumerate(signals):
-            if j <= i:
-                continue  # avoid double counting; i<j only
-            if sig_a.power_dbm < MIN_POWER_DBM or sig_b.power_dbm < MIN_POWER_DBM:
-                continue
-
-            wl_a = sig_a.wavelength_nm
-            wl_b = sig_b.wavelength_nm
-            wl_sfg = 1.0 / (1.0 / wl_a + 1.0 / wl_b)
-
-            # Phase-matching efficiency
-            eta_pm = ppln_phase_mismatch_efficiency(
-                wl_a, wl_b, poling_period_nm, ppln_length_nm,
-            )
+    depletion_db = 10 * np.log10(max(1.0 - base_conversion_efficiency, 0.01))
+    pass_dbm = (power_dbm - insertion_loss_db) + depletion_db
+    passthroughs = [
+        OpticalSignal(sig.wavelength_nm, p, sig.phase_rad)
+        for sig, p in zip(signals, pass_dbm.tolist())
+    ]
+
+    # Every pair i<j can produce SFG: evaluate all pairs at once
+    eta_pm = _phase_match_matrix(
+        wavelengths,
+        (design_triplet.wl_minus1, design_triplet.wl_zero, design_triplet.wl_plus1),
+        ppln_length_um,
+    )
+    i_idx, j_idx = np.triu_indices(n_signals, k=1)
 
-            # Effective conversion efficiency
-            eta_eff = base_conversion_efficiency * eta_pm
+    eta_eff = base_conversion_efficiency * eta_pm[i_idx, j_idx]
+    strong = power_dbm >= MIN_POWER_DBM
+    keep = strong[i_idx] & strong[j_idx] & (eta_eff >= 1e-6)
+    i_idx, j_idx, eta_eff = i_idx[keep], j_idx[keep], eta_eff[keep]
 
-            if eta_eff < 1e-6:
-                continue  # negligible
+    wl = np.array(wavelengths)
+    wl_sfg = 1.0 / (1.0 / wl[i_idx] + 1.0 / wl[j_idx])
+    power_mw = 10 ** (power_dbm / 10)
+    p_sfg_mw = eta_eff * np.sqrt(power_mw[i_idx] * power_mw[j_idx])
+    p_sfg_dbm = 10 * np.log10(np.maximum(p_sfg_mw, 1e-10)) - insertion_loss_db
 
-            p_a_mw = sig_a.power_mw
-            p_b_mw = sig_b.power_mw
-            p_sfg_mw = eta_eff * np.sqrt(p_a_mw * p_b_mw)
-            p_sfg_dbm = 10 * np.log10(max(p_sfg_mw, 1e-10))
-
-            sfg_out = OpticalSignal(
-                round(wl_sfg, 2),
-                p_sfg_dbm - insertion_loss_db,
-                0.0,
-            )
-            sfg_products.append(sfg_out)
+    sfg_products = [
+        OpticalSignal(round(w, 2), p, 0.0)
+        for w, p in zip(wl_sfg.tolist(), p_sfg_dbm.tolist())
+    ]
 
     return sfg_products, passthroughs
 
@@ -573,7 +613,6 @@ def simulate_array_single_triplet(
             sfg_out, act, pass_v = sfg_mixer(
                 act, wt,
                 ppln_length_um=PPLN_LENGTH,
-                conversion_efficiency=0.10,
                 insertion_loss_db=1.0,
             )
 
@@ -633,6 +672,8 @@ def simulate_array_multi_triplet(
     active_triplets: list[WDMTriplet],
     laser_power_dbm: float = 10.0,
     verbose: bool = False,
+    ppln_length_um: float = PPLN_LENGTH,
+    base_conversion_efficiency: float = 0.10,
 ) -> dict[int, list[MultiTripletResult]]:
     """
     Simulate 9x9 array with multiple triplets simultaneously.
@@ -648,6 +689,8 @@ def simulate_array_multi_triplet(
         active_triplets: List of active WDMTriplet objects
         laser_power_dbm: Laser power per channel
         verbose: Print detailed trace
+        ppln_length_um: PPLN interaction length in every PE
+        base_conversion_efficiency: Peak SFG conversion efficiency
 
     Returns:
         {triplet_id: [MultiTripletResult for each column]}
@@ -726,8 +769,8 @@ def simulate_array_multi_triplet(
             sfg_products, passthroughs = multi_triplet_sfg_mixer(
                 all_pe_signals,
                 design_triplet,
-                ppln_length_um=PPLN_LENGTH,
-                base_conversion_efficiency=0.10,
+                ppln_length_um=ppln_length_um,
+                base_conversion_efficiency=base_conversion_efficiency,
                 insertion_loss_db=1.0,
             )
 
@@ -764,6 +807,7 @@ def simulate_array_multi_triplet(
 
         sfg_result_table = t.sfg_result_table()
         awg_ch = t.awg_channels()
+        within_triplet_wls = list(t.sfg_products().values())
 
         col_results = []
         for col in range(9):
@@ -800,7 +844,7 @@ def simulate_array_multi_triplet(
                 sfg_wl = sfg.wavelength_nm
                 is_within_triplet = any(
                     abs(sfg_wl - expected_wl) < 1.0
-                    for expected_wl in t.sfg_products().values()
+                    for expected_wl in within_triplet_wls
                 )
 
                 # Check if it actually registers on the AWG (above noise floor)
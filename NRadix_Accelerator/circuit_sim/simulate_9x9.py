@@ -28,8 +28,11 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from models.components import (
     OpticalSignal, waveguide_transfer, sfg_mixer, awg_demux,
-    photodetector, mzi_encode,
-    TRIT_TO_WL, SFG_TABLE, SFG_RESULT, AWG_CHANNELS,
+    photodetector, mzi_encode, sfg_conversion_efficiency,
+    TRIT_TO_WL, SFG_TABLE, SFG_RESULT, AWG_CHANNELS, SFG_MIN_POWER_DBM,
+)
+from models.kernels import (
+    dbm_to_mw, mw_to_dbm, propagation_loss_db, cascade_power_dbm,
 )
 
 # Override — import constants directly
@@ -127,6 +130,18 @@ class PEResult:
     pass_v_power_dbm: float  # Passthrough vertical
 
 
+def mix_pe(
+    activation: OpticalSignal,
+    weight: OpticalSignal,
+) -> tuple[OpticalSignal | None, OpticalSignal, OpticalSignal]:
+    """The PE's PPLN mixer: (sfg_output, passthrough_h, passthrough_v)."""
+    return sfg_mixer(
+        activation, weight,
+        ppln_length_um=PPLN_LENGTH,
+        insertion_loss_db=1.0,
+    )
+
+
 def simulate_pe(
     activation: OpticalSignal,
     weight: OpticalSignal,
@@ -143,12 +158,7 @@ def simulate_pe(
         (sfg_output, passthrough_h, passthrough_v, result)
     """
     # SFG mixing
-    sfg_out, pass_h, pass_v = sfg_mixer(
-        activation, weight,
-        ppln_length_um=PPLN_LENGTH,
-        conversion_efficiency=0.10,
-        insertion_loss_db=1.0,
-    )
+    sfg_out, pass_h, pass_v = mix_pe(activation, weight)
 
     # Determine expected ternary product
     act_trit = {1550: -1, 1310: 0, 1064: +1}.get(round(activation.wavelength_nm), 0)
@@ -169,10 +179,95 @@ def simulate_pe(
     return sfg_out, pass_h, pass_v, result
 
 
+# =============================================================================
+# Signal path stages (shared by the full and incremental simulators)
+# =============================================================================
+
+def encode_activation(trit: int, laser_power_dbm: float = 10.0) -> OpticalSignal:
+    """Activation for one row: IOC encoder + routing gap + input facet."""
+    sig = mzi_encode(trit, laser_power_dbm)
+    # Propagate through IOC encoder + routing gap
+    sig = waveguide_transfer(sig, IOC_INPUT_WIDTH + ROUTING_GAP, WG_LOSS_DB_CM)
+    # Add edge coupling loss (input facet)
+    return sig.attenuate(EDGE_COUPLING_LOSS)
+
+
+def encode_weight(trit: int, row: int, laser_power_dbm: float = 10.0) -> OpticalSignal:
+    """Weight W[row][col] as it arrives at PE[row][col] from the weight bus."""
+    sig = mzi_encode(trit, laser_power_dbm)
+    # Weight path: bus → drop line → PE (varies by row position)
+    weight_path_um = row * PE_PITCH + 40  # 40μm bus overhead
+    return waveguide_transfer(sig, weight_path_um, WG_LOSS_DB_CM)
+
+
+def decode_sfg_product(sfg: OpticalSignal) -> tuple[float, int, float]:
+    """
+    Route one SFG product to the column decoder and read it out.
+
+    Returns:
+        (awg_channel_wavelength_nm, trit_value, channel_power_dbm)
+    """
+    # Route through output waveguide to decoder
+    sfg_routed = waveguide_transfer(
+        sfg,
+        ROUTING_GAP + IOC_OUTPUT_WIDTH * 0.3,  # to AWG input
+        WG_LOSS_DB_CM,
+    )
+
+    # AWG demux
+    channel_powers = awg_demux(sfg_routed)
+
+    # Find which channel has highest power
+    best_ch = max(channel_powers, key=channel_powers.get)
+    best_wl = AWG_CHANNELS[best_ch]
+
+    # Decode wavelength to trit result
+    return best_wl, SFG_RESULT.get(best_wl, 0), channel_powers[best_ch]
+
+
+def column_detector_currents(products: list[OpticalSignal]) -> dict[int, float]:
+    """Photocurrent per AWG channel for the strongest product in a column."""
+    det_currents = {}
+    if products:
+        strongest = max(products, key=lambda s: s.power_dbm)
+        strongest_routed = waveguide_transfer(
+            strongest, ROUTING_GAP + IOC_OUTPUT_WIDTH * 0.3, WG_LOSS_DB_CM,
+        )
+        ch_powers = awg_demux(strongest_routed)
+        for ch, pwr in ch_powers.items():
+            det_currents[ch] = photodetector(pwr)
+    return det_currents
+
+
 # =============================================================================
 # Full 9x9 Array simulation
 # =============================================================================
 
+# Trace levels for simulate_array_9x9
+TRACE_NONE = "none"        # Outputs only: no per-PE objects are kept
+TRACE_SUMMARY = "summary"  # + PEResult grid, column products, detector currents
+TRACE_FULL = "full"        # + per-PE record array (ArrayResult.trace)
+TRACE_LEVELS = (TRACE_NONE, TRACE_SUMMARY, TRACE_FULL)
+
+# One record per PE, row-major (index = row * 9 + col). Float fields are
+# NaN and decoded_trit is 0 where the PE produced no SFG output.
+# Persist with np.save(path, result.trace) for later inspection.
+PE_TRACE_DTYPE = np.dtype([
+    ("row", np.int8),
+    ("col", np.int8),
+    ("activation_trit", np.int8),
+    ("weight_trit", np.int8),
+    ("expected_product", np.int8),
+    ("sfg_wavelength_nm", np.float64),
+    ("sfg_power_dbm", np.float64),
+    ("pass_h_power_dbm", np.float64),
+    ("pass_v_power_dbm", np.float64),
+    ("decoded_wavelength_nm", np.float64),
+    ("decoded_trit", np.int8),
+    ("decoded_power_dbm", np.float64),
+])
+
+
 @dataclass
 class ArrayResult:
     """Result of simulating the full 9x9 array."""
@@ -184,13 +279,15 @@ class ArrayResult:
     detected_output: list[int] = field(default_factory=list)
     detector_currents: list[dict] = field(default_factory=list)
     all_correct: bool = False
+    trace: np.recarray | None = field(default=None, compare=False)  # TRACE_FULL only
 
 
 def simulate_array_9x9(
     input_trits: list[int],
     weight_matrix: list[list[int]],
     laser_power_dbm: float = 10.0,
-    verbose: bool = True,
+    verbose: bool = False,
+    trace_level: str = TRACE_SUMMARY,
 ) -> ArrayResult:
     """
     Simulate the complete 9x9 systolic array.
@@ -211,11 +308,16 @@ def simulate_array_9x9(
         input_trits: Length-9 input vector (activation)
         weight_matrix: 9x9 weight matrix (W[row][col])
         laser_power_dbm: Laser power per channel
-        verbose: Print detailed simulation trace
+        verbose: Print the simulation report (per-PE lines need TRACE_FULL)
+        trace_level: How much per-PE data to keep:
+            TRACE_NONE    - only expected/detected outputs (fast path)
+            TRACE_SUMMARY - PEResult grid, column products, detector currents
+            TRACE_FULL    - summary + per-PE record array in result.trace
 
     Returns:
-        ArrayResult with full simulation data
+        ArrayResult with the requested level of simulation data
     """
+    assert trace_level in TRACE_LEVELS, f"trace_level must be one of {TRACE_LEVELS}"
     assert len(input_trits) == 9, "Input must be length 9"
     assert len(weight_matrix) == 9 and all(len(r) == 9 for r in weight_matrix), \
         "Weight matrix must be 9x9"
@@ -251,11 +353,7 @@ def simulate_array_9x9(
     # Encode activation signals (one per row)
     activation_signals = []
     for row in range(9):
-        sig = mzi_encode(input_trits[row], laser_power_dbm)
-        # Propagate through IOC encoder + routing gap
-        sig = waveguide_transfer(sig, IOC_INPUT_WIDTH + ROUTING_GAP, WG_LOSS_DB_CM)
-        # Add edge coupling loss (input facet)
-        sig = sig.attenuate(EDGE_COUPLING_LOSS)
+        sig = encode_activation(input_trits[row], laser_power_dbm)
         activation_signals.append(sig)
         if verbose:
             print(f"  Row {row}: trit={input_trits[row]:+d} → "
@@ -273,11 +371,7 @@ def simulate_array_9x9(
     for row in range(9):
         row_weights = []
         for col in range(9):
-            w = weight_matrix[row][col]
-            sig = mzi_encode(w, laser_power_dbm)
-            # Weight path: bus → drop line → PE (varies by row position)
-            weight_path_um = row * PE_PITCH + 40  # 40μm bus overhead
-            sig = waveguide_transfer(sig, weight_path_um, WG_LOSS_DB_CM)
+            sig = encode_weight(weight_matrix[row][col], row, laser_power_dbm)
             row_weights.append(sig)
         weight_signals.append(row_weights)
 
@@ -288,11 +382,17 @@ def simulate_array_9x9(
     if verbose:
         print("\n--- Stage 3: PE array computation ---")
 
+    keep_pe = trace_level != TRACE_NONE
+    # Full trace rows (PE_TRACE_DTYPE field order), packed into a record
+    # array once the decode stage has filled in the decoded fields
+    trace_rows = [None] * 81 if trace_level == TRACE_FULL else None
+
     # Track SFG products per column for accumulation
     column_products = [[] for _ in range(9)]  # column_products[col] = list of SFG signals
+    column_rows = [[] for _ in range(9)]      # source row of each product
 
     # Track PE results
-    pe_results = [[None]*9 for _ in range(9)]
+    pe_results = [[None]*9 for _ in range(9)] if keep_pe else []
 
     # Process array: activation flows left-to-right through each row,
     # weights are injected per-PE, SFG products collected per column
@@ -303,8 +403,21 @@ def simulate_array_9x9(
             wt = weight_signals[row][col]
 
             # Simulate this PE
-            sfg_out, act, pass_v, pe_res = simulate_pe(act, wt, row, col)
-            pe_results[row][col] = pe_res
+            if keep_pe:
+                sfg_out, act, pass_v, pe_res = simulate_pe(act, wt, row, col)
+                pe_results[row][col] = pe_res
+            else:
+                sfg_out, act, pass_v = mix_pe(act, wt)
+
+            if trace_rows is not None:
+                trace_rows[row * 9 + col] = [
+                    row, col,
+                    pe_res.activation_trit, pe_res.weight_trit, pe_res.expected_product,
+                    sfg_out.wavelength_nm if sfg_out else np.nan,
+                    sfg_out.power_dbm if sfg_out else np.nan,
+                    pe_res.pass_h_power_dbm, pe_res.pass_v_power_dbm,
+                    np.nan, 0, np.nan,
+                ]
 
             # Propagate activation through inter-PE waveguide (to next column)
             if col < 8:
@@ -313,15 +426,17 @@ def simulate_array_9x9(
             # Collect SFG product for this column
             if sfg_out is not None:
                 column_products[col].append(sfg_out)
+                column_rows[col].append(row)
 
-            if verbose and sfg_out is not None:
-                print(f"  PE[{row},{col}]: {pe_res.activation_trit:+d} × "
-                      f"{pe_res.weight_trit:+d} = {pe_res.expected_product:+d} → "
-                      f"SFG λ={sfg_out.wavelength_nm:.1f}nm, "
-                      f"P={sfg_out.power_dbm:.1f} dBm")
+    if verbose and trace_rows is not None:
+        for row, col, act_t, wt_t, prod, sfg_wl, sfg_p, *_ in trace_rows:
+            if not np.isnan(sfg_wl):
+                print(f"  PE[{row},{col}]: {act_t:+d} × {wt_t:+d} = {prod:+d} → "
+                      f"SFG λ={sfg_wl:.1f}nm, P={sfg_p:.1f} dBm")
 
-    result.pe_results = pe_results
-    result.column_sfg_products = column_products
+    if keep_pe:
+        result.pe_results = pe_results
+        result.column_sfg_products = column_products
 
     # =========================================================================
     # Stage 4: Column output → AWG decode → photodetectors
@@ -336,7 +451,8 @@ def simulate_array_9x9(
         if not products:
             # No SFG products in this column (all weights or inputs were 0)
             result.detected_output.append(0)
-            result.detector_currents.append({})
+            if keep_pe:
+                result.detector_currents.append({})
             if verbose:
                 print(f"  Column {col}: No SFG products → output = 0")
             continue
@@ -347,41 +463,19 @@ def simulate_array_9x9(
         net_trit_sum = 0
         product_details = []
 
-        for sfg in products:
-            # Route through output waveguide to decoder
-            sfg_routed = waveguide_transfer(
-                sfg,
-                ROUTING_GAP + IOC_OUTPUT_WIDTH * 0.3,  # to AWG input
-                WG_LOSS_DB_CM,
-            )
-
-            # AWG demux
-            channel_powers = awg_demux(sfg_routed)
-
-            # Find which channel has highest power
-            best_ch = max(channel_powers, key=channel_powers.get)
-            best_power = channel_powers[best_ch]
-            best_wl = AWG_CHANNELS[best_ch]
-
-            # Decode wavelength to trit result
-            trit_value = SFG_RESULT.get(best_wl, 0)
+        for sfg, row in zip(products, column_rows[col]):
+            best_wl, trit_value, best_power = decode_sfg_product(sfg)
             net_trit_sum += trit_value
-
-            product_details.append((best_wl, trit_value, best_power))
+            if verbose:
+                product_details.append((best_wl, trit_value, best_power))
+            if trace_rows is not None:
+                trace_rows[row * 9 + col][9:] = [best_wl, trit_value, best_power]
 
         result.detected_output.append(net_trit_sum)
 
         # Compute detector currents for the dominant signal
-        det_currents = {}
-        if products:
-            strongest = max(products, key=lambda s: s.power_dbm)
-            strongest_routed = waveguide_transfer(
-                strongest, ROUTING_GAP + IOC_OUTPUT_WIDTH * 0.3, WG_LOSS_DB_CM,
-            )
-            ch_powers = awg_demux(strongest_routed)
-            for ch, pwr in ch_powers.items():
-                det_currents[ch] = photodetector(pwr)
-        result.detector_currents.append(det_currents)
+        if keep_pe:
+            result.detector_currents.append(column_detector_currents(products))
 
         if verbose:
             detail_str = ", ".join(
@@ -390,6 +484,11 @@ def simulate_array_9x9(
             print(f"  Column {col}: {len(products)} products [{detail_str}] "
                   f"→ sum = {net_trit_sum:+d}")
 
+    if trace_rows is not None:
+        result.trace = np.array(
+            [tuple(r) for r in trace_rows], dtype=PE_TRACE_DTYPE,
+        ).view(np.recarray)
+
     # =========================================================================
     # Stage 5: Verify
     # =========================================================================
@@ -406,7 +505,7 @@ def simulate_array_9x9(
         print(f"  Match:    {match}")
 
         # Power budget summary
-        if result.pe_results[0][0]:
+        if result.pe_results and result.pe_results[0][0]:
             pe00 = result.pe_results[0][0]
             if pe00.sfg_power_dbm is not None:
                 print(f"\n  Power budget (PE[0,0]):")
@@ -418,6 +517,247 @@ def simulate_array_9x9(
     return result
 
 
+# =============================================================================
+# Batched 9x9 array simulation
+# =============================================================================
+
+TRITS = (-1, 0, +1)
+
+
+@dataclass
+class BatchArrayResult:
+    """
+    Columnar result of simulate_array_9x9_batch for B input/weight pairs.
+
+    Per-PE arrays are (B, 9, 9) indexed [sample, row, col]; per-column
+    arrays are (B, 9). Power fields are NaN where a PE produced no SFG.
+    """
+    expected_output: np.ndarray     # (B, 9) int
+    detected_output: np.ndarray     # (B, 9) int
+    sfg_power_dbm: np.ndarray       # (B, 9, 9) at the PE output
+    decoded_power_dbm: np.ndarray   # (B, 9, 9) on the winning AWG channel
+    decoded_value: np.ndarray       # (B, 9, 9) trit read back per product
+
+    @property
+    def all_correct(self) -> np.ndarray:
+        """(B,) bool: every column of the sample decoded correctly."""
+        return (self.detected_output == self.expected_output).all(axis=1)
+
+
+def simulate_array_9x9_batch(
+    input_trits,
+    weight_matrices,
+    laser_power_dbm: float = 10.0,
+) -> BatchArrayResult:
+    """
+    Simulate B independent 9x9 matrix-vector products in one vectorized pass.
+
+    Same signal path and component models as simulate_array_9x9: the
+    per-trit encoder powers, mixer efficiencies and AWG readouts are taken
+    from the scalar models once (they depend only on the trit pair), then
+    the activation cascade along each row and the SFG powers are computed
+    for the whole batch with the shared kernels in models/kernels.py.
+
+    Args:
+        input_trits: (B, 9) or (9,) ternary inputs
+        weight_matrices: (B, 9, 9) or (9, 9) ternary weights W[row][col]
+        laser_power_dbm: Laser power per channel
+
+    Returns:
+        BatchArrayResult; detected_output[b] equals
+        simulate_array_9x9(input_trits[b], weight_matrices[b]).detected_output
+    """
+    x = np.asarray(input_trits, dtype=np.int64)
+    W = np.asarray(weight_matrices, dtype=np.int64)
+    if x.ndim == 1:
+        x = x[None]
+    if W.ndim == 2:
+        W = np.broadcast_to(W, (len(x), 9, 9))
+    assert x.shape[1:] == (9,) and W.shape[1:] == (9, 9) and len(x) == len(W), \
+        "Expected (B, 9) inputs and (B, 9, 9) weights"
+
+    # Per-trit tables from the scalar component models (index = trit + 1)
+    act_dbm = np.array([encode_activation(t, laser_power_dbm).power_dbm for t in TRITS])
+    wt_dbm = np.array([[encode_weight(t, row, laser_power_dbm).power_dbm
+                        for row in range(9)] for t in TRITS])          # (3, 9)
+    eta = np.array([[sfg_conversion_efficiency(TRIT_TO_WL[a], TRIT_TO_WL[b], PPLN_LENGTH)
+                     for b in TRITS] for a in TRITS])                  # (3, 3)
+    decode_value = np.zeros((3, 3), dtype=np.int64)
+    decode_offset_db = np.zeros((3, 3))
+    for i, a in enumerate(TRITS):
+        for j, b in enumerate(TRITS):
+            wl = SFG_TABLE[(TRIT_TO_WL[a], TRIT_TO_WL[b])]
+            # AWG and routing losses are linear in dB: read out a 0 dBm probe
+            _, decode_value[i, j], decode_offset_db[i, j] = \
+                decode_sfg_product(OpticalSignal(wl, 0.0))
+
+    xi, Wi = x + 1, W + 1
+    ai = np.broadcast_to(xi[:, :, None], W.shape)                      # act trit per PE
+    pair_eta = eta[ai, Wi]
+
+    # Activation entering each PE: mixer passthrough + inter-PE gap, cascaded.
+    # The depleted passthrough assumes every PE mixes, which holds unless a
+    # row falls below SFG_MIN_POWER_DBM part-way along (laser < ~-25 dBm).
+    pass_loss_db = 1.0 - 10 * np.log10(1.0 - pair_eta)
+    gap_loss_db = propagation_loss_db(PE_PITCH - PE_WIDTH, WG_LOSS_DB_CM)
+    act_in = cascade_power_dbm(act_dbm[xi], pass_loss_db, gap_loss_db)
+    wt_in = wt_dbm[Wi, np.arange(9)[:, None]]
+
+    sfg_dbm = mw_to_dbm(pair_eta * np.sqrt(dbm_to_mw(act_in) * dbm_to_mw(wt_in))) - 1.0
+    mixed = (act_in >= SFG_MIN_POWER_DBM) & (wt_in >= SFG_MIN_POWER_DBM)
+    sfg_dbm = np.where(mixed, sfg_dbm, np.nan)
+
+    value = np.where(mixed, decode_value[ai, Wi], 0)
+    decoded_dbm = sfg_dbm + decode_offset_db[ai, Wi]
+
+    return BatchArrayResult(
+        expected_output=np.einsum("bi,bij->bj", x, W),
+        detected_output=value.sum(axis=1),
+        sfg_power_dbm=sfg_dbm,
+        decoded_power_dbm=decoded_dbm,
+        decoded_value=value,
+    )
+
+
+# =============================================================================
+# Incremental re-simulation (weight updates)
+# =============================================================================
+
+class IncrementalArray9x9:
+    """
+    Simulator state for repeated runs where only a few weights change
+    between runs (e.g. stepping through training-style updates).
+
+    Keeps the activation entering every PE, every PE's SFG output and its
+    decoded trit. update_weights() re-runs only the PEs whose weight changed
+    (plus any PEs further along the same row whose input activation actually
+    changes) and re-reduces only the affected columns, so the cost of an
+    update scales with the number of changed weights rather than 81 PEs.
+
+    After construction and after every update, self.result is identical to
+    simulate_array_9x9(input_trits, current_weights, verbose=False).
+    """
+
+    def __init__(
+        self,
+        input_trits: list[int],
+        weight_matrix: list[list[int]],
+        laser_power_dbm: float = 10.0,
+    ):
+        assert len(input_trits) == 9, "Input must be length 9"
+        assert len(weight_matrix) == 9 and all(len(r) == 9 for r in weight_matrix), \
+            "Weight matrix must be 9x9"
+
+        self.input_trits = list(input_trits)
+        self.weight_matrix = [list(r) for r in weight_matrix]
+        self.laser_power_dbm = laser_power_dbm
+        self.pe_evaluations = 0   # Number of simulate_pe calls so far
+
+        # Per-PE state: activation entering PE[row][col], its SFG output and
+        # the decoded (awg_wl, trit_value, power) of that output
+        self.act_in = [[None] * 9 for _ in range(9)]
+        self.sfg = [[None] * 9 for _ in range(9)]
+        self.decoded = [[None] * 9 for _ in range(9)]
+
+        self.result = ArrayResult(
+            input_trits=self.input_trits,
+            weight_matrix=self.weight_matrix,
+            expected_output=[
+                sum(self.input_trits[row] * self.weight_matrix[row][col] for row in range(9))
+                for col in range(9)
+            ],
+            pe_results=[[None] * 9 for _ in range(9)],
+            column_sfg_products=[[] for _ in range(9)],
+            detected_output=[0] * 9,
+            detector_currents=[{} for _ in range(9)],
+        )
+
+        for row in range(9):
+            self.act_in[row][0] = encode_activation(self.input_trits[row], laser_power_dbm)
+            self._run_row(row, 0, last_changed_col=8)
+        for col in range(9):
+            self._reduce_column(col)
+        self.result.all_correct = (self.result.detected_output == self.result.expected_output)
+
+    def _run_row(self, row: int, start_col: int, last_changed_col: int) -> set[int]:
+        """
+        Re-simulate PEs in a row from start_col onward. Stops past
+        last_changed_col as soon as the activation handed to the next PE is
+        unchanged, since everything downstream is then still valid.
+
+        Returns:
+            Columns whose PE was re-simulated
+        """
+        touched = set()
+        act = self.act_in[row][start_col]
+
+        for col in range(start_col, 9):
+            wt = encode_weight(self.weight_matrix[row][col], row, self.laser_power_dbm)
+            sfg_out, act_out, _, pe_res = simulate_pe(act, wt, row, col)
+            self.pe_evaluations += 1
+
+            self.sfg[row][col] = sfg_out
+            self.decoded[row][col] = decode_sfg_product(sfg_out) if sfg_out is not None else None
+            self.result.pe_results[row][col] = pe_res
+            touched.add(col)
+
+            if col == 8:
+                break
+            act = waveguide_transfer(act_out, PE_PITCH - PE_WIDTH, WG_LOSS_DB_CM)
+            if col >= last_changed_col and act == self.act_in[row][col + 1]:
+                break
+            self.act_in[row][col + 1] = act
+
+        return touched
+
+    def _reduce_column(self, col: int) -> None:
+        """Rebuild one column's products, detected sum and detector currents."""
+        products = []
+        net_trit_sum = 0
+        for row in range(9):
+            if self.sfg[row][col] is not None:
+                products.append(self.sfg[row][col])
+                net_trit_sum += self.decoded[row][col][1]
+
+        self.result.column_sfg_products[col] = products
+        self.result.detected_output[col] = net_trit_sum
+        self.result.detector_currents[col] = column_detector_currents(products)
+
+    def update_weights(self, delta: dict[tuple[int, int], int]) -> ArrayResult:
+        """
+        Apply a weight delta and return the updated result.
+
+        Args:
+            delta: {(row, col): new_trit} for the weights that changed
+
+        Returns:
+            self.result, updated in place
+        """
+        changed_by_row = {}
+        for (row, col), w in delta.items():
+            assert w in (-1, 0, +1), f"Weight must be a trit, got {w}"
+            old = self.weight_matrix[row][col]
+            if w == old:
+                continue
+            self.weight_matrix[row][col] = w
+            self.result.expected_output[col] += self.input_trits[row] * (w - old)
+            changed_by_row.setdefault(row, []).append(col)
+
+        dirty_cols = set()
+        for row, cols in changed_by_row.items():
+            done = set()
+            for col in sorted(cols):
+                if col in done:
+                    continue  # already re-run while propagating an earlier change
+                done |= self._run_row(row, col, last_changed_col=col)
+            dirty_cols |= done
+
+        for col in dirty_cols:
+            self._reduce_column(col)
+        self.result.all_correct = (self.result.detected_output == self.result.expected_output)
+        return self.result
+
+
 # =============================================================================
 # Test cases
 # =============================================================================
@@ -473,7 +813,7 @@ def test_identity_matrix():
     x = [+1, -1, 0, +1, -1, 0, +1, -1, 0]
     W = [[1 if i == j else 0 for j in range(9)] for i in range(9)]
 
-    result = simulate_array_9x9(x, W, verbose=True)
+    result = simulate_array_9x9(x, W, verbose=True, trace_level=TRACE_FULL)
     return result.all_correct
 
 
@@ -486,7 +826,7 @@ def test_all_ones():
     x = [+1] * 9
     W = [[+1] * 9 for _ in range(9)]
 
-    result = simulate_array_9x9(x, W, verbose=True)
+    result = simulate_array_9x9(x, W, verbose=True, trace_level=TRACE_FULL)
     return result.all_correct
 
 
@@ -500,7 +840,7 @@ def test_single_nonzero():
     W = [[0] * 9 for _ in range(9)]
     W[4][4] = +1  # Only PE[4,4] has a weight
 
-    result = simulate_array_9x9(x, W, verbose=True)
+    result = simulate_array_9x9(x, W, verbose=True, trace_level=TRACE_FULL)
     return result.all_correct
 
 
@@ -520,7 +860,7 @@ def test_mixed_3x3():
             W[i][j] = sub_W[i][j]
 
     # Expected: y[0]=0, y[1]=+1, y[2]=0, rest=0
-    result = simulate_array_9x9(x, W, verbose=True)
+    result = simulate_array_9x9(x, W, verbose=True, trace_level=TRACE_FULL)
     return result.all_correct
 
 
@@ -545,7 +885,7 @@ def test_tridiagonal_laplacian():
     # ...middle cols: -2 each
     # Col 8: W[7][8]=-1 → y[8]=-1
 
-    result = simulate_array_9x9(x, W, verbose=True)
+    result = simulate_array_9x9(x, W, verbose=True, trace_level=TRACE_FULL)
     return result.all_correct
 
 
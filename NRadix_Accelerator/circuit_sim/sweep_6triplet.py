@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Parallel Design-Space Sweep: 6-Triplet WDM Simulator
+=====================================================
+
+Runs simulate_array_multi_triplet() over a grid of design parameters:
+
+  - PPLN length (um)
+  - Peak SFG conversion efficiency
+  - Laser power per channel (dBm)
+  - Active triplet subset (e.g. T1, T1+T2, ... T1-T6)
+
+Each grid point runs the identity-matrix workload from the progressive
+loading test and records correctness, spurious SFG counts and the PPLN
+phase-matching isolation for that subset.
+
+Points are fanned out over a multiprocessing pool in chunks. Each result
+row is appended to a CSV file as soon as it completes, so an interrupted
+sweep is resumed by re-running the same command: points already on disk
+are skipped.
+
+Usage:
+    python sweep_6triplet.py --output sweep.csv
+    python sweep_6triplet.py --ppln-lengths 26,100,500 --efficiencies 0.05,0.1 \\
+        --laser-powers 6,10 --triplets "1;1,2;1,2,3" --workers 8
+
+Author: N-Radix Project
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from dataclasses import dataclass
+from itertools import product
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulate_6triplet import TRIPLETS, simulate_array_multi_triplet, _phase_match_matrix
+
+
+# Identity-matrix workload (same as test_progressive_loading)
+WORKLOAD_X = [+1, -1, 0, +1, -1, 0, +1, -1, 0]
+WORKLOAD_W = [[1 if i == j else 0 for j in range(9)] for i in range(9)]
+
+SWEEP_FIELDS = [
+    "ppln_length_um", "conversion_efficiency", "laser_power_dbm", "triplets",
+    "n_triplets", "all_correct", "correct_columns", "total_columns",
+    "spurious_products", "worst_spurious_dbm",
+    "min_within_eff", "worst_cross_eff", "isolation_db", "elapsed_s",
+]
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """One design point of the sweep."""
+    ppln_length_um: float
+    conversion_efficiency: float
+    laser_power_dbm: float
+    triplets: tuple[int, ...]
+
+    @property
+    def key(self) -> tuple[float, float, float, str]:
+        return (
+            float(self.ppln_length_um),
+            float(self.conversion_efficiency),
+            float(self.laser_power_dbm),
+            "-".join(str(t) for t in self.triplets),
+        )
+
+
+def build_grid(
+    ppln_lengths_um: list[float],
+    conversion_efficiencies: list[float],
+    laser_powers_dbm: list[float],
+    triplet_subsets: list[tuple[int, ...]],
+) -> list[SweepPoint]:
+    """Full Cartesian product of the four parameter axes."""
+    return [
+        SweepPoint(float(length), float(eff), float(power), tuple(subset))
+        for length, eff, power, subset in product(
+            ppln_lengths_um, conversion_efficiencies, laser_powers_dbm, triplet_subsets,
+        )
+    ]
+
+
+def _isolation(active, ppln_length_um: float) -> tuple[float, float]:
+    """(min within-triplet, worst cross-triplet) phase-matching efficiency."""
+    wavelengths = tuple(wl for t in active for wl in t.wavelengths)
+    min_within = 1.0
+    worst_cross = 0.0
+    for k, t_design in enumerate(active):
+        eta = _phase_match_matrix(
+            wavelengths,
+            (t_design.wl_minus1, t_design.wl_zero, t_design.wl_plus1),
+            ppln_length_um,
+        )
+        own = slice(3 * k, 3 * k + 3)
+        min_within = min(min_within, float(eta[own, own].min()))
+        others = np.ones(len(wavelengths), dtype=bool)
+        others[own] = False
+        if others.any():
+            worst_cross = max(worst_cross, float(eta[own][:, others].max()))
+    return min_within, worst_cross
+
+
+def evaluate_point(point: SweepPoint) -> dict:
+    """Run the multi-triplet simulation for one design point."""
+    t0 = time.perf_counter()
+    by_id = {t.triplet_id: t for t in TRIPLETS}
+    active = [by_id[tid] for tid in point.triplets]
+
+    results = simulate_array_multi_triplet(
+        {t.triplet_id: (WORKLOAD_X, WORKLOAD_W) for t in active},
+        active,
+        laser_power_dbm=point.laser_power_dbm,
+        ppln_length_um=point.ppln_length_um,
+        base_conversion_efficiency=point.conversion_efficiency,
+    )
+
+    cols = [c for t in active for c in results[t.triplet_id]]
+    correct = sum(1 for c in cols if c.expected == c.detected)
+    min_within, worst_cross = _isolation(active, point.ppln_length_um)
+
+    length, eff, power, triplets = point.key
+    return {
+        "ppln_length_um": length,
+        "conversion_efficiency": eff,
+        "laser_power_dbm": power,
+        "triplets": triplets,
+        "n_triplets": len(active),
+        "all_correct": int(correct == len(cols)),
+        "correct_columns": correct,
+        "total_columns": len(cols),
+        "spurious_products": sum(c.spurious_sfg_count for c in cols),
+        "worst_spurious_dbm": max(c.worst_spurious_power_dbm for c in cols),
+        "min_within_eff": min_within,
+        "worst_cross_eff": worst_cross,
+        "isolation_db": -10 * np.log10(max(worst_cross, 1e-15)),
+        "elapsed_s": time.perf_counter() - t0,
+    }
+
+
+def load_sweep(path: str) -> list[dict]:
+    """
+    Read completed rows from a sweep CSV. Rows cut short by an interrupted
+    write are dropped.
+    """
+    if not os.path.exists(path):
+        return []
+    rows = []
+    with open(path, newline="") as f:
+        for raw in csv.DictReader(f):
+            if any(raw.get(name) in (None, "") for name in SWEEP_FIELDS):
+                continue
+            row = {}
+            for name in SWEEP_FIELDS:
+                row[name] = raw[name] if name == "triplets" else float(raw[name])
+            rows.append(row)
+    return rows
+
+
+def _row_key(row: dict) -> tuple[float, float, float, str]:
+    return (row["ppln_length_um"], row["conversion_efficiency"],
+            row["laser_power_dbm"], row["triplets"])
+
+
+def run_sweep(
+    points: list[SweepPoint],
+    output_csv: str,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    resume: bool = True,
+    verbose: bool = True,
+) -> list[dict]:
+    """
+    Evaluate all points, streaming each result row to output_csv.
+
+    Args:
+        points: Grid from build_grid()
+        output_csv: Result file (appended to; created if missing)
+        workers: Process count (default: all cores; 1 = run in-process)
+        chunk_size: Points handed to a worker at a time
+            (default: ~4 chunks per worker)
+        resume: Skip points already present in output_csv
+        verbose: Print one line per completed point
+
+    Returns:
+        All result rows for this grid (previously saved + new)
+    """
+    done = load_sweep(output_csv) if resume else []
+    done_keys = {_row_key(row) for row in done}
+    pending = [p for p in points if p.key not in done_keys]
+
+    # Rewrite the file with only complete rows, dropping any torn last line
+    os.makedirs(os.path.dirname(os.path.abspath(output_csv)), exist_ok=True)
+    tmp_path = output_csv + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_FIELDS)
+        writer.writeheader()
+        writer.writerows(done)
+    os.replace(tmp_path, output_csv)
+
+    workers = workers or cpu_count()
+    workers = max(1, min(workers, len(pending)))
+    if chunk_size is None:
+        chunk_size = max(1, len(pending) // (4 * workers))
+
+    if verbose:
+        print(f"  Sweep: {len(points)} points, {len(points) - len(pending)} already done, "
+              f"{len(pending)} to run on {workers} worker(s), chunk={chunk_size}")
+
+    new_rows = []
+    t0 = time.time()
+    with open(output_csv, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_FIELDS)
+
+        if workers == 1:
+            completed = map(evaluate_point, pending)
+            pool = None
+        else:
+            pool = Pool(workers)
+            completed = pool.imap_unordered(evaluate_point, pending, chunksize=chunk_size)
+
+        try:
+            for n, row in enumerate(completed, 1):
+                writer.writerow(row)
+                f.flush()
+                new_rows.append(row)
+                if verbose:
+                    status = "PASS" if row["all_correct"] else "FAIL"
+                    print(f"  [{n}/{len(pending)}] L={row['ppln_length_um']:g}um "
+                          f"eta={row['conversion_efficiency']:g} "
+                          f"P={row['laser_power_dbm']:g}dBm T={row['triplets']}: "
+                          f"{status}, {row['spurious_products']:.0f} spurious, "
+                          f"isolation={row['isolation_db']:.1f} dB")
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    if verbose:
+        print(f"  Sweep complete: {len(new_rows)} new points in {time.time() - t0:.1f}s "
+              f"-> {output_csv}")
+
+    wanted = {p.key for p in points}
+    return [row for row in done + new_rows if _row_key(row) in wanted]
+
+
+def _floats(text: str) -> list[float]:
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def _subsets(text: str) -> list[tuple[int, ...]]:
+    if text == "progressive":
+        return [tuple(range(1, n + 1)) for n in range(1, len(TRIPLETS) + 1)]
+    return [tuple(int(t) for t in group.split(",")) for group in text.split(";") if group.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel 6-triplet design-space sweep")
+    parser.add_argument("--ppln-lengths", type=str, default="26,50,100,200,500",
+                        help="Comma-separated PPLN lengths (um)")
+    parser.add_argument("--efficiencies", type=str, default="0.10",
+                        help="Comma-separated peak conversion efficiencies")
+    parser.add_argument("--laser-powers", type=str, default="10",
+                        help="Comma-separated laser powers (dBm)")
+    parser.add_argument("--triplets", type=str, default="progressive",
+                        help="Triplet subsets, e.g. '1;1,2;1,2,3' or 'progressive'")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Points per task")
+    parser.add_argument("--output", type=str, default="sweep_6triplet.csv",
+                        help="Result CSV (resumed if it exists)")
+    parser.add_argument("--no-resume", action="store_true", help="Start the sweep over")
+    args = parser.parse_args()
+
+    points = build_grid(
+        _floats(args.ppln_lengths), _floats(args.efficiencies),
+        _floats(args.laser_powers), _subsets(args.triplets),
+    )
+
+    print("=" * 78)
+    print("  6-TRIPLET DESIGN-SPACE SWEEP")
+    print("=" * 78)
+    rows = run_sweep(points, args.output, args.workers, args.chunk_size,
+                     resume=not args.no_resume)
+
+    n_pass = sum(1 for row in rows if row["all_correct"])
+    print(f"\n  {n_pass}/{len(rows)} design points compute correctly")
+
+
+if __name__ == "__main__":
+    main()
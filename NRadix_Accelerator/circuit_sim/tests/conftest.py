@@ -0,0 +1,9 @@
+"""
+Pytest configuration for the circuit simulation tests.
+"""
+
+import os
+import sys
+
+# The circuit_sim scripts import their siblings as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,75 @@
+"""
+Tests for the bit-packed NxN binary engine
+(Binary_Accelerator/circuit_sim/simulate_binary_nxn.py).
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "..", "..", "Binary_Accelerator", "circuit_sim"))
+from simulate_binary_nxn import (
+    check_against_9x9, first_active_row, n_words, pack_bits, pack_weight_columns, reference_or_and,
+    simulate_binary_array_nxn, simulate_binary_array_packed, unpack_bits,
+)
+
+SIZES = [1, 63, 64, 65, 130]
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_pack_unpack_roundtrip(n):
+    rng = np.random.default_rng(n)
+    bits = rng.integers(0, 2, (7, n), dtype=np.uint8)
+    words = pack_bits(bits)
+    assert words.dtype == np.uint64
+    assert words.shape == (7, n_words(n))
+    np.testing.assert_array_equal(unpack_bits(words, n), bits)
+
+
+def test_pack_bit_order():
+    bits = np.zeros(130, dtype=np.uint8)
+    bits[[0, 63, 64, 129]] = 1
+    words = pack_bits(bits)
+    assert words.tolist() == [1 | (1 << 63), 1, 1 << 1]
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_first_active_row_matches_unpacked_scan(n):
+    rng = np.random.default_rng(100 + n)
+    x = rng.random((40, n)) < 0.1
+    W = rng.random((n, 9)) < 0.1
+    first = first_active_row(np.ascontiguousarray(pack_bits(x).T),
+                             np.ascontiguousarray(pack_weight_columns(W).T))
+
+    active = x[:, :, None] & W[None]                       # (B, n, N_out)
+    expect = np.where(active.any(axis=1), active.argmax(axis=1), -1)
+    np.testing.assert_array_equal(first, expect)
+
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("density", [0.02, 0.5])
+def test_outputs_match_reference_or_and(n, density):
+    rng = np.random.default_rng(n)
+    W = rng.random((n, n)) < density
+    x = rng.random((50, n)) < density
+    result = simulate_binary_array_nxn(x, W)
+    np.testing.assert_array_equal(result.output, reference_or_and(x, W))
+    assert np.array_equal(np.isnan(result.column_margin_db), result.output == 0)
+
+
+def test_chunking_does_not_change_results():
+    rng = np.random.default_rng(3)
+    W = rng.random((130, 65)) < 0.05
+    x = rng.random((100, 130)) < 0.05
+    args = (pack_bits(x), pack_weight_columns(W), 130)
+    whole = simulate_binary_array_packed(*args)
+    chunked = simulate_binary_array_packed(*args, chunk_size=7)
+    np.testing.assert_array_equal(chunked.output_packed, whole.output_packed)
+    np.testing.assert_array_equal(chunked.first_active_row, whole.first_active_row)
+
+
+def test_agrees_with_the_9x9_simulator():
+    assert check_against_9x9(n_samples=60, seed=1)
@@ -0,0 +1,155 @@
+"""
+Tests for the FDTD calibration cache (calibration/) and its use by the
+component models.
+"""
+
+import numpy as np
+import pytest
+
+from calibration.cache import CACHE_VERSION, CalibrationCache, CalibrationEntry, geometry_key
+from calibration.fdtd_io import read_fdtd_table
+from calibration.fits import fit_awg, fit_directional_coupler, fit_sfg_mixer
+from calibration.build_cache import ingest_file
+import models.components as components
+
+
+def _write_csv(path, header, columns):
+    np.savetxt(path, np.column_stack(columns), delimiter=",", header=header, comments='')
+
+
+class TestCache:
+
+    def test_geometry_key_is_order_independent(self):
+        assert geometry_key({"b": 2, "a": 1.5}) == geometry_key({"a": 1.5, "b": 2.0})
+
+    def test_roundtrip(self, tmp_path):
+        cache = CalibrationCache(tmp_path / "cal.json")
+        cache.put(CalibrationEntry("awg_demux", {"n_channels": 6},
+                                   {"insertion_loss_db": 2.5}, "awg.csv", "abc"))
+        cache.save()
+
+        loaded = CalibrationCache.load(tmp_path / "cal.json")
+        assert len(loaded) == 1
+        assert loaded.param("awg_demux", {"n_channels": 6}, "insertion_loss_db", 3.0) == 2.5
+        assert loaded.param("awg_demux", {"n_channels": 5}, "insertion_loss_db", 3.0) == 3.0
+        assert loaded.has_source("awg_demux", "abc")
+
+    def test_stale_version_is_ignored(self, tmp_path):
+        path = tmp_path / "cal.json"
+        path.write_text(f'{{"version": {CACHE_VERSION + 1}, "components": {{}}}}')
+        with pytest.warns(UserWarning):
+            assert len(CalibrationCache.load(path)) == 0
+
+
+class TestFits:
+
+    def test_sfg_mixer_efficiency(self, tmp_path):
+        wl_um = np.linspace(0.5, 1.9, 2000)
+        band = lambda center, amp: amp * np.exp(-0.5 * ((wl_um - center) / 0.005) ** 2)
+        flux = band(1.55, 4.0) + band(1.0, 1.0) + band(1.0 / (1 / 1.55 + 1 / 1.0), 0.2)
+        path = tmp_path / "mixer_data_RED_BLUE.csv"
+        _write_csv(path, "Frequency (Meep),Wavelength (um),Flux (a.u.)",
+                   (1 / wl_um, wl_um, flux))
+
+        fit = fit_sfg_mixer(read_fdtd_table(path), 1550.0, 1000.0)
+        assert fit.params["conversion_efficiency"] == pytest.approx(0.1, rel=0.05)
+
+    def test_awg_gaussian_passbands(self):
+        wl_um = np.linspace(0.5, 0.8, 3000)
+        table = {"wavelength_um": wl_um}
+        sigma_nm = 10.0 / 2.355
+        for i, center in enumerate([550.0, 620.0, 700.0]):
+            table[f"ch{i}_t"] = 0.5 * np.exp(-0.5 * ((wl_um * 1000 - center) / sigma_nm) ** 2)
+
+        fit = fit_awg(table)
+        assert fit.params["insertion_loss_db"] == pytest.approx(3.01, abs=0.01)
+        assert fit.params["channel_bandwidth_nm"] == pytest.approx(10.0, rel=0.01)
+        assert fit.params["ch1_center_nm"] == pytest.approx(620.0, abs=0.1)
+        assert fit.params["crosstalk_db"] < -60
+
+    def test_coupler_recovers_model(self):
+        gaps, lengths = np.meshgrid([0.2, 0.22, 0.25, 0.27, 0.3], [6.0, 7.0, 8.0, 9.0, 10.0])
+        kappa = 1.2 * np.exp(-gaps / 0.12)
+        cross = 0.95 * np.sin(kappa * lengths) ** 2
+        table = {
+            "gap_um": gaps.ravel(), "length_um": lengths.ravel(),
+            "cross_t": cross.ravel(), "through_t": (0.95 - cross).ravel(),
+        }
+
+        fit = fit_directional_coupler(table)
+        assert fit.params["kappa0_per_um"] == pytest.approx(1.2, rel=1e-3)
+        assert fit.params["gap_decay_um"] == pytest.approx(0.12, rel=1e-3)
+        assert fit.params["excess_loss_db"] == pytest.approx(0.223, abs=1e-3)
+        assert fit.fit_rms < 1e-6
+
+
+class TestComponentsUseCache:
+
+    def test_sfg_mixer_picks_up_calibration(self, tmp_path, monkeypatch):
+        cache = CalibrationCache(tmp_path / "cal.json")
+        cache.put(CalibrationEntry(
+            "sfg_mixer",
+            {"ppln_length_um": 26.0, "wl_short_nm": 1064, "wl_long_nm": 1550},
+            {"conversion_efficiency": 0.05},
+        ))
+        monkeypatch.setattr(components, "CALIBRATION", cache)
+
+        a = components.mzi_encode(-1)
+        b = components.mzi_encode(+1)
+        calibrated, _, _ = components.sfg_mixer(a, b)
+        explicit, _, _ = components.sfg_mixer(a, b, conversion_efficiency=0.05)
+        assert calibrated.power_dbm == pytest.approx(explicit.power_dbm)
+
+        # Uncalibrated pair falls back to the nominal efficiency
+        g = components.mzi_encode(0)
+        fallback, _, _ = components.sfg_mixer(g, b)
+        nominal, _, _ = components.sfg_mixer(
+            g, b, conversion_efficiency=components.SFG_CONVERSION_EFFICIENCY)
+        assert fallback.power_dbm == pytest.approx(nominal.power_dbm)
+
+    def test_ingested_color_mixer_is_found_by_the_simulator(self, tmp_path, monkeypatch):
+        # RED+BLUE run at the FDTD wavelengths (1550 + 1000 nm), 5% conversion
+        wl_um = np.linspace(0.5, 1.9, 2000)
+        band = lambda center, amp: amp * np.exp(-0.5 * ((wl_um - center) / 0.005) ** 2)
+        flux = band(1.55, 4.0) + band(1.0, 1.0) + band(1.0 / (1 / 1.55 + 1 / 1.0), 0.1)
+        path = tmp_path / "mixer_data_RED_BLUE.csv"
+        _write_csv(path, "Frequency (Meep),Wavelength (um),Flux (a.u.)",
+                   (1 / wl_um, wl_um, flux))
+
+        cache = CalibrationCache(tmp_path / "cal.json")
+        entry = ingest_file(cache, path)
+        fitted = entry.params["conversion_efficiency"]
+        assert fitted == pytest.approx(0.05, rel=0.05)
+
+        monkeypatch.setattr(components, "CALIBRATION", cache)
+        red, blue = components.TRIT_TO_WL[-1], components.TRIT_TO_WL[+1]
+        assert components.sfg_conversion_efficiency(red, blue) == fitted
+        assert components.sfg_conversion_efficiency(blue, red) == fitted
+
+        calibrated, _, _ = components.sfg_mixer(components.mzi_encode(-1), components.mzi_encode(+1))
+        explicit, _, _ = components.sfg_mixer(components.mzi_encode(-1), components.mzi_encode(+1),
+                                              conversion_efficiency=fitted)
+        assert calibrated.power_dbm == pytest.approx(explicit.power_dbm)
+
+    def test_ingest_then_awg_uses_fit(self, tmp_path, monkeypatch):
+        wl_um = np.linspace(0.5, 0.8, 3000)
+        centers = sorted(components.AWG_CHANNELS.values())
+        sigma_nm = 8.0 / 2.355
+        cols = [1 / wl_um, wl_um, np.ones_like(wl_um)]
+        header = ["Frequency (Meep)", "Wavelength (um)", "Input Flux"]
+        for i, center in enumerate(centers):
+            t = 0.8 * np.exp(-0.5 * ((wl_um * 1000 - center) / sigma_nm) ** 2)
+            cols += [t, t]
+            header += [f"Ch{i} Flux", f"Ch{i} T"]
+        path = tmp_path / "awg_broadband.csv"
+        _write_csv(path, ",".join(header), cols)
+
+        cache = CalibrationCache(tmp_path / "cal.json")
+        entry = ingest_file(cache, path)
+        assert entry.geometry == {"n_channels": len(centers)}
+        assert ingest_file(cache, path) is None  # unchanged file is skipped
+
+        monkeypatch.setattr(components, "CALIBRATION", cache)
+        sig = components.OpticalSignal(775.0, 0.0)
+        powers = components.awg_demux(sig)
+        assert powers[5] == pytest.approx(10 * np.log10(0.8), abs=0.01)
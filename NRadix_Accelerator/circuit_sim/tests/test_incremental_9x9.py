@@ -0,0 +1,55 @@
+"""
+Tests for incremental weight-update re-simulation (IncrementalArray9x9).
+"""
+
+import numpy as np
+import pytest
+
+from simulate_9x9 import IncrementalArray9x9, simulate_array_9x9
+
+
+def _random_trits(rng, shape):
+    return rng.integers(-1, 2, size=shape).tolist()
+
+
+def test_initial_state_matches_full_simulation():
+    rng = np.random.default_rng(0)
+    x = _random_trits(rng, 9)
+    W = _random_trits(rng, (9, 9))
+
+    inc = IncrementalArray9x9(x, W)
+    assert inc.result == simulate_array_9x9(x, W, verbose=False)
+    assert inc.pe_evaluations == 81
+
+
+@pytest.mark.parametrize("n_changes", [1, 3, 12])
+def test_updates_match_full_simulation(n_changes):
+    rng = np.random.default_rng(n_changes)
+    x = _random_trits(rng, 9)
+    W = _random_trits(rng, (9, 9))
+    inc = IncrementalArray9x9(x, W)
+
+    for _ in range(5):
+        cells = rng.choice(81, size=n_changes, replace=False)
+        delta = {}
+        for cell in cells:
+            row, col = divmod(int(cell), 9)
+            delta[(row, col)] = (W[row][col] + 2) % 3 - 1   # always a different trit
+            W[row][col] = delta[(row, col)]
+
+        before = inc.pe_evaluations
+        result = inc.update_weights(delta)
+
+        assert result == simulate_array_9x9(x, W, verbose=False)
+        # Passthrough power does not depend on the weight trit, so only the
+        # changed PEs are re-simulated
+        assert inc.pe_evaluations - before == n_changes
+
+
+def test_unchanged_weight_is_free():
+    x = [+1] * 9
+    W = [[+1] * 9 for _ in range(9)]
+    inc = IncrementalArray9x9(x, W)
+    before = inc.pe_evaluations
+    inc.update_weights({(4, 4): +1})
+    assert inc.pe_evaluations == before
@@ -0,0 +1,55 @@
+"""
+Tests for the parallel 6-triplet design-space sweep (sweep_6triplet.py).
+"""
+
+import sweep_6triplet
+from sweep_6triplet import build_grid, load_sweep, run_sweep
+
+
+def _grid():
+    return build_grid([26.0, 500.0], [0.10], [10.0], [(1,), (1, 2)])
+
+
+def test_sweep_streams_all_points(tmp_path):
+    out = str(tmp_path / "sweep.csv")
+    rows = run_sweep(_grid(), out, workers=2, verbose=False)
+
+    assert len(rows) == 4
+    assert len(load_sweep(out)) == 4
+    single = [r for r in rows if r["triplets"] == "1"]
+    assert all(r["all_correct"] == 1 for r in single)
+
+
+def test_parallel_matches_serial(tmp_path):
+    serial = run_sweep(_grid(), str(tmp_path / "a.csv"), workers=1, verbose=False)
+    parallel = run_sweep(_grid(), str(tmp_path / "b.csv"), workers=2, verbose=False)
+
+    def strip(rows):
+        return sorted(
+            tuple((k, v) for k, v in r.items() if k != "elapsed_s") for r in rows
+        )
+    assert strip(serial) == strip(parallel)
+
+
+def test_resume_skips_completed_points(tmp_path, monkeypatch):
+    out = tmp_path / "sweep.csv"
+    points = _grid()
+    run_sweep(points[:2], str(out), workers=1, verbose=False)
+
+    # Simulate a crash mid-write: torn last line
+    with open(out, "a") as f:
+        f.write("500.0,0.1,10.0,1-")
+
+    evaluated = []
+    real = sweep_6triplet.evaluate_point
+
+    def counting(point):
+        evaluated.append(point)
+        return real(point)
+
+    monkeypatch.setattr(sweep_6triplet, "evaluate_point", counting)
+    rows = run_sweep(points, str(out), workers=1, verbose=False)
+
+    assert evaluated == points[2:]
+    assert len(rows) == 4
+    assert len(load_sweep(str(out))) == 4
@@ -0,0 +1,56 @@
+"""
+Tests for simulate_array_9x9 trace levels.
+"""
+
+import numpy as np
+
+from simulate_9x9 import (
+    TRACE_FULL, TRACE_NONE, TRACE_SUMMARY, simulate_array_9x9,
+)
+
+
+def _workload():
+    rng = np.random.default_rng(3)
+    return rng.integers(-1, 2, 9).tolist(), rng.integers(-1, 2, (9, 9)).tolist()
+
+
+def test_levels_agree_on_outputs():
+    x, W = _workload()
+    results = [simulate_array_9x9(x, W, trace_level=lvl)
+               for lvl in (TRACE_NONE, TRACE_SUMMARY, TRACE_FULL)]
+    for r in results:
+        assert r.expected_output == results[1].expected_output
+        assert r.detected_output == results[1].detected_output
+        assert r.all_correct == results[1].all_correct
+
+
+def test_none_keeps_no_per_pe_data(capsys):
+    x, W = _workload()
+    r = simulate_array_9x9(x, W, trace_level=TRACE_NONE)
+    assert r.pe_results == []
+    assert r.column_sfg_products == []
+    assert r.detector_currents == []
+    assert r.trace is None
+    assert capsys.readouterr().out == ""
+
+
+def test_full_trace_matches_pe_results():
+    x, W = _workload()
+    r = simulate_array_9x9(x, W, trace_level=TRACE_FULL)
+
+    assert r.trace.shape == (81,)
+    for row in range(9):
+        for col in range(9):
+            rec = r.trace[row * 9 + col]
+            pe = r.pe_results[row][col]
+            assert (rec.row, rec.col) == (row, col)
+            assert rec.expected_product == pe.expected_product
+            assert rec.pass_h_power_dbm == pe.pass_h_power_dbm
+            if pe.sfg_power_dbm is None:
+                assert np.isnan(rec.sfg_power_dbm)
+            else:
+                assert rec.sfg_power_dbm == pe.sfg_power_dbm
+
+    # Per-column sums of decoded trits reproduce the detected output
+    decoded = r.trace.decoded_trit.reshape(9, 9).sum(axis=0)
+    assert decoded.tolist() == r.detected_output
@@ -0,0 +1,199 @@
+"""
+Batched excitation: every wavelength of a passive device from one FDTD run.
+
+The passive components (AWG, directional coupler, MZI at a fixed phase)
+are linear, so the response at each wavelength does not depend on what
+else is in the pulse. One broadband Gaussian pulse covering all the
+channel wavelengths, with flux monitors sampled at each of them, measures
+what a narrowband run per wavelength would, at the cost of one run:
+
+  - Band picks the source centre and width so the weakest channel still
+    gets edge_power of the pulse's peak spectral power (1e-3 by default;
+    the spectra are normalized by an input monitor, so only the dynamic
+    range matters), and the monitor frequencies: a uniform grid over the
+    band for plotting, plus each channel frequency exactly, so nothing is
+    interpolated at the wavelengths that matter
+  - TransferMatrix holds output port x wavelength power transmission
+    taken from those spectra, and can be concatenated from per-wavelength
+    runs so the two modes can be compared
+
+Nonlinear runs (Kerr, SFG, SOA gain saturation) are not batchable: their
+response to one wavelength depends on the others.
+
+Usage:
+
+    band = Band.covering({"RED": 1.55, "GREEN": 1.216, "BLUE": 1.0})
+    source = mp.Source(mp.GaussianSource(band.fcen, fwidth=band.fwidth), ...)
+    mon = sim.add_flux(band.frequencies, region)    # Meep accepts a frequency array
+    ...
+    transfer = TransferMatrix.from_spectra(freqs, {"through": T_through, "cross": T_cross},
+                                           band.wavelengths)
+    transfer.print_table("Directional coupler")
+"""
+
+import csv
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+DEFAULT_EDGE_POWER = 1e-3
+DEFAULT_NFREQ = 100
+
+
+# =============================================================================
+# Source band and monitor frequencies
+# =============================================================================
+
+@dataclass
+class Band:
+    """Broadband pulse and monitor frequencies covering a set of wavelengths."""
+    wavelengths: dict[str, float]   # name -> wavelength (um)
+    fcen: float
+    fwidth: float
+    frequencies: np.ndarray         # monitor frequencies, ascending
+
+    @classmethod
+    def covering(cls, wavelengths: dict, edge_power: float = DEFAULT_EDGE_POWER,
+                 nfreq: int = DEFAULT_NFREQ, margin: float = 0.1) -> "Band":
+        """
+        Args:
+            wavelengths: name -> wavelength (um) to measure
+            edge_power: Source spectral power at the outermost wavelength,
+                relative to the peak
+            nfreq: Points of the uniform monitor grid
+            margin: Grid extension beyond the outermost wavelengths, as a
+                fraction of the band
+        """
+        targets = 1.0 / np.array(list(wavelengths.values()), dtype=float)
+        f_min, f_max = targets.min(), targets.max()
+        fcen = (f_min + f_max) / 2
+        half = max((f_max - f_min) / 2, 0.05 * fcen)
+
+        # Meep's GaussianSource(fcen, fwidth) has power spectrum
+        # exp(-4 pi^2 ((f - fcen) / fwidth)^2)
+        fwidth = 2 * np.pi * half / np.sqrt(np.log(1 / edge_power))
+
+        pad = margin * 2 * half
+        grid = np.linspace(f_min - pad, f_max + pad, nfreq)
+        # Grid points that land on a channel (up to rounding) would be
+        # near-duplicate DFT frequencies; the exact channel value replaces them
+        spacing = (grid[-1] - grid[0]) / max(nfreq - 1, 1)
+        distinct = np.min(np.abs(grid[:, None] - targets[None, :]), axis=1) > 1e-6 * spacing
+        frequencies = np.unique(np.concatenate([grid[distinct], targets]))
+        return cls(wavelengths=dict(wavelengths), fcen=float(fcen), fwidth=float(fwidth),
+                   frequencies=frequencies)
+
+    def source_power(self, frequency: float) -> float:
+        """Relative spectral power of the pulse at a frequency."""
+        return float(np.exp(-4 * np.pi ** 2 * ((frequency - self.fcen) / self.fwidth) ** 2))
+
+    def index_of(self, wavelength: float) -> int:
+        """Index of the monitor frequency nearest a wavelength."""
+        return int(np.argmin(np.abs(self.frequencies - 1.0 / wavelength)))
+
+    def describe(self) -> str:
+        weakest = min(self.source_power(1.0 / w) for w in self.wavelengths.values())
+        return (f"Broadband pulse: f = {self.fcen:.4f} +/- {self.fwidth:.4f} covering "
+                f"{len(self.wavelengths)} wavelength(s), {len(self.frequencies)} monitor "
+                f"frequencies (weakest channel at {weakest:.1e} of peak power)")
+
+
+# =============================================================================
+# Transfer matrix
+# =============================================================================
+
+@dataclass
+class TransferMatrix:
+    """Power transmission from one input to each output port, per wavelength."""
+    ports: list[str]
+    names: list[str]                # wavelength names, one per column
+    wavelengths: np.ndarray         # um, one per column
+    power: np.ndarray               # (ports, wavelengths) output / input power
+    runs: int = 1                   # FDTD runs it took
+    unbatched_runs: int | None = None   # runs one per wavelength would take (default: one each)
+
+    @classmethod
+    def from_spectra(cls, freqs, transmission: dict, wavelengths: dict,
+                     runs: int = 1) -> "TransferMatrix":
+        """
+        Sample transmission spectra at each wavelength.
+
+        Args:
+            freqs: Monitor frequencies of the spectra
+            transmission: port name -> normalized transmission spectrum
+            wavelengths: name -> wavelength (um); exact monitor frequencies
+                are read directly, others linearly interpolated
+        """
+        freqs = np.asarray(freqs, dtype=float)
+        order = np.argsort(freqs)
+        targets = 1.0 / np.array(list(wavelengths.values()), dtype=float)
+        power = np.array([np.interp(targets, freqs[order], np.asarray(t, dtype=float)[order])
+                          for t in transmission.values()])
+        return cls(ports=list(transmission), names=list(wavelengths),
+                   wavelengths=1.0 / targets, power=power, runs=runs)
+
+    @classmethod
+    def concat(cls, matrices: list["TransferMatrix"]) -> "TransferMatrix":
+        """Join per-wavelength matrices (same ports) column-wise."""
+        return cls(ports=list(matrices[0].ports),
+                   names=[n for m in matrices for n in m.names],
+                   wavelengths=np.concatenate([m.wavelengths for m in matrices]),
+                   power=np.hstack([m.power for m in matrices]),
+                   runs=sum(m.runs for m in matrices),
+                   unbatched_runs=sum(m.baseline_runs for m in matrices))
+
+    @property
+    def baseline_runs(self) -> int:
+        return self.unbatched_runs or len(self.names)
+
+    def column(self, name: str) -> dict:
+        """port -> transmission at one wavelength."""
+        j = self.names.index(name)
+        return {port: float(self.power[i, j]) for i, port in enumerate(self.ports)}
+
+    def routed(self) -> dict:
+        """wavelength name -> (port with the most power, its transmission)."""
+        best = np.argmax(self.power, axis=0)
+        return {name: (self.ports[best[j]], float(self.power[best[j], j]))
+                for j, name in enumerate(self.names)}
+
+    def max_difference(self, other: "TransferMatrix") -> float:
+        """Largest absolute difference against another measurement of the same matrix."""
+        cols = [other.names.index(n) for n in self.names]
+        return float(np.max(np.abs(self.power - other.power[:, cols])))
+
+    def print_table(self, title: str = "Transfer matrix") -> None:
+        print(f"\n  {title} (output power / input power, {self.runs} FDTD run(s) "
+              f"for {len(self.names)} wavelength(s))")
+        print(f"    {'Port':<12}" + "".join(f"{n:>10}" for n in self.names))
+        print(f"    {'':<12}" + "".join(f"{w:>8.3f}um" for w in self.wavelengths))
+        for i, port in enumerate(self.ports):
+            print(f"    {port:<12}" + "".join(f"{t:>10.4f}" for t in self.power[i]))
+        if self.runs < self.baseline_runs:
+            print(f"    {self.baseline_runs - self.runs} of {self.baseline_runs} run(s) saved "
+                  f"against running each wavelength separately")
+
+    def save_csv(self, path: str) -> None:
+        """Rows per port, columns per wavelength."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Port"] + [f"{n} ({w} um)" for n, w in zip(self.names, self.wavelengths)])
+            for i, port in enumerate(self.ports):
+                writer.writerow([port] + [float(t) for t in self.power[i]])
+            writer.writerow([])
+            writer.writerow(["fdtd_runs", self.runs])
+        print(f"Saved: {path}")
+
+
+# =============================================================================
+# Command line
+# =============================================================================
+
+def add_arguments(parser) -> None:
+    """Add the shared batched-excitation flag to a script's argparse parser."""
+    group = parser.add_argument_group("batched excitation")
+    group.add_argument("--per-wavelength", action="store_true",
+                       help="One narrowband FDTD run per wavelength instead of a single "
+                            "broadband run (slower; for validating the batched results)")
@@ -0,0 +1,357 @@
+"""
+Content-addressed on-disk cache for Meep FDTD results.
+
+A cached run is keyed by the SHA-256 of its full simulation spec: the
+mp.Simulation keyword arguments (cell, geometry blocks and their materials,
+sources, boundary layers, resolution, default material), the flux monitors,
+the run/stop condition, any extra inputs the caller names, and the Meep
+version. Meep objects are reduced to their public attributes and Python
+callables (amplitude functions, material callbacks) to their code and the
+values they close over, so the key changes whenever anything that reaches
+the solver changes.
+
+Each entry is one compressed NPZ holding the named result arrays (flux
+spectra, field snapshots, scalars) plus the canonical spec it was made
+from. Arrays are stored exactly (dtype and bytes), so a warm hit returns
+the same bytes a fresh run produced. Entries are evicted least-recently-used
+once the directory exceeds its size budget; a hit refreshes the entry's
+mtime.
+
+Usage in a simulation script:
+
+    from fdtd_cache import default_cache, simulation_spec
+
+    sim_kwargs = dict(cell_size=..., geometry=..., sources=..., resolution=...)
+    monitors = {"through": (fcen, df, nfreq, mp.FluxRegion(...)), ...}
+    run = {"until_after_sources": 200}
+    spec = simulation_spec(sim_kwargs, monitors, run)
+
+    def fresh():
+        sim = mp.Simulation(**sim_kwargs)
+        mons = {k: sim.add_flux(*v) for k, v in monitors.items()}
+        sim.run(until_after_sources=200)
+        return {"through_flux": mp.get_fluxes(mons["through"]), ...}
+
+    arrays = default_cache().fetch(spec, fresh)
+
+Environment:
+    NRADIX_FDTD_CACHE_DIR        cache directory ("off" disables caching)
+    NRADIX_FDTD_CACHE_MAX_BYTES  size budget in bytes (default 2 GiB)
+"""
+
+import functools
+import hashlib
+import json
+import marshal
+import math
+import os
+import tempfile
+import types
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from fdtd_parallel import RANK as _RANK
+
+
+CACHE_DIR_ENV = "NRADIX_FDTD_CACHE_DIR"
+CACHE_MAX_BYTES_ENV = "NRADIX_FDTD_CACHE_MAX_BYTES"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "nradix" / "fdtd"
+DEFAULT_MAX_BYTES = 2 * 2**30
+
+SPEC_KEY = "__spec__"   # NPZ member holding the canonical spec JSON
+
+# Meep attributes that are handles into the C++ solver, not inputs
+_SKIPPED_ATTRS = {"swigobj", "this", "thisown"}
+
+
+# =============================================================================
+# Canonical spec
+# =============================================================================
+
+def meep_version() -> str:
+    """Installed Meep version, or "none" if Meep is not importable."""
+    try:
+        import meep
+    except ImportError:
+        return "none"
+    return str(getattr(meep, "__version__", "unknown"))
+
+
+def canonical(obj):
+    """
+    Reduce a spec value to JSON-serializable data, deterministically.
+
+    Numbers keep full precision (float repr round-trips), complex numbers
+    become [re, im], NumPy arrays become lists, Vector3-like objects become
+    [x, y, z], and other objects become {"__type__": name, **public attrs}.
+    Functions are identified by module and qualified name plus their code,
+    defaults, closure values and the plain-data globals they read (see
+    _function_spec), so two lambdas or closures never share a key.
+    """
+    if obj is None or isinstance(obj, (bool, str)):
+        return obj
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        value = float(obj)
+        return value if math.isfinite(value) else repr(value)
+    if isinstance(obj, (complex, np.complexfloating)):
+        return [canonical(obj.real), canonical(obj.imag)]
+    if isinstance(obj, np.ndarray):
+        return canonical(obj.tolist())
+    if isinstance(obj, (list, tuple)):
+        return [canonical(v) for v in obj]
+    if isinstance(obj, dict):
+        return {str(k): canonical(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if type(obj).__name__ == "Vector3" and hasattr(obj, "x"):
+        return [canonical(obj.x), canonical(obj.y), canonical(obj.z)]
+    if isinstance(obj, functools.partial):
+        return {"__partial__": canonical(obj.func), "args": canonical(obj.args),
+                "keywords": canonical(obj.keywords)}
+    if isinstance(obj, types.MethodType):
+        return {"__method__": canonical(obj.__func__), "self": canonical(obj.__self__)}
+    if isinstance(obj, types.FunctionType):
+        return _function_spec(obj)
+    if callable(obj) and hasattr(obj, "__qualname__"):
+        # Classes and builtins: the name is the whole behaviour
+        return f"{getattr(obj, '__module__', '')}.{obj.__qualname__}"
+    if hasattr(obj, "__dict__"):
+        attrs = {k: v for k, v in vars(obj).items()
+                 if not k.startswith("_") and k not in _SKIPPED_ATTRS}
+        return {"__type__": type(obj).__name__, **canonical(attrs)}
+    # Unknown opaque object: its repr may not be stable, which can only
+    # cause a cache miss, never a wrong hit
+    return {"__type__": type(obj).__name__, "repr": repr(obj)}
+
+
+# Module-level values a function may read that are folded into its key
+_DATA_TYPES = (bool, int, float, complex, str, bytes, np.number, np.ndarray, list, tuple, dict)
+
+
+def _code_names(code: types.CodeType) -> set[str]:
+    """Global names read by code and the code objects nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _function_spec(fn: types.FunctionType) -> dict:
+    """
+    Canonical form of a Python function.
+
+    The qualified name alone would give every lambda (and every closure
+    made by one factory) the same key, so the spec also holds a digest of
+    the bytecode and the values it depends on: defaults, closure cells and
+    the plain-data module globals it reads. Other globals (modules,
+    functions, classes) are taken to be fixed for the life of the cache.
+    """
+    closure = []
+    for cell in fn.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:          # cell not yet assigned
+            value = None
+        closure.append("<self>" if value is fn else value)
+    data_globals = {name: fn.__globals__[name] for name in sorted(_code_names(fn.__code__))
+                    if isinstance(fn.__globals__.get(name), _DATA_TYPES)}
+    return {
+        "__function__": f"{fn.__module__}.{fn.__qualname__}",
+        "code": hashlib.sha256(marshal.dumps(fn.__code__)).hexdigest(),
+        "defaults": canonical(fn.__defaults__),
+        "kwdefaults": canonical(fn.__kwdefaults__),
+        "closure": canonical(closure),
+        "globals": canonical(data_globals),
+    }
+
+
+def simulation_spec(
+    sim_kwargs: dict,
+    monitors: dict | None = None,
+    run: dict | None = None,
+    extra: dict | None = None,
+) -> dict:
+    """
+    Canonical spec of one FDTD run.
+
+    Args:
+        sim_kwargs: Keyword arguments passed to mp.Simulation
+        monitors: {name: (fcen, df, nfreq, *regions)} flux monitors
+        run: Run / stop condition, e.g. {"until_after_sources": 200} or a
+            description of a stop_when_fields_decayed condition
+        extra: Anything else that changes the stored arrays (post-processing
+            parameters, field snapshot regions, ...)
+    """
+    return canonical({
+        "simulation": sim_kwargs,
+        "monitors": monitors or {},
+        "run": run or {},
+        "extra": extra or {},
+        "meep_version": meep_version(),
+    })
+
+
+def spec_digest(spec: dict) -> str:
+    """SHA-256 of the canonical spec JSON."""
+    blob = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class FDTDCache:
+    """Directory of <digest>.npz result archives with LRU size eviction."""
+
+    def __init__(self, cache_dir: str | Path = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.last_hit = False   # whether the latest get() was served from disk
+
+    def path_for(self, spec: dict) -> Path:
+        return self.cache_dir / f"{spec_digest(spec)}.npz"
+
+    def get(self, spec: dict) -> dict[str, np.ndarray] | None:
+        """Stored arrays for this spec, or None on a miss."""
+        path = self.path_for(spec)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                stored_spec = json.loads(str(npz[SPEC_KEY]))
+                arrays = {k: npz[k] for k in npz.files if k != SPEC_KEY}
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            self.last_hit = False
+            return None
+        if stored_spec != spec:   # digest collision or truncated write
+            self.misses += 1
+            self.last_hit = False
+            return None
+        try:
+            os.utime(path)        # mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        self.last_hit = True
+        return arrays
+
+    def put(self, spec: dict, arrays: dict[str, np.ndarray]) -> Path | None:
+        """
+        Store arrays for spec (atomic temp file + rename), then evict.
+
+        Only MPI rank 0 writes; every rank ran the same simulation.
+        """
+        if _RANK != 0:
+            return None
+        assert SPEC_KEY not in arrays, f"{SPEC_KEY} is reserved"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(spec)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f, **{SPEC_KEY: np.array(json.dumps(spec, sort_keys=True))},
+                    **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+        return path
+
+    def fetch(self, spec: dict,
+              compute: Callable[[], dict]) -> dict[str, np.ndarray]:
+        """
+        Arrays for spec: from the cache, else compute() and store them.
+
+        compute() returns {name: array-like}. Fresh results are normalized
+        with np.asarray exactly as they are stored, so callers see identical
+        arrays on cold and warm runs.
+        """
+        arrays = self.get(spec)
+        if arrays is not None:
+            return arrays
+        arrays = {k: np.asarray(v) for k, v in compute().items()}
+        self.put(spec, arrays)
+        return arrays
+
+    def entries(self) -> list[Path]:
+        """Cached archives, least recently used first."""
+        if not self.cache_dir.is_dir():
+            return []
+        return sorted(self.cache_dir.glob("*.npz"), key=lambda p: p.stat().st_mtime)
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.entries())
+
+    def evict(self) -> list[Path]:
+        """Delete least-recently-used entries until within max_bytes."""
+        entries = self.entries()
+        total = sum(p.stat().st_size for p in entries)
+        removed = []
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            removed.append(path)
+        return removed
+
+    def clear(self) -> None:
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+
+
+class NullCache(FDTDCache):
+    """Cache that never hits and never writes (caching disabled)."""
+
+    def __init__(self):
+        super().__init__(cache_dir=os.devnull, max_bytes=0)
+
+    def get(self, spec):
+        self.misses += 1
+        self.last_hit = False
+        return None
+
+    def put(self, spec, arrays):
+        return None
+
+    def entries(self):
+        return []
+
+
+_DEFAULT: FDTDCache | None = None
+
+
+def default_cache() -> FDTDCache:
+    """
+    Process-wide cache configured from the environment.
+
+    $NRADIX_FDTD_CACHE_DIR=off disables caching.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENV, str(DEFAULT_CACHE_DIR))
+        if cache_dir.lower() == "off":
+            _DEFAULT = NullCache()
+        else:
+            max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+            _DEFAULT = FDTDCache(cache_dir, max_bytes)
+    return _DEFAULT
+
+
+def disable() -> None:
+    """
+    Turn the process-wide cache off (e.g. for a --no-cache flag), here and
+    in any sweep worker processes spawned afterwards.
+    """
+    global _DEFAULT
+    _DEFAULT = NullCache()
+    os.environ[CACHE_DIR_ENV] = "off"
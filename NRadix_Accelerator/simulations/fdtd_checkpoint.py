@@ -0,0 +1,293 @@
+"""
+Checkpoint / restart for long Meep runs.
+
+A multi-hour sim.run(until=RUN_TIME) loses everything if the node dies
+near the end. RunCheckpoint.run() instead advances the simulation in
+interval-long segments and after each one saves:
+
+  - the fields (sim.dump, fields only: the structure is rebuilt by the
+    script), one file per MPI rank
+  - the DFT accumulations of every flux monitor (sim.get_flux_data), so
+    the spectra continue where they stopped instead of restarting
+  - the timestep, so the resumed run ends at the same time
+
+Checkpoints live under <root>/<spec digest>/, the digest being the
+fdtd_cache spec of the run, so relaunching the same script with the same
+spec resumes from the newest complete checkpoint automatically and any
+change to the geometry, sources, monitors or run time starts fresh.
+
+Writes are asynchronous. sim.dump goes to a node-local staging directory
+(/dev/shm when available: memory speed), and a background thread writes
+the monitor data, copies the generation into place and marks it complete
+while the timestep loop carries on. Only one write is in flight; a
+checkpoint that comes due while the previous one is still being copied
+waits for it, and the wait is reported. Two generations are kept, so a
+crash mid-copy always leaves the previous one intact.
+
+Usage:
+
+    ckpt = RunCheckpoint(checkpoint_root, spec, interval=100)
+    sim = mp.Simulation(**sim_kwargs)
+    monitors = [sim.add_flux(...) for ...]
+    ckpt.run(sim, monitors, until=RUN_TIME, step_funcs=[mp.at_every(10, progress)])
+    # or, ending early once the fields decay (fdtd_stop.DecayStop; its
+    # decay history is checkpointed too):
+    ckpt.run(sim, monitors, until=RUN_TIME, stop=DecayStop(regions, cap=RUN_TIME))
+    ...
+    ckpt.clear()        # once the results are safely written
+
+Environment:
+    NRADIX_FDTD_STAGING_DIR   node-local staging directory (default
+                              /dev/shm, else the system temp directory)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from fdtd_cache import spec_digest
+from fdtd_parallel import MPI, RANK, SIZE, print_master
+
+STAGING_DIR_ENV = "NRADIX_FDTD_STAGING_DIR"
+COMPLETE_MARKER = "COMPLETE"
+KEEP_GENERATIONS = 2
+
+
+def staging_root() -> Path:
+    """Node-local directory checkpoints are dumped to before being copied."""
+    if os.environ.get(STAGING_DIR_ENV):
+        return Path(os.environ[STAGING_DIR_ENV])
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return Path("/dev/shm") / "nradix_fdtd"
+    return Path(tempfile.gettempdir()) / "nradix_fdtd"
+
+
+def _generation_number(path: Path) -> int:
+    return int(path.name[len("gen"):])
+
+
+# =============================================================================
+# Checkpointed run
+# =============================================================================
+
+class RunCheckpoint:
+    """Periodic, asynchronously written checkpoints of one FDTD run."""
+
+    def __init__(self, root: str | Path, spec: dict, interval: float,
+                 name: str = "run"):
+        """
+        Args:
+            root: Directory holding the checkpoints of every spec
+            spec: fdtd_cache.simulation_spec() of the run; identifies it
+            interval: Simulation time between checkpoints (Meep units)
+            name: Prefix of the checkpoint directory, for humans
+        """
+        self.digest = spec_digest(spec)[:16]
+        self.directory = Path(root) / f"{name}-{self.digest}"
+        self.staging = staging_root() / f"{name}-{self.digest}"
+        self.interval = interval
+        self.spec = spec
+        self._writer: threading.Thread | None = None
+        self._error: BaseException | None = None
+        self.waited = 0.0               # timestep loop time spent waiting on writes
+        self.saved = 0
+
+    # -------------------------------------------------------------------------
+    # Locating checkpoints
+    # -------------------------------------------------------------------------
+
+    def _generations(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted((p for p in self.directory.glob("gen*") if p.name[3:].isdigit()),
+                      key=_generation_number)
+
+    def _is_complete(self, generation: Path) -> bool:
+        return all((generation / f"rank{r}" / COMPLETE_MARKER).exists() for r in range(SIZE))
+
+    def latest(self) -> Path | None:
+        """Newest generation every rank finished writing (agreed across ranks)."""
+        found = None
+        for generation in reversed(self._generations()):
+            if self._is_complete(generation):
+                found = generation
+                break
+        if MPI is not None and SIZE > 1:
+            found = MPI.COMM_WORLD.bcast(found, root=0)
+        return found
+
+    # -------------------------------------------------------------------------
+    # Save
+    # -------------------------------------------------------------------------
+
+    def save(self, sim, monitors: list, stop=None) -> None:
+        """Dump the fields to staging and hand the rest to the writer thread."""
+        self.wait()
+        previous = self._generations()
+        number = _generation_number(previous[-1]) + 1 if previous else 1
+        stage = self.staging / f"gen{number}" / f"rank{RANK}"
+        stage.mkdir(parents=True, exist_ok=True)
+        sim.dump(str(stage), dump_structure=False, dump_fields=True, single_parallel_file=False)
+
+        # Copies of the DFT accumulations; the solver keeps running meanwhile
+        flux = [sim.get_flux_data(mon) for mon in monitors]
+        meta = {"timestep": int(sim.fields.t), "meep_time": float(sim.meep_time()),
+                "ranks": SIZE, "monitors": len(monitors), "written": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        if stop is not None:
+            meta["stop"] = stop.state()
+        target = self.directory / f"gen{number}" / f"rank{RANK}"
+        self._writer = threading.Thread(target=self._commit, args=(stage, target, flux, meta),
+                                        name="fdtd-checkpoint", daemon=False)
+        self._writer.start()
+        self.saved += 1
+
+    def _commit(self, stage: Path, target: Path, flux: list, meta: dict) -> None:
+        try:
+            arrays = {}
+            for i, data in enumerate(flux):
+                arrays[f"E{i}"] = np.asarray(data.E)
+                arrays[f"H{i}"] = np.asarray(data.H)
+            np.savez(stage / "monitors.npz", **arrays)
+            with open(stage / "meta.json", "w") as f:
+                json.dump(meta, f, indent=2)
+
+            if target.exists():
+                shutil.rmtree(target)
+            shutil.copytree(stage, target)
+            (target / COMPLETE_MARKER).touch()
+            shutil.rmtree(stage, ignore_errors=True)
+            try:
+                stage.parent.rmdir()        # other ranks on this node may still be copying
+            except OSError:
+                pass
+
+            if RANK == 0 and not (self.directory / "spec.json").exists():
+                with open(self.directory / "spec.json", "w") as f:
+                    json.dump(self.spec, f, indent=1, sort_keys=True)
+
+            # Every rank finished the previous generation before this dump
+            # (sim.dump is collective and each rank waits for its own writer
+            # first), so anything older than that is safe to drop.
+            for old in self._generations()[:-KEEP_GENERATIONS]:
+                shutil.rmtree(old / f"rank{RANK}", ignore_errors=True)
+                if RANK == 0:
+                    shutil.rmtree(old, ignore_errors=True)
+        except BaseException as exc:        # surfaced by wait() on the main thread
+            self._error = exc
+
+    def wait(self) -> None:
+        """Block until the write in flight (if any) is complete."""
+        if self._writer is not None and self._writer.is_alive():
+            start = time.perf_counter()
+            self._writer.join()
+            self.waited += time.perf_counter() - start
+        self._writer = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"checkpoint write failed: {error}") from error
+
+    # -------------------------------------------------------------------------
+    # Restore
+    # -------------------------------------------------------------------------
+
+    def restore(self, sim, monitors: list, stop=None) -> float | None:
+        """
+        Load the newest complete checkpoint into sim, its monitors and (if
+        given) the fdtd_stop.DecayStop's decay history.
+
+        The monitors must already be added (so the fields exist). Returns the
+        simulation time resumed from, or None if there is nothing to resume.
+        """
+        import meep as mp
+
+        generation = self.latest()
+        if generation is None:
+            return None
+        rank_dir = generation / f"rank{RANK}"
+        with open(rank_dir / "meta.json") as f:
+            meta = json.load(f)
+        if meta["ranks"] != SIZE or meta["monitors"] != len(monitors):
+            print_master(f"  Checkpoint {generation} was written by {meta['ranks']} rank(s) with "
+                         f"{meta['monitors']} monitor(s); starting fresh")
+            return None
+
+        if sim.fields is None:
+            sim.init_sim()
+        sim.load(str(rank_dir), load_structure=False, load_fields=True, single_parallel_file=False)
+        with np.load(rank_dir / "monitors.npz") as data:
+            for i, mon in enumerate(monitors):
+                sim.load_flux_data(mon, mp.FluxData(E=data[f"E{i}"], H=data[f"H{i}"]))
+        if sim.fields.t != meta["timestep"]:
+            sim.fields.t = meta["timestep"]
+        if stop is not None and "stop" in meta:
+            stop.load_state(meta["stop"])
+        return meta["meep_time"]
+
+    # -------------------------------------------------------------------------
+    # Run
+    # -------------------------------------------------------------------------
+
+    def run(self, sim, monitors: list, until: float, step_funcs=(), resume: bool = True,
+            stop=None) -> None:
+        """
+        sim.run(*step_funcs, until=until), checkpointed every interval.
+
+        Resumes from the newest complete checkpoint of this spec unless
+        resume is False. With an fdtd_stop.DecayStop the run also ends as
+        soon as it fires, `until` acting as the cap. A final checkpoint is
+        written where the run ends, so a crash after it (during analysis)
+        does not repeat it; clear() removes them once the results are saved.
+        """
+        resumed = self.restore(sim, monitors, stop) if resume else None
+        if resumed is not None:
+            print_master(f"  Resumed from checkpoint at t = {resumed:.1f} of {until} "
+                         f"({self.directory})")
+        else:
+            print_master(f"  Checkpointing every {self.interval} time units to {self.directory}")
+
+        start = time.perf_counter()
+        while until - sim.meep_time() > 0.5 / sim.resolution and not (stop and stop.reason):
+            segment = min(self.interval, until - sim.meep_time())
+            if stop is None:
+                sim.run(*step_funcs, until=segment)
+            else:
+                end = sim.meep_time() + segment
+                sim.run(*step_funcs,
+                        until=lambda s: s.meep_time() >= end - 0.25 / s.resolution or stop(s))
+            self.save(sim, monitors, stop)
+        self.wait()
+        wall = time.perf_counter() - start
+        if self.saved:
+            print_master(f"  Wrote {self.saved} checkpoint(s); the timestep loop waited "
+                         f"{self.waited:.1f}s of {wall:.1f}s on checkpoint I/O")
+
+    def clear(self) -> None:
+        """Remove this run's checkpoints (after its results are written)."""
+        self.wait()
+        if RANK == 0:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+
+# =============================================================================
+# Command line
+# =============================================================================
+
+def add_arguments(parser, default_interval: float) -> None:
+    """Add the shared checkpoint flags to a script's argparse parser."""
+    group = parser.add_argument_group("checkpoint / restart")
+    group.add_argument("--checkpoint-interval", type=float, default=default_interval,
+                       help=f"Simulation time between checkpoints; 0 disables "
+                            f"(default: {default_interval})")
+    group.add_argument("--checkpoint-dir", type=str, default=None,
+                       help="Checkpoint directory (default: <output>/checkpoints)")
+    group.add_argument("--restart", action="store_true",
+                       help="Ignore existing checkpoints and run from t = 0")
+    group.add_argument("--keep-checkpoint", action="store_true",
+                       help="Keep the final checkpoint after the results are written")
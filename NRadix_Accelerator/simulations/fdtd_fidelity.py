@@ -0,0 +1,221 @@
+"""
+Multi-fidelity FDTD sweeps: coarse-resolution screening, fine confirmation.
+
+In 2D the cost of a Meep run grows roughly with resolution^3 (resolution^2
+grid cells, and the Courant timestep shrinks with the cell size), so a
+resolution-10 screening run costs about 1/8 of a production run at 20.
+screen_and_confirm():
+
+  1. runs every candidate at screen_resolution
+  2. keeps the top_k by the objective
+  3. re-runs those, plus calibration_points others spread over the rest
+     of the screening ranking (worst first), at the production resolution
+  4. reports how well the two fidelities agree (Spearman rank and Pearson
+     correlation over every point run at both) so the shortcut can be
+     judged: a rank correlation near 1 means the screen orders designs
+     the way the production run would
+
+The calibration points matter: correlation over the top-k alone is taken
+over a narrow range of good designs and understates agreement.
+
+Both passes go through fdtd_sweep.run_sweep(), so they run in parallel,
+share one checkpoint (points differ by resolution) and hit the FDTD cache.
+
+Usage:
+
+    report = screen_and_confirm(
+        run_coupler_simulation,
+        [dict(gap=g, coupling_length=L) for g in gaps for L in lengths],
+        objective=lambda r: r["split_error_percent"],
+        fixed={"wavelength": 1.55}, screen_resolution=10, resolution=20, top_k=5)
+    best = report.best_result
+"""
+
+import csv
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+import fdtd_sweep
+
+
+# =============================================================================
+# Screening and confirmation
+# =============================================================================
+
+@dataclass
+class FidelityReport:
+    """Outcome of a screened sweep."""
+    candidates: list[dict]
+    screen_resolution: int
+    resolution: int
+    screen_results: list            # per candidate (None if the run failed)
+    screen_values: np.ndarray       # objective per candidate (inf if failed)
+    confirmed: list[int]            # candidate indices re-run at resolution
+    top_k: list[int]                # the screening top-k among them
+    fine_results: dict              # candidate index -> production result
+    fine_values: dict               # candidate index -> production objective
+
+    @property
+    def best_index(self) -> int | None:
+        """Best candidate by the production runs of the top-k (None if every run failed)."""
+        return min(self.top_k, key=lambda i: self.fine_values.get(i, np.inf), default=None)
+
+    @property
+    def best_result(self):
+        return self.fine_results.get(self.best_index)
+
+    @property
+    def paired(self) -> tuple[np.ndarray, np.ndarray]:
+        """(screen, production) objective of every point run at both."""
+        idx = [i for i in self.confirmed
+               if np.isfinite(self.screen_values[i]) and np.isfinite(self.fine_values.get(i, np.inf))]
+        return (np.array([self.screen_values[i] for i in idx]),
+                np.array([self.fine_values[i] for i in idx]))
+
+    @property
+    def pearson(self) -> float:
+        a, b = self.paired
+        if len(a) < 3 or np.std(a) == 0 or np.std(b) == 0:
+            return float("nan")
+        return float(np.corrcoef(a, b)[0, 1])
+
+    @property
+    def spearman(self) -> float:
+        a, b = self.paired
+        if len(a) < 3:
+            return float("nan")
+        ra = np.argsort(np.argsort(a)).astype(float)
+        rb = np.argsort(np.argsort(b)).astype(float)
+        return float(np.corrcoef(ra, rb)[0, 1])
+
+    @property
+    def relative_cost(self) -> float:
+        """Cost of this sweep relative to running every candidate at resolution."""
+        ratio = (self.screen_resolution / self.resolution) ** 3
+        return (len(self.candidates) * ratio + len(self.confirmed)) / len(self.candidates)
+
+
+def _calibration_indices(order: list[int], top_k: int, n: int) -> list[int]:
+    """
+    n candidates spread evenly over the screening ranking below the top-k,
+    always including the worst-ranked one.
+    """
+    rest = order[top_k:]
+    if n <= 0 or not rest:
+        return []
+    picks = np.linspace(len(rest) - 1, 0, min(n, len(rest))).round().astype(int)
+    return [rest[p] for p in sorted(set(picks))]
+
+
+def screen_and_confirm(
+    func: Callable[..., dict],
+    candidates: list[dict],
+    objective: Callable[[dict], float],
+    fixed: dict | None = None,
+    screen_resolution: int = 10,
+    resolution: int = 20,
+    top_k: int = 5,
+    calibration_points: int = 3,
+    sweep: fdtd_sweep.SweepOptions | None = None,
+    verbose: bool = True,
+) -> FidelityReport:
+    """
+    Screen every candidate at screen_resolution, confirm the top_k at resolution.
+
+    Args:
+        func: Module-level simulation function taking a `resolution` keyword
+        candidates: Design keyword arguments, one dict per candidate
+        objective: Result -> value to minimize
+        fixed: Keyword arguments shared by every run
+        screen_resolution: Resolution of the screening pass
+        resolution: Production resolution
+        top_k: Candidates confirmed at production resolution
+        calibration_points: Extra lower-ranked candidates confirmed so the
+            fidelity correlation spans the whole ranking
+        sweep: Scheduling / checkpoint options for both passes
+    """
+    fixed = fixed or {}
+    if verbose:
+        print(f"\n  Screening {len(candidates)} candidate(s) at resolution {screen_resolution}")
+    screen_results = fdtd_sweep.run_sweep(
+        func, [{**fixed, **c, "resolution": screen_resolution} for c in candidates],
+        sweep, verbose=verbose)
+    screen_values = np.array([objective(r) if r is not None else np.inf for r in screen_results])
+
+    order = [int(i) for i in np.argsort(screen_values, kind="stable")
+             if np.isfinite(screen_values[i])]
+    top = order[:top_k]
+    confirmed = top + _calibration_indices(order, top_k, calibration_points)
+
+    if verbose:
+        print(f"\n  Confirming top {len(top)} + {len(confirmed) - len(top)} calibration "
+              f"candidate(s) at resolution {resolution}")
+    fine = fdtd_sweep.run_sweep(
+        func, [{**fixed, **candidates[i], "resolution": resolution} for i in confirmed],
+        sweep, verbose=verbose)
+    fine_results = {i: r for i, r in zip(confirmed, fine) if r is not None}
+    fine_values = {i: objective(r) for i, r in fine_results.items()}
+
+    report = FidelityReport(
+        candidates=candidates, screen_resolution=screen_resolution, resolution=resolution,
+        screen_results=screen_results, screen_values=screen_values,
+        confirmed=confirmed, top_k=top, fine_results=fine_results, fine_values=fine_values,
+    )
+    if verbose:
+        print_report(report)
+    return report
+
+
+def print_report(report: FidelityReport) -> None:
+    print(f"\n  Multi-fidelity: {len(report.candidates)} screened at res "
+          f"{report.screen_resolution}, {len(report.confirmed)} confirmed at res {report.resolution}")
+    print(f"    {'Candidate':<40} {'Screen':>10} {'Production':>12}")
+    for i in report.confirmed:
+        label = ", ".join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                          for k, v in report.candidates[i].items())
+        tag = "" if i in report.top_k else "  (calibration)"
+        print(f"    {label:<40} {report.screen_values[i]:>10.4g} "
+              f"{report.fine_values.get(i, np.nan):>12.4g}{tag}")
+    print(f"    Fidelity correlation: Spearman {report.spearman:.3f}, Pearson {report.pearson:.3f}")
+    print(f"    Cost: {report.relative_cost:.0%} of running every candidate at res "
+          f"{report.resolution} (cost ~ resolution^3)")
+
+
+def save_report(report: FidelityReport, path: str) -> None:
+    """Per-candidate screening and production objective as CSV."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    names = list(report.candidates[0]) if report.candidates else []
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names + [f"Screen (res {report.screen_resolution})",
+                                 f"Production (res {report.resolution})", "Role"])
+        for i, cand in enumerate(report.candidates):
+            role = ("top_k" if i in report.top_k else
+                    "calibration" if i in report.confirmed else "screened")
+            fine = report.fine_values.get(i, "")
+            writer.writerow([cand[n] for n in names] + [report.screen_values[i], fine, role])
+        writer.writerow([])
+        writer.writerow(["spearman", report.spearman])
+        writer.writerow(["pearson", report.pearson])
+        writer.writerow(["relative_cost", report.relative_cost])
+    print(f"Saved: {path}")
+
+
+# =============================================================================
+# Command line
+# =============================================================================
+
+def add_arguments(parser) -> None:
+    """Add the shared multi-fidelity flags to a script's argparse parser."""
+    group = parser.add_argument_group("multi-fidelity screening")
+    group.add_argument("--screen-resolution", type=int, default=None,
+                       help="Screen every sweep point at this resolution, then confirm "
+                            "the --top-k at production resolution (default: off)")
+    group.add_argument("--top-k", type=int, default=5,
+                       help="Screened points confirmed at production resolution (default: 5)")
+    group.add_argument("--calibration-points", type=int, default=3,
+                       help="Lower-ranked points also confirmed, for the fidelity "
+                            "correlation (default: 3)")
@@ -0,0 +1,180 @@
+"""
+Adaptive design search for FDTD device sweeps (successive grid refinement).
+
+A fixed design grid spends most of its FDTD runs far from the optimum: the
+directional coupler's 5x5 gap/length sweep, for instance, needs only the
+few points near the 50/50 contour. refine_search() instead:
+
+  1. runs a coarse grid (points_per_axis per axis) over the design box
+  2. stops as soon as the best point meets the objective tolerance
+  3. otherwise shrinks the box around the best point and grids it again,
+     skipping points already run, until the tolerance is met, the box
+     reaches each axis's resolution, or the round/run budget is spent
+
+Each round is one fdtd_sweep.run_sweep() call, so its points run in
+parallel under the core budget, land in the sweep checkpoint (an
+interrupted search resumes with --resume) and hit the FDTD result cache. Coordinates are
+snapped to each axis's resolution so revisited points are recognized.
+
+Usage:
+
+    axes = [Axis("gap", 0.2, 0.3, 0.005), Axis("coupling_length", 6.0, 10.0, 0.1)]
+    best = refine_search(run_coupler_simulation, axes,
+                         objective=lambda r: r["split_error_percent"],
+                         fixed={"wavelength": 1.55, "resolution": 20},
+                         tolerance=1.0)
+"""
+
+import math
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable
+
+import numpy as np
+
+import fdtd_sweep
+
+
+# =============================================================================
+# Successive grid refinement
+# =============================================================================
+
+@dataclass(frozen=True)
+class Axis:
+    """One design parameter: keyword name, search bounds and resolution."""
+    name: str
+    low: float
+    high: float
+    resolution: float               # smallest step worth resolving
+
+    def snap(self, value: float) -> float:
+        steps = round((value - self.low) / self.resolution)
+        return round(min(max(self.low + steps * self.resolution, self.low), self.high), 9)
+
+
+@dataclass
+class RefinementResult:
+    """Outcome of an adaptive search."""
+    best_params: dict
+    best_value: float
+    best_result: object
+    converged: bool                 # best_value met the tolerance
+    rounds: int
+    evaluations: list[tuple[dict, float]] = field(default_factory=list)
+
+    @property
+    def n_evaluations(self) -> int:
+        return len(self.evaluations)
+
+
+def _grid(axes: list[Axis], centre: dict, half_width: dict, n: int) -> list[dict]:
+    values = []
+    for axis in axes:
+        lo = max(axis.low, centre[axis.name] - half_width[axis.name])
+        hi = min(axis.high, centre[axis.name] + half_width[axis.name])
+        values.append(sorted({axis.snap(v) for v in np.linspace(lo, hi, n)}))
+    return [dict(zip((a.name for a in axes), combo)) for combo in product(*values)]
+
+
+def _key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def refine_search(
+    func: Callable[..., dict],
+    axes: list[Axis],
+    objective: Callable[[dict], float],
+    fixed: dict | None = None,
+    tolerance: float | None = None,
+    points_per_axis: int = 3,
+    shrink: float = 0.5,
+    max_rounds: int = 8,
+    max_evaluations: int | None = None,
+    sweep: fdtd_sweep.SweepOptions | None = None,
+    verbose: bool = True,
+) -> RefinementResult:
+    """
+    Minimize objective(func(**fixed, **params)) over the axes' box.
+
+    Args:
+        func: Module-level simulation function (run through fdtd_sweep)
+        axes: Design parameters searched
+        objective: Result -> value to minimize (e.g. split error in percent)
+        fixed: Keyword arguments shared by every run
+        tolerance: Stop once the best value is at or below this
+        points_per_axis: Grid points per axis in every round (odd keeps the
+            current best on the grid)
+        shrink: Box half-width multiplier between rounds
+        max_rounds: Refinement rounds, including the coarse one
+        max_evaluations: Run budget, checked between rounds
+        sweep: Scheduling / checkpoint options for each round
+
+    Returns:
+        RefinementResult with the best point found and every evaluation
+    """
+    fixed = fixed or {}
+    centre = {a.name: (a.low + a.high) / 2 for a in axes}
+    half_width = {a.name: (a.high - a.low) / 2 for a in axes}
+    seen: dict[tuple, float] = {}
+    evaluations = []
+    best_params, best_value, best_result = None, math.inf, None
+    converged = False
+    rounds = 0
+
+    while rounds < max_rounds:
+        candidates = [p for p in _grid(axes, centre, half_width, points_per_axis)
+                      if _key(p) not in seen]
+        if not candidates:
+            break           # the box is down to the axes' resolution
+        if max_evaluations is not None and evaluations and \
+                len(evaluations) + len(candidates) > max_evaluations:
+            break
+        rounds += 1
+        if verbose:
+            box = ", ".join(f"{a.name}={centre[a.name]:g}+/-{half_width[a.name]:.3g}" for a in axes)
+            print(f"\n  Refinement round {rounds}: {len(candidates)} new point(s) around {box}")
+
+        results = fdtd_sweep.run_sweep(func, [{**fixed, **p} for p in candidates], sweep,
+                                       verbose=verbose)
+        for params, result in zip(candidates, results):
+            value = objective(result) if result is not None else math.inf
+            seen[_key(params)] = value
+            evaluations.append((params, value))
+            if value < best_value:
+                best_params, best_value, best_result = params, value, result
+
+        if verbose and best_params is not None:
+            print(f"  Best so far: {best_params} -> {best_value:.4g}")
+        if best_params is None:
+            break
+        if tolerance is not None and best_value <= tolerance:
+            converged = True
+            break
+
+        centre = dict(best_params)
+        half_width = {a.name: max(half_width[a.name] * shrink, a.resolution) for a in axes}
+
+    if verbose:
+        full = math.prod(int(round((a.high - a.low) / a.resolution)) + 1 for a in axes)
+        status = "converged" if converged else "stopped"
+        print(f"\n  Adaptive search {status} after {len(evaluations)} run(s) in {rounds} round(s) "
+              f"(a full grid at the same resolution is {full} runs)")
+    return RefinementResult(best_params=best_params or {}, best_value=best_value,
+                            best_result=best_result, converged=converged, rounds=rounds,
+                            evaluations=evaluations)
+
+
+# =============================================================================
+# Command line
+# =============================================================================
+
+def add_arguments(parser, default_tolerance: float,
+                  tolerance_help: str = "Stop once the objective is at or below this") -> None:
+    """Add the shared adaptive search flags to a script's argparse parser."""
+    group = parser.add_argument_group("adaptive search")
+    group.add_argument("--tolerance", type=float, default=default_tolerance,
+                       help=f"{tolerance_help} (default: {default_tolerance})")
+    group.add_argument("--max-rounds", type=int, default=8,
+                       help="Refinement rounds, including the coarse grid (default: 8)")
+    group.add_argument("--max-evaluations", type=int, default=None,
+                       help="FDTD run budget for the search (default: unlimited)")
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Parallel launch for the FDTD scripts: MPI ranks, OpenMP threads, chunks.
+
+Every FDTD script used to carry its own RANK/print_master block and leave
+OMP_NUM_THREADS to the caller. This module is the one place that:
+
+  - detects the parallelism available: mpi4py ranks (and how many share
+    this node), the cores this process may use, OpenMP threads per rank
+  - sets OMP_NUM_THREADS to the node's cores divided by its ranks when the
+    caller has not set it, before Meep (and its OpenMP runtime) loads
+  - picks the chunk decomposition for each mp.Simulation from its cell:
+    one chunk per rank, split by cost so the PML-heavy edges of the cell
+    do not leave ranks idle, with a warning when the cell is too small
+    for the rank count to pay off
+  - times every sim.run() and records timesteps/s, grid-cell updates/s
+    and scaling efficiency against the smallest-worker run of the same
+    cell, in a JSONL log
+
+Scripts import RANK, SIZE, IS_PARALLEL and print_master from here. Any
+script runs under the launcher unchanged:
+
+    python fdtd_parallel.py wdm_81x81_array_test.py
+    python fdtd_parallel.py --threads 6 wdm_27x27_array_test.py
+    mpirun -np 4 python fdtd_parallel.py wdm_243x243_array_test.py
+    python fdtd_parallel.py --info          # what would be used here
+    python fdtd_parallel.py --report        # throughput / efficiency log
+
+Scaling efficiency needs a baseline: run a script once with --threads 1 (or
+any smaller configuration) and later runs of the same cell are compared
+against it. Meep must be built with MPI for mpirun to split a cell; an
+MPI-less build under mpirun would run the whole cell on every rank, which
+the launcher reports instead of silently wasting the ranks.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    from mpi4py import MPI
+    RANK = MPI.COMM_WORLD.Get_rank()
+    SIZE = MPI.COMM_WORLD.Get_size()
+except (ImportError, RuntimeError, OSError):
+    MPI = None
+    RANK = 0
+    SIZE = 1
+IS_PARALLEL = SIZE > 1
+
+PERF_LOG_ENV = "NRADIX_FDTD_PERF_LOG"
+DEFAULT_PERF_LOG = Path.home() / ".cache" / "nradix" / "fdtd_perf.jsonl"
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MEEP_NUM_THREADS")
+
+# Below this many grid cells per chunk (a 64x64 2D tile) the halo exchange
+# between ranks costs about as much as the chunk's own update
+MIN_CHUNK_CELLS = 64 * 64
+
+
+def print_master(msg):
+    """Only print from rank 0."""
+    if RANK == 0:
+        print(msg)
+        sys.stdout.flush()
+
+
+# =============================================================================
+# Detection
+# =============================================================================
+
+def available_cores() -> int:
+    """Cores this process may run on (affinity mask when available)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def local_ranks() -> int:
+    """MPI ranks sharing this node (collective: every rank must call it)."""
+    if MPI is None or SIZE == 1:
+        return 1
+    return MPI.COMM_WORLD.Split_type(MPI.COMM_TYPE_SHARED).Get_size()
+
+
+def meep_has_mpi() -> bool | None:
+    """Whether the installed Meep was built with MPI (None without Meep)."""
+    try:
+        import meep as mp
+    except ImportError:
+        return None
+    return bool(mp.with_mpi())
+
+
+@dataclass(frozen=True)
+class Parallelism:
+    """Ranks, threads and cores one FDTD run uses."""
+    ranks: int
+    local_ranks: int
+    threads: int                    # OpenMP threads per rank
+    cores: int                      # cores visible on this node
+
+    @property
+    def workers(self) -> int:
+        return self.ranks * self.threads
+
+    def __str__(self) -> str:
+        return (f"{self.ranks} MPI rank(s) x {self.threads} OpenMP thread(s) "
+                f"on {self.cores} core(s)")
+
+
+def detect(threads: int | None = None) -> Parallelism:
+    """
+    The parallelism available to this run.
+
+    threads: OpenMP threads per rank; defaults to OMP_NUM_THREADS, then to
+    this node's cores divided among its ranks.
+    """
+    cores = available_cores()
+    ranks_here = local_ranks()
+    if threads is None and os.environ.get("OMP_NUM_THREADS", "").isdigit():
+        threads = int(os.environ["OMP_NUM_THREADS"])
+    if threads is None:
+        threads = cores // ranks_here
+    return Parallelism(ranks=SIZE, local_ranks=ranks_here, threads=max(1, threads), cores=cores)
+
+
+def configure_threads(parallelism: Parallelism) -> None:
+    """
+    Export the OpenMP thread count. The OpenMP runtime reads it when Meep
+    loads, so this must run before the first `import meep`.
+    """
+    if "meep" in sys.modules:
+        print_master("  Warning: Meep already imported; the OpenMP thread count "
+                     "it started with is kept")
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(parallelism.threads)
+
+
+# =============================================================================
+# Chunk decomposition
+# =============================================================================
+
+def grid_cells(cell_size, resolution: float) -> int:
+    """Grid cells in a cell of the given size (zero-size dimensions count once)."""
+    dims = (cell_size.x, cell_size.y, cell_size.z) if hasattr(cell_size, "x") else cell_size
+    return math.prod(max(1, round(d * resolution)) for d in dims)
+
+
+@dataclass(frozen=True)
+class Decomposition:
+    """How one cell is split into Meep chunks."""
+    num_chunks: int
+    split_chunks_evenly: bool
+    cells: int
+
+    @property
+    def cells_per_chunk(self) -> int:
+        return self.cells // self.num_chunks
+
+
+def choose_chunks(cell_size, resolution: float, ranks: int = SIZE) -> Decomposition:
+    """
+    One chunk per rank. With several ranks the split follows Meep's cost
+    estimate rather than equal volumes: the scripts' cells are bounded by
+    PML on every side, and PML cells cost several times an interior cell.
+    A single rank keeps one chunk, which its OpenMP threads share.
+    """
+    cells = grid_cells(cell_size, resolution)
+    decomposition = Decomposition(num_chunks=max(1, ranks), split_chunks_evenly=ranks <= 1,
+                                  cells=cells)
+    if ranks > 1 and decomposition.cells_per_chunk < MIN_CHUNK_CELLS:
+        useful = max(1, cells // MIN_CHUNK_CELLS)
+        print_master(f"  Warning: {cells:,} grid cells over {ranks} ranks is "
+                     f"{decomposition.cells_per_chunk:,} per chunk; halo exchange dominates "
+                     f"below {MIN_CHUNK_CELLS:,}. Fewer ranks (<= {useful}) with more "
+                     f"OpenMP threads each will be faster.")
+    return decomposition
+
+
+# =============================================================================
+# Throughput log
+# =============================================================================
+
+def perf_log_path() -> Path:
+    return Path(os.environ.get(PERF_LOG_ENV) or DEFAULT_PERF_LOG)
+
+
+def load_records(path: Path | None = None) -> list[dict]:
+    path = path or perf_log_path()
+    if not path.exists():
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue        # torn last line from an interrupted run
+    return records
+
+
+def _run_key(record: dict) -> tuple:
+    return (record["script"], tuple(record["cell_size"]), record["resolution"])
+
+
+def scaling_efficiency(record: dict, records: list[dict]) -> tuple[float, dict] | None:
+    """
+    Efficiency of a run against the fewest-worker run of the same script and
+    cell: (baseline rate per worker) vs (this rate per worker). None when
+    there is no smaller baseline to compare with.
+    """
+    same = [r for r in records if _run_key(r) == _run_key(record)]
+    if not same:
+        return None
+    base = min(same, key=lambda r: (r["workers"], -r["steps_per_s"]))
+    if base["workers"] >= record["workers"]:
+        return None
+    per_worker = record["steps_per_s"] / record["workers"]
+    return per_worker / (base["steps_per_s"] / base["workers"]), base
+
+
+def record_run(record: dict, path: Path | None = None) -> None:
+    path = path or perf_log_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def print_report(path: Path | None = None) -> None:
+    records = load_records(path)
+    if not records:
+        print(f"No FDTD runs recorded in {path or perf_log_path()}")
+        return
+    print(f"\n  {'Script':<30} {'Cells':>12} {'Ranks x thr':>12} {'Steps/s':>10} "
+          f"{'Mcell/s':>9} {'Efficiency':>11}")
+    for record in records:
+        eff = scaling_efficiency(record, records)
+        eff_text = f"{eff[0]:.0%}" if eff else "baseline"
+        print(f"  {record['script']:<30} {record['cells']:>12,} "
+              f"{record['ranks']:>5} x {record['threads']:<4} {record['steps_per_s']:>10.1f} "
+              f"{record['mcells_per_s']:>9.1f} {eff_text:>11}")
+
+
+# =============================================================================
+# Meep instrumentation
+# =============================================================================
+
+def instrument_meep(parallelism: Parallelism, script: str, decompose: bool = True,
+                    log: bool = True) -> None:
+    """
+    Replace mp.Simulation with a subclass that applies choose_chunks() to
+    every cell (unless the script sets num_chunks or chunk_layout itself)
+    and times every run(). Scripts call mp.Simulation(...) through the
+    module, so they pick the subclass up unchanged.
+    """
+    import meep as mp
+
+    if getattr(mp.Simulation, "_launcher_instrumented", False):
+        return
+    if parallelism.ranks > 1 and not mp.with_mpi():
+        print_master(f"  Warning: Meep was built without MPI; each of the {parallelism.ranks} "
+                     f"ranks will run the whole cell. Launch without mpirun and use "
+                     f"--threads instead.")
+
+    class Simulation(mp.Simulation):
+        _launcher_instrumented = True
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._decomposition = choose_chunks(self.cell_size, self.resolution,
+                                                parallelism.ranks)
+            if decompose and "num_chunks" not in kwargs and "chunk_layout" not in kwargs:
+                self.num_chunks = self._decomposition.num_chunks
+                self.split_chunks_evenly = self._decomposition.split_chunks_evenly
+
+        def run(self, *step_funcs, **kwargs):
+            start_step = self.fields.t if self.fields is not None else 0
+            start = time.perf_counter()
+            super().run(*step_funcs, **kwargs)
+            wall = time.perf_counter() - start
+            steps = self.fields.t - start_step
+            if RANK == 0 and steps > 0 and wall > 0:
+                _report_run(self, parallelism, script, steps, wall, log)
+
+    mp.Simulation = Simulation
+
+
+def _report_run(sim, parallelism: Parallelism, script: str, steps: int, wall: float,
+                log: bool) -> None:
+    cells = sim._decomposition.cells
+    record = {
+        "script": script,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cell_size": [sim.cell_size.x, sim.cell_size.y, sim.cell_size.z],
+        "resolution": sim.resolution,
+        "cells": cells,
+        "num_chunks": sim.num_chunks,
+        **{k: v for k, v in asdict(parallelism).items() if k in ("ranks", "threads", "cores")},
+        "workers": parallelism.workers,
+        "timesteps": steps,
+        "wall_s": wall,
+        "steps_per_s": steps / wall,
+        "mcells_per_s": cells * steps / wall / 1e6,
+    }
+    records = load_records() if log else []
+    eff = scaling_efficiency(record, records)
+    print_master(f"  FDTD throughput: {steps:,} timesteps in {wall:.1f}s = "
+                 f"{record['steps_per_s']:.1f} steps/s, {record['mcells_per_s']:.1f} Mcell/s "
+                 f"({parallelism})")
+    if eff:
+        efficiency, base = eff
+        print_master(f"  Scaling efficiency: {efficiency:.0%} vs {base['ranks']} x "
+                     f"{base['threads']} baseline ({base['steps_per_s']:.1f} steps/s)")
+    else:
+        print_master("  Scaling efficiency: no smaller run of this cell on record "
+                     "(run once with --threads 1 for a baseline)")
+    if log:
+        record_run(record)
+
+
+# =============================================================================
+# Launcher
+# =============================================================================
+
+def launch(script: str, script_args: list[str], threads: int | None = None,
+           decompose: bool = True, log: bool = True) -> None:
+    """Run a simulation script as __main__ under the detected parallelism."""
+    parallelism = detect(threads)
+    configure_threads(parallelism)
+    print_master(f"FDTD launch: {os.path.basename(script)} with {parallelism}")
+    try:
+        instrument_meep(parallelism, os.path.basename(script), decompose, log)
+    except ImportError:
+        print_master("  Warning: Meep not importable; running without instrumentation")
+
+    script = os.path.abspath(script)
+    sys.argv = [script] + script_args
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name="__main__")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run an FDTD script with detected MPI/OpenMP parallelism, automatic "
+                    "chunk decomposition and throughput logging")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="OpenMP threads per rank (default: OMP_NUM_THREADS, else "
+                             "node cores / ranks on the node)")
+    parser.add_argument("--no-decompose", action="store_true",
+                        help="Leave Meep's default chunk decomposition")
+    parser.add_argument("--no-log", action="store_true",
+                        help=f"Do not append runs to the throughput log "
+                             f"(${PERF_LOG_ENV}, default {DEFAULT_PERF_LOG})")
+    parser.add_argument("--info", action="store_true",
+                        help="Print the detected parallelism and exit")
+    parser.add_argument("--report", action="store_true",
+                        help="Print the throughput / scaling-efficiency log and exit")
+    parser.add_argument("script", nargs="?", help="Simulation script to run")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER,
+                        help="Arguments passed to the script")
+    args = parser.parse_args()
+
+    if args.report:
+        if RANK == 0:
+            print_report()
+        return
+    if args.info:
+        parallelism = detect(args.threads)
+        with_mpi = meep_has_mpi()
+        print_master(f"Detected: {parallelism}")
+        print_master(f"  mpi4py: {'yes' if MPI is not None else 'no'}, "
+                     f"ranks on this node: {parallelism.local_ranks}")
+        print_master(f"  Meep: {'not installed' if with_mpi is None else 'MPI build' if with_mpi else 'serial build (OpenMP only)'}")
+        return
+    if not args.script:
+        parser.error("a script to run is required (or --info / --report)")
+
+    launch(args.script, args.script_args, threads=args.threads,
+           decompose=not args.no_decompose, log=not args.no_log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Shared stop condition for pulsed FDTD runs: energy decay, capped by time.
+
+A fixed until=RUN_TIME has to be long enough for the slowest case, so most
+runs spend their last stretch stepping fields that have already left the
+device and are only being absorbed by the PML. DecayStop ends a run once
+the field energy in the monitor region(s) has fallen to decay_by of its
+peak, and never later than the fixed time it replaces:
+
+  - the energy is sum(sim.field_energy_in_box(region)) over the regions
+    the results are measured in (the flux monitors), checked every
+    check_every time units, so a pulse that is still arriving at a far
+    monitor keeps the run going
+  - min_time (e.g. the group delay across the device) guards against an
+    early scattered bump decaying before the main pulse arrives
+  - cap is the old fixed run time; a run that has not decayed by then
+    stops exactly where it used to
+
+run_until_decayed() runs the simulation and prints which condition fired,
+the simulation time saved against the cap and the estimated wall time
+saved; the StopReport it returns carries the same numbers.
+
+Usage:
+
+    stop = DecayStop([mp.Volume(center=..., size=...), ...], cap=RUN_TIME,
+                     min_time=transit_time)
+    report = run_until_decayed(sim, stop, step_funcs=[mp.at_every(10, progress)])
+
+    # pulses measured after the sources turn off:
+    stop = DecayStop(regions, cap=200, after_sources=True)
+
+Only pulsed (GaussianSource) runs can decay; continuous-source and
+time-trace recordings keep their fixed durations.
+"""
+
+import time
+from dataclasses import dataclass
+
+from fdtd_parallel import print_master
+
+DEFAULT_DECAY_BY = 1e-3
+DEFAULT_CHECK_EVERY = 20.0
+
+
+# =============================================================================
+# Stop condition
+# =============================================================================
+
+@dataclass
+class StopReport:
+    """How one run ended."""
+    reason: str                     # "decay" or "cap"
+    run_time: float                 # simulation time run (from the origin)
+    cap: float
+    wall_s: float
+
+    @property
+    def saved_time(self) -> float:
+        return max(0.0, self.cap - self.run_time)
+
+    @property
+    def saved_fraction(self) -> float:
+        return self.saved_time / self.cap if self.cap else 0.0
+
+    @property
+    def wall_saved_s(self) -> float:
+        """Wall time the rest of the cap would have taken at this run's pace."""
+        return self.wall_s * self.saved_time / self.run_time if self.run_time else 0.0
+
+
+class DecayStop:
+    """
+    Meep stop condition: energy in the regions below decay_by x its peak,
+    or the time cap, whichever comes first. Pass the instance as `until`
+    (or `until_after_sources` with after_sources=True).
+    """
+
+    def __init__(self, regions, cap: float, decay_by: float = DEFAULT_DECAY_BY,
+                 check_every: float = DEFAULT_CHECK_EVERY, min_time: float = 0.0,
+                 after_sources: bool = False):
+        """
+        Args:
+            regions: Volumes / FluxRegions (anything with center and size)
+                whose field energy is tracked
+            cap: Longest run, in time units from the origin
+            decay_by: Stop once the energy is below this fraction of its peak
+            check_every: Time between energy checks
+            min_time: Never stop on decay before this time from the origin
+            after_sources: Measure cap and min_time from when the sources
+                turn off (for until_after_sources runs) instead of from
+                the start of the run
+        """
+        self.regions = list(regions)
+        self.cap = cap
+        self.decay_by = decay_by
+        self.check_every = check_every
+        self.min_time = min_time
+        self.after_sources = after_sources
+        self._origin = None
+        self._next_check = 0.0
+        self.peak = 0.0
+        self.energy = 0.0
+        self.reason = None
+
+    def describe(self) -> dict:
+        """The condition as plain data, for fdtd_cache specs."""
+        return {"stop": "energy_decay", "decay_by": self.decay_by, "cap": self.cap,
+                "check_every": self.check_every, "min_time": self.min_time,
+                "after_sources": self.after_sources, "regions": self.regions}
+
+    def region_energy(self, sim) -> float:
+        return sum(sim.field_energy_in_box(center=r.center, size=r.size) for r in self.regions)
+
+    def elapsed(self, sim) -> float:
+        return sim.meep_time() - (self._origin or 0.0)
+
+    def __call__(self, sim) -> bool:
+        if self._origin is None:
+            self._origin = sim.fields.last_source_time() if self.after_sources else sim.meep_time()
+        if self.reason is not None:
+            return True
+        t = self.elapsed(sim)
+        if t >= self.cap:
+            self.reason = "cap"
+            return True
+        if t < self._next_check:
+            return False
+        self._next_check = t + self.check_every
+
+        self.energy = self.region_energy(sim)
+        self.peak = max(self.peak, self.energy)
+        if t >= self.min_time and self.peak > 0 and self.energy <= self.decay_by * self.peak:
+            self.reason = "decay"
+            return True
+        return False
+
+    # Checkpointed runs (fdtd_checkpoint) carry the decay history across a restart
+    def state(self) -> dict:
+        return {"origin": self._origin, "next_check": self._next_check, "peak": self.peak,
+                "energy": self.energy, "reason": self.reason}
+
+    def load_state(self, state: dict) -> None:
+        self._origin = state["origin"]
+        self._next_check = state["next_check"]
+        self.peak = state["peak"]
+        self.energy = state["energy"]
+        self.reason = state["reason"]
+
+    def report(self, sim, wall_s: float, label: str = "") -> StopReport:
+        """Summarize and print how the run ended."""
+        result = StopReport(reason=self.reason or "cap", run_time=self.elapsed(sim),
+                            cap=self.cap, wall_s=wall_s)
+        prefix = f"  Stop ({label})" if label else "  Stop"
+        origin = " after sources" if self.after_sources else ""
+        if result.reason == "decay":
+            print_master(f"{prefix}: monitor energy fell to {self.decay_by:g} of peak at "
+                         f"t = {result.run_time:.1f}{origin} (cap {self.cap:g}); saved "
+                         f"{result.saved_time:.1f} time units ({result.saved_fraction:.0%}), "
+                         f"~{result.wall_saved_s:.0f}s wall")
+        else:
+            ratio = self.energy / self.peak if self.peak else float("nan")
+            print_master(f"{prefix}: reached the cap t = {self.cap:g}{origin} before decaying "
+                         f"(energy at {ratio:.2g} of peak); no time saved")
+        return result
+
+
+def run_until_decayed(sim, stop: DecayStop, step_funcs=(), label: str = "") -> StopReport:
+    """sim.run() with the decay condition; prints and returns the StopReport."""
+    start = time.perf_counter()
+    if stop.after_sources:
+        sim.run(*step_funcs, until_after_sources=stop)
+    else:
+        sim.run(*step_funcs, until=stop)
+    return stop.report(sim, time.perf_counter() - start, label)
@@ -0,0 +1,453 @@
+"""
+Parallel scheduler for FDTD parameter sweeps.
+
+Each sweep point is one independent Meep run. Meep's OpenMP scaling flattens
+out after a few threads on these small 2D cells, so a sweep finishes soonest
+when the machine's cores are split into several concurrent jobs with a few
+threads each (e.g. 4 jobs x 3 threads on 12 cores) rather than one job with
+every thread. This is the packing ioc_6lane_integration_test.py --parallel
+does by hand for its six triplets, generalized to any point list:
+
+  - plan_cores() splits a core budget into jobs x OMP threads per job
+  - run_sweep() fans the points out over a process pool, streams each
+    result as it completes, retries points that raised, and appends every
+    finished point to a JSONL checkpoint so an interrupted sweep can be
+    resumed (resume=True / --resume) where it stopped
+  - finish() removes the checkpoint once the whole sweep has succeeded
+
+A checkpoint starts with a header fingerprinting the code it ran: the
+simulation function and the source of its module and of the shared fdtd_*
+helpers. A resume whose fingerprint differs is refused, so a sweep re-run
+after a change to the geometry, sources or stop condition never picks up
+results of the old code. Rounds of one sweep in the same process (adaptive
+search, multi-fidelity passes) share its checkpoint and append to it.
+
+Workers are spawned, not forked: OMP_NUM_THREADS is read when the OpenMP
+runtime starts, and the parent has usually imported Meep already.
+
+Usage in a simulation script:
+
+    import fdtd_sweep
+
+    points = [dict(wavelength=1.55, gap=g, resolution=20) for g in gaps]
+    results = fdtd_sweep.run_sweep(run_coupler_simulation, points, options)
+    ...
+    fdtd_sweep.finish(options)      # after the results are saved
+
+Under mpirun every rank already shares one simulation, so sweeps run serially
+in-process there.
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import math
+import multiprocessing
+import os
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from fdtd_cache import canonical
+from fdtd_parallel import RANK as _RANK, SIZE as _MPI_SIZE, THREAD_ENV_VARS, available_cores
+
+# Threads beyond this per Meep job buy little on the sweep cell sizes
+MAX_EFFICIENT_THREADS = 4
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Checkpoints this process has started writing, and those with failed points
+_STARTED: set[str] = set()
+_FAILED: set[str] = set()
+
+
+# =============================================================================
+# Core budgeting
+# =============================================================================
+
+@dataclass(frozen=True)
+class CorePlan:
+    """Concurrent jobs and OpenMP threads per job for one sweep."""
+    jobs: int
+    threads_per_job: int
+    cores: int
+
+    def __str__(self) -> str:
+        return f"{self.jobs} job(s) x {self.threads_per_job} thread(s) on {self.cores} cores"
+
+
+def plan_cores(
+    n_points: int,
+    cores: int | None = None,
+    jobs: int | None = None,
+    threads_per_job: int | None = None,
+) -> CorePlan:
+    """
+    Split a core budget into concurrent jobs x OMP threads per job.
+
+    With nothing fixed, each job gets the fewest threads that still keep
+    every core busy, capped at MAX_EFFICIENT_THREADS; spare points then
+    become extra concurrent jobs. Fixing jobs or threads_per_job derives the
+    other from the budget. jobs * threads_per_job never exceeds cores, and
+    there are never more jobs than points.
+    """
+    cores = max(1, cores or available_cores())
+    n_points = max(1, n_points)
+    if jobs is None and threads_per_job is None:
+        threads_per_job = min(MAX_EFFICIENT_THREADS, max(1, math.ceil(cores / n_points)))
+    if jobs is None:
+        threads_per_job = max(1, min(threads_per_job, cores))
+        jobs = cores // threads_per_job
+    jobs = max(1, min(jobs, n_points, cores))
+    if threads_per_job is None:
+        threads_per_job = max(1, cores // jobs)
+    else:
+        threads_per_job = max(1, min(threads_per_job, cores // jobs))
+    return CorePlan(jobs=jobs, threads_per_job=threads_per_job, cores=cores)
+
+
+# =============================================================================
+# Checkpoint
+# =============================================================================
+
+def _encode(obj):
+    """
+    Result value -> JSON data. Arrays keep their dtype and shape, and
+    tuples, complex and non-finite floats are tagged so _decode restores
+    them; dict keys become strings.
+    """
+    if isinstance(obj, np.ndarray):
+        if np.iscomplexobj(obj):
+            return {"__ndarray__": [obj.real.tolist(), obj.imag.tolist()],
+                    "dtype": str(obj.dtype), "complex": True}
+        return {"__ndarray__": obj.tolist(), "dtype": str(obj.dtype)}
+    if isinstance(obj, dict):
+        return {str(k): _encode(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_encode(v) for v in obj]}
+    if isinstance(obj, list):
+        return [_encode(v) for v in obj]
+    if isinstance(obj, (np.integer, np.floating, np.bool_)):
+        return obj.item()
+    if isinstance(obj, complex):
+        return {"__complex__": [obj.real, obj.imag]}
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return {"__float__": repr(obj)}
+    return obj
+
+
+def _decode(obj):
+    if isinstance(obj, list):
+        return [_decode(v) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "__ndarray__" in obj:
+        if obj.get("complex"):
+            re, im = obj["__ndarray__"]
+            return (np.array(re) + 1j * np.array(im)).astype(obj["dtype"])
+        return np.array(obj["__ndarray__"], dtype=obj["dtype"])
+    if "__tuple__" in obj:
+        return tuple(_decode(v) for v in obj["__tuple__"])
+    if "__complex__" in obj:
+        return complex(*obj["__complex__"])
+    if "__float__" in obj:
+        return float(obj["__float__"])
+    return {k: _decode(v) for k, v in obj.items()}
+
+
+def point_key(point: dict) -> str:
+    """Stable identity of a sweep point (its canonical kwargs JSON)."""
+    return json.dumps(canonical(point), sort_keys=True, separators=(",", ":"))
+
+
+def sweep_fingerprint(func: Callable) -> dict:
+    """
+    Identity of the code a sweep runs: the function, and a digest of its
+    module's source plus the shared fdtd_* helpers (stop conditions,
+    sources, caching) it builds on.
+    """
+    digest = hashlib.sha256()
+    try:
+        sources = [inspect.getsourcefile(func)]
+    except TypeError:
+        sources = []
+    sources += sorted(glob.glob(os.path.join(_HERE, "fdtd_*.py")))
+    for path in sources:
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return {"func": f"{func.__module__}.{func.__qualname__}",
+            "source": digest.hexdigest()[:16]}
+
+
+def load_checkpoint(path: str, fingerprint: dict | None = None) -> dict[str, object]:
+    """
+    {point_key: result} of every point completed in a checkpoint file.
+    A line cut short by an interrupted write is dropped.
+
+    With a fingerprint, a checkpoint written by different code (or without
+    a header) raises ValueError instead of being resumed.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    done = {}
+    header = None
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "header" in record:
+                header = record["header"]
+                continue
+            done[record["key"]] = _decode(record["result"])
+    if fingerprint is not None and header != fingerprint:
+        raise ValueError(
+            f"Sweep checkpoint {path} was written by different code "
+            f"({header or 'no fingerprint'}, now {fingerprint}); its results would be stale. "
+            f"Run without --resume to start the sweep over.")
+    return done
+
+
+def _open_checkpoint(path: str, resume: bool, fingerprint: dict):
+    """
+    Open a checkpoint for appending. A new checkpoint starts with the
+    fingerprint header. When resuming, the file is first rewritten with
+    only its complete lines, so a torn last line from an interrupted write
+    cannot swallow the next record.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if not resume or not os.path.exists(path):
+        f = open(path, "w")
+        f.write(json.dumps({"header": fingerprint}) + "\n")
+        f.flush()
+        return f
+    with open(path) as f:
+        lines = [line for line in f if line.endswith("\n") and _parses(line)]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+    return open(path, "a")
+
+
+def _parses(line: str) -> bool:
+    try:
+        json.loads(line)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def _append_checkpoint(f, key: str, point: dict, result) -> None:
+    f.write(json.dumps({"key": key, "point": canonical(point),
+                        "result": _encode(result)}) + "\n")
+    f.flush()
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+@dataclass
+class SweepOptions:
+    """How to schedule a sweep (None = decide from the core budget)."""
+    jobs: int | None = None
+    cores: int | None = None
+    threads_per_job: int | None = None
+    retries: int = 1                   # extra attempts for a point that raised
+    checkpoint: str | None = None      # JSONL file of completed points
+    resume: bool = False               # skip points already in the checkpoint
+
+
+def _describe_point(point: dict) -> str:
+    return ", ".join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                     for k, v in point.items())
+
+
+def _start_pool(plan: CorePlan):
+    """
+    Spawn plan.jobs workers with plan.threads_per_job OpenMP threads each.
+    Workers inherit the environment at spawn time, so the thread variables
+    are set only around pool creation.
+    """
+    saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(plan.threads_per_job)
+    try:
+        return multiprocessing.get_context("spawn").Pool(plan.jobs)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _call_point(task):
+    """Worker body: (index, ok, result or formatted traceback)."""
+    func, index, point = task
+    try:
+        return index, True, func(**point)
+    except Exception:
+        return index, False, traceback.format_exc()
+
+
+def run_sweep(
+    func: Callable[..., object],
+    points: list[dict],
+    options: SweepOptions | None = None,
+    describe: Callable[[dict, object], str] | None = None,
+    verbose: bool = True,
+) -> list:
+    """
+    Evaluate func(**point) for every point, in parallel.
+
+    Args:
+        func: Module-level simulation function (picklable by reference)
+        points: Keyword arguments of each run
+        options: Core budget, retries and checkpoint (default: all cores,
+            one retry, no checkpoint)
+        describe: (point, result) -> short text printed as each point
+            completes (default: the point's kwargs)
+        verbose: Print the plan and one line per completed point
+
+    Returns:
+        Results in the order of points; None for a point that still failed
+        after its retries (its last traceback is printed). Results resumed
+        from a checkpoint round-trip through JSON: arrays, tuples, complex
+        and non-finite floats come back as they were, but dict keys come
+        back as strings.
+    """
+    options = options or SweepOptions()
+    keys = [point_key(p) for p in points]
+    fingerprint = sweep_fingerprint(func)
+    # Later rounds of a sweep this process started continue its checkpoint
+    resume = bool(options.checkpoint) and (options.resume or options.checkpoint in _STARTED)
+    done = load_checkpoint(options.checkpoint, fingerprint) if resume else {}
+    results = [done.get(k) for k in keys]
+    pending = [i for i, k in enumerate(keys) if k not in done]
+    n_resumed = len(points) - len(pending)
+
+    if _MPI_SIZE > 1:
+        plan = CorePlan(jobs=1, threads_per_job=1, cores=_MPI_SIZE)
+    else:
+        plan = plan_cores(len(pending), options.cores, options.jobs, options.threads_per_job)
+
+    if verbose and _RANK == 0:
+        print(f"\n  Sweep: {len(points)} points, {n_resumed} from checkpoint, "
+              f"{len(pending)} to run as {plan}")
+
+    checkpoint = None
+    if options.checkpoint:
+        _STARTED.add(options.checkpoint)
+        if _RANK == 0:
+            checkpoint = _open_checkpoint(options.checkpoint, resume, fingerprint)
+
+    errors = {}
+    n_done = 0
+    t0 = time.time()
+    pool = _start_pool(plan) if plan.jobs > 1 and pending else None
+    try:
+        for attempt in range(options.retries + 1):
+            if not pending:
+                break
+            if attempt and verbose and _RANK == 0:
+                print(f"  Retrying {len(pending)} failed point(s) (attempt {attempt + 1})")
+            tasks = [(func, i, points[i]) for i in pending]
+            completed = (pool.imap_unordered(_call_point, tasks) if pool is not None
+                         else map(_call_point, tasks))
+            failed = []
+            for index, ok, value in completed:
+                if not ok:
+                    errors[index] = value
+                    failed.append(index)
+                    if verbose and _RANK == 0:
+                        print(f"  FAILED {_describe_point(points[index])}: "
+                              f"{value.strip().splitlines()[-1]}")
+                    continue
+                errors.pop(index, None)
+                results[index] = value
+                n_done += 1
+                if checkpoint is not None:
+                    _append_checkpoint(checkpoint, keys[index], points[index], value)
+                if verbose and _RANK == 0:
+                    text = (describe(points[index], value) if describe
+                            else _describe_point(points[index]))
+                    print(f"  [{n_resumed + n_done}/{len(points)}] "
+                          f"{text} ({time.time() - t0:.0f}s)")
+            pending = sorted(failed)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    if pending and options.checkpoint:
+        _FAILED.add(options.checkpoint)
+    if _RANK == 0:
+        for index in pending:
+            print(f"\n  Point {_describe_point(points[index])} failed after "
+                  f"{options.retries + 1} attempt(s):\n{errors[index]}")
+        if verbose:
+            print(f"  Sweep complete: {n_done} run, {len(pending)} failed, "
+                  f"{time.time() - t0:.0f}s wall")
+    return results
+
+
+def finish(options: SweepOptions | None) -> None:
+    """
+    Remove the sweep's checkpoint once the sweep has completed (call after
+    its results are saved). A checkpoint with failed points is kept so the
+    sweep can be finished with --resume.
+    """
+    path = options.checkpoint if options else None
+    if not path or path not in _STARTED:
+        return
+    if path in _FAILED:
+        if _RANK == 0:
+            print(f"  Kept sweep checkpoint {path} (failed points); rerun with --resume")
+        return
+    if _RANK == 0 and os.path.exists(path):
+        os.remove(path)
+    _STARTED.discard(path)
+
+
+# =============================================================================
+# Command line
+# =============================================================================
+
+def add_arguments(parser) -> None:
+    """Add the shared sweep scheduling flags to a script's argparse parser."""
+    group = parser.add_argument_group("sweep scheduling")
+    group.add_argument("--jobs", type=int, default=None,
+                       help="Concurrent sweep points (default: from the core budget)")
+    group.add_argument("--cores", type=int, default=None,
+                       help="Total cores for the sweep (default: auto-detect)")
+    group.add_argument("--threads-per-job", type=int, default=None,
+                       help="OpenMP threads per sweep point (default: from the core budget)")
+    group.add_argument("--retries", type=int, default=1,
+                       help="Extra attempts for a sweep point that fails (default: 1)")
+    group.add_argument("--checkpoint", type=str, default=None,
+                       help="Sweep checkpoint file (default: <output>/<sweep>_checkpoint.jsonl)")
+    group.add_argument("--resume", action="store_true",
+                       help="Skip sweep points already in the checkpoint of an interrupted "
+                            "run of the same code")
+
+
+def options_from_args(args, default_checkpoint: str | None = None) -> SweepOptions:
+    """SweepOptions from the flags added by add_arguments()."""
+    return SweepOptions(
+        jobs=args.jobs,
+        cores=args.cores,
+        threads_per_job=args.threads_per_job,
+        retries=args.retries,
+        checkpoint=args.checkpoint or default_checkpoint,
+        resume=args.resume,
+    )
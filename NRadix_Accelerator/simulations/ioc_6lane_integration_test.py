@@ -57,22 +57,11 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 
 # ---------------------------------------------------------------------------
-# MPI support
+# MPI support (shared detection and rank-0 printing)
 # ---------------------------------------------------------------------------
-try:
-    from mpi4py import MPI
-    RANK = MPI.COMM_WORLD.Get_rank()
-    SIZE = MPI.COMM_WORLD.Get_size()
-    IS_PARALLEL = SIZE > 1
-except (ImportError, RuntimeError, OSError):
-    RANK = 0
-    SIZE = 1
-    IS_PARALLEL = False
-
-
-def print_master(msg):
-    if RANK == 0:
-        print(msg, flush=True)
+from fdtd_parallel import MPI, RANK, SIZE, IS_PARALLEL, print_master
+
+import fdtd_stop
 
 
 # ===========================================================================
@@ -318,29 +307,22 @@ def run_sfg_test(triplet_id, sfg_key, sfg_info):
     df_sfg = f_hi - f_lo
     nfreq_sfg = 200
 
-    sfg_mon = sim.add_flux(
-        fcen_sfg, df_sfg, nfreq_sfg,
-        mp.FluxRegion(
-            center=mp.Vector3(sx(x_out_end - 0.5), 0),
-            size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
-        )
+    out_region = mp.FluxRegion(
+        center=mp.Vector3(sx(x_out_end - 0.5), 0),
+        size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
     )
+    sfg_mon = sim.add_flux(fcen_sfg, df_sfg, nfreq_sfg, out_region)
 
     # Broadband monitor for spectral plot
     f_min, f_max = 0.55, 2.10
     fcen_full = (f_min + f_max) / 2.0
     df_full = f_max - f_min
-    full_mon = sim.add_flux(
-        fcen_full, df_full, 500,
-        mp.FluxRegion(
-            center=mp.Vector3(sx(x_out_end - 0.5), 0),
-            size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
-        )
-    )
+    full_mon = sim.add_flux(fcen_full, df_full, 500, out_region)
 
-    # Run
+    # Run until the output energy decays, at most 200 after the sources
     t0 = time.time()
-    sim.run(until_after_sources=200)
+    fdtd_stop.run_until_decayed(sim, fdtd_stop.DecayStop([out_region], cap=200,
+                                                         after_sources=True))
     wall = time.time() - t0
     print_master(f"  Meep time: {sim.meep_time():.0f}, wall: {wall:.1f}s")
 
@@ -46,23 +46,13 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+import fdtd_cache
+import fdtd_stop
+
 # ---------------------------------------------------------------------------
-# MPI support
+# MPI support (shared detection and rank-0 printing)
 # ---------------------------------------------------------------------------
-try:
-    from mpi4py import MPI
-    RANK = MPI.COMM_WORLD.Get_rank()
-    SIZE = MPI.COMM_WORLD.Get_size()
-    IS_PARALLEL = SIZE > 1
-except (ImportError, RuntimeError, OSError):
-    RANK = 0
-    SIZE = 1
-    IS_PARALLEL = False
-
-
-def print_master(msg):
-    if RANK == 0:
-        print(msg, flush=True)
+from fdtd_parallel import RANK, SIZE, IS_PARALLEL, print_master
 
 
 # ===========================================================================
@@ -254,7 +244,7 @@ def run_sfg_test(sfg_key: str) -> dict:
                       size=mp.Vector3(0, SFG_WG_WIDTH, 0)),
         ]
 
-    sim = mp.Simulation(
+    sim_kwargs = dict(
         cell_size=mp.Vector3(cell_x, cell_y, 0),
         geometry=geometry,
         sources=sources,
@@ -262,6 +252,10 @@ def run_sfg_test(sfg_key: str) -> dict:
         resolution=RESOLUTION,
         default_material=mp.Medium(index=N_CLAD),
     )
+    out_region = mp.FluxRegion(
+        center=mp.Vector3(sx(x_out_end - 0.5), 0),
+        size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
+    )
 
     # Flux monitor — NARROW band around the expected SFG wavelength only.
     # This avoids broadband chi2 noise that dominates global peak search.
@@ -274,51 +268,49 @@ def run_sfg_test(sfg_key: str) -> dict:
     df_sfg = f_hi - f_lo
     nfreq_sfg = 200
 
-    sfg_mon = sim.add_flux(
-        fcen_sfg, df_sfg, nfreq_sfg,
-        mp.FluxRegion(
-            center=mp.Vector3(sx(x_out_end - 0.5), 0),
-            size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
-        )
-    )
+    monitors = {'sfg': (fcen_sfg, df_sfg, nfreq_sfg, out_region)}
 
     # Also monitor SHG bands for comparison (if cross-SFG)
-    shg_mons = []
     if not is_shg:
-        for lam_input in [la, lb]:
+        for i, lam_input in enumerate([la, lb]):
             lam_shg = lam_input / 2.0
             f_shg = 1.0 / lam_shg
             f_lo_shg = 1.0 / (lam_shg + 0.020)
             f_hi_shg = 1.0 / (lam_shg - 0.020)
-            shg_mons.append(sim.add_flux(
-                (f_lo_shg + f_hi_shg) / 2.0, f_hi_shg - f_lo_shg, 50,
-                mp.FluxRegion(
-                    center=mp.Vector3(sx(x_out_end - 0.5), 0),
-                    size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
-                )
-            ))
+            monitors[f'shg_{i}'] = ((f_lo_shg + f_hi_shg) / 2.0, f_hi_shg - f_lo_shg, 50,
+                                    out_region)
 
     # Broadband monitor for spectral plot
     f_min, f_max = 0.55, 2.10
     fcen_full = (f_min + f_max) / 2.0
     df_full = f_max - f_min
-    full_mon = sim.add_flux(
-        fcen_full, df_full, 500,
-        mp.FluxRegion(
-            center=mp.Vector3(sx(x_out_end - 0.5), 0),
-            size=mp.Vector3(0, SFG_WG_WIDTH * 2, 0),
-        )
-    )
-
-    # Run
-    t0 = time.time()
-    sim.run(until_after_sources=200)
-    wall = time.time() - t0
-    print_master(f"  Meep time: {sim.meep_time():.0f}, wall: {wall:.1f}s")
+    monitors['full'] = (fcen_full, df_full, 500, out_region)
+
+    # Stop once the output energy decays, at most 200 after the sources
+    stop = fdtd_stop.DecayStop([out_region], cap=200, after_sources=True)
+
+    def fresh():
+        sim = mp.Simulation(**sim_kwargs)
+        mons = {name: sim.add_flux(*args) for name, args in monitors.items()}
+        t0 = time.time()
+        fdtd_stop.run_until_decayed(sim, stop)
+        arrays = {'meep_time': sim.meep_time(), 'wall': time.time() - t0}
+        for name, mon in mons.items():
+            arrays[f'{name}_freqs'] = mp.get_flux_freqs(mon)
+            arrays[f'{name}_flux'] = mp.get_fluxes(mon)
+        return arrays
+
+    # Run (or reuse an identical earlier run)
+    spec = fdtd_cache.simulation_spec(sim_kwargs, monitors, stop.describe())
+    cache = fdtd_cache.default_cache()
+    arrays = cache.fetch(spec, fresh)
+    wall = float(arrays['wall'])
+    print_master(f"  Meep time: {float(arrays['meep_time']):.0f}, wall: {wall:.1f}s"
+                 f"{' (cached)' if cache.last_hit else ''}")
 
     # --- Analyze SFG monitor (narrow band around expected wavelength) ---
-    sfg_freqs = np.array(mp.get_flux_freqs(sfg_mon))
-    sfg_flux = np.array(mp.get_fluxes(sfg_mon))
+    sfg_freqs = np.array(arrays['sfg_freqs'])
+    sfg_flux = np.array(arrays['sfg_flux'])
     sfg_wvls = 1.0 / sfg_freqs  # um
 
     # Find peak in the SFG monitor window
@@ -352,10 +344,10 @@ def run_sfg_test(sfg_key: str) -> dict:
 
     # SHG suppression for cross-SFG
     shg_suppression_db = None
-    if not is_shg and len(shg_mons) > 0:
+    if not is_shg:
         max_shg_flux = 0.0
-        for m in shg_mons:
-            shg_f = np.abs(np.array(mp.get_fluxes(m)))
+        for i in range(2):
+            shg_f = np.abs(np.array(arrays[f'shg_{i}_flux']))
             if len(shg_f) > 0:
                 max_shg_flux = max(max_shg_flux, float(shg_f.max()))
         if max_shg_flux > 1e-20 and peak_val > 1e-20:
@@ -366,8 +358,8 @@ def run_sfg_test(sfg_key: str) -> dict:
             shg_suppression_db = 0.0
 
     # Full spectrum for plotting
-    full_freqs = np.array(mp.get_flux_freqs(full_mon))
-    full_flux = np.array(mp.get_fluxes(full_mon))
+    full_freqs = np.array(arrays['full_freqs'])
+    full_flux = np.array(arrays['full_flux'])
     full_wvls = 1.0 / full_freqs
 
     # Pass criteria:
@@ -0,0 +1,356 @@
+"""
+Global sensitivity analysis and surrogate yield model for the Monte Carlo
+engines (monte_carlo_9x9.py and
+Binary_Accelerator/simulations/monte_carlo_binary_9x9.py).
+
+Both engines are written in their latent space: every varied fab parameter
+is nominal + sigma * z with z ~ N(0, 1). A SensitivityProblem wraps the
+vectorized checks as margins(z), one margin per check (pass <=> margin > 0),
+and everything here works on those latent draws:
+
+    sobol_indices      first-order and total Sobol indices of every margin
+                       and of the failure indicator, from Saltelli's
+                       A / B / AB_i design (n * (d + 2) check evaluations)
+    PolynomialChaos    Hermite polynomial-chaos surrogate of the margins,
+                       fitted once by least squares
+    what_if_yield      yield with some sigmas scaled ("what if sigma_X
+                       halves?"), answered from the surrogate
+
+Scaling sigma_X by s is the same as drawing z_X from N(0, s^2), so a what-if
+query needs no new Monte Carlo run: the fitted surrogate is evaluated on
+scaled latent draws. Margins with kinks (abs() detuning, sinc^2 phase
+matching) are only approximated by a polynomial, so chips whose predicted
+margin lies within a few hold-out RMS of 0 are re-evaluated with the true
+checks. That band is typically ~1% of the draws, and yields come out at
+Monte Carlo accuracy.
+"""
+
+from dataclasses import dataclass, field
+from itertools import combinations, product
+from math import factorial
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class SensitivityProblem:
+    """
+    A Monte Carlo model in its latent standard-normal space.
+
+    names:    one varied parameter per latent column
+    margins:  maps an (n, d) block of latent draws, in units of the
+              baseline sigmas, to {check: margin array}; a chip passes a
+              check when its margin is > 0
+    clip:     the engine clips draws at +/- clip sigma (None = unclipped)
+    """
+    names: List[str]
+    margins: Callable[[np.ndarray], Dict[str, np.ndarray]]
+    clip: Optional[float] = None
+
+    @property
+    def dim(self) -> int:
+        return len(self.names)
+
+    def latent(self, z: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+        """Standard normals -> engine draws: clipped, then scaled per parameter."""
+        if self.clip is not None:
+            z = np.clip(z, -self.clip, self.clip)
+        return z if scales is None else z * scales
+
+    def scale_vector(self, scales: Optional[Dict[str, float]]) -> np.ndarray:
+        """{parameter: sigma factor} -> per-column factor (1 elsewhere)."""
+        vector = np.ones(self.dim)
+        for name, factor in (scales or {}).items():
+            vector[self.names.index(name)] = factor
+        return vector
+
+
+def parse_what_if(text: str, names: List[str]) -> Dict[str, float]:
+    """
+    Parse a 'name=factor,name=factor' what-if query.
+
+    Raises:
+        ValueError: On a malformed item, a parameter not in names, or a
+            negative or non-finite factor
+    """
+    scales = {}
+    for item in text.split(","):
+        name, sep, factor = item.partition("=")
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"item {item!r} is not of the form name=factor")
+        if name not in names:
+            raise ValueError(f"unknown parameter {name!r}; choose from: "
+                             + ", ".join(names))
+        try:
+            scales[name] = float(factor)
+        except ValueError:
+            raise ValueError(f"factor {factor!r} for {name} is not a number") from None
+        if not np.isfinite(scales[name]) or scales[name] < 0:
+            raise ValueError(f"factor for {name} must be a finite number >= 0")
+    return scales
+
+
+def _failure(margins: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.any([m <= 0 for m in margins.values()], axis=0)
+
+
+# =============================================================================
+# Sobol indices (Saltelli sampling)
+# =============================================================================
+
+@dataclass
+class SobolResult:
+    """First-order and total Sobol indices per output, with bootstrap CIs."""
+    names: List[str]
+    first_order: Dict[str, np.ndarray]     # output -> S_i per parameter
+    total: Dict[str, np.ndarray]           # output -> ST_i per parameter
+    first_order_ci: Dict[str, np.ndarray]  # 95% bootstrap half-widths
+    total_ci: Dict[str, np.ndarray]
+    variance: Dict[str, float]             # output variance (0 = constant)
+    n_evaluations: int
+
+
+def _saltelli(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Saltelli (2010) first-order and Jansen total estimators.
+
+    f_a, f_b have shape (..., n); f_ab has shape (d, ..., n).
+    """
+    var = np.var(np.concatenate([f_a, f_b], axis=-1), axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first = np.mean(f_b * (f_ab - f_a), axis=-1) / var
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=-1) / var
+    return np.nan_to_num(first), np.nan_to_num(total)
+
+
+def sobol_indices(problem: SensitivityProblem, n_base: int = 20_000, seed: int = 0,
+                  n_bootstrap: int = 100) -> SobolResult:
+    """
+    Sobol indices of every margin and of the failure indicator ('fail').
+
+    Uses the A / B / AB_i radial design: A and B are independent latent
+    samples and AB_i is A with column i taken from B. All n_base * (d + 2)
+    rows are checked in one vectorized call.
+    """
+    rng = np.random.default_rng(seed)
+    d = problem.dim
+    a = problem.latent(rng.standard_normal((n_base, d)))
+    b = problem.latent(rng.standard_normal((n_base, d)))
+    ab = np.repeat(a[None], d, axis=0)
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+
+    margins = problem.margins(np.concatenate([a, b, ab.reshape(-1, d)]))
+    outputs = dict(margins)
+    outputs['fail'] = _failure(margins).astype(float)
+
+    boot = rng.integers(0, n_base, (n_bootstrap, n_base))
+    result = SobolResult(problem.names, {}, {}, {}, {}, {}, n_base * (d + 2))
+    for name, y in outputs.items():
+        y = np.asarray(y, dtype=float)
+        f_a, f_b, f_ab = y[:n_base], y[n_base:2 * n_base], y[2 * n_base:].reshape(d, n_base)
+        first, total = _saltelli(f_a, f_b, f_ab)
+        first_boot, total_boot = _saltelli(f_a[boot], f_b[boot], f_ab[:, boot])
+        result.first_order[name] = first
+        result.total[name] = total
+        result.first_order_ci[name] = 1.96 * first_boot.std(axis=-1)
+        result.total_ci[name] = 1.96 * total_boot.std(axis=-1)
+        result.variance[name] = float(np.var(np.concatenate([f_a, f_b])))
+    return result
+
+
+def print_sobol(result: SobolResult, width: int = 24) -> None:
+    """Total-order (and first-order for 'fail') Sobol table, parameters x outputs."""
+    outputs = [name for name in result.total if result.variance[name] > 0]
+    constant = [name for name in result.total if result.variance[name] == 0]
+    short = [name.removesuffix('_margin')[:11] for name in outputs]
+
+    print(f"\n  TOTAL-ORDER SOBOL INDICES ST ({result.n_evaluations:,} check evaluations)")
+    print(f"  {'-' * (width + 12 * len(outputs))}")
+    print(f"  {'Parameter':<{width}}" + "".join(f"{s:>12}" for s in short))
+    for i, param in enumerate(result.names):
+        print(f"  {param:<{width}}" + "".join(f"{result.total[o][i]:>12.4f}" for o in outputs))
+    if constant:
+        print(f"  (constant over the variation, no indices: {', '.join(constant)})")
+
+    if 'fail' in outputs:
+        order = np.argsort(-result.total['fail'])
+        print(f"\n  FAILURE DRIVERS (S1 / ST of the pass/fail outcome, +/- 95% bootstrap)")
+        print(f"  {'-' * (width + 34)}")
+        for i in order:
+            print(f"  {result.names[i]:<{width}} "
+                  f"S1 {result.first_order['fail'][i]:+.4f} +/-{result.first_order_ci['fail'][i]:.4f}  "
+                  f"ST {result.total['fail'][i]:.4f} +/-{result.total_ci['fail'][i]:.4f}")
+
+
+# =============================================================================
+# Polynomial-chaos surrogate
+# =============================================================================
+
+def _hermite_table(z: np.ndarray, degree: int) -> np.ndarray:
+    """Orthonormal probabilists' Hermite polynomials He_k(z)/sqrt(k!), k <= degree."""
+    table = np.empty((degree + 1,) + z.shape)
+    table[0] = 1.0
+    if degree > 0:
+        table[1] = z
+    for k in range(1, degree):
+        table[k + 1] = z * table[k] - k * table[k - 1]
+    for k in range(2, degree + 1):
+        table[k] /= np.sqrt(factorial(k))
+    return table
+
+
+def multi_indices(dim: int, degree: int, max_interaction: int) -> List[Tuple[Tuple[int, int], ...]]:
+    """
+    Total-degree <= degree Hermite terms that involve at most max_interaction
+    parameters, each as ((dim, order), ...); the constant term is ().
+    """
+    terms = [()]
+    for k in range(1, max_interaction + 1):
+        for dims in combinations(range(dim), k):
+            for orders in product(range(1, degree + 1), repeat=k):
+                if sum(orders) <= degree:
+                    terms.append(tuple(zip(dims, orders)))
+    return terms
+
+
+@dataclass
+class PolynomialChaos:
+    """
+    Hermite polynomial-chaos expansion of every margin over the latent draws.
+
+    fit_rms is the RMS error on a hold-out set; what_if_yield() re-checks
+    chips whose predicted margin is within refine_band * fit_rms of 0.
+    """
+    problem: SensitivityProblem
+    degree: int
+    terms: List[Tuple[Tuple[int, int], ...]]
+    outputs: List[str]
+    coefficients: np.ndarray                 # (n_terms, n_outputs)
+    fit_rms: Dict[str, float] = field(default_factory=dict)
+    n_train: int = 0
+
+    @classmethod
+    def fit(cls, problem: SensitivityProblem, degree: int = 6, max_interaction: int = 2,
+            n_train: Optional[int] = None, spread: float = 1.3,
+            seed: int = 0) -> 'PolynomialChaos':
+        """
+        Least-squares fit on latent draws from N(0, spread^2), wider than the
+        nominal model so the tails (and halved / doubled sigmas) are covered.
+        n_train defaults to 4 draws per term plus 2,000.
+        """
+        rng = np.random.default_rng(seed)
+        terms = multi_indices(problem.dim, degree, max_interaction)
+        n_train = n_train or 4 * len(terms) + 2000
+        n_test = max(n_train // 4, 1000)
+
+        z = problem.latent(spread * rng.standard_normal((n_train + n_test, problem.dim)))
+        margins = problem.margins(z)
+        outputs = list(margins)
+        y = np.column_stack([margins[name] for name in outputs])
+
+        pce = cls(problem, degree, terms, outputs, np.zeros((len(terms), len(outputs))),
+                  n_train=n_train)
+        basis = pce._basis(z[:n_train])
+        pce.coefficients = np.linalg.lstsq(basis, y[:n_train], rcond=None)[0]
+        residual = pce._predict(z[n_train:]) - y[n_train:]
+        pce.fit_rms = dict(zip(outputs, np.sqrt(np.mean(residual ** 2, axis=0))))
+        return pce
+
+    def _basis(self, z: np.ndarray) -> np.ndarray:
+        # (order, dim, chip) table; each term gathers one row per factor,
+        # padded with He_0 = 1 up to the largest interaction order
+        table = _hermite_table(z.T, self.degree)
+        width = max(len(term) for term in self.terms)
+        dims = np.zeros((len(self.terms), width), dtype=int)
+        orders = np.zeros((len(self.terms), width), dtype=int)
+        for t, term in enumerate(self.terms):
+            for k, (dim, order) in enumerate(term):
+                dims[t, k], orders[t, k] = dim, order
+        basis = table[orders[:, 0], dims[:, 0]]
+        for k in range(1, width):
+            basis *= table[orders[:, k], dims[:, k]]
+        return basis.T
+
+    def _predict(self, z: np.ndarray, chunk: int = 20_000) -> np.ndarray:
+        return np.concatenate([self._basis(z[i:i + chunk]) @ self.coefficients
+                               for i in range(0, len(z), chunk)])
+
+    def predict(self, z: np.ndarray) -> Dict[str, np.ndarray]:
+        """Surrogate margins at latent draws z (engine units, as margins(z))."""
+        return dict(zip(self.outputs, self._predict(z).T))
+
+
+@dataclass
+class WhatIfResult:
+    """Yield under scaled sigmas, from the surrogate plus band re-checks."""
+    scales: Dict[str, float]
+    yield_fraction: float
+    check_yields: Dict[str, float]
+    surrogate_yield: float                   # before re-checking the band
+    n_samples: int
+    n_rechecked: int
+
+
+def what_if_yield(surrogate: PolynomialChaos, scales: Optional[Dict[str, float]] = None,
+                  n_samples: int = 100_000, seed: int = 1,
+                  refine_band: float = 3.0) -> WhatIfResult:
+    """
+    Yield with sigma_X multiplied by scales[X] (e.g. {'refractive_index': 0.5}).
+
+    The surrogate is evaluated on n_samples scaled latent draws. Chips whose
+    predicted margin for any check is within refine_band hold-out RMS of 0
+    are re-evaluated with the true checks (refine_band=0 disables this).
+    """
+    problem = surrogate.problem
+    rng = np.random.default_rng(seed)
+    z = problem.latent(rng.standard_normal((n_samples, problem.dim)),
+                       problem.scale_vector(scales))
+    predicted = surrogate._predict(z)
+    surrogate_yield = float(np.mean(np.all(predicted > 0, axis=1)))
+
+    band = refine_band * np.array([surrogate.fit_rms[name] for name in surrogate.outputs])
+    uncertain = np.any(np.abs(predicted) <= band, axis=1)
+    if uncertain.any():
+        exact = problem.margins(z[uncertain])
+        predicted[uncertain] = np.column_stack([exact[name] for name in surrogate.outputs])
+
+    passed = predicted > 0
+    return WhatIfResult(
+        scales=dict(scales or {}),
+        yield_fraction=float(np.mean(np.all(passed, axis=1))),
+        check_yields=dict(zip(surrogate.outputs, passed.mean(axis=0))),
+        surrogate_yield=surrogate_yield,
+        n_samples=n_samples,
+        n_rechecked=int(uncertain.sum()),
+    )
+
+
+def print_what_if(surrogate: PolynomialChaos, factor: float = 0.5,
+                  n_samples: int = 100_000, width: int = 24,
+                  extra: Optional[Dict[str, float]] = None) -> None:
+    """Yield if each sigma (in turn) is multiplied by factor, plus an optional custom query."""
+    baseline = what_if_yield(surrogate, n_samples=n_samples)
+    print(f"\n  SURROGATE: degree-{surrogate.degree} polynomial chaos, "
+          f"{len(surrogate.terms)} terms, {surrogate.n_train:,} training chips")
+    print("  Hold-out RMS: " + ", ".join(f"{name.removesuffix('_margin')} {rms:.3g}"
+                                         for name, rms in surrogate.fit_rms.items()))
+    print(f"\n  WHAT-IF: YIELD WITH ONE SIGMA x {factor:g} ({n_samples:,} surrogate chips)")
+    print(f"  {'-' * (width + 44)}")
+    print(f"  {'Parameter':<{width}} {'Yield':>12} {'Change':>12} {'Re-checked':>12}")
+    print(f"  {'(baseline)':<{width}} {baseline.yield_fraction * 100:>11.4f}% "
+          f"{'':>12} {baseline.n_rechecked / n_samples:>11.2%}")
+
+    queries = [{name: factor} for name in surrogate.problem.names]
+    if extra:
+        queries.append(extra)
+    for scales in queries:
+        result = what_if_yield(surrogate, scales, n_samples=n_samples)
+        label = next(iter(scales)) if len(scales) == 1 else "(custom query)"
+        delta = (result.yield_fraction - baseline.yield_fraction) * 100
+        print(f"  {label:<{width}} {result.yield_fraction * 100:>11.4f}% {delta:>+11.4f}% "
+              f"{result.n_rechecked / n_samples:>11.2%}")
+    if extra:
+        print("  Custom query: " + ", ".join(f"{name} x {f:g}" for name, f in extra.items()))
@@ -0,0 +1,402 @@
+"""
+Online statistics for the Monte Carlo yield engines.
+
+The engines in monte_carlo_9x9.py and
+Binary_Accelerator/simulations/monte_carlo_binary_9x9.py never hold or ship
+per-trial results: each chunk of trials ({column: array}) is folded into a
+MonteCarloStats, and shard partials are merged in shard order. Memory is
+constant in the number of trials:
+
+    pass counts       exact (integer sums), with Wilson confidence intervals
+    mean / variance   Welford / Chan et al. update of (count, mean, M2)
+    min / max         exact
+    pass/fail groups  moments split by all_passed, for point-biserial
+                      correlation of a parameter with yield
+    histograms        exact, on fixed bin edges shared by every shard
+                      (pilot_ranges sizes them from a pilot batch drawn at
+                      the run's sigmas); values off the edges are counted
+                      as under/overflow
+    quantiles         t-digest per histogrammed (margin) column
+    worst case        the full trial row at each tracked column's minimum
+    sample            the first sample_size trials, kept for scatter plots
+                      and other per-trial views
+
+WeightedRate is the importance-sampling counterpart of a pass count: it
+accumulates likelihood-ratio weights of failing trials drawn from a shifted
+distribution, for the rare-event mode of monte_carlo_9x9.py.
+
+Because shards are merged in a fixed order, the merged result does not
+depend on how many worker processes produced the partials.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class RunningMoments:
+    """Count, mean, M2 (sum of squared deviations) and extrema of a column."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = np.inf
+    maximum: float = -np.inf
+
+    def add(self, values: np.ndarray) -> None:
+        """Fold a batch of values in."""
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        mean = float(values.mean())
+        batch = RunningMoments(
+            count=values.size,
+            mean=mean,
+            m2=float(np.sum((values - mean) ** 2)),
+            minimum=float(values.min()),
+            maximum=float(values.max()),
+        )
+        self.merge(batch)
+
+    def merge(self, other: 'RunningMoments') -> None:
+        """Combine with the moments of a disjoint set of values."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ddof=0, as np.var)."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+
+@dataclass
+class FixedHistogram:
+    """
+    Histogram on fixed, shared bin edges. Values outside [edges[0], edges[-1]]
+    are counted in underflow/overflow rather than dropped.
+    """
+    edges: np.ndarray
+    counts: np.ndarray = None
+    underflow: int = 0
+    overflow: int = 0
+
+    def __post_init__(self):
+        self.edges = np.asarray(self.edges, dtype=float)
+        if self.counts is None:
+            self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    @classmethod
+    def linear(cls, low: float, high: float, n_bins: int) -> 'FixedHistogram':
+        return cls(np.linspace(low, high, n_bins + 1))
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+    def merge(self, other: 'FixedHistogram') -> None:
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+
+def pilot_ranges(table: Dict[str, np.ndarray], bins: Dict[str, int],
+                 pad: float = 0.5) -> Dict[str, Tuple[float, float, int]]:
+    """
+    Histogram ranges (low, high, n_bins) for the columns in bins, spanning
+    a pilot table's values widened by pad x their spread on each side.
+
+    Run once per Monte Carlo run, before the shards, so every shard shares
+    the edges and the ranges follow whatever sigmas the run uses. A column
+    the pilot saw as constant gets a +/- pad band around its value.
+    """
+    ranges = {}
+    for name, n_bins in bins.items():
+        values = np.asarray(table[name], dtype=float)
+        values = values[np.isfinite(values)]
+        low, high = (float(values.min()), float(values.max())) if values.size else (0.0, 0.0)
+        spread = high - low
+        if spread <= 1e-12 * max(abs(low), abs(high), 1.0):
+            spread = max(abs(low), 1.0)
+        ranges[name] = (low - pad * spread, high + pad * spread, n_bins)
+    return ranges
+
+
+@dataclass
+class TDigest:
+    """
+    Merging t-digest (Dunning) for streaming quantiles.
+
+    Values are summarized as weighted centroids whose size is limited by the
+    arcsine scale function, so centroids stay small (down to single values)
+    in the tails, where the yield-relevant quantiles live. Batches are
+    compressed vectorized: every centroid spanning at most one unit of the
+    scale function k(q) = compression / (2 pi) * asin(2q - 1) is merged.
+    """
+    compression: float = 1000.0
+    means: np.ndarray = field(default_factory=lambda: np.empty(0))
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0))
+    minimum: float = np.inf
+    maximum: float = -np.inf
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        # Compress the batch on its own first: sorting the raw values is far
+        # cheaper than argsorting them together with the existing centroids
+        batch_means, batch_weights = self._clusters(np.sort(values), np.ones(values.size))
+        self._compress(np.concatenate((self.means, batch_means)),
+                       np.concatenate((self.weights, batch_weights)))
+
+    def merge(self, other: 'TDigest') -> None:
+        if other.weights.size == 0:
+            return
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress(np.concatenate((self.means, other.means)),
+                       np.concatenate((self.weights, other.weights)))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind='stable')
+        self.means, self.weights = self._clusters(means[order], weights[order])
+
+    def _clusters(self, means: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge sorted centroids that fall within one unit of k(q)."""
+        cumulative = np.cumsum(weights)
+        q_mid = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        return np.add.reduceat(means * weights, starts) / merged_weights, merged_weights
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def quantile(self, q: float) -> float:
+        """Estimated q-quantile (0..1), interpolating between centroids."""
+        if self.weights.size == 0:
+            return float('nan')
+        cumulative = np.cumsum(self.weights)
+        centers = (cumulative - self.weights / 2) / cumulative[-1]
+        points = np.concatenate(([0.0], centers, [1.0]))
+        values = np.concatenate(([self.minimum], self.means, [self.maximum]))
+        return float(np.interp(q, points, values))
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion (default 95%)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+@dataclass
+class WeightedRate:
+    """
+    Importance-sampling estimate of an event probability.
+
+    Each trial drawn from the proposal contributes its likelihood ratio
+    w = p(z) / q(z) if the event occurred and 0 otherwise; the estimate is
+    the mean contribution, with a normal-approximation confidence interval
+    from the running second moment.
+    """
+    n: int = 0
+    hits: int = 0
+    sum_w: float = 0.0
+    sum_w2: float = 0.0
+
+    def add(self, weights: np.ndarray, event: np.ndarray) -> None:
+        w = weights[event]
+        self.n += len(weights)
+        self.hits += len(w)
+        self.sum_w += float(w.sum())
+        self.sum_w2 += float(np.dot(w, w))
+
+    def merge(self, other: 'WeightedRate') -> None:
+        self.n += other.n
+        self.hits += other.hits
+        self.sum_w += other.sum_w
+        self.sum_w2 += other.sum_w2
+
+    @property
+    def estimate(self) -> float:
+        return self.sum_w / self.n if self.n else 0.0
+
+    @property
+    def std_error(self) -> float:
+        if self.n < 2:
+            return np.inf
+        p = self.estimate
+        return float(np.sqrt(max(self.sum_w2 / self.n - p * p, 0.0) / (self.n - 1)))
+
+    def interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """Normal-approximation confidence interval (default 95%)."""
+        half = z * self.std_error
+        return max(0.0, self.estimate - half), min(1.0, self.estimate + half)
+
+    def relative_half_width(self, z: float = 1.96) -> float:
+        """CI half-width over the estimate (inf until an event is seen)."""
+        if self.hits == 0:
+            return np.inf
+        return z * self.std_error / self.estimate
+
+    @property
+    def effective_sample_size(self) -> float:
+        """Kish effective number of event samples, (sum w)^2 / sum w^2."""
+        return self.sum_w ** 2 / self.sum_w2 if self.sum_w2 > 0 else 0.0
+
+
+@dataclass
+class MonteCarloStats:
+    """
+    Mergeable summary of a columnar Monte Carlo trial table.
+
+    Columns named '<check>_passed' (and 'all_passed') are counted into
+    pass_counts['<check>'] (and pass_counts['all']); every other column gets
+    RunningMoments. The columns listed in histogram_ranges also get a
+    FixedHistogram and a TDigest, group_columns get moments split by
+    all_passed, and worst_case_columns keep the whole trial row at their
+    minimum.
+    """
+    histogram_ranges: Dict[str, Tuple[float, float, int]] = field(default_factory=dict)
+    group_columns: Sequence[str] = ()
+    worst_case_columns: Sequence[str] = ()
+    sample_size: int = 10_000
+    n_trials: int = 0
+    pass_counts: Dict[str, int] = field(default_factory=dict)
+    moments: Dict[str, RunningMoments] = field(default_factory=dict)
+    pass_moments: Dict[str, RunningMoments] = field(default_factory=dict)
+    fail_moments: Dict[str, RunningMoments] = field(default_factory=dict)
+    histograms: Dict[str, FixedHistogram] = field(default_factory=dict)
+    digests: Dict[str, TDigest] = field(default_factory=dict)
+    worst_case: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    sample: Optional[Dict[str, np.ndarray]] = None
+
+    def add(self, table: Dict[str, np.ndarray]) -> None:
+        """Fold a columnar trial table (one chunk) in."""
+        n = len(table['all_passed'])
+        self.n_trials += n
+        passed = np.asarray(table['all_passed'], dtype=bool)
+
+        for name, values in table.items():
+            if name.endswith('_passed'):
+                key = 'all' if name == 'all_passed' else name[:-len('_passed')]
+                self.pass_counts[key] = self.pass_counts.get(key, 0) + int(np.count_nonzero(values))
+                continue
+            self.moments.setdefault(name, RunningMoments()).add(values)
+            if name in self.group_columns:
+                self.pass_moments.setdefault(name, RunningMoments()).add(values[passed])
+                self.fail_moments.setdefault(name, RunningMoments()).add(values[~passed])
+            if name in self.histogram_ranges:
+                if name not in self.histograms:
+                    self.histograms[name] = FixedHistogram.linear(*self.histogram_ranges[name])
+                    self.digests[name] = TDigest()
+                self.histograms[name].add(values)
+                self.digests[name].add(values)
+
+        for name in self.worst_case_columns:
+            i = int(np.argmin(table[name]))
+            if name not in self.worst_case or table[name][i] < self.worst_case[name][name]:
+                self.worst_case[name] = {col: values[i].item() for col, values in table.items()}
+
+        self._extend_sample(table)
+
+    def merge(self, other: 'MonteCarloStats') -> None:
+        """Fold in the stats of the trials that follow this one's."""
+        self.n_trials += other.n_trials
+        for key, count in other.pass_counts.items():
+            self.pass_counts[key] = self.pass_counts.get(key, 0) + count
+        for name, moments in other.moments.items():
+            self.moments.setdefault(name, RunningMoments()).merge(moments)
+        for name, moments in other.pass_moments.items():
+            self.pass_moments.setdefault(name, RunningMoments()).merge(moments)
+        for name, moments in other.fail_moments.items():
+            self.fail_moments.setdefault(name, RunningMoments()).merge(moments)
+        for name, hist in other.histograms.items():
+            if name in self.histograms:
+                self.histograms[name].merge(hist)
+                self.digests[name].merge(other.digests[name])
+            else:
+                self.histograms[name] = FixedHistogram(hist.edges, hist.counts.copy(),
+                                                       hist.underflow, hist.overflow)
+                self.digests[name] = TDigest(other.digests[name].compression)
+                self.digests[name].merge(other.digests[name])
+        for name, row in other.worst_case.items():
+            if name not in self.worst_case or row[name] < self.worst_case[name][name]:
+                self.worst_case[name] = row
+        if other.sample is not None:
+            self._extend_sample(other.sample)
+
+    def _extend_sample(self, table: Dict[str, np.ndarray]) -> None:
+        have = 0 if self.sample is None else len(self.sample['all_passed'])
+        take = self.sample_size - have
+        if take <= 0:
+            return
+        head = {name: np.array(values[:take]) for name, values in table.items()}
+        if self.sample is None:
+            self.sample = head
+        else:
+            self.sample = {name: np.concatenate((self.sample[name], head[name]))
+                           for name in self.sample}
+
+    def yield_fraction(self, check: str = 'all') -> float:
+        """Fraction of trials passing check ('all' = every check)."""
+        return self.pass_counts.get(check, 0) / self.n_trials if self.n_trials else 0.0
+
+    def yield_interval(self, check: str = 'all', z: float = 1.96) -> Tuple[float, float]:
+        """Wilson confidence interval on yield_fraction(check)."""
+        return wilson_interval(self.pass_counts.get(check, 0), self.n_trials, z)
+
+    def quantile(self, column: str, q: float) -> float:
+        """t-digest estimate of the q-quantile (0..1) of a histogrammed column."""
+        return self.digests[column].quantile(q)
+
+    def out_of_range(self) -> Dict[str, Tuple[int, int]]:
+        """(underflow, overflow) of each histogram with values off its edges."""
+        return {name: (hist.underflow, hist.overflow)
+                for name, hist in self.histograms.items()
+                if hist.underflow or hist.overflow}
+
+    def correlation_with_yield(self, column: str) -> float:
+        """
+        Point-biserial correlation of a group column with all_passed
+        (equal to the Pearson r of the column against a 0/1 pass flag).
+        """
+        ok, bad = self.pass_moments[column], self.fail_moments[column]
+        std = self.moments[column].std
+        if ok.count == 0 or bad.count == 0 or std == 0:
+            return 0.0
+        p = ok.count / self.n_trials
+        return (ok.mean - bad.mean) / std * np.sqrt(p * (1 - p))
@@ -13,9 +13,9 @@ PURPOSE:
     "Given realistic fab tolerances, how often does the chip still work?"
 
 METHOD:
-    Monte Carlo simulation — we roll the dice 10,000 times, each time picking
-    random fab parameter values from Gaussian distributions centered on the
-    nominal design. For each "virtual chip," we re-run the key validation
+    Monte Carlo simulation — we roll the dice --trials times (10,000 by
+    default), each time picking random fab parameter values from Gaussian
+    distributions centered on the nominal design. For each "virtual chip," we re-run the key validation
     checks from the monolithic_chip_9x9.py architecture. The fraction of
     chips that pass ALL checks is the predicted yield.
 
@@ -38,6 +38,16 @@ USAGE:
 
     Output: terminal summary + plots saved to ../docs/monte_carlo_plots/
 
+    python3 monte_carlo_9x9.py --rare-event --sigma-scale 0.7
+
+    Rare-event mode: importance-sampled failure probabilities (1e-6 and
+    below) that stop once the 95% CI is within --target-rel-width.
+
+    python3 monte_carlo_9x9.py --sensitivity --what-if refractive_index=0.5
+
+    Sensitivity mode: Sobol indices of every check margin, and yields with
+    a sigma halved from a polynomial-chaos surrogate (mc_sensitivity.py).
+
 Author: N-Radix Project
 Date: February 17, 2026
 """
@@ -46,11 +56,17 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend — safe for headless servers
 import matplotlib.pyplot as plt
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Dict, List, Tuple, Optional
+import argparse
 import os
 import time
 import sys
+from multiprocessing import Pool
+
+from mc_stats import MonteCarloStats, WeightedRate, pilot_ranges
+from mc_sensitivity import (SensitivityProblem, PolynomialChaos, sobol_indices,
+                            parse_what_if, print_sobol, print_what_if)
 
 # =============================================================================
 # NOMINAL DESIGN PARAMETERS (from monolithic_chip_9x9.py and DRC_RULES.md)
@@ -260,12 +276,72 @@ def sample_chip(nominal: NominalDesign, variation: ProcessVariation,
     )
 
 
+# Draw order of the varied parameters: (SampledChip / NominalDesign field,
+# ProcessVariation sigma field, is a loss with a 0.1 dB floor).
+# Same order as sample_chip() above.
+SAMPLING_PLAN = [
+    ('waveguide_width_nm',     'waveguide_width_sigma_nm',  False),
+    ('ring_coupling_gap_nm',   'ring_gap_sigma_nm',         False),
+    ('ppln_poling_period_um',  'ppln_period_sigma_um',      False),
+    ('etch_depth_nm',          'etch_depth_sigma_nm',       False),
+    ('prop_loss_db_per_cm',    'prop_loss_sigma_db_per_cm', True),
+    ('refractive_index',       'refractive_index_sigma',    False),
+    ('mzi_loss_db',            'mzi_loss_sigma_db',         True),
+    ('combiner_loss_db',       'combiner_loss_sigma_db',    True),
+    ('sfg_conversion_loss_db', 'sfg_loss_sigma_db',         True),
+    ('awg_loss_db',            'awg_loss_sigma_db',         True),
+    ('edge_coupling_loss_db',  'coupling_loss_sigma_db',    True),
+]
+
+
+def sample_population(n_chips: int, nominal: NominalDesign, variation: ProcessVariation,
+                      rng: np.random.Generator) -> SampledChip:
+    """
+    Draw n_chips chip realizations at once.
+
+    Returns a SampledChip whose fields are arrays of length n_chips, which
+    the check_* functions accept in place of a single chip.
+
+    The standard normals are drawn as one (n_chips, 11) block in trial-major
+    order — the same stream sample_chip() consumes one value at a time — so
+    for a given generator state the population is identical to n_chips
+    successive sample_chip() calls.
+    """
+    z = rng.standard_normal((n_chips, len(SAMPLING_PLAN)))
+    return chips_from_normals(z, nominal, variation)
+
+
+def chips_from_normals(z: np.ndarray, nominal: NominalDesign,
+                       variation: ProcessVariation,
+                       clip: Optional[float] = 3.0) -> SampledChip:
+    """
+    Map an (n_chips, 11) block of standard-normal draws, one column per
+    SAMPLING_PLAN entry, to chip parameters (clipped at +/- clip sigma,
+    losses floored at 0.1 dB).
+    """
+    params = {}
+    for i, (name, sigma_name, is_loss) in enumerate(SAMPLING_PLAN):
+        mean = getattr(nominal, name)
+        sigma = getattr(variation, sigma_name)
+        values = mean + sigma * z[:, i]
+        if clip is not None:
+            values = np.clip(values, mean - clip * sigma, mean + clip * sigma)
+        if is_loss:
+            values = np.maximum(values, 0.1)
+        params[name] = values
+    return SampledChip(**params)
+
+
 # =============================================================================
 # VALIDATION CHECKS (reimplemented from monolithic_chip_9x9.py)
 # =============================================================================
 #
 # Each check returns (passed: bool, metric_value: float, margin: float)
 # where margin = how far inside the acceptable range we are (positive = good)
+#
+# The checks are plain array arithmetic, so `chip` may also be a whole
+# population from sample_population() (array-valued fields); passed,
+# metric and margin then come back as arrays with one entry per trial.
 
 def check_loss_budget(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float, float]:
     """
@@ -376,26 +452,37 @@ def check_wavelength_collision(chip: SampledChip, nominal: NominalDesign) -> Tup
             if spacing < min_spacing_nm:
                 min_spacing_nm = spacing
 
-    # AWG resolution is affected by refractive index variation.
-    # A change in n shifts the AWG's channel centers.
-    # The AWG free spectral range (FSR) and channel spacing depend on
-    # the path length difference between array arms, which scales with n.
-    # A delta_n / n_nominal fractional change shifts all channels by that fraction.
+    # Effective margin: how much spare spacing we have beyond what AWG needs
+    margin_nm = min_spacing_nm - awg_min_resolution(chip, nominal)
+
+    passed = margin_nm > 0
+    return passed, min_spacing_nm, margin_nm
+
+
+def awg_min_resolution(chip: SampledChip, nominal: NominalDesign) -> float:
+    """
+    Minimum SFG product spacing [nm] the chip's output AWG can resolve.
+
+    AWG resolution is affected by refractive index variation.
+    A change in n shifts the AWG's channel centers.
+    The AWG free spectral range (FSR) and channel spacing depend on
+    the path length difference between array arms, which scales with n.
+    A delta_n / n_nominal fractional change shifts all channels by that fraction.
+    """
     delta_n = chip.refractive_index - nominal.refractive_index
     fractional_shift = delta_n / nominal.refractive_index
 
     # This shift affects the AWG's ability to resolve channels.
     # The AWG passband width narrows or broadens slightly.
     # We model the effective minimum resolvable spacing as:
-    awg_min_resolution_nm = 20.0 * (1.0 + 2.0 * abs(fractional_shift))
     # (The 2x factor is because both the SFG products and AWG channels
     #  experience the index shift, doubling the effective misalignment)
+    return 20.0 * (1.0 + 2.0 * np.abs(fractional_shift))
 
-    # Effective margin: how much spare spacing we have beyond what AWG needs
-    margin_nm = min_spacing_nm - awg_min_resolution_nm
 
-    passed = margin_nm > 0
-    return passed, min_spacing_nm, margin_nm
+# Ring parameters
+RING_RADIUS_UM = 5.0          # From DRC: RING.R.1 nominal = 5.0 um
+RING_TUNING_RANGE_NM = 5.0    # nm — achievable with TiN heater
 
 
 def check_ring_resonator_tuning(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float, float]:
@@ -422,10 +509,24 @@ def check_ring_resonator_tuning(chip: SampledChip, nominal: NominalDesign) -> Tu
 
     PASS CRITERION: Resonance wavelength shift < thermal tuning range (5 nm)
     """
-    # Ring parameters
-    ring_radius_um = 5.0  # From DRC: RING.R.1 nominal = 5.0 um
-    thermal_tuning_range_nm = 5.0  # nm — achievable with TiN heater
+    delta_lambda_nm, gap_penalty_nm = ring_resonance_offset(chip, nominal)
+
+    total_shift_nm = np.abs(delta_lambda_nm) + gap_penalty_nm
+
+    margin_nm = RING_TUNING_RANGE_NM - total_shift_nm
+
+    passed = margin_nm > 0
+    return passed, total_shift_nm, margin_nm
+
+
+def ring_resonance_offset(chip: SampledChip, nominal: NominalDesign) -> Tuple[float, float]:
+    """
+    Process-induced ring resonance offset at 1550 nm.
 
+    Returns:
+        (signed resonance shift [nm], coupling-gap penalty [nm]); the
+        ring tuning check adds |shift| and the penalty.
+    """
     # Effective index model:
     # n_eff depends on waveguide width, etch depth, and material index.
     # We use a linearized sensitivity model based on published TFLN data:
@@ -468,14 +569,9 @@ def check_ring_resonator_tuning(chip: SampledChip, nominal: NominalDesign) -> Tu
     # as a secondary pass/fail: if gap is too far from nominal, the
     # ring's extinction ratio drops below useful levels.
     delta_gap_nm = chip.ring_coupling_gap_nm - nominal.ring_coupling_gap_nm
-    gap_penalty_nm = abs(delta_gap_nm) * 0.02  # Small contribution to effective shift
-
-    total_shift_nm = abs(delta_lambda_nm) + gap_penalty_nm
-
-    margin_nm = thermal_tuning_range_nm - total_shift_nm
+    gap_penalty_nm = np.abs(delta_gap_nm) * 0.02  # Small contribution to effective shift
 
-    passed = margin_nm > 0
-    return passed, total_shift_nm, margin_nm
+    return delta_lambda_nm, gap_penalty_nm
 
 
 def check_path_timing(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool, float, float]:
@@ -517,7 +613,7 @@ def check_path_timing(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool,
     #
     # Model: within-chip index variation is ~10% of chip-to-chip variation
     # This is because most of the process variation is wafer-scale, not die-scale.
-    within_chip_index_sigma = 0.1 * abs(chip.refractive_index - nominal.refractive_index) + 0.0001
+    within_chip_index_sigma = 0.1 * np.abs(chip.refractive_index - nominal.refractive_index) + 0.0001
 
     # The worst-case skew is between two paths at opposite ends of the chip
     # where the index differs by 2*within_chip_sigma
@@ -531,7 +627,7 @@ def check_path_timing(chip: SampledChip, nominal: NominalDesign) -> Tuple[bool,
     # Also consider geometric variation — etch depth non-uniformity
     # changes the effective waveguide cross-section, which changes n_eff.
     # This adds ~0.01 ps of skew per 1nm etch variation across 440um path.
-    etch_contribution_ps = abs(chip.etch_depth_nm - nominal.etch_depth_nm) * 0.01
+    etch_contribution_ps = np.abs(chip.etch_depth_nm - nominal.etch_depth_nm) * 0.01
 
     total_skew_ps = timing_skew_ps + etch_contribution_ps
 
@@ -621,16 +717,14 @@ def check_sfg_phase_matching(chip: SampledChip, nominal: NominalDesign) -> Tuple
 
     # SFG efficiency relative to perfect phase matching
     arg = delta_k * mixer_length_um / 2.0
-    if abs(arg) < 1e-10:
-        efficiency_ratio = 1.0
-    else:
-        efficiency_ratio = (np.sin(arg) / arg) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency_ratio = np.where(np.abs(arg) < 1e-10, 1.0,
+                                    (np.sin(arg) / arg) ** 2)
 
-    # Efficiency in dB relative to nominal
-    if efficiency_ratio > 1e-10:
-        efficiency_penalty_db = -10 * np.log10(efficiency_ratio)
-    else:
-        efficiency_penalty_db = 100.0  # Effectively zero efficiency
+        # Efficiency in dB relative to nominal
+        # (100 dB = effectively zero efficiency)
+        efficiency_penalty_db = np.where(efficiency_ratio > 1e-10,
+                                         -10 * np.log10(efficiency_ratio), 100.0)[()]
 
     # PASS: efficiency penalty < 3 dB (still >50% of nominal)
     max_penalty_db = 3.0
@@ -644,163 +738,547 @@ def check_sfg_phase_matching(chip: SampledChip, nominal: NominalDesign) -> Tuple
 # MONTE CARLO ENGINE
 # =============================================================================
 
-@dataclass
-class TrialResult:
-    """Results from a single Monte Carlo trial."""
-    chip: SampledChip
+# (result column prefix, check) — columns are <prefix>_passed/_metric/_margin
+CHECKS = [
+    ('loss_budget',          check_loss_budget),
+    ('wavelength_collision', check_wavelength_collision),
+    ('ring_tuning',          check_ring_resonator_tuning),
+    ('path_timing',          check_path_timing),
+    ('sfg_phase_matching',   check_sfg_phase_matching),
+]
 
-    # Per-check results: (passed, metric, margin)
-    loss_budget: Tuple[bool, float, float] = (True, 0.0, 0.0)
-    wavelength_collision: Tuple[bool, float, float] = (True, 0.0, 0.0)
-    ring_tuning: Tuple[bool, float, float] = (True, 0.0, 0.0)
-    path_timing: Tuple[bool, float, float] = (True, 0.0, 0.0)
-    sfg_phase_matching: Tuple[bool, float, float] = (True, 0.0, 0.0)
+PARAMETER_COLUMNS = [name for name, _, _ in SAMPLING_PLAN]
+
+# Columns of the run_monte_carlo() result table
+TRIAL_COLUMNS = (
+    PARAMETER_COLUMNS
+    + [f'{name}_{column}' for name, _ in CHECKS for column in ('passed', 'metric', 'margin')]
+    + ['all_passed']
+)
+
+
+def evaluate_population(chips: SampledChip, nominal: NominalDesign) -> Dict[str, np.ndarray]:
+    """
+    Run all validation checks on a population from sample_population().
+
+    Returns:
+        Columnar table {column: array}, with the TRIAL_COLUMNS: the chip
+        parameters, <check>_passed/_metric/_margin per check and all_passed
+    """
+    n_chips = len(chips.waveguide_width_nm)
+    table = {name: getattr(chips, name) for name in PARAMETER_COLUMNS}
+
+    all_passed = np.ones(n_chips, dtype=bool)
+    for name, check in CHECKS:
+        passed, metric, margin = check(chips, nominal)
+        table[f'{name}_passed'] = passed
+        table[f'{name}_metric'] = np.broadcast_to(metric, n_chips)
+        table[f'{name}_margin'] = margin
+        all_passed &= passed
+    table['all_passed'] = all_passed
+    return table
+
+
+# Histogram bin counts for the streamed margin/metric columns. The edges
+# come from a pilot batch drawn at the run's own ProcessVariation (see
+# histogram_ranges), so --sigma-scale runs stay on the plotted range;
+# anything outside still lands in the under/overflow counts.
+HISTOGRAM_BINS = {
+    'loss_budget_metric':          250,
+    'loss_budget_margin':          250,
+    'wavelength_collision_margin': 200,
+    'ring_tuning_metric':          200,
+    'ring_tuning_margin':          200,
+    'path_timing_margin':          400,
+    'sfg_phase_matching_metric':   200,
+    'sfg_phase_matching_margin':   210,
+}
+PILOT_TRIALS = 20_000
+PILOT_STREAM = 0x9111   # keeps the pilot draws off the shards' seed streams
+
+
+# Parameters correlated with pass/fail in the sensitivity analysis
+SENSITIVITY_PARAMETERS = [
+    ('Waveguide Width',  'waveguide_width_nm'),
+    ('Coupling Gap',     'ring_coupling_gap_nm'),
+    ('PPLN Period',      'ppln_poling_period_um'),
+    ('Etch Depth',       'etch_depth_nm'),
+    ('Prop Loss',        'prop_loss_db_per_cm'),
+    ('Refractive Index', 'refractive_index'),
+]
+
+MARGIN_COLUMNS = [f'{name}_margin' for name, _ in CHECKS]
+
+
+def histogram_ranges(nominal: NominalDesign, variation: ProcessVariation,
+                     seed: int = 42) -> Dict[str, Tuple[float, float, int]]:
+    """
+    Histogram (low, high, n_bins) for HISTOGRAM_BINS, sized from a pilot
+    batch of PILOT_TRIALS chips sampled at the given variation.
+    """
+    rng = np.random.default_rng([PILOT_STREAM, seed])
+    chips = sample_population(PILOT_TRIALS, nominal, variation, rng)
+    return pilot_ranges(evaluate_population(chips, nominal), HISTOGRAM_BINS)
+
+
+def new_stats(ranges: Dict[str, Tuple[float, float, int]],
+              sample_size: int = 10_000) -> MonteCarloStats:
+    """Empty accumulator configured for the TRIAL_COLUMNS table."""
+    return MonteCarloStats(
+        ranges,
+        group_columns=[column for _, column in SENSITIVITY_PARAMETERS],
+        worst_case_columns=MARGIN_COLUMNS,
+        sample_size=sample_size,
+    )
 
-    @property
-    def all_passed(self) -> bool:
-        return (self.loss_budget[0] and
-                self.wavelength_collision[0] and
-                self.ring_tuning[0] and
-                self.path_timing[0] and
-                self.sfg_phase_matching[0])
+
+def _run_shard(task) -> MonteCarloStats:
+    """Sample, check and reduce one shard, chunk by chunk (runs in a worker)."""
+    n_chips, seed_seq, nominal, variation, ranges, sample_size, chunk_size = task
+    rng = np.random.default_rng(seed_seq)
+    stats = new_stats(ranges, sample_size)
+    for start in range(0, n_chips, chunk_size):
+        chips = sample_population(min(chunk_size, n_chips - start), nominal, variation, rng)
+        stats.add(evaluate_population(chips, nominal))
+    return stats
 
 
 def run_monte_carlo(n_trials: int = 10000, seed: int = 42,
                     nominal: Optional[NominalDesign] = None,
-                    variation: Optional[ProcessVariation] = None) -> List[TrialResult]:
+                    variation: Optional[ProcessVariation] = None,
+                    workers: int = 1,
+                    shard_size: int = 1_000_000,
+                    sample_size: int = 10_000,
+                    chunk_size: int = 100_000) -> MonteCarloStats:
     """
     Run the Monte Carlo process variation analysis.
 
+    Trials are split into shards of shard_size chips. Each shard draws from
+    its own np.random.SeedSequence(seed).spawn() child and is sampled,
+    checked and folded into a MonteCarloStats chunk_size chips at a time, so
+    memory does not grow with n_trials. Partials are merged in shard order:
+    for a given seed, shard_size and chunk_size the result is bit-identical
+    for any worker count. Histogram edges are fixed up front from a pilot
+    batch at the same variation (histogram_ranges). Progress lines show the
+    running yield with its 95% Wilson confidence interval.
+
     Args:
         n_trials: Number of random chip realizations to test
         seed: Random seed for reproducibility
         nominal: Nominal design parameters (uses defaults if None)
         variation: Process variation model (uses defaults if None)
+        workers: Worker processes (1 = run in-process)
+        shard_size: Trials per shard (unit of work and of seeding)
+        sample_size: Leading trials kept per-trial for scatter plots and
+            the tolerance sweep
+        chunk_size: Trials sampled and evaluated per vectorized batch
 
     Returns:
-        List of TrialResult objects, one per trial
+        Merged MonteCarloStats over all trials
     """
     if nominal is None:
         nominal = NominalDesign()
     if variation is None:
         variation = ProcessVariation()
 
-    rng = np.random.default_rng(seed)
-    results = []
+    sizes = [shard_size] * (n_trials // shard_size)
+    if n_trials % shard_size:
+        sizes.append(n_trials % shard_size)
+    starts = np.cumsum([0] + sizes[:-1])
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    ranges = histogram_ranges(nominal, variation, seed)
+    # Only the leading shards need to contribute to the per-trial sample
+    tasks = [(size, child, nominal, variation, ranges,
+              max(0, sample_size - int(start)), chunk_size)
+             for size, child, start in zip(sizes, children, starts)]
+    workers = max(1, min(workers, len(tasks)))
 
     print(f"\nRunning {n_trials:,} Monte Carlo trials...")
     print(f"Seed: {seed}")
     print(f"Parameters varied: 11 (6 geometric/material + 5 component losses)")
+    print(f"Shards: {len(tasks)} x <= {shard_size:,} trials on {workers} worker(s)")
     print()
 
     t_start = time.time()
-    progress_interval = n_trials // 20  # Print progress every 5%
-
-    for i in range(n_trials):
-        # Sample a random chip
-        chip = sample_chip(nominal, variation, rng)
-
-        # Run all checks
-        trial = TrialResult(chip=chip)
-        trial.loss_budget = check_loss_budget(chip, nominal)
-        trial.wavelength_collision = check_wavelength_collision(chip, nominal)
-        trial.ring_tuning = check_ring_resonator_tuning(chip, nominal)
-        trial.path_timing = check_path_timing(chip, nominal)
-        trial.sfg_phase_matching = check_sfg_phase_matching(chip, nominal)
-
-        results.append(trial)
-
-        # Progress indicator
-        if progress_interval > 0 and (i + 1) % progress_interval == 0:
-            pct = (i + 1) / n_trials * 100
-            elapsed = time.time() - t_start
-            rate = (i + 1) / elapsed
-            remaining = (n_trials - i - 1) / rate
-            print(f"  [{pct:5.1f}%] {i+1:,}/{n_trials:,} trials "
-                  f"({elapsed:.1f}s elapsed, ~{remaining:.1f}s remaining)")
+    stats = new_stats(ranges, sample_size)
+
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        completed = pool.imap(_run_shard, tasks) if pool else map(_run_shard, tasks)
+        for partial in completed:
+            stats.merge(partial)
+
+            # Progress indicator
+            if len(tasks) > 1:
+                pct = stats.n_trials / n_trials * 100
+                elapsed = time.time() - t_start
+                remaining = (n_trials - stats.n_trials) * elapsed / stats.n_trials
+                low, high = stats.yield_interval()
+                print(f"  [{pct:5.1f}%] {stats.n_trials:,}/{n_trials:,} trials, "
+                      f"yield {stats.yield_fraction() * 100:.4f}% "
+                      f"[{low * 100:.4f}, {high * 100:.4f}] "
+                      f"({elapsed:.1f}s elapsed, ~{remaining:.1f}s remaining)")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
     elapsed = time.time() - t_start
     print(f"\nCompleted {n_trials:,} trials in {elapsed:.2f}s "
-          f"({n_trials/elapsed:.0f} trials/sec)")
+          f"({n_trials/max(elapsed, 1e-9):.0f} trials/sec)")
+
+    return stats
+
+
+# =============================================================================
+# RARE-EVENT MODE (importance sampling)
+# =============================================================================
+#
+# Plain Monte Carlo needs ~(1.96 / r)^2 / p trials to pin a failure
+# probability p down to a relative 95% half-width r — about 4e8 trials for
+# p = 1e-6 at r = 10%. The rare-event mode instead draws the latent standard
+# normals z (the sample_population() draws, before the +/- 3 sigma clip)
+# from a mixture of Gaussians shifted toward each check's failure region,
+# and weights every trial by the likelihood ratio p(z) / q(z). The checks
+# are deterministic functions of z, so the weighted failure rate is an
+# unbiased estimate of the true one; the clip is applied exactly as usual.
+#
+# The shift for each check comes from the cross-entropy method: move the
+# sampling mean to the weighted mean of the worst elite_fraction of trials,
+# lowering the margin threshold level by level until it reaches 0. A
+# defensive share of the mixture stays at the nominal distribution.
+
+def _check_margin(check, z: np.ndarray, nominal: NominalDesign,
+                  variation: ProcessVariation) -> np.ndarray:
+    _, _, margin = check(chips_from_normals(z, nominal, variation), nominal)
+    return np.broadcast_to(margin, len(z))
+
+
+def _cross_entropy_descend(check, mu: np.ndarray, nominal: NominalDesign,
+                           variation: ProcessVariation, rng: np.random.Generator,
+                           n_per_level: int, elite_fraction: float, max_levels: int,
+                           patience: int) -> Tuple[Optional[np.ndarray], int]:
+    """CE levels from mean mu until the elite threshold reaches margin 0."""
+    best_gamma = np.inf
+    stalled = 0
+    for level in range(1, max_levels + 1):
+        z = rng.standard_normal((n_per_level, len(SAMPLING_PLAN))) + mu
+        margin = _check_margin(check, z, nominal, variation)
+
+        gamma = max(float(np.quantile(margin, elite_fraction)), 0.0)
+        elite = z[margin <= gamma]
+        # Likelihood ratio nominal / current proposal, up to a constant
+        log_w = -elite @ mu
+        w = np.exp(log_w - log_w.max())
+        mu = w @ elite / w.sum()
+
+        if gamma == 0.0:
+            return mu, level * n_per_level
+        if gamma < best_gamma:
+            best_gamma, stalled = gamma, 0
+        else:
+            stalled += 1
+            if stalled >= patience:
+                break
+    return None, level * n_per_level
+
+
+def cross_entropy_shifts(check, nominal: NominalDesign, variation: ProcessVariation,
+                         rng: np.random.Generator, n_per_level: int = 10_000,
+                         elite_fraction: float = 0.1, max_levels: int = 30,
+                         patience: int = 3) -> Tuple[List[np.ndarray], int]:
+    """
+    Cross-entropy mean shifts toward the failure region (margin <= 0) of one
+    check, in the standard-normal space of SAMPLING_PLAN.
+
+    Several checks fail on both sides of nominal (ring detuning and phase
+    mismatch go through abs() / sinc^2), where a single mean shift would
+    average the two lobes back to the origin. The first-level elite is
+    therefore split by the sign of its principal axis and each half is
+    refined separately; halves that end on the same point are merged.
+
+    Returns:
+        (shifts, trials used). shifts is empty if no failure was reached:
+        the elite margin threshold stopped falling above 0 for `patience`
+        levels (e.g. the +/- 3 sigma clip keeps the margin positive).
+    """
+    z = rng.standard_normal((n_per_level, len(SAMPLING_PLAN)))
+    margin = _check_margin(check, z, nominal, variation)
+    elite = z[margin <= max(float(np.quantile(margin, elite_fraction)), 0.0)]
+    axis = np.linalg.eigh(elite.T @ elite)[1][:, -1]
+    side = elite @ axis > 0
+
+    shifts = []
+    used = n_per_level
+    for half in (elite[side], elite[~side]):
+        if len(half) < 10:
+            continue
+        mu, n = _cross_entropy_descend(check, half.mean(axis=0), nominal, variation, rng,
+                                       n_per_level, elite_fraction, max_levels, patience)
+        used += n
+        if mu is not None and all(np.linalg.norm(mu - s) > 0.5 for s in shifts):
+            shifts.append(mu)
+    return shifts, used
+
+
+def _mixture_weights(z: np.ndarray, means: np.ndarray, fractions: np.ndarray) -> np.ndarray:
+    """
+    Likelihood ratio N(0, I) / sum_k fractions[k] * N(means[k], I) at z.
+
+    Uses N(m, I)(z) / N(0, I)(z) = exp(m.z - |m|^2 / 2), in log space.
+    """
+    log_terms = (z @ means.T - 0.5 * np.sum(means ** 2, axis=1)
+                 + np.log(fractions))
+    top = log_terms.max(axis=1)
+    return np.exp(-top - np.log(np.exp(log_terms - top[:, None]).sum(axis=1)))
+
+
+def plain_mc_trials(p_fail: float, rel_half_width: float, z: float = 1.96) -> float:
+    """Plain Monte Carlo trials for a 95% CI of +/- rel_half_width * p_fail."""
+    if p_fail <= 0:
+        return np.inf
+    return (z / rel_half_width) ** 2 * (1 - p_fail) / p_fail
+
+
+@dataclass
+class RareEventResult:
+    """Output of run_rare_event()."""
+    shifts: Dict[str, List[np.ndarray]]      # CE means per check (empty = no failure reached)
+    failures: Dict[str, WeightedRate]        # per check prefix and 'all'
+    n_trials: int                            # importance-sampled trials
+    n_pilot: int                             # cross-entropy trials
+    converged: bool                          # stopping rule met before max_trials
+    target_rel_width: float
+    elapsed_s: float
+
+
+def run_rare_event(seed: int = 42,
+                   nominal: Optional[NominalDesign] = None,
+                   variation: Optional[ProcessVariation] = None,
+                   target_rel_width: float = 0.1,
+                   batch_size: int = 100_000,
+                   max_trials: int = 20_000_000,
+                   defensive_fraction: float = 0.1,
+                   n_per_level: int = 10_000,
+                   min_hits: int = 10) -> RareEventResult:
+    """
+    Estimate per-check and overall failure probabilities by importance
+    sampling, with a sequential stopping rule.
+
+    Batches of batch_size trials are drawn from the mixture of the nominal
+    distribution (defensive_fraction of each batch) and the cross-entropy
+    shift of every check that can fail, split evenly. The run stops once
+    every failure rate that can be non-zero has at least min_hits failing
+    trials and a 95% CI half-width within target_rel_width of its
+    estimate, or after max_trials.
+
+    Args:
+        seed: Random seed for reproducibility
+        nominal: Nominal design parameters (uses defaults if None)
+        variation: Process variation model (uses defaults if None)
+        target_rel_width: Stopping target for CI half-width / estimate
+        batch_size: Trials per batch (the stopping rule is checked per batch)
+        max_trials: Cap on importance-sampled trials
+        defensive_fraction: Share of each batch drawn from the nominal model
+        n_per_level: Trials per cross-entropy level
+        min_hits: Failing trials required before a rate may stop the run
+
+    Returns:
+        RareEventResult with a WeightedRate per check and for 'all'
+    """
+    if nominal is None:
+        nominal = NominalDesign()
+    if variation is None:
+        variation = ProcessVariation()
+    rng = np.random.default_rng(seed)
+
+    print(f"\nRare-event mode: cross-entropy shifts ({n_per_level:,} trials/level)")
+    t_start = time.time()
+    shifts = {}
+    n_pilot = 0
+    for name, check in CHECKS:
+        shifts[name], used = cross_entropy_shifts(check, nominal, variation, rng, n_per_level)
+        n_pilot += used
+        if not shifts[name]:
+            print(f"  {name:<22} no failure reached (rate 0 within the 3-sigma clip)")
+        else:
+            norms = ", ".join(f"{np.linalg.norm(mu):.2f}" for mu in shifts[name])
+            print(f"  {name:<22} shift |mu| = {norms} sigma")
+
+    reachable = [name for name, shift in shifts.items() if shift]
+    means = np.array([np.zeros(len(SAMPLING_PLAN))]
+                     + [mu for name in reachable for mu in shifts[name]])
+    # Deterministic split of every batch over the mixture components
+    counts = np.full(len(means), int((1 - defensive_fraction) * batch_size) // max(len(means) - 1, 1))
+    counts[0] = batch_size - counts[1:].sum()
+    fractions = counts / batch_size
+
+    failures = {name: WeightedRate() for name, _ in CHECKS}
+    failures['all'] = WeightedRate()
+    tracked = reachable + ['all'] if reachable else []
+
+    print(f"\nImportance sampling: {len(means)} mixture components, "
+          f"batches of {batch_size:,}, stop at +/-{target_rel_width:.0%} (95% CI)")
+    n_trials = 0
+    converged = False
+    while n_trials < max_trials:
+        z = np.concatenate([rng.standard_normal((count, len(SAMPLING_PLAN))) + mean
+                            for count, mean in zip(counts, means)])
+        weights = _mixture_weights(z, means, fractions)
+        table = evaluate_population(chips_from_normals(z, nominal, variation), nominal)
+        for name, _ in CHECKS:
+            failures[name].add(weights, ~table[f'{name}_passed'])
+        failures['all'].add(weights, ~table['all_passed'])
+        n_trials += batch_size
+
+        converged = all(failures[name].hits >= min_hits
+                        and failures[name].relative_half_width() <= target_rel_width
+                        for name in tracked)
+        overall = failures['all']
+        print(f"  {n_trials:>12,} trials: P(fail) = {overall.estimate:.3e} "
+              f"+/-{overall.relative_half_width():.1%}, "
+              f"worst tracked +/-{max((failures[n].relative_half_width() for n in tracked), default=0):.1%}")
+        if converged:
+            break
+
+    elapsed = time.time() - t_start
+    print(f"\n{'Stopping rule met' if converged else 'Reached max_trials'} after "
+          f"{n_trials:,} weighted + {n_pilot:,} pilot trials in {elapsed:.2f}s")
+
+    return RareEventResult(shifts, failures, n_trials, n_pilot, converged,
+                           target_rel_width, elapsed)
+
+
+def print_rare_event_summary(result: RareEventResult) -> None:
+    """Print per-check failure probabilities and the plain-MC trial equivalent."""
+    r = result.target_rel_width
+    total = result.n_trials + result.n_pilot
+
+    print()
+    print("=" * 72)
+    print("  RARE-EVENT FAILURE PROBABILITIES (importance sampling)")
+    print("=" * 72)
+    print(f"  {'CHECK':<22} {'P(fail)':>10}  {'95% CI':>23}  {'ESS':>8}  {'plain MC':>9}")
+    print(f"  {'-'*22} {'-'*10}  {'-'*23}  {'-'*8}  {'-'*9}")
+    for name in [name for name, _ in CHECKS] + ['all']:
+        rate = result.failures[name]
+        if name != 'all' and not result.shifts[name]:
+            print(f"  {name:<22} {0.0:>10.2e}  {'(no failure reachable)':>23}")
+            continue
+        low, high = rate.interval()
+        print(f"  {name:<22} {rate.estimate:>10.3e}  [{low:.3e}, {high:.3e}]  "
+              f"{rate.effective_sample_size:>8.0f}  {plain_mc_trials(rate.estimate, r):>9.2e}")
+
+    overall = result.failures['all']
+    plain = max((plain_mc_trials(result.failures[name].estimate, r)
+                 for name in result.failures if result.failures[name].hits), default=0.0)
+    print(f"\n  OVERALL YIELD: {(1 - overall.estimate) * 100:.6f}%")
+    print(f"  Trials used:   {total:,} ({result.n_pilot:,} cross-entropy pilot)")
+    if plain > total:
+        print(f"  Plain MC would need ~{plain:.2e} trials for the same +/-{r:.0%} "
+              f"precision ({plain / total:.0f}x more)")
+    if not result.converged:
+        print(f"  WARNING: max_trials reached before the +/-{r:.0%} target")
+    print(f"\n{'='*72}")
+
+
+# =============================================================================
+# GLOBAL SENSITIVITY (Sobol indices + polynomial-chaos surrogate)
+# =============================================================================
+
+def sensitivity_problem(nominal: NominalDesign,
+                        variation: ProcessVariation) -> SensitivityProblem:
+    """
+    The five check margins as a function of the 11 latent draws, for
+    mc_sensitivity. The +/- 3 sigma clip is applied by the problem, so a
+    scaled sigma keeps its own 3-sigma bounds.
+    """
+    def margins(z: np.ndarray) -> Dict[str, np.ndarray]:
+        chips = chips_from_normals(z, nominal, variation, clip=None)
+        return {f'{name}_margin': np.broadcast_to(check(chips, nominal)[2], len(z))
+                for name, check in CHECKS}
+
+    return SensitivityProblem(PARAMETER_COLUMNS, margins, clip=3.0)
+
+
+def run_sensitivity(nominal: NominalDesign, variation: ProcessVariation,
+                    n_base: int = 20_000, seed: int = 42,
+                    what_if: Optional[Dict[str, float]] = None) -> PolynomialChaos:
+    """Print Sobol indices and single-sigma-halved what-if yields; returns the surrogate."""
+    problem = sensitivity_problem(nominal, variation)
 
-    return results
+    t_start = time.time()
+    print_sobol(sobol_indices(problem, n_base, seed), width=24)
+    surrogate = PolynomialChaos.fit(problem, seed=seed)
+    print_what_if(surrogate, 0.5, width=24, extra=what_if)
+    print(f"\n  Sensitivity analysis done in {time.time() - t_start:.1f}s")
+    return surrogate
 
 
 # =============================================================================
 # ANALYSIS & REPORTING
 # =============================================================================
 
-def analyze_results(results: List[TrialResult], nominal: NominalDesign) -> Dict:
+def analyze_results(stats: MonteCarloStats, nominal: NominalDesign) -> Dict:
     """
-    Analyze Monte Carlo results and compute summary statistics.
+    Analyze Monte Carlo results (the run_monte_carlo() stats) and compute
+    summary statistics.
+
+    Everything is computed from the constant-size accumulator: yields with
+    confidence intervals, margins, quantiles, histograms, worst-case chips
+    and sensitivity correlations cover every trial. Only the scatter data
+    and the tolerance sweep use the retained sample of the first
+    stats.sample_size trials.
     """
-    n = len(results)
-
-    # Per-check pass counts
-    loss_pass = sum(1 for r in results if r.loss_budget[0])
-    collision_pass = sum(1 for r in results if r.wavelength_collision[0])
-    ring_pass = sum(1 for r in results if r.ring_tuning[0])
-    timing_pass = sum(1 for r in results if r.path_timing[0])
-    sfg_pass = sum(1 for r in results if r.sfg_phase_matching[0])
-    all_pass = sum(1 for r in results if r.all_passed)
-
-    # Extract metric arrays
-    loss_margins = np.array([r.loss_budget[2] for r in results])
-    collision_margins = np.array([r.wavelength_collision[2] for r in results])
-    ring_margins = np.array([r.ring_tuning[2] for r in results])
-    timing_margins = np.array([r.path_timing[2] for r in results])
-    sfg_margins = np.array([r.sfg_phase_matching[2] for r in results])
-
-    loss_metrics = np.array([r.loss_budget[1] for r in results])
-    ring_shifts = np.array([r.ring_tuning[1] for r in results])
-    timing_skews = np.array([r.path_timing[1] for r in results])
-    sfg_penalties = np.array([r.sfg_phase_matching[1] for r in results])
+    moments = stats.moments
+    sample = stats.sample
 
     # Extract parameter arrays for sensitivity analysis
-    wg_widths = np.array([r.chip.waveguide_width_nm for r in results])
-    gaps = np.array([r.chip.ring_coupling_gap_nm for r in results])
-    ppln_periods = np.array([r.chip.ppln_poling_period_um for r in results])
-    etch_depths = np.array([r.chip.etch_depth_nm for r in results])
-    prop_losses = np.array([r.chip.prop_loss_db_per_cm for r in results])
-    ref_indices = np.array([r.chip.refractive_index for r in results])
-    pass_fail = np.array([1 if r.all_passed else 0 for r in results])
+    wg_widths = sample['waveguide_width_nm']
+    gaps = sample['ring_coupling_gap_nm']
+    ppln_periods = sample['ppln_poling_period_um']
+    etch_depths = sample['etch_depth_nm']
+    prop_losses = sample['prop_loss_db_per_cm']
+    ref_indices = sample['refractive_index']
+    pass_fail = sample['all_passed'].astype(int)
+    n = len(pass_fail)
 
     analysis = {
-        'n_trials': n,
+        'n_trials': stats.n_trials,
+        'n_sample': n,
 
         # Yields
-        'yield_overall': all_pass / n * 100,
-        'yield_loss_budget': loss_pass / n * 100,
-        'yield_collision': collision_pass / n * 100,
-        'yield_ring_tuning': ring_pass / n * 100,
-        'yield_timing': timing_pass / n * 100,
-        'yield_sfg_phase': sfg_pass / n * 100,
+        'yield_overall': stats.yield_fraction('all') * 100,
+        'yield_loss_budget': stats.yield_fraction('loss_budget') * 100,
+        'yield_collision': stats.yield_fraction('wavelength_collision') * 100,
+        'yield_ring_tuning': stats.yield_fraction('ring_tuning') * 100,
+        'yield_timing': stats.yield_fraction('path_timing') * 100,
+        'yield_sfg_phase': stats.yield_fraction('sfg_phase_matching') * 100,
+        'yield_overall_ci': tuple(100 * y for y in stats.yield_interval('all')),
 
         # Margins
-        'loss_margin_mean': np.mean(loss_margins),
-        'loss_margin_min': np.min(loss_margins),
-        'loss_margin_std': np.std(loss_margins),
-        'collision_margin_mean': np.mean(collision_margins),
-        'collision_margin_min': np.min(collision_margins),
-        'ring_margin_mean': np.mean(ring_margins),
-        'ring_margin_min': np.min(ring_margins),
-        'timing_margin_mean': np.mean(timing_margins),
-        'timing_margin_min': np.min(timing_margins),
-        'sfg_margin_mean': np.mean(sfg_margins),
-        'sfg_margin_min': np.min(sfg_margins),
-
-        # Metric distributions
-        'loss_total_db': loss_metrics,
-        'ring_shift_nm': ring_shifts,
-        'timing_skew_pct': timing_skews,
-        'sfg_penalty_db': sfg_penalties,
-        'loss_margins': loss_margins,
-        'collision_margins': collision_margins,
-        'ring_margins': ring_margins,
-        'timing_margins': timing_margins,
-        'sfg_margins': sfg_margins,
-
-        # Parameter arrays (for sensitivity)
+        'loss_margin_mean': moments['loss_budget_margin'].mean,
+        'loss_margin_min': moments['loss_budget_margin'].minimum,
+        'loss_margin_std': moments['loss_budget_margin'].std,
+        'collision_margin_mean': moments['wavelength_collision_margin'].mean,
+        'collision_margin_min': moments['wavelength_collision_margin'].minimum,
+        'ring_margin_mean': moments['ring_tuning_margin'].mean,
+        'ring_margin_min': moments['ring_tuning_margin'].minimum,
+        'timing_margin_mean': moments['path_timing_margin'].mean,
+        'timing_margin_min': moments['path_timing_margin'].minimum,
+        'sfg_margin_mean': moments['sfg_phase_matching_margin'].mean,
+        'sfg_margin_min': moments['sfg_phase_matching_margin'].minimum,
+        'margin_p001': {column: stats.quantile(column, 0.001) for column in MARGIN_COLUMNS},
+        'worst_case': stats.worst_case,
+        'weakest_check': min((name for name, _ in CHECKS), key=stats.yield_fraction),
+
+        # Metric / margin distributions over all trials
+        'moments': moments,
+        'histograms': stats.histograms,
+        'out_of_range': stats.out_of_range(),
+
+        # Per-trial sample (for scatter plots and sensitivity)
+        'loss_margins': sample['loss_budget_margin'],
         'wg_widths': wg_widths,
         'gaps': gaps,
         'ppln_periods': ppln_periods,
@@ -814,18 +1292,12 @@ def analyze_results(results: List[TrialResult], nominal: NominalDesign) -> Dict:
     # Compute correlation between each parameter and overall pass/fail
     # Also compute "yield impact" — how much does tightening each parameter
     # by 1 sigma improve yield?
-    param_names = ['Waveguide Width', 'Coupling Gap', 'PPLN Period',
-                   'Etch Depth', 'Prop Loss', 'Refractive Index']
+    param_names = [name for name, _ in SENSITIVITY_PARAMETERS]
     param_arrays = [wg_widths, gaps, ppln_periods, etch_depths, prop_losses, ref_indices]
 
-    correlations = {}
-    for name, arr in zip(param_names, param_arrays):
-        # Point-biserial correlation with pass/fail
-        if np.std(arr) > 0 and np.std(pass_fail) > 0:
-            corr = np.corrcoef(arr, pass_fail)[0, 1]
-        else:
-            corr = 0.0
-        correlations[name] = corr
+    # Point-biserial correlation with pass/fail, from pass/fail-split moments
+    correlations = {name: stats.correlation_with_yield(column)
+                    for name, column in SENSITIVITY_PARAMETERS}
 
     # Rank parameters by |correlation| with yield
     sensitivity_ranking = sorted(correlations.items(), key=lambda x: abs(x[1]), reverse=True)
@@ -895,6 +1367,8 @@ def print_summary(analysis: Dict, nominal: NominalDesign) -> None:
     overall = analysis['yield_overall']
     print(f"\n  {'='*68}")
     print(f"  OVERALL YIELD (all checks pass): {overall:.2f}%")
+    low, high = analysis['yield_overall_ci']
+    print(f"  95% confidence interval:         [{low:.2f}%, {high:.2f}%]")
 
     if overall >= 99:
         verdict = "EXCELLENT — production-ready process margins"
@@ -938,6 +1412,19 @@ def print_summary(analysis: Dict, nominal: NominalDesign) -> None:
     print(f"  Timing skew worst margin:        {analysis['timing_margin_min']:+.2f} ps")
     print(f"  SFG phase match worst margin:    {analysis['sfg_margin_min']:+.2f} dB")
 
+    weakest = analysis['weakest_check']
+    worst_chip = analysis['worst_case'][f'{weakest}_margin']
+    print(f"\n  WORST-CASE CHIP ({weakest}, margin {worst_chip[f'{weakest}_margin']:+.3f})")
+    print(f"  {'-'*68}")
+    for name in PARAMETER_COLUMNS:
+        print(f"  {name:<30} {worst_chip[name]:>12.4f}")
+
+    if analysis['out_of_range']:
+        print(f"\n  WARNING: values outside the pilot-sized histogram ranges")
+        print(f"  (not plotted):")
+        for column, (under, over) in analysis['out_of_range'].items():
+            print(f"  {column:<30} {under:>10,} below  {over:>10,} above")
+
     print(f"\n{'='*72}")
 
 
@@ -995,24 +1482,28 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     # =========================================================================
     fig, axes = plt.subplots(2, 3, figsize=(14, 8))
 
+    hists = analysis['histograms']
     margin_data = [
-        ('Loss Budget Margin (dB)', analysis['loss_margins'], 0, 'dB'),
-        ('Collision Margin (nm)', analysis['collision_margins'], 0, 'nm'),
-        ('Ring Tuning Margin (nm)', analysis['ring_margins'], 0, 'nm'),
-        ('Timing Margin (ps)', analysis['timing_margins'], 0, 'ps'),
-        ('SFG Phase Margin (dB)', analysis['sfg_margins'], 0, 'dB'),
+        ('Loss Budget Margin (dB)', hists['loss_budget_margin'], 0, 'dB'),
+        ('Collision Margin (nm)', hists['wavelength_collision_margin'], 0, 'nm'),
+        ('Ring Tuning Margin (nm)', hists['ring_tuning_margin'], 0, 'nm'),
+        ('Timing Margin (ps)', hists['path_timing_margin'], 0, 'ps'),
+        ('SFG Phase Margin (dB)', hists['sfg_phase_matching_margin'], 0, 'dB'),
     ]
 
-    for idx, (title, data, threshold, unit) in enumerate(margin_data):
+    for idx, (title, hist, threshold, unit) in enumerate(margin_data):
         row, col = idx // 3, idx % 3
         ax = axes[row][col]
 
-        ax.hist(data, bins=80, color='#3498db', edgecolor='none', alpha=0.8)
+        ax.stairs(hist.counts, hist.edges, fill=True, color='#3498db', alpha=0.8)
         ax.axvline(x=threshold, color='red', linewidth=2, linestyle='--', label='Pass/Fail')
         ax.set_xlabel(f'Margin ({unit})')
         ax.set_ylabel('Count')
         ax.set_title(title, fontsize=10)
         ax.legend(fontsize=8)
+        if hist.underflow or hist.overflow:
+            ax.text(0.02, 0.95, f'{hist.underflow:,} below / {hist.overflow:,} above range',
+                    transform=ax.transAxes, fontsize=7, va='top', color='red')
 
         # Shade the fail region
         xlims = ax.get_xlim()
@@ -1073,11 +1564,12 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     # =========================================================================
     fig, ax = plt.subplots(figsize=(10, 5))
 
-    loss_data = analysis['loss_total_db']
+    loss_hist = analysis['histograms']['loss_budget_metric']
+    loss_stats = analysis['moments']['loss_budget_metric']
     nominal_loss = 21.30  # From validation report
 
-    ax.hist(loss_data, bins=80, color='#9b59b6', edgecolor='none', alpha=0.8,
-            label='Monte Carlo distribution')
+    ax.stairs(loss_hist.counts, loss_hist.edges, fill=True, color='#9b59b6', alpha=0.8,
+              label='Monte Carlo distribution')
     ax.axvline(x=nominal_loss, color='blue', linewidth=2, linestyle='-',
                label=f'Nominal ({nominal_loss:.1f} dB)')
 
@@ -1089,7 +1581,7 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     ax.set_xlabel('Total Optical Loss (dB)')
     ax.set_ylabel('Count')
     ax.set_title(f'Total Loss Distribution ({analysis["n_trials"]:,} trials)\n'
-                 f'Mean: {np.mean(loss_data):.2f} dB, Std: {np.std(loss_data):.2f} dB')
+                 f'Mean: {loss_stats.mean:.2f} dB, Std: {loss_stats.std:.2f} dB')
     ax.legend()
 
     plt.tight_layout()
@@ -1102,10 +1594,11 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     # =========================================================================
     fig, ax = plt.subplots(figsize=(10, 5))
 
-    ring_data = analysis['ring_shift_nm']
+    ring_hist = analysis['histograms']['ring_tuning_metric']
+    ring_stats = analysis['moments']['ring_tuning_metric']
     thermal_limit = 5.0  # nm thermal tuning range
 
-    ax.hist(ring_data, bins=80, color='#e67e22', edgecolor='none', alpha=0.8)
+    ax.stairs(ring_hist.counts, ring_hist.edges, fill=True, color='#e67e22', alpha=0.8)
     ax.axvline(x=thermal_limit, color='red', linewidth=2, linestyle='--',
                label=f'Thermal tuning limit ({thermal_limit} nm)')
     ax.axvline(x=0, color='blue', linewidth=1, linestyle='-',
@@ -1114,8 +1607,8 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     ax.set_xlabel('Ring Resonance Wavelength Shift (nm)')
     ax.set_ylabel('Count')
     ax.set_title(f'Ring Resonator Detuning Distribution\n'
-                 f'Mean: {np.mean(ring_data):.3f} nm, '
-                 f'Max: {np.max(ring_data):.3f} nm, '
+                 f'Mean: {ring_stats.mean:.3f} nm, '
+                 f'Max: {ring_stats.maximum:.3f} nm, '
                  f'Thermal limit: {thermal_limit} nm')
     ax.legend()
 
@@ -1129,9 +1622,10 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     # =========================================================================
     fig, ax = plt.subplots(figsize=(10, 5))
 
-    sfg_data = analysis['sfg_penalty_db']
+    sfg_hist = analysis['histograms']['sfg_phase_matching_metric']
+    sfg_stats = analysis['moments']['sfg_phase_matching_metric']
 
-    ax.hist(sfg_data, bins=80, color='#1abc9c', edgecolor='none', alpha=0.8)
+    ax.stairs(sfg_hist.counts, sfg_hist.edges, fill=True, color='#1abc9c', alpha=0.8)
     ax.axvline(x=3.0, color='red', linewidth=2, linestyle='--',
                label='3 dB penalty limit')
     ax.axvline(x=0, color='blue', linewidth=1, linestyle='-',
@@ -1140,8 +1634,8 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
     ax.set_xlabel('SFG Efficiency Penalty (dB)')
     ax.set_ylabel('Count')
     ax.set_title(f'SFG Phase Matching Efficiency Loss\n'
-                 f'Mean penalty: {np.mean(sfg_data):.3f} dB, '
-                 f'Max penalty: {np.max(sfg_data):.3f} dB')
+                 f'Mean penalty: {sfg_stats.mean:.3f} dB, '
+                 f'Max penalty: {sfg_stats.maximum:.3f} dB')
     ax.legend()
 
     plt.tight_layout()
@@ -1200,6 +1694,25 @@ def generate_plots(analysis: Dict, output_dir: str) -> None:
 # =============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo yield analysis, 9x9 N-Radix chip")
+    parser.add_argument("--trials", type=int, default=10_000, help="Number of trials")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--shard-size", type=int, default=1_000_000, help="Trials per shard")
+    parser.add_argument("--sigma-scale", type=float, default=1.0,
+                        help="Scale every process-variation sigma (e.g. 0.5 = tighter fab)")
+    parser.add_argument("--rare-event", action="store_true",
+                        help="Importance-sampled failure probabilities with early stopping")
+    parser.add_argument("--target-rel-width", type=float, default=0.1,
+                        help="Rare-event stopping target: 95%% CI half-width / estimate")
+    parser.add_argument("--max-trials", type=int, default=20_000_000,
+                        help="Rare-event cap on importance-sampled trials")
+    parser.add_argument("--sensitivity", action="store_true",
+                        help="Sobol indices and surrogate what-if yields instead of MC")
+    parser.add_argument("--what-if", type=str, default=None,
+                        help="Extra surrogate query, e.g. 'refractive_index=0.5,etch_depth_nm=0.8'")
+    args = parser.parse_args()
+
     print("=" * 72)
     print("  MONTE CARLO PROCESS VARIATION ANALYSIS")
     print("  Monolithic 9x9 N-Radix Chip — TFLN Foundry Tolerances")
@@ -1207,10 +1720,11 @@ def main():
     print("=" * 72)
 
     # --- Configuration ---
-    N_TRIALS = 10_000
-    SEED = 42
+    N_TRIALS = args.trials
+    SEED = args.seed
     nominal = NominalDesign()
-    variation = ProcessVariation()
+    variation = ProcessVariation(**{f.name: getattr(ProcessVariation, f.name) * args.sigma_scale
+                                    for f in fields(ProcessVariation)})
 
     # --- Print parameter table ---
     print("\n  NOMINAL DESIGN PARAMETERS:")
@@ -1232,12 +1746,29 @@ def main():
     print(f"  {'AWG demux':<30} {nominal.awg_loss_db:>10.1f} +/- {variation.awg_loss_sigma_db:.1f} dB")
     print(f"  {'Edge coupling':<30} {nominal.edge_coupling_loss_db:>10.1f} +/- {variation.coupling_loss_sigma_db:.1f} dB")
 
+    if args.sensitivity:
+        what_if = None
+        if args.what_if:
+            try:
+                what_if = parse_what_if(args.what_if, PARAMETER_COLUMNS)
+            except ValueError as e:
+                parser.error(f"--what-if: {e}")
+        return run_sensitivity(nominal, variation, seed=SEED, what_if=what_if)
+
+    if args.rare_event:
+        result = run_rare_event(SEED, nominal, variation, args.target_rel_width,
+                                max_trials=args.max_trials)
+        print_rare_event_summary(result)
+        return result
+
     # --- Run Monte Carlo ---
     results = run_monte_carlo(
         n_trials=N_TRIALS,
         seed=SEED,
         nominal=nominal,
         variation=variation,
+        workers=args.workers,
+        shard_size=args.shard_size,
     )
 
     # --- Analyze ---
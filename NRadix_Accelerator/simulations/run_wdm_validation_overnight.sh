@@ -5,8 +5,8 @@
 # Runs WDM simulations using OpenMP for parallelism.
 # Designed to run overnight while you sleep.
 #
-# Note: MPI is unavailable with Python 3.13, so we use OpenMP threading instead.
-# The OMP_NUM_THREADS environment variable controls the number of threads.
+# Scripts run through fdtd_parallel.py, which sets OpenMP threads from
+# OMP_NUM_THREADS, picks the chunk decomposition and logs timesteps/s.
 #
 # Usage: ./run_wdm_validation_overnight.sh
 #
@@ -48,7 +48,7 @@ if ! python3 -c "import meep" 2>/dev/null; then
 fi
 echo "Meep found!" | tee -a "$LOG_FILE"
 
-# Set up OpenMP for parallelism (MPI unavailable with Python 3.13)
+# Set up OpenMP for parallelism
 export OMP_NUM_THREADS=$NUM_CORES
 echo "OpenMP threads: $OMP_NUM_THREADS" | tee -a "$LOG_FILE"
 
@@ -68,7 +68,7 @@ echo "Started: $(date)" | tee -a "$LOG_FILE"
 cd "$SCRIPT_DIR"
 
 echo "Running with OpenMP ($OMP_NUM_THREADS threads)..." | tee -a "$LOG_FILE"
-$PYTHON wdm_waveguide_test.py 2>&1 | tee -a "$LOG_FILE"
+$PYTHON fdtd_parallel.py wdm_waveguide_test.py 2>&1 | tee -a "$LOG_FILE"
 
 WG_EXIT=$?
 echo "" | tee -a "$LOG_FILE"
@@ -90,7 +90,7 @@ echo "=================================================" | tee -a "$LOG_FILE"
 echo "Started: $(date)" | tee -a "$LOG_FILE"
 
 echo "Running with OpenMP ($OMP_NUM_THREADS threads)..." | tee -a "$LOG_FILE"
-$PYTHON wdm_3x3_array_test.py 2>&1 | tee -a "$LOG_FILE"
+$PYTHON fdtd_parallel.py wdm_3x3_array_test.py 2>&1 | tee -a "$LOG_FILE"
 
 ARRAY_EXIT=$?
 echo "" | tee -a "$LOG_FILE"
@@ -0,0 +1,86 @@
+"""Tests for batched broadband excitation in fdtd_broadband."""
+import numpy as np
+import pytest
+
+from fdtd_broadband import Band, TransferMatrix
+
+TERNARY = {'RED': 1.55, 'GREEN': 1.216, 'BLUE': 1.0}
+AWG = {'SFG_RB': 0.608, 'SFG_RG': 0.681, 'BLUE': 1.0, 'GREEN': 1.216, 'RED': 1.55}
+
+
+@pytest.mark.parametrize("wavelengths", [TERNARY, AWG])
+@pytest.mark.parametrize("edge_power", [1e-2, 1e-3, 1e-5])
+def test_outermost_channel_gets_edge_power(wavelengths, edge_power):
+    band = Band.covering(wavelengths, edge_power=edge_power)
+    f = 1.0 / np.array(list(wavelengths.values()))
+    assert band.source_power(f.min()) == pytest.approx(edge_power, rel=1e-9)
+    assert band.source_power(f.max()) == pytest.approx(edge_power, rel=1e-9)
+    assert band.source_power(band.fcen) == pytest.approx(1.0)
+    # inner channels get more power than the edges
+    assert all(band.source_power(x) >= edge_power * (1 - 1e-9) for x in f)
+
+
+@pytest.mark.parametrize("wavelengths", [TERNARY, AWG])
+def test_every_channel_frequency_is_sampled_exactly(wavelengths):
+    band = Band.covering(wavelengths, nfreq=37)
+    for name, wvl in wavelengths.items():
+        assert np.any(band.frequencies == 1.0 / wvl), name
+        assert band.frequencies[band.index_of(wvl)] == 1.0 / wvl
+    spacing = (band.frequencies[-1] - band.frequencies[0]) / 36
+    assert np.all(np.diff(band.frequencies) > 1e-6 * spacing)
+    assert 37 <= len(band.frequencies) <= 37 + len(wavelengths)
+
+
+def _spectra(freqs):
+    return {'through': 0.5 + 0.4 * np.sin(7 * freqs), 'cross': 0.5 - 0.4 * np.sin(7 * freqs)}
+
+
+def test_from_spectra_reads_exact_channel_values():
+    band = Band.covering(TERNARY)
+    spectra = _spectra(band.frequencies)
+    transfer = TransferMatrix.from_spectra(band.frequencies, spectra, TERNARY)
+    assert transfer.ports == ['through', 'cross']
+    assert transfer.names == list(TERNARY)
+    np.testing.assert_allclose(transfer.wavelengths, list(TERNARY.values()))
+    for name, wvl in TERNARY.items():
+        i = band.index_of(wvl)
+        assert transfer.column(name) == {port: spectra[port][i] for port in spectra}
+
+
+def test_from_spectra_is_independent_of_frequency_order():
+    band = Band.covering(AWG)
+    freqs = band.frequencies
+    spectra = {'Ch0': np.cos(3 * freqs), 'Ch1': freqs ** 2}
+    ascending = TransferMatrix.from_spectra(freqs, spectra, AWG)
+
+    order = np.random.default_rng(0).permutation(len(freqs))
+    shuffled = TransferMatrix.from_spectra(freqs[order], {k: v[order] for k, v in spectra.items()}, AWG)
+    descending = TransferMatrix.from_spectra(freqs[::-1], {k: v[::-1] for k, v in spectra.items()}, AWG)
+    np.testing.assert_array_equal(shuffled.power, ascending.power)
+    np.testing.assert_array_equal(descending.power, ascending.power)
+
+
+def test_concat_of_per_wavelength_runs_equals_batched():
+    band = Band.covering(TERNARY)
+    batched = TransferMatrix.from_spectra(band.frequencies, _spectra(band.frequencies), TERNARY)
+
+    per_wavelength = []
+    for name, wvl in TERNARY.items():
+        # a narrowband run: its own grid, centred on the channel
+        freqs = np.linspace(0.85 / wvl, 1.15 / wvl, 51)
+        per_wavelength.append(TransferMatrix.from_spectra(freqs, _spectra(freqs), {name: wvl}))
+    joined = TransferMatrix.concat(per_wavelength)
+
+    assert joined.names == batched.names
+    assert joined.ports == batched.ports
+    np.testing.assert_allclose(joined.power, batched.power, rtol=1e-12)
+    assert joined.max_difference(batched) < 1e-12
+    assert (batched.runs, batched.baseline_runs) == (1, 3)
+    assert (joined.runs, joined.baseline_runs) == (3, 3)
+
+
+def test_routed_picks_the_strongest_port_per_wavelength():
+    transfer = TransferMatrix(ports=['Ch0', 'Ch1', 'Ch2'], names=['A', 'B'],
+                              wavelengths=np.array([1.0, 1.5]),
+                              power=np.array([[0.1, 0.7], [0.8, 0.2], [0.05, 0.1]]))
+    assert transfer.routed() == {'A': ('Ch1', 0.8), 'B': ('Ch0', 0.7)}
@@ -0,0 +1,118 @@
+"""Tests for the content-addressed FDTD result cache in fdtd_cache."""
+import functools
+import os
+
+import numpy as np
+import pytest
+
+from fdtd_cache import FDTDCache, NullCache, canonical, simulation_spec, spec_digest
+
+SCALE = 2.0
+
+
+def spec(resolution=20, **extra):
+    return simulation_spec({"resolution": resolution, "cell_size": (16.0, 8.0, 0.0)},
+                           run={"until_after_sources": 200}, extra=extra)
+
+
+def arrays():
+    rng = np.random.default_rng(0)
+    return {
+        "flux": rng.standard_normal(100),
+        "field": (rng.standard_normal((8, 8)) + 1j * rng.standard_normal((8, 8))).astype(np.complex64),
+        "counts": np.arange(5, dtype=np.int16),
+        "scalar": np.float32(0.25),
+    }
+
+
+def test_put_then_get(tmp_path):
+    cache = FDTDCache(tmp_path)
+    assert cache.get(spec()) is None
+    cache.put(spec(), arrays())
+    got = cache.get(spec())
+    assert set(got) == set(arrays())
+    assert (cache.hits, cache.misses, cache.last_hit) == (1, 1, True)
+    assert cache.get(spec(resolution=40)) is None
+    assert not cache.last_hit
+
+
+def test_dtype_shape_and_bytes_survive_a_round_trip(tmp_path):
+    cache = FDTDCache(tmp_path)
+    fresh = cache.fetch(spec(), arrays)
+    warm = FDTDCache(tmp_path).get(spec())
+    for name, value in arrays().items():
+        value = np.asarray(value)
+        for got in (fresh[name], warm[name]):
+            assert got.dtype == value.dtype, name
+            assert got.shape == value.shape, name
+            assert got.tobytes() == value.tobytes(), name
+
+
+def test_fetch_computes_once(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return arrays()
+
+    cache = FDTDCache(tmp_path)
+    cache.fetch(spec(), compute)
+    cache.fetch(spec(), compute)
+    assert len(calls) == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = FDTDCache(tmp_path, max_bytes=10**9)
+    paths = [cache.put(spec(resolution=r), arrays()) for r in (10, 20, 30)]
+    for age, path in enumerate(paths):
+        os.utime(path, (1_000_000 + age, 1_000_000 + age))
+    cache.get(spec(resolution=10))          # a hit makes the oldest entry the newest
+
+    cache.max_bytes = sum(p.stat().st_size for p in paths) - 1   # one entry too many
+    removed = cache.evict()
+    assert removed == [paths[1]]
+    assert cache.get(spec(resolution=20)) is None
+    assert cache.get(spec(resolution=10)) is not None
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+def test_null_cache_never_stores(tmp_path):
+    cache = NullCache()
+    assert cache.put(spec(), arrays()) is None
+    assert cache.get(spec()) is None
+    assert cache.fetch(spec(), arrays)["counts"].dtype == np.int16
+
+
+def _amplitude(factor):
+    return lambda t: factor * t
+
+
+def _scaled(t):
+    return SCALE * t
+
+
+def _power(t, exponent=2):
+    return t ** exponent
+
+
+def key(obj):
+    return spec_digest(canonical({"amplitude": obj}))
+
+
+def test_distinct_lambdas_and_closures_get_distinct_keys():
+    assert key(lambda t: t) != key(lambda t: 2 * t)
+    assert key(_amplitude(1.0)) != key(_amplitude(2.0))
+    assert key(_amplitude(1.0)) == key(_amplitude(1.0))
+    assert key(functools.partial(_power, exponent=2)) != key(functools.partial(_power, exponent=3))
+
+
+def test_function_key_follows_defaults_and_globals(monkeypatch):
+    before = key(_scaled)
+    monkeypatch.setitem(globals(), "SCALE", 3.0)
+    assert key(_scaled) != before
+
+    def power(t, exponent=2):
+        return t ** exponent
+    first = key(power)
+    power.__defaults__ = (3,)
+    assert key(power) != first
@@ -0,0 +1,126 @@
+"""Tests for the energy-decay stop condition in fdtd_stop."""
+import pytest
+
+from fdtd_stop import DecayStop
+
+
+class FakeFields:
+    def __init__(self, last_source_time):
+        self._last_source_time = last_source_time
+
+    def last_source_time(self):
+        return self._last_source_time
+
+
+class FakeSim:
+    """Steps time by dt; field energy follows energy(t)."""
+
+    def __init__(self, energy, dt=1.0, last_source_time=0.0):
+        self.t = 0.0
+        self.dt = dt
+        self.energy = energy
+        self.fields = FakeFields(last_source_time)
+
+    def meep_time(self):
+        return self.t
+
+    def field_energy_in_box(self, center=None, size=None):
+        return self.energy(self.t)
+
+    def run_until(self, stop, limit=10_000):
+        while not stop(self):
+            self.t += self.dt
+            assert self.t < limit, "stop condition never fired"
+        return self.t
+
+
+class Region:
+    center = (0, 0, 0)
+    size = (1, 1, 0)
+
+
+def pulse(t, arrival=10.0, tau=5.0):
+    """Energy rising until arrival, then decaying exponentially."""
+    return t / arrival if t < arrival else 2.718 ** (-(t - arrival) / tau)
+
+
+def test_decay_fires_before_cap():
+    stop = DecayStop([Region()], cap=1000, decay_by=1e-3, check_every=1)
+    t = FakeSim(pulse).run_until(stop)
+    assert stop.reason == "decay"
+    # energy reaches 1e-3 of its peak about 5 * ln(1000) ~ 35 after arrival
+    assert 40 <= t <= 50
+    assert stop.energy <= 1e-3 * stop.peak
+
+
+def test_cap_fires_when_energy_persists():
+    stop = DecayStop([Region()], cap=100, check_every=1)
+    t = FakeSim(lambda t: 1.0).run_until(stop)
+    assert stop.reason == "cap"
+    assert t == pytest.approx(100)
+
+
+def test_min_time_suppresses_early_dip():
+    # A scattered bump that dies away at t ~ 10, then the main pulse at t = 60
+    def energy(t):
+        return (pulse(t, arrival=2.0, tau=1.0) if t < 30
+                else 5 * pulse(t - 30, arrival=30.0, tau=5.0))
+
+    early = DecayStop([Region()], cap=1000, check_every=1)
+    assert FakeSim(energy).run_until(early) < 30
+
+    guarded = DecayStop([Region()], cap=1000, check_every=1, min_time=50)
+    t = FakeSim(energy).run_until(guarded)
+    assert guarded.reason == "decay"
+    assert t > 60
+    assert guarded.peak == pytest.approx(5.0, rel=0.05)
+
+
+def test_after_sources_measures_from_last_source_time():
+    sim = FakeSim(lambda t: 1.0, last_source_time=40.0)
+    sim.t = 40.0        # until_after_sources starts calling once the sources are off
+    stop = DecayStop([Region()], cap=25, check_every=1, after_sources=True)
+    t = sim.run_until(stop)
+    assert stop.reason == "cap"
+    assert t == pytest.approx(65)
+    assert stop.elapsed(sim) == pytest.approx(25)
+
+
+def test_check_every_throttles_energy_reads():
+    reads = []
+
+    def energy(t):
+        reads.append(t)
+        return 1.0
+
+    stop = DecayStop([Region()], cap=100, check_every=20)
+    FakeSim(energy).run_until(stop)
+    assert reads == [0, 20, 40, 60, 80]
+
+
+def test_state_round_trip_resumes_identically():
+    reference = DecayStop([Region()], cap=1000, check_every=3)
+    t_reference = FakeSim(pulse).run_until(reference)
+
+    # Run part way, checkpoint, then continue in a fresh stop (as after a restart)
+    first = DecayStop([Region()], cap=1000, check_every=3)
+    sim = FakeSim(pulse)
+    while sim.t < 25:
+        assert not first(sim)
+        sim.t += sim.dt
+    state = first.state()
+
+    resumed = DecayStop([Region()], cap=1000, check_every=3)
+    resumed.load_state(state)
+    assert resumed.state() == state
+    assert sim.run_until(resumed) == t_reference
+    assert resumed.reason == reference.reason == "decay"
+    assert resumed.peak == reference.peak
+
+
+def test_fired_condition_stays_fired():
+    stop = DecayStop([Region()], cap=10, check_every=1)
+    sim = FakeSim(lambda t: 1.0)
+    sim.run_until(stop)
+    sim.t = 0.0
+    assert stop(sim)
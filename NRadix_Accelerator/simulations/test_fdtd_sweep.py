@@ -0,0 +1,154 @@
+"""Tests for the sweep scheduler and checkpoints in fdtd_sweep."""
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+import fdtd_sweep
+from fdtd_sweep import SweepOptions, load_checkpoint, plan_cores, run_sweep
+
+
+def test_plan_never_oversubscribes():
+    for n_points, cores, jobs, threads in itertools.product(
+            [1, 3, 8, 25], [1, 4, 12], [None, 1, 4, 16], [None, 1, 4, 16]):
+        plan = plan_cores(n_points, cores=cores, jobs=jobs, threads_per_job=threads)
+        assert plan.jobs * plan.threads_per_job <= cores
+        assert 1 <= plan.jobs <= n_points
+
+
+def test_fixed_jobs_and_threads_are_clamped():
+    plan = plan_cores(8, cores=12, jobs=4, threads_per_job=4)
+    assert (plan.jobs, plan.threads_per_job) == (4, 3)
+
+
+def test_default_plan_fills_cores():
+    plan = plan_cores(4, cores=12)
+    assert (plan.jobs, plan.threads_per_job) == (4, 3)
+
+
+# =============================================================================
+# Scheduler (module-level functions, so spawned workers can import them)
+# =============================================================================
+
+def simulate(x, log=None):
+    """Dummy sweep point; appends x to log so tests can count runs."""
+    if log:
+        with open(log, "a") as f:
+            f.write(f"{x}\n")
+    return {"x": x, "pair": (x, 2 * x), "spectrum": np.arange(3, dtype=np.float32) * x,
+            "phase": complex(x, -x), "loss": float("inf")}
+
+
+def slow_first(x):
+    time.sleep(0.3 if x == 0 else 0.0)
+    return x
+
+
+def flaky(x, marker_dir):
+    """Fails on the first attempt at each point."""
+    marker = os.path.join(marker_dir, f"{x}.tried")
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise RuntimeError(f"transient failure at {x}")
+    return x
+
+
+def always_fails(x):
+    raise RuntimeError("broken")
+
+
+def runs(log):
+    with open(log) as f:
+        return [int(line) for line in f]
+
+
+@pytest.fixture(autouse=True)
+def fresh_sweep_state(monkeypatch):
+    monkeypatch.setattr(fdtd_sweep, "_STARTED", set())
+    monkeypatch.setattr(fdtd_sweep, "_FAILED", set())
+
+
+def options(tmp_path, **kwargs):
+    return SweepOptions(jobs=1, checkpoint=str(tmp_path / "sweep.jsonl"), **kwargs)
+
+
+def test_results_come_back_in_submission_order():
+    points = [dict(x=i) for i in range(4)]
+    results = run_sweep(slow_first, points, SweepOptions(jobs=2, cores=2), verbose=False)
+    assert results == [0, 1, 2, 3]
+
+
+def test_resume_skips_completed_points_and_restores_types(tmp_path):
+    log = str(tmp_path / "runs.log")
+    first = run_sweep(simulate, [dict(x=i, log=log) for i in range(2)],
+                      options(tmp_path), verbose=False)
+    fdtd_sweep._STARTED.clear()         # as in a new process after an interruption
+
+    points = [dict(x=i, log=log) for i in range(4)]
+    results = run_sweep(simulate, points, options(tmp_path, resume=True), verbose=False)
+    assert runs(log) == [0, 1, 2, 3]    # 0 and 1 were not run again
+    for resumed, fresh in zip(results[:2], first):
+        assert resumed["pair"] == fresh["pair"] and isinstance(resumed["pair"], tuple)
+        assert resumed["spectrum"].dtype == np.float32
+        np.testing.assert_array_equal(resumed["spectrum"], fresh["spectrum"])
+        assert resumed["phase"] == fresh["phase"] and resumed["loss"] == float("inf")
+
+
+def test_without_resume_the_checkpoint_starts_over(tmp_path):
+    log = str(tmp_path / "runs.log")
+    run_sweep(simulate, [dict(x=0, log=log)], options(tmp_path), verbose=False)
+    fdtd_sweep._STARTED.clear()
+    run_sweep(simulate, [dict(x=0, log=log)], options(tmp_path), verbose=False)
+    assert runs(log) == [0, 0]
+
+
+def test_resume_refuses_a_checkpoint_from_other_code(tmp_path):
+    opts = options(tmp_path)
+    run_sweep(simulate, [dict(x=0)], opts, verbose=False)
+    fdtd_sweep._STARTED.clear()
+
+    with open(opts.checkpoint) as f:
+        lines = f.readlines()
+    header = json.loads(lines[0])
+    header["header"]["source"] = "0" * 16
+    with open(opts.checkpoint, "w") as f:
+        f.writelines([json.dumps(header) + "\n"] + lines[1:])
+    with pytest.raises(ValueError, match="different code"):
+        run_sweep(simulate, [dict(x=0)], options(tmp_path, resume=True), verbose=False)
+
+    with open(opts.checkpoint, "w") as f:      # headerless (pre-fingerprint) checkpoint
+        f.writelines(lines[1:])
+    with pytest.raises(ValueError):
+        run_sweep(simulate, [dict(x=0)], options(tmp_path, resume=True), verbose=False)
+
+
+def test_later_rounds_in_one_process_continue_the_checkpoint(tmp_path):
+    log = str(tmp_path / "runs.log")
+    run_sweep(simulate, [dict(x=0, log=log)], options(tmp_path), verbose=False)
+    run_sweep(simulate, [dict(x=0, log=log), dict(x=1, log=log)], options(tmp_path), verbose=False)
+    assert runs(log) == [0, 1]
+    assert len(load_checkpoint(str(tmp_path / "sweep.jsonl"))) == 2
+
+
+def test_failed_points_are_retried(tmp_path):
+    points = [dict(x=i, marker_dir=str(tmp_path)) for i in range(3)]
+    assert run_sweep(flaky, points, SweepOptions(jobs=1, retries=1), verbose=False) == [0, 1, 2]
+
+
+def test_points_that_keep_failing_return_none_and_keep_the_checkpoint(tmp_path, capsys):
+    opts = options(tmp_path, retries=2)
+    assert run_sweep(always_fails, [dict(x=0)], opts, verbose=False) == [None]
+    assert "failed after 3 attempt(s)" in capsys.readouterr().out
+    fdtd_sweep.finish(opts)
+    assert os.path.exists(opts.checkpoint)
+
+
+def test_finish_removes_the_checkpoint_of_a_complete_sweep(tmp_path):
+    opts = options(tmp_path)
+    run_sweep(simulate, [dict(x=0)], opts, verbose=False)
+    assert os.path.exists(opts.checkpoint)
+    fdtd_sweep.finish(opts)
+    assert not os.path.exists(opts.checkpoint)
@@ -0,0 +1,119 @@
+"""Tests for the streamed, mergeable Monte Carlo statistics in mc_stats."""
+import numpy as np
+import pytest
+
+from mc_stats import FixedHistogram, MonteCarloStats, RunningMoments, TDigest, pilot_ranges
+
+QUANTILES = [0.001, 0.01, 0.1, 0.5, 0.9, 0.99]
+RANGES = {'margin': (-5.0, 15.0, 200)}
+
+
+def sample(n=200_000, seed=7):
+    """A skewed fixed sample, so the tails differ from a normal's."""
+    rng = np.random.default_rng(seed)
+    return rng.gamma(2.0, 1.5, n) - 3.0
+
+
+def table(values, passed):
+    return {'all_passed': passed, 'margin': values, 'check_passed': values > 0}
+
+
+def streamed(values, chunk):
+    moments = RunningMoments()
+    digest = TDigest()
+    for start in range(0, len(values), chunk):
+        moments.add(values[start:start + chunk])
+        digest.add(values[start:start + chunk])
+    return moments, digest
+
+
+@pytest.mark.parametrize("chunk", [1_000, 7_919, 200_000])
+def test_streamed_moments_match_numpy(chunk):
+    values = sample()
+    moments, _ = streamed(values, chunk)
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert moments.variance == pytest.approx(np.var(values), rel=1e-10)
+    assert moments.std == pytest.approx(np.std(values), rel=1e-10)
+    assert (moments.minimum, moments.maximum) == (values.min(), values.max())
+
+
+def test_streamed_quantiles_match_numpy():
+    values = sample()
+    _, digest = streamed(values, 10_000)
+    for q in QUANTILES:
+        exact = np.quantile(values, q)
+        # rank error: the estimate must sit close to the q-th order statistic
+        rank = np.searchsorted(np.sort(values), digest.quantile(q)) / len(values)
+        assert rank == pytest.approx(q, abs=max(0.01 * q * (1 - q), 1e-4)), q
+        assert digest.quantile(q) == pytest.approx(exact, abs=0.01 * np.std(values)), q
+
+
+def test_merge_of_two_shards_matches_numpy_on_the_union():
+    values = sample()
+    passed = values > -1.5
+    first, second = MonteCarloStats(RANGES), MonteCarloStats(RANGES)
+    split = 83_117
+    first.add(table(values[:split], passed[:split]))
+    second.add(table(values[split:], passed[split:]))
+    first.merge(second)
+
+    moments = first.moments['margin']
+    assert first.n_trials == len(values)
+    assert moments.mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert moments.variance == pytest.approx(np.var(values), rel=1e-10)
+    assert (moments.minimum, moments.maximum) == (values.min(), values.max())
+    assert first.pass_counts == {'all': int(passed.sum()), 'check': int(np.sum(values > 0))}
+    for q in QUANTILES:
+        assert first.quantile('margin', q) == pytest.approx(np.quantile(values, q),
+                                                            abs=0.01 * np.std(values)), q
+
+    hist = first.histograms['margin']
+    np.testing.assert_array_equal(hist.counts, np.histogram(values, bins=hist.edges)[0])
+    assert hist.total == len(values)
+
+
+def test_merge_equals_a_single_pass():
+    values = sample(50_000)
+    passed = values > 0
+    whole = MonteCarloStats(RANGES)
+    whole.add(table(values, passed))
+    merged = MonteCarloStats(RANGES)
+    for part in np.array_split(np.arange(len(values)), 2):
+        shard = MonteCarloStats(RANGES)
+        shard.add(table(values[part], passed[part]))
+        merged.merge(shard)
+
+    assert merged.moments['margin'].mean == pytest.approx(whole.moments['margin'].mean, rel=1e-12)
+    assert merged.moments['margin'].m2 == pytest.approx(whole.moments['margin'].m2, rel=1e-10)
+    np.testing.assert_array_equal(merged.histograms['margin'].counts, whole.histograms['margin'].counts)
+    np.testing.assert_array_equal(merged.sample['margin'], whole.sample['margin'][:merged.sample_size])
+
+
+def test_histogram_counts_values_off_the_edges():
+    hist = FixedHistogram.linear(0.0, 1.0, 10)
+    hist.add(np.array([-0.5, 0.0, 0.25, 1.0, 1.5, 2.0]))
+    assert (hist.underflow, hist.overflow) == (1, 2)
+    assert hist.counts.sum() == 3
+    assert hist.total == 6
+
+    stats = MonteCarloStats({'margin': (0.0, 1.0, 10)})
+    stats.add(table(np.array([-0.5, 0.5, 2.0]), np.ones(3, bool)))
+    assert stats.out_of_range() == {'margin': (1, 1)}
+
+
+def test_pilot_ranges_follow_the_spread():
+    narrow, wide = sample(20_000), 3.0 * sample(20_000)
+    (low, high, bins), = pilot_ranges({'margin': narrow}, {'margin': 50}).values()
+    assert bins == 50
+    assert low < narrow.min() and high > narrow.max()
+    (wide_low, wide_high, _), = pilot_ranges({'margin': wide}, {'margin': 50}).values()
+    assert wide_high - wide_low == pytest.approx(3.0 * (high - low))
+
+    full = sample()
+    stats = MonteCarloStats(pilot_ranges({'margin': full[:20_000]}, {'margin': 200}))
+    stats.add(table(full, full > 0))
+    assert stats.out_of_range() == {}
+
+    (low, high, _), = pilot_ranges({'margin': np.full(10, 2.0)}, {'margin': 10}).values()
+    assert low < 2.0 < high
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Joint Thermal x Process-Variation Analysis — Monolithic 9x9 N-Radix Chip
+=========================================================================
+
+PURPOSE:
+    monte_carlo_9x9.py asks "how many fabricated chips work at 25 C?" and
+    thermal_sweep_9x9.py asks "how does the nominal chip drift from 15 C to
+    45 C?". This script answers the combined question: what fraction of
+    fabricated chips work across the whole ambient range, and what is each
+    chip's own operating window?
+
+METHOD:
+    Chips are drawn exactly as in monte_carlo_9x9.py (same SAMPLING_PLAN and
+    seeding), then every chip is evaluated on a temperature grid as one
+    (n_chips, n_temps) array computation, chunk by chunk. Each check splits
+    into a per-chip process term and a per-temperature thermal term from the
+    thermal sweep models, so the 2-D evaluation is a handful of broadcasts:
+
+    1. Loss budget — temperature independent (process check as-is)
+    2. Wavelength collision — drifted SFG product spacing (thermal sweep)
+       against the chip's AWG resolution (process)
+    3. Ring tuning — process resonance offset plus thermal ring drift at
+       1550 nm must stay inside the heater tuning range (5 nm)
+    4. Path timing — temperature independent (a uniform temperature adds
+       no differential skew)
+    5. SFG phase matching — Jundt Sellmeier phase mismatch of the RED+BLUE
+       mixer at temperature T against the chip's poling period (the design
+       period is phase-matched at 25 C and scaled by the chip's period error)
+
+    At 25 C the ring and collision terms reduce to the process-only checks,
+    so the 25 C yield matches run_monte_carlo() for the same seed.
+
+OUTPUT:
+    - Population yield (with 95% Wilson CI) versus ambient temperature
+    - Per-chip operating window: the contiguous passing run starting at the
+      chip's coolest passing temperature
+    - Fraction of chips covering the full sweep / lab / server-room ranges
+    - Plot saved to ../docs/monte_carlo_plots/thermal_process_yield.png
+
+USAGE:
+    python3 thermal_monte_carlo_9x9.py
+    python3 thermal_monte_carlo_9x9.py --chips 1000000 --t-step 0.05
+
+Author: N-Radix Project
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend — safe for headless servers
+import matplotlib.pyplot as plt
+
+from mc_stats import wilson_interval
+from monte_carlo_9x9 import (NominalDesign, ProcessVariation, SampledChip, CHECKS,
+                             RING_TUNING_RANGE_NM, sample_population, check_loss_budget,
+                             check_path_timing, awg_min_resolution, ring_resonance_offset)
+from thermal_sweep_9x9 import (T_REF, run_thermal_sweep, calculate_ppln_period)
+
+
+# SFG mixer (RED+BLUE, the tightest phase-matching bandwidth) — same length
+# and 3 dB penalty limit as check_sfg_phase_matching()
+SFG_LAMBDA_A_NM = 1550.0
+SFG_LAMBDA_B_NM = 1064.0
+SFG_MIXER_LENGTH_UM = 20.0
+SFG_MAX_PENALTY_DB = 3.0
+
+CHECK_NAMES = [name for name, _ in CHECKS]
+
+# Ambient ranges reported in the summary (same as thermal_sweep_9x9.py)
+AMBIENT_RANGES = [
+    ('Lab ambient', 18.0, 28.0),
+    ('Server room', 20.0, 25.0),
+]
+
+# Chip-temperature points evaluated per array operation (bounds memory)
+EVAL_POINTS = 4_000_000
+
+
+# =============================================================================
+# THERMAL TERMS (per temperature, shared by every chip)
+# =============================================================================
+
+@dataclass
+class ThermalTerms:
+    """Temperature-only inputs of the joint checks, one entry per grid point."""
+    temps: np.ndarray
+    ring_shift_nm: np.ndarray      # ring resonance drift at 1550 nm
+    sfg_spacing_nm: np.ndarray     # minimum spacing of the drifted SFG products
+    sfg_delta_k: np.ndarray        # k_out - k_a - k_b of the SFG mixer [1/um]
+    design_period_um: float        # poling period phase-matched at T_REF
+
+
+def thermal_terms(temps: np.ndarray) -> ThermalTerms:
+    """Evaluate the thermal sweep models once on the temperature grid."""
+    temps = np.asarray(temps, dtype=float)
+    sweep = run_thermal_sweep(temperatures=temps)
+    return ThermalTerms(
+        temps=temps,
+        ring_shift_nm=sweep.ring_shift_1550,
+        sfg_spacing_nm=sweep.min_collision_margin_nm,
+        sfg_delta_k=2.0 * np.pi / calculate_ppln_period(SFG_LAMBDA_A_NM, SFG_LAMBDA_B_NM, temps),
+        design_period_um=float(calculate_ppln_period(SFG_LAMBDA_A_NM, SFG_LAMBDA_B_NM, T_REF)),
+    )
+
+
+# =============================================================================
+# JOINT CHECKS (per chip x per temperature)
+# =============================================================================
+
+def joint_margins(chips: SampledChip, nominal: NominalDesign,
+                  terms: ThermalTerms) -> Dict[str, np.ndarray]:
+    """
+    Margin of every check for every (chip, temperature) pair.
+
+    Returns:
+        {check name: margin}, each broadcastable to (n_chips, n_temps);
+        the temperature-independent checks come back as (n_chips, 1)
+    """
+    margins = {}
+
+    _, _, margins['loss_budget'] = check_loss_budget(chips, nominal)
+
+    margins['wavelength_collision'] = (terms.sfg_spacing_nm
+                                       - awg_min_resolution(chips, nominal)[:, np.newaxis])
+
+    delta_lambda_nm, gap_penalty_nm = ring_resonance_offset(chips, nominal)
+    total_shift_nm = (np.abs(delta_lambda_nm[:, np.newaxis] + terms.ring_shift_nm)
+                      + gap_penalty_nm[:, np.newaxis])
+    margins['ring_tuning'] = RING_TUNING_RANGE_NM - total_shift_nm
+
+    _, _, margins['path_timing'] = check_path_timing(chips, nominal)
+
+    # The chip's poling period is the design period scaled by its fab error;
+    # a uniform index offset cancels in k_out - k_a - k_b
+    period_um = terms.design_period_um * (chips.ppln_poling_period_um
+                                          / nominal.ppln_poling_period_um)
+    delta_k = terms.sfg_delta_k - 2.0 * np.pi / period_um[:, np.newaxis]
+    efficiency = np.sinc(delta_k * SFG_MIXER_LENGTH_UM / 2.0 / np.pi) ** 2
+    with np.errstate(divide='ignore'):
+        penalty_db = np.where(efficiency > 1e-10, -10 * np.log10(efficiency), 100.0)
+    margins['sfg_phase_matching'] = SFG_MAX_PENALTY_DB - penalty_db
+
+    for name in ('loss_budget', 'path_timing'):
+        margins[name] = margins[name][:, np.newaxis]
+    return margins
+
+
+def operating_windows(passed: np.ndarray, temps: np.ndarray):
+    """
+    Per-chip operating window from a (n_chips, n_temps) pass matrix.
+
+    The window is the contiguous passing run that starts at the chip's
+    coolest passing temperature. Chips that never pass get NaN bounds.
+
+    Returns:
+        (window_low, window_high) temperature arrays [C]
+    """
+    n_temps = passed.shape[1]
+    works = passed.any(axis=1)
+    first = passed.argmax(axis=1)
+    # First failing grid point after the window opens ends it
+    closed = ~passed & (np.arange(n_temps) > first[:, np.newaxis])
+    last = np.where(closed.any(axis=1), closed.argmax(axis=1) - 1, n_temps - 1)
+    return (np.where(works, temps[first], np.nan),
+            np.where(works, temps[last], np.nan))
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+@dataclass
+class JointResult:
+    """Population yield versus temperature and per-chip operating windows."""
+    temps: np.ndarray
+    n_chips: int
+    pass_counts: np.ndarray               # chips passing every check, per temperature
+    fail_counts: Dict[str, np.ndarray]    # chips failing each check, per temperature
+    full_range_passes: int                # chips passing at every grid temperature
+    window_low: np.ndarray                # per chip [C], NaN if it never works
+    window_high: np.ndarray
+    elapsed_s: float
+
+    def yield_vs_temp(self) -> np.ndarray:
+        return self.pass_counts / self.n_chips
+
+    def yield_interval(self, index: int, z: float = 1.96):
+        return wilson_interval(int(self.pass_counts[index]), self.n_chips, z)
+
+    def window_width(self) -> np.ndarray:
+        """Width of each chip's window [C] (0 for chips that never work)."""
+        return np.nan_to_num(self.window_high - self.window_low)
+
+    def covering(self, t_low: float, t_high: float) -> int:
+        """Number of chips whose window contains [t_low, t_high]."""
+        with np.errstate(invalid='ignore'):
+            return int(np.sum((self.window_low <= t_low) & (self.window_high >= t_high)))
+
+
+def _slice_chips(chips: SampledChip, rows: slice) -> SampledChip:
+    return SampledChip(**{f.name: getattr(chips, f.name)[rows] for f in fields(SampledChip)})
+
+
+def run_joint_analysis(n_chips: int = 100_000, seed: int = 42,
+                       temps: Optional[np.ndarray] = None,
+                       nominal: Optional[NominalDesign] = None,
+                       variation: Optional[ProcessVariation] = None,
+                       chunk_size: int = 100_000) -> JointResult:
+    """
+    Evaluate n_chips sampled chips on a temperature grid.
+
+    Chips are drawn chunk_size at a time from the first
+    np.random.SeedSequence(seed).spawn() child — the same stream as the
+    first shard of run_monte_carlo(seed) — and each chunk is checked in
+    row slices of at most EVAL_POINTS chip-temperature points, so memory
+    stays bounded for any grid.
+
+    Args:
+        n_chips: Number of random chip realizations
+        seed: Random seed for reproducibility
+        temps: Temperature grid [C] (default: 15-45 C in 0.1 C steps)
+        nominal: Nominal design parameters (uses defaults if None)
+        variation: Process variation model (uses defaults if None)
+        chunk_size: Chips sampled per batch
+
+    Returns:
+        JointResult
+    """
+    if nominal is None:
+        nominal = NominalDesign()
+    if variation is None:
+        variation = ProcessVariation()
+    if temps is None:
+        temps = 15.0 + 0.1 * np.arange(301)
+
+    t_start = time.time()
+    terms = thermal_terms(temps)
+    n_temps = len(terms.temps)
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    rows_per_eval = max(1, EVAL_POINTS // n_temps)
+
+    pass_counts = np.zeros(n_temps, dtype=np.int64)
+    fail_counts = {name: np.zeros(n_temps, dtype=np.int64) for name in CHECK_NAMES}
+    full_range_passes = 0
+    window_low = np.empty(n_chips)
+    window_high = np.empty(n_chips)
+
+    for start in range(0, n_chips, chunk_size):
+        chunk = sample_population(min(chunk_size, n_chips - start), nominal, variation, rng)
+        n_chunk = len(chunk.waveguide_width_nm)
+        for offset in range(0, n_chunk, rows_per_eval):
+            rows = slice(offset, min(offset + rows_per_eval, n_chunk))
+            chips = _slice_chips(chunk, rows)
+            passed = np.ones((rows.stop - rows.start, n_temps), dtype=bool)
+            for name, margin in joint_margins(chips, nominal, terms).items():
+                ok = margin > 0
+                fail_counts[name] += np.broadcast_to(~ok, passed.shape).sum(axis=0)
+                passed &= ok
+
+            pass_counts += passed.sum(axis=0)
+            full_range_passes += int(passed.all(axis=1).sum())
+            at = start + rows.start
+            window_low[at:at + passed.shape[0]], window_high[at:at + passed.shape[0]] = \
+                operating_windows(passed, terms.temps)
+
+    return JointResult(
+        temps=terms.temps,
+        n_chips=n_chips,
+        pass_counts=pass_counts,
+        fail_counts=fail_counts,
+        full_range_passes=full_range_passes,
+        window_low=window_low,
+        window_high=window_high,
+        elapsed_s=time.time() - t_start,
+    )
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def print_joint_summary(result: JointResult, n_rows: int = 13) -> None:
+    """Yield-vs-temperature table and operating-window statistics."""
+    temps = result.temps
+    n = result.n_chips
+    step = (temps[-1] - temps[0]) / max(len(temps) - 1, 1)
+
+    print()
+    print("=" * 72)
+    print("  JOINT THERMAL x PROCESS-VARIATION ANALYSIS")
+    print("  Monolithic 9x9 N-Radix Chip")
+    print("=" * 72)
+    print(f"  Chips: {n:,}   Grid: {temps[0]:g}-{temps[-1]:g} C in {step:g} C steps "
+          f"({len(temps)} points)")
+    print(f"  Evaluated {n * len(temps):,} chip-temperature points in {result.elapsed_s:.2f}s")
+
+    print()
+    print("  YIELD VS AMBIENT TEMPERATURE")
+    print(f"  {'-'*64}")
+    print(f"  {'Temp (C)':>9}  {'Yield (%)':>10}  {'95% CI (%)':>20}  {'Main failure':<20}")
+    yields = result.yield_vs_temp()
+    for i in np.unique(np.linspace(0, len(temps) - 1, n_rows).round().astype(int)):
+        low, high = result.yield_interval(i)
+        worst = max(CHECK_NAMES, key=lambda name: result.fail_counts[name][i])
+        fails = result.fail_counts[worst][i]
+        cause = f"{worst} ({fails / n * 100:.2f}%)" if fails else "-"
+        print(f"  {temps[i]:>9.1f}  {yields[i] * 100:>10.3f}  "
+              f"[{low * 100:>7.3f}, {high * 100:>7.3f}]  {cause:<20}")
+    best = int(np.argmax(yields))
+    print(f"  Peak yield {yields[best] * 100:.3f}% at {temps[best]:.1f} C, "
+          f"lowest {yields.min() * 100:.3f}% at {temps[int(np.argmin(yields))]:.1f} C")
+
+    print()
+    print("  PER-CHIP OPERATING WINDOW")
+    print(f"  {'-'*64}")
+    ranges = [('Full sweep', temps[0], temps[-1])] + AMBIENT_RANGES
+    for label, t_low, t_high in ranges:
+        if label == 'Full sweep':
+            count = result.full_range_passes
+        else:
+            count = result.covering(t_low, t_high)
+        low, high = wilson_interval(count, n)
+        print(f"  {f'{label} ({t_low:g}-{t_high:g} C)':<30} {count / n * 100:>8.3f}%  "
+              f"[{low * 100:.3f}, {high * 100:.3f}]")
+    never = int(np.isnan(result.window_low).sum())
+    print(f"  {'Never work':<30} {never / n * 100:>8.3f}%")
+    width = result.window_width()
+    q = np.percentile(width, [0.1, 1, 5, 50])
+    print(f"  Window width (C):  p0.1 {q[0]:.1f}   p1 {q[1]:.1f}   p5 {q[2]:.1f}   median {q[3]:.1f}")
+    print("=" * 72)
+
+
+def generate_joint_plot(result: JointResult, output_dir: str) -> str:
+    """Yield vs temperature (with CI band) and the window-width distribution."""
+    os.makedirs(output_dir, exist_ok=True)
+    temps = result.temps
+    yields = result.yield_vs_temp() * 100
+    bounds = np.array([result.yield_interval(i) for i in range(len(temps))]) * 100
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5.5))
+
+    ax1.fill_between(temps, bounds[:, 0], bounds[:, 1], color='#1976D2', alpha=0.25,
+                     label='95% Wilson CI')
+    ax1.plot(temps, yields, color='#1976D2', linewidth=2, label='Population yield')
+    for label, t_low, t_high in AMBIENT_RANGES:
+        ax1.axvspan(t_low, t_high, alpha=0.08, color='green')
+    ax1.axvline(x=T_REF, color='gray', linestyle=':', alpha=0.6, label=f'Reference ({T_REF:g} C)')
+    ax1.set_xlabel('Ambient Temperature (C)')
+    ax1.set_ylabel('Yield (%)')
+    ax1.set_title('Yield vs Ambient Temperature')
+    ax1.legend(loc='lower center')
+    ax1.grid(True, alpha=0.3)
+
+    width = result.window_width()
+    ax2.hist(width, bins=60, color='#388E3C', alpha=0.8)
+    ax2.set_yscale('log')
+    ax2.set_xlabel('Operating Window Width (C)')
+    ax2.set_ylabel('Chips')
+    ax2.set_title(f'Per-Chip Operating Window ({result.n_chips:,} chips)')
+    ax2.grid(True, alpha=0.3)
+
+    fig.suptitle('Joint Thermal x Process Variation — Monolithic 9x9 N-Radix', fontsize=14)
+    fig.tight_layout()
+    path = os.path.join(output_dir, 'thermal_process_yield.png')
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Joint thermal x process-variation yield, 9x9 N-Radix chip")
+    parser.add_argument("--chips", type=int, default=100_000, help="Number of sampled chips")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--t-min", type=float, default=15.0, help="Grid start [C] (default: 15)")
+    parser.add_argument("--t-max", type=float, default=45.0, help="Grid end [C] (default: 45)")
+    parser.add_argument("--t-step", type=float, default=0.1, help="Grid step [C] (default: 0.1)")
+    parser.add_argument("--sigma-scale", type=float, default=1.0,
+                        help="Scale every process-variation sigma (e.g. 0.5 = tighter fab)")
+    args = parser.parse_args()
+
+    variation = ProcessVariation(**{f.name: getattr(ProcessVariation, f.name) * args.sigma_scale
+                                    for f in fields(ProcessVariation)})
+    n_points = int(round((args.t_max - args.t_min) / args.t_step)) + 1
+    temps = args.t_min + args.t_step * np.arange(n_points)
+
+    result = run_joint_analysis(args.chips, args.seed, temps, variation=variation)
+    print_joint_summary(result)
+
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              '..', 'docs', 'monte_carlo_plots')
+    print(f"\nPlot saved to {generate_joint_plot(result, output_dir)}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
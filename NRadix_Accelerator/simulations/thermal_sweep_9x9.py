@@ -25,19 +25,19 @@ Requirements: numpy, matplotlib (standard Python scientific stack).
 
 Usage:
     python3 thermal_sweep_9x9.py
+    python3 thermal_sweep_9x9.py --t-step 0.001     # millikelvin-resolution sweep
 
 Author: N-Radix Project
 Date: February 17, 2026
 """
 
+import argparse
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend for headless runs
 import matplotlib.pyplot as plt
-from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Optional, Tuple
 import os
-import csv
 from datetime import datetime
 
 
@@ -96,10 +96,20 @@ SFG_PAIRS = {
     'RED+RED':     {'lam_a': 1550.0, 'lam_b': 1550.0, 'lam_out': 775.0},
 }
 
+# Order of the SFG-pair axis in the per-pair sweep columns
+SFG_PAIR_NAMES = list(SFG_PAIRS)
+
 # Input wavelengths [nm]
 INPUT_WAVELENGTHS_NM = [1550.0, 1310.0, 1064.0]
 INPUT_LABELS = ['RED (-1) 1550 nm', 'GREEN (0) 1310 nm', 'BLUE (+1) 1064 nm']
 
+# Per-input-wavelength optics: (group index, dn/dT, n_eff at 25 C)
+INPUT_OPTICS = {
+    1550.0: (N_GROUP_1550, DN_DT_1550, N_EFF_1550),
+    1310.0: (N_GROUP_1310, DN_DT_1310, N_EFF_1310),
+    1064.0: (N_GROUP_1064, DN_DT_1064, N_EFF_1064),
+}
+
 # Reference temperature [degC]
 T_REF = 25.0
 
@@ -114,41 +124,43 @@ CHIP_HEIGHT_UM = 695.0
 # THERMAL MODEL
 # =============================================================================
 
-@dataclass
-class ThermalState:
-    """State of the chip at a given temperature."""
-    temp_c: float
-    delta_t: float  # T - T_ref
+# State of the chip at each temperature point.  run_thermal_sweep() returns
+# one record per temperature; the per-pair fields carry a trailing SFG-pair
+# axis ordered as SFG_PAIR_NAMES.
+THERMAL_STATE_DTYPE = np.dtype([
+    ('temp_c', 'f8'),
+    ('delta_t', 'f8'),                          # T - T_ref
 
     # Ring resonator shifts [nm]
-    ring_shift_1550: float = 0.0
-    ring_shift_1310: float = 0.0
-    ring_shift_1064: float = 0.0
+    ('ring_shift_1550', 'f8'),
+    ('ring_shift_1310', 'f8'),
+    ('ring_shift_1064', 'f8'),
 
     # Effective index changes (dimensionless)
-    dn_eff_1550: float = 0.0
-    dn_eff_1310: float = 0.0
-    dn_eff_1064: float = 0.0
+    ('dn_eff_1550', 'f8'),
+    ('dn_eff_1310', 'f8'),
+    ('dn_eff_1064', 'f8'),
 
     # SFG phase-matching detuning [nm] — shift in optimal poling period
-    sfg_period_shift_nm: Dict[str, float] = field(default_factory=dict)
+    ('sfg_period_shift_nm', 'f8', (len(SFG_PAIR_NAMES),)),
 
     # SFG output wavelength shifts [nm]
-    sfg_output_shift_nm: Dict[str, float] = field(default_factory=dict)
+    ('sfg_output_shift_nm', 'f8', (len(SFG_PAIR_NAMES),)),
 
     # SFG efficiency relative to peak (0-1)
-    sfg_efficiency: Dict[str, float] = field(default_factory=dict)
+    ('sfg_efficiency', 'f8', (len(SFG_PAIR_NAMES),)),
 
     # AWG channel drift [nm]
-    awg_drift_1550: float = 0.0
-    awg_drift_1310: float = 0.0
-    awg_drift_1064: float = 0.0
+    ('awg_drift_1550', 'f8'),
+    ('awg_drift_1310', 'f8'),
+    ('awg_drift_1064', 'f8'),
 
     # Actual SFG output wavelengths [nm]
-    sfg_output_actual: Dict[str, float] = field(default_factory=dict)
+    ('sfg_output_actual', 'f8', (len(SFG_PAIR_NAMES),)),
 
     # Collision margins [nm]
-    min_collision_margin_nm: float = 0.0
+    ('min_collision_margin_nm', 'f8'),
+])
 
 
 def sellmeier_ne_linbo3(wavelength_um: float, temp_c: float = 25.0) -> float:
@@ -289,12 +301,9 @@ def ppln_phase_match_efficiency(
     # Phase mismatch
     delta_k = k_out - k_a - k_b - k_poling
 
-    # SFG efficiency: sinc^2(Delta_k * L / 2)
+    # SFG efficiency: sinc^2(Delta_k * L / 2)  (np.sinc is sin(pi x) / (pi x))
     arg = delta_k * interaction_length_um / 2.0
-    if abs(arg) < 1e-12:
-        efficiency = 1.0
-    else:
-        efficiency = (np.sin(arg) / arg) ** 2
+    efficiency = np.sinc(arg / np.pi) ** 2
 
     return efficiency, delta_k
 
@@ -325,9 +334,9 @@ def calculate_ppln_period(lam_a_nm: float, lam_b_nm: float, temp_c: float) -> fl
     k_out = 2.0 * np.pi * n_out / lam_out_um
 
     delta_k_bare = k_out - k_a - k_b
-    if abs(delta_k_bare) < 1e-15:
-        return float('inf')
-    return 2.0 * np.pi / delta_k_bare
+    with np.errstate(divide='ignore'):
+        period = np.where(np.abs(delta_k_bare) < 1e-15, np.inf, 2.0 * np.pi / delta_k_bare)
+    return period[()]
 
 
 def awg_channel_drift(
@@ -371,98 +380,82 @@ def run_thermal_sweep(
     t_min: float = 15.0,
     t_max: float = 45.0,
     t_step: float = 0.5,
-) -> List[ThermalState]:
+    temperatures: Optional[np.ndarray] = None,
+) -> np.recarray:
     """
     Sweep temperature and compute all thermal effects.
 
+    Every effect is evaluated at once over a (temperature x SFG pair) grid,
+    so a 0.001 C sweep costs the same few array operations as 0.5 C steps.
+
     Args:
         t_min: Minimum temperature [degC]
         t_max: Maximum temperature [degC]
         t_step: Temperature step [degC]
+        temperatures: Explicit temperature grid [degC]; overrides t_min/t_max/t_step
 
     Returns:
-        List of ThermalState for each temperature point
+        Record array of THERMAL_STATE_DTYPE, one row per temperature point
     """
-    temperatures = np.arange(t_min, t_max + t_step / 2, t_step)
-    states: List[ThermalState] = []
-
-    # Pre-calculate PPLN periods at reference temperature (these are frozen at fab)
-    ppln_periods_ref = {}
-    for name, pair in SFG_PAIRS.items():
-        ppln_periods_ref[name] = calculate_ppln_period(
-            pair['lam_a'], pair['lam_b'], T_REF
-        )
+    if temperatures is None:
+        n_points = int(round((t_max - t_min) / t_step)) + 1
+        temperatures = t_min + t_step * np.arange(n_points)
+    temps = np.asarray(temperatures, dtype=float)
+    dt = temps - T_REF
+
+    states = np.zeros(len(temps), dtype=THERMAL_STATE_DTYPE).view(np.recarray)
+    states.temp_c = temps
+    states.delta_t = dt
+
+    # --- 1. Ring resonator shifts, 2. effective index changes, 4. AWG drift ---
+    for lam in INPUT_WAVELENGTHS_NM:
+        n_group, dn_dt, n_eff = INPUT_OPTICS[lam]
+        states[f'ring_shift_{lam:.0f}'] = ring_resonance_shift(lam, n_group, dn_dt, dt)
+        states[f'dn_eff_{lam:.0f}'] = dn_dt * dt
+        states[f'awg_drift_{lam:.0f}'] = awg_channel_drift(lam, n_eff, dn_dt, dt)
+
+    # --- 3. SFG phase-matching analysis on the (temperature, pair) grid ---
+    lam_a = np.array([SFG_PAIRS[name]['lam_a'] for name in SFG_PAIR_NAMES])
+    lam_b = np.array([SFG_PAIRS[name]['lam_b'] for name in SFG_PAIR_NAMES])
+    lam_out = np.array([SFG_PAIRS[name]['lam_out'] for name in SFG_PAIR_NAMES])
+    grid_t = temps[:, np.newaxis]
+    grid_dt = dt[:, np.newaxis]
+
+    # PPLN periods at reference temperature (these are frozen at fab)
+    ppln_periods_ref = calculate_ppln_period(lam_a, lam_b, T_REF)
 
     # PPLN interaction length from monolithic_chip_9x9.py: mixer_w = 26 um
     interaction_length_um = 26.0
 
-    for temp in temperatures:
-        dt = temp - T_REF
-        state = ThermalState(temp_c=temp, delta_t=dt)
-
-        # --- 1. Ring resonator shifts ---
-        state.ring_shift_1550 = ring_resonance_shift(1550.0, N_GROUP_1550, DN_DT_1550, dt)
-        state.ring_shift_1310 = ring_resonance_shift(1310.0, N_GROUP_1310, DN_DT_1310, dt)
-        state.ring_shift_1064 = ring_resonance_shift(1064.0, N_GROUP_1064, DN_DT_1064, dt)
-
-        # --- 2. Effective index changes ---
-        state.dn_eff_1550 = DN_DT_1550 * dt
-        state.dn_eff_1310 = DN_DT_1310 * dt
-        state.dn_eff_1064 = DN_DT_1064 * dt
-
-        # --- 3. SFG phase-matching analysis ---
-        for name, pair in SFG_PAIRS.items():
-            # Efficiency with the frozen PPLN period
-            eff, dk = ppln_phase_match_efficiency(
-                pair['lam_a'], pair['lam_b'], temp,
-                ppln_periods_ref[name], interaction_length_um
-            )
-            state.sfg_efficiency[name] = eff
-
-            # How much has the optimal period shifted?
-            ppln_optimal = calculate_ppln_period(pair['lam_a'], pair['lam_b'], temp)
-            state.sfg_period_shift_nm[name] = (ppln_optimal - ppln_periods_ref[name]) * 1000.0  # um -> nm
-
-            # SFG output wavelength: energy conservation still holds
-            # (the output wavelength is set by the input wavelengths, which
-            #  are locked by the laser sources, not the crystal).
-            # BUT the ring filter that selects each input DOES shift.
-            # If the ring filters drift, the actual wavelengths entering
-            # the SFG region shift too, changing the output.
-            #
-            # Effective input wavelength = nominal + ring shift
-            shifted_a = pair['lam_a'] + ring_resonance_shift(
-                pair['lam_a'],
-                N_GROUP_1550 if pair['lam_a'] == 1550.0 else (N_GROUP_1310 if pair['lam_a'] == 1310.0 else N_GROUP_1064),
-                DN_DT_1550 if pair['lam_a'] == 1550.0 else (DN_DT_1310 if pair['lam_a'] == 1310.0 else DN_DT_1064),
-                dt
-            )
-            shifted_b = pair['lam_b'] + ring_resonance_shift(
-                pair['lam_b'],
-                N_GROUP_1550 if pair['lam_b'] == 1550.0 else (N_GROUP_1310 if pair['lam_b'] == 1310.0 else N_GROUP_1064),
-                DN_DT_1550 if pair['lam_b'] == 1550.0 else (DN_DT_1310 if pair['lam_b'] == 1310.0 else DN_DT_1064),
-                dt
-            )
-
-            actual_out = sfg_output_wavelength(shifted_a, shifted_b)
-            state.sfg_output_actual[name] = actual_out
-            state.sfg_output_shift_nm[name] = actual_out - pair['lam_out']
-
-        # --- 4. AWG channel drift ---
-        state.awg_drift_1550 = awg_channel_drift(1550.0, N_EFF_1550, DN_DT_1550, dt)
-        state.awg_drift_1310 = awg_channel_drift(1310.0, N_EFF_1310, DN_DT_1310, dt)
-        state.awg_drift_1064 = awg_channel_drift(1064.0, N_EFF_1064, DN_DT_1064, dt)
-
-        # --- 5. Collision margin ---
-        actual_outputs = sorted(state.sfg_output_actual.values())
-        min_margin = float('inf')
-        for i in range(len(actual_outputs) - 1):
-            spacing = actual_outputs[i + 1] - actual_outputs[i]
-            if spacing < min_margin:
-                min_margin = spacing
-        state.min_collision_margin_nm = min_margin
-
-        states.append(state)
+    # Efficiency with the frozen PPLN period
+    states.sfg_efficiency, _ = ppln_phase_match_efficiency(
+        lam_a, lam_b, grid_t, ppln_periods_ref, interaction_length_um
+    )
+
+    # How much has the optimal period shifted?
+    ppln_optimal = calculate_ppln_period(lam_a, lam_b, grid_t)
+    states.sfg_period_shift_nm = (ppln_optimal - ppln_periods_ref) * 1000.0  # um -> nm
+
+    # SFG output wavelength: energy conservation still holds
+    # (the output wavelength is set by the input wavelengths, which
+    #  are locked by the laser sources, not the crystal).
+    # BUT the ring filter that selects each input DOES shift.
+    # If the ring filters drift, the actual wavelengths entering
+    # the SFG region shift too, changing the output.
+    #
+    # Effective input wavelength = nominal + ring shift
+    optics_a = np.array([INPUT_OPTICS[lam] for lam in lam_a])
+    optics_b = np.array([INPUT_OPTICS[lam] for lam in lam_b])
+    shifted_a = lam_a + ring_resonance_shift(lam_a, optics_a[:, 0], optics_a[:, 1], grid_dt)
+    shifted_b = lam_b + ring_resonance_shift(lam_b, optics_b[:, 0], optics_b[:, 1], grid_dt)
+
+    actual_out = sfg_output_wavelength(shifted_a, shifted_b)
+    states.sfg_output_actual = actual_out
+    states.sfg_output_shift_nm = actual_out - lam_out
+
+    # --- 5. Collision margin ---
+    spacings = np.diff(np.sort(actual_out, axis=1), axis=1)
+    states.min_collision_margin_nm = spacings.min(axis=1)
 
     return states
 
@@ -472,7 +465,7 @@ def run_thermal_sweep(
 # =============================================================================
 
 def analyze_operating_window(
-    states: List[ThermalState],
+    states: np.recarray,
     sfg_efficiency_threshold: float = 0.50,
     collision_margin_threshold_nm: float = 20.0,
 ) -> dict:
@@ -494,28 +487,22 @@ def analyze_operating_window(
     results = {}
 
     # --- Passive window (no heaters, no TEC) ---
-    passive_temps = []
-    for s in states:
-        all_sfg_ok = all(eff >= sfg_efficiency_threshold for eff in s.sfg_efficiency.values())
-        margin_ok = s.min_collision_margin_nm >= collision_margin_threshold_nm
-        if all_sfg_ok and margin_ok:
-            passive_temps.append(s.temp_c)
-
-    if passive_temps:
-        results['passive_window_min'] = min(passive_temps)
-        results['passive_window_max'] = max(passive_temps)
-        results['passive_window_width'] = max(passive_temps) - min(passive_temps)
+    all_sfg_ok = np.all(states.sfg_efficiency >= sfg_efficiency_threshold, axis=1)
+    margin_ok = states.min_collision_margin_nm >= collision_margin_threshold_nm
+    passive_temps = states.temp_c[all_sfg_ok & margin_ok]
+
+    if passive_temps.size:
+        results['passive_window_min'] = float(passive_temps.min())
+        results['passive_window_max'] = float(passive_temps.max())
+        results['passive_window_width'] = float(passive_temps.max() - passive_temps.min())
     else:
         results['passive_window_min'] = None
         results['passive_window_max'] = None
         results['passive_window_width'] = 0.0
 
     # --- Maximum ring shift across the sweep ---
-    max_ring_shift = 0.0
-    for s in states:
-        for shift in [abs(s.ring_shift_1550), abs(s.ring_shift_1310), abs(s.ring_shift_1064)]:
-            if shift > max_ring_shift:
-                max_ring_shift = shift
+    ring_shifts = np.abs([states[f'ring_shift_{lam:.0f}'] for lam in INPUT_WAVELENGTHS_NM])
+    max_ring_shift = float(ring_shifts.max(initial=0.0))
     results['max_ring_shift_nm'] = max_ring_shift
 
     # --- Heater tuning range needed ---
@@ -534,19 +521,17 @@ def analyze_operating_window(
     # --- Temperature sensitivity of SFG output ---
     # Rate of SFG output shift per degree
     sfg_shift_rates = {}
-    for name in SFG_PAIRS:
-        # Use +/-5C around reference for the slope
-        states_near_ref = [s for s in states if abs(s.delta_t) <= 5.0 and abs(s.delta_t) > 0]
-        if states_near_ref:
-            shifts = [(s.sfg_output_shift_nm[name], s.delta_t) for s in states_near_ref]
-            # Linear fit
-            dts = np.array([s[1] for s in shifts])
-            dshifts = np.array([s[0] for s in shifts])
-            if len(dts) > 1:
-                slope = np.polyfit(dts, dshifts, 1)[0]
-            else:
-                slope = dshifts[0] / dts[0] if dts[0] != 0 else 0
-            sfg_shift_rates[name] = slope
+    # Use +/-5C around reference for the slope
+    near_ref = (np.abs(states.delta_t) <= 5.0) & (np.abs(states.delta_t) > 0)
+    dts = states.delta_t[near_ref]
+    dshifts = states.sfg_output_shift_nm[near_ref]
+    if dts.size:
+        # Linear fit of every pair at once (one column per pair)
+        if len(dts) > 1:
+            slopes = np.polyfit(dts, dshifts, 1)[0]
+        else:
+            slopes = dshifts[0] / dts[0]
+        sfg_shift_rates = dict(zip(SFG_PAIR_NAMES, slopes))
     results['sfg_shift_rates_nm_per_c'] = sfg_shift_rates
 
     # --- Maximum temperature gradient tolerance ---
@@ -620,7 +605,7 @@ def analyze_operating_window(
 # PLOTTING
 # =============================================================================
 
-def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
+def generate_plots(states: np.recarray, analysis: dict, output_dir: str):
     """
     Generate publication-quality plots from the thermal sweep data.
 
@@ -630,7 +615,7 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
         3. Wavelength collision margin vs temperature
         4. Operating window diagram
     """
-    temps = [s.temp_c for s in states]
+    temps = states.temp_c
 
     # Color scheme
     RED_COLOR = '#D32F2F'
@@ -662,9 +647,9 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
     # =========================================================================
     fig1, ax1 = plt.subplots(figsize=(10, 6))
 
-    ring_1550 = [s.ring_shift_1550 for s in states]
-    ring_1310 = [s.ring_shift_1310 for s in states]
-    ring_1064 = [s.ring_shift_1064 for s in states]
+    ring_1550 = states.ring_shift_1550
+    ring_1310 = states.ring_shift_1310
+    ring_1064 = states.ring_shift_1064
 
     ax1.plot(temps, ring_1550, color=RED_COLOR, linewidth=2, label='1550 nm (RED)')
     ax1.plot(temps, ring_1310, color=GREEN_COLOR, linewidth=2, label='1310 nm (GREEN)')
@@ -697,8 +682,8 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
     # =========================================================================
     fig2, ax2 = plt.subplots(figsize=(10, 6))
 
-    for name in SFG_PAIRS:
-        eff_vals = [s.sfg_efficiency[name] for s in states]
+    for i, name in enumerate(SFG_PAIR_NAMES):
+        eff_vals = states.sfg_efficiency[:, i]
         ax2.plot(temps, eff_vals, color=sfg_colors[name], linewidth=2, label=name)
 
     # Threshold line
@@ -722,8 +707,8 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
     fig3, (ax3a, ax3b) = plt.subplots(1, 2, figsize=(14, 6))
 
     # Left panel: All SFG output wavelengths vs temperature
-    for name in SFG_PAIRS:
-        actual_wls = [s.sfg_output_actual[name] for s in states]
+    for i, name in enumerate(SFG_PAIR_NAMES):
+        actual_wls = states.sfg_output_actual[:, i]
         ax3a.plot(temps, actual_wls, color=sfg_colors[name], linewidth=2, label=name)
 
     ax3a.axvline(x=T_REF, color='gray', linestyle=':', alpha=0.5)
@@ -734,7 +719,7 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
     ax3a.grid(True, alpha=0.3)
 
     # Right panel: Minimum collision margin vs temperature
-    margins = [s.min_collision_margin_nm for s in states]
+    margins = states.min_collision_margin_nm
     ax3b.plot(temps, margins, color='black', linewidth=2.5)
     ax3b.axhline(y=20.0, color='red', linestyle='--', linewidth=1.5,
                   label='20 nm AWG resolution limit')
@@ -782,9 +767,7 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
     # SFG efficiency on secondary axis
     ax4b = ax4.twinx()
     # Show worst-case SFG efficiency across all pairs
-    worst_eff = []
-    for s in states:
-        worst_eff.append(min(s.sfg_efficiency.values()))
+    worst_eff = states.sfg_efficiency.min(axis=1)
     ax4b.plot(temps, worst_eff, color='red', linewidth=2, linestyle='-', alpha=0.7,
               label='Worst-case SFG efficiency')
     ax4b.axhline(y=0.50, color='red', linestyle='--', alpha=0.4)
@@ -812,43 +795,42 @@ def generate_plots(states: List[ThermalState], analysis: dict, output_dir: str):
 # CSV OUTPUT
 # =============================================================================
 
-def save_csv(states: List[ThermalState], output_dir: str):
+def save_csv(states: np.recarray, output_dir: str):
     """Save raw sweep data to CSV for post-processing."""
     path = os.path.join(output_dir, 'thermal_sweep_data.csv')
 
     sfg_names = sorted(SFG_PAIRS.keys())
 
-    headers = ['temp_c', 'delta_t',
-               'ring_shift_1550_nm', 'ring_shift_1310_nm', 'ring_shift_1064_nm',
-               'dn_eff_1550', 'dn_eff_1310', 'dn_eff_1064',
-               'awg_drift_1550_nm', 'awg_drift_1310_nm', 'awg_drift_1064_nm',
-               'min_collision_margin_nm']
+    # Enough decimals on the temperature columns to resolve the sweep step
+    steps = np.diff(states.temp_c)
+    t_decimals = max(2, -int(np.floor(np.log10(np.abs(steps).min())))) if steps.size else 2
+
+    columns = [
+        ('temp_c', states.temp_c, f'%.{t_decimals}f'),
+        ('delta_t', states.delta_t, f'%.{t_decimals}f'),
+        ('ring_shift_1550_nm', states.ring_shift_1550, '%.6f'),
+        ('ring_shift_1310_nm', states.ring_shift_1310, '%.6f'),
+        ('ring_shift_1064_nm', states.ring_shift_1064, '%.6f'),
+        ('dn_eff_1550', states.dn_eff_1550, '%.8f'),
+        ('dn_eff_1310', states.dn_eff_1310, '%.8f'),
+        ('dn_eff_1064', states.dn_eff_1064, '%.8f'),
+        ('awg_drift_1550_nm', states.awg_drift_1550, '%.6f'),
+        ('awg_drift_1310_nm', states.awg_drift_1310, '%.6f'),
+        ('awg_drift_1064_nm', states.awg_drift_1064, '%.6f'),
+        ('min_collision_margin_nm', states.min_collision_margin_nm, '%.4f'),
+    ]
 
     for name in sfg_names:
-        headers.append(f'sfg_eff_{name}')
-        headers.append(f'sfg_out_actual_{name}_nm')
-        headers.append(f'sfg_out_shift_{name}_nm')
-        headers.append(f'sfg_period_shift_{name}_nm')
-
-    with open(path, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-
-        for s in states:
-            row = [
-                f'{s.temp_c:.2f}', f'{s.delta_t:.2f}',
-                f'{s.ring_shift_1550:.6f}', f'{s.ring_shift_1310:.6f}', f'{s.ring_shift_1064:.6f}',
-                f'{s.dn_eff_1550:.8f}', f'{s.dn_eff_1310:.8f}', f'{s.dn_eff_1064:.8f}',
-                f'{s.awg_drift_1550:.6f}', f'{s.awg_drift_1310:.6f}', f'{s.awg_drift_1064:.6f}',
-                f'{s.min_collision_margin_nm:.4f}',
-            ]
-            for name in sfg_names:
-                row.append(f'{s.sfg_efficiency.get(name, 0):.8f}')
-                row.append(f'{s.sfg_output_actual.get(name, 0):.4f}')
-                row.append(f'{s.sfg_output_shift_nm.get(name, 0):.6f}')
-                row.append(f'{s.sfg_period_shift_nm.get(name, 0):.6f}')
-
-            writer.writerow(row)
+        i = SFG_PAIR_NAMES.index(name)
+        columns.append((f'sfg_eff_{name}', states.sfg_efficiency[:, i], '%.8f'))
+        columns.append((f'sfg_out_actual_{name}_nm', states.sfg_output_actual[:, i], '%.4f'))
+        columns.append((f'sfg_out_shift_{name}_nm', states.sfg_output_shift_nm[:, i], '%.6f'))
+        columns.append((f'sfg_period_shift_{name}_nm', states.sfg_period_shift_nm[:, i], '%.6f'))
+
+    headers, values, formats = zip(*columns)
+    # Same \r\n line endings as the csv module
+    np.savetxt(path, np.column_stack(values), fmt=list(formats), delimiter=',',
+               header=','.join(headers), comments='', newline='\r\n')
 
     return path
 
@@ -857,25 +839,28 @@ def save_csv(states: List[ThermalState], output_dir: str):
 # SUMMARY REPORT
 # =============================================================================
 
-def print_summary(states: List[ThermalState], analysis: dict):
+def print_summary(states: np.recarray, analysis: dict):
     """Print a clear, actionable summary to stdout."""
 
+    s_min = states[0]   # 15 C
+    s_max = states[-1]  # 45 C
+    s_ref = states[np.argmin(np.abs(states.temp_c - T_REF))]
+    lo, hi = f'{s_min.temp_c:g}', f'{s_max.temp_c:g}'
+    t_step = (s_max.temp_c - s_min.temp_c) / max(len(states) - 1, 1)
+
     print()
     print("=" * 72)
     print("  THERMAL SENSITIVITY ANALYSIS — MONOLITHIC 9x9 N-RADIX CHIP")
     print("  Material: X-cut LiNbO3 (TFLN) | Reference: 25 C")
-    print("  Sweep: 15 C to 45 C in 0.5 C steps (61 points)")
+    print(f"  Sweep: {lo} C to {hi} C in {t_step:g} C steps ({len(states)} points)")
     print("=" * 72)
 
     # --- Ring Resonator Shifts ---
     print()
     print("[1] RING RESONATOR RESONANCE SHIFTS")
     print("-" * 50)
-    s_min = states[0]   # 15 C
-    s_max = states[-1]  # 45 C
-    s_ref = [s for s in states if abs(s.temp_c - T_REF) < 0.01][0]
 
-    print(f"  {'Wavelength':>12s}  {'Shift/C (nm)':>14s}  {'@ 15C (nm)':>12s}  {'@ 45C (nm)':>12s}")
+    print(f"  {'Wavelength':>12s}  {'Shift/C (nm)':>14s}  {f'@ {lo}C (nm)':>12s}  {f'@ {hi}C (nm)':>12s}")
     for lam, label, getter in [
         (1550, 'RED 1550 nm', lambda s: s.ring_shift_1550),
         (1310, 'GRN 1310 nm', lambda s: s.ring_shift_1310),
@@ -888,23 +873,23 @@ def print_summary(states: List[ThermalState], analysis: dict):
     print()
     print("[2] SFG PHASE-MATCHING EFFICIENCY (PPLN frozen at 25 C)")
     print("-" * 50)
-    print(f"  {'SFG Pair':>16s}  {'Eff @ 15C':>10s}  {'Eff @ 25C':>10s}  {'Eff @ 45C':>10s}")
-    for name in SFG_PAIRS:
-        e15 = s_min.sfg_efficiency[name]
-        e25 = s_ref.sfg_efficiency[name]
-        e45 = s_max.sfg_efficiency[name]
+    print(f"  {'SFG Pair':>16s}  {f'Eff @ {lo}C':>10s}  {'Eff @ 25C':>10s}  {f'Eff @ {hi}C':>10s}")
+    for i, name in enumerate(SFG_PAIR_NAMES):
+        e15 = s_min.sfg_efficiency[i]
+        e25 = s_ref.sfg_efficiency[i]
+        e45 = s_max.sfg_efficiency[i]
         print(f"  {name:>16s}  {e15:>10.4f}  {e25:>10.4f}  {e45:>10.4f}")
 
     # --- SFG Output Wavelength Shifts ---
     print()
     print("[3] SFG OUTPUT WAVELENGTH SHIFTS")
     print("-" * 50)
-    print(f"  {'SFG Pair':>16s}  {'Nominal (nm)':>12s}  {'Shift/C':>10s}  {'@ 15C':>10s}  {'@ 45C':>10s}")
+    print(f"  {'SFG Pair':>16s}  {'Nominal (nm)':>12s}  {'Shift/C':>10s}  {f'@ {lo}C':>10s}  {f'@ {hi}C':>10s}")
     sfg_rates = analysis.get('sfg_shift_rates_nm_per_c', {})
-    for name, pair in SFG_PAIRS.items():
+    for i, (name, pair) in enumerate(SFG_PAIRS.items()):
         rate = sfg_rates.get(name, 0)
-        s15 = s_min.sfg_output_shift_nm[name]
-        s45 = s_max.sfg_output_shift_nm[name]
+        s15 = s_min.sfg_output_shift_nm[i]
+        s45 = s_max.sfg_output_shift_nm[i]
         print(f"  {name:>16s}  {pair['lam_out']:>12.1f}  {rate:>+10.5f}  {s15:>+10.4f}  {s45:>+10.4f}")
 
     # --- Collision Margins ---
@@ -912,14 +897,14 @@ def print_summary(states: List[ThermalState], analysis: dict):
     print("[4] WAVELENGTH COLLISION MARGINS")
     print("-" * 50)
     margin_ref = s_ref.min_collision_margin_nm
-    margin_min_val = min(s.min_collision_margin_nm for s in states)
-    margin_max_val = max(s.min_collision_margin_nm for s in states)
+    margin_min_val = states.min_collision_margin_nm.min()
+    margin_max_val = states.min_collision_margin_nm.max()
     margin_at_15 = s_min.min_collision_margin_nm
     margin_at_45 = s_max.min_collision_margin_nm
 
     print(f"  Nominal (25 C):     {margin_ref:.2f} nm")
-    print(f"  At 15 C:            {margin_at_15:.2f} nm")
-    print(f"  At 45 C:            {margin_at_45:.2f} nm")
+    print(f"  {f'At {lo} C:':<20s}{margin_at_15:.2f} nm")
+    print(f"  {f'At {hi} C:':<20s}{margin_at_45:.2f} nm")
     print(f"  Range over sweep:   {margin_min_val:.2f} - {margin_max_val:.2f} nm")
     print(f"  AWG resolution:     20 nm minimum needed")
     margin_safe = margin_min_val > 20.0
@@ -929,7 +914,7 @@ def print_summary(states: List[ThermalState], analysis: dict):
     print()
     print("[5] AWG CHANNEL DRIFT")
     print("-" * 50)
-    print(f"  {'Channel':>12s}  {'Drift/C (nm)':>14s}  {'@ 15C (nm)':>12s}  {'@ 45C (nm)':>12s}")
+    print(f"  {'Channel':>12s}  {'Drift/C (nm)':>14s}  {f'@ {lo}C (nm)':>12s}  {f'@ {hi}C (nm)':>12s}")
     for lam, label, getter in [
         (1550, '1550 nm', lambda s: s.awg_drift_1550),
         (1310, '1310 nm', lambda s: s.awg_drift_1310),
@@ -1002,6 +987,11 @@ def print_summary(states: List[ThermalState], analysis: dict):
 
 def main():
     """Run the complete thermal sensitivity analysis."""
+    parser = argparse.ArgumentParser(description="Thermal sensitivity sweep, 9x9 N-Radix chip")
+    parser.add_argument('--t-min', type=float, default=15.0, help='Sweep start [C] (default: 15)')
+    parser.add_argument('--t-max', type=float, default=45.0, help='Sweep end [C] (default: 45)')
+    parser.add_argument('--t-step', type=float, default=0.5, help='Sweep step [C] (default: 0.5)')
+    args = parser.parse_args()
 
     # Output directory
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -1013,8 +1003,8 @@ def main():
     print()
 
     # --- Step 1: Run the sweep ---
-    print("Running thermal sweep (15 C to 45 C, 0.5 C steps)...")
-    states = run_thermal_sweep(t_min=15.0, t_max=45.0, t_step=0.5)
+    print(f"Running thermal sweep ({args.t_min:g} C to {args.t_max:g} C, {args.t_step:g} C steps)...")
+    states = run_thermal_sweep(t_min=args.t_min, t_max=args.t_max, t_step=args.t_step)
     print(f"  Computed {len(states)} temperature points.")
 
     # --- Step 2: Analyze operating windows ---
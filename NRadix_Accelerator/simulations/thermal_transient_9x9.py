@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Thermal Transient & Heater-Loop Simulation — Monolithic 9x9 N-Radix Chip
+=========================================================================
+
+thermal_sweep_9x9.py is quasi-static: it answers "where do the rings sit
+at temperature T?". This script answers the operations question: how well
+do closed-loop ring heaters hold all 81 PEs on channel while the room
+temperature drifts?
+
+THERMAL NETWORK (lumped RC, 82 nodes):
+
+        ambient ──R_pkg── substrate ──R_heater── ring[r, c]  (x 81)
+                                                     │
+                                        R_lateral to 4-neighbour rings
+
+    - Substrate node: chip + submount + heatsink, package resistance
+      < 5 C/W (PACKAGING_SPEC.md section 7), tens-of-seconds time constant
+    - Ring nodes: one per PE, TiN heater on top, sub-millisecond time
+      constant. R_heater is set so heater tuning is 0.01 nm/mW, the figure
+      used by thermal_sweep_9x9.py
+    - Every heater also warms the shared substrate, so the loops interact
+    - A static per-PE load (detectors, SFG) adds a column gradient
+
+CONTROLLER:
+    One discrete PID per PE, sampled every dt. The process variable is the
+    ring detuning from its channel, ring_resonance_shift(T_ring - T_set) —
+    what a drop-port monitor photodiode reports. Heaters can only heat
+    (0..P_max), with conditional-integration anti-windup. Rings are locked
+    at T_SETPOINT_C, above the ambient range, and the PPLN periods are
+    designed for that temperature; ppln_phase_match_efficiency() reports
+    what the residual ring temperature error costs in SFG efficiency.
+
+INTEGRATOR:
+    The network is linear, so it is discretized exactly (zero-order hold,
+    via an eigendecomposition of the symmetrized conductance matrix). The
+    fixed step is stable for any dt and stiff ring/substrate time
+    constants cost nothing. Each step is one (82 x 164) matrix product over
+    all nodes x every ambient profile at once; an hour at dt = 50 ms for
+    all five profiles runs in a couple of seconds.
+
+AMBIENT PROFILES:
+    step, hvac (15-min HVAC cycling), ramp, diurnal and random_walk
+    (Ornstein-Uhlenbeck drift); see AMBIENT_PROFILES.
+
+Usage:
+    python3 thermal_transient_9x9.py
+    python3 thermal_transient_9x9.py --hours 8 --profiles diurnal random_walk
+
+Author: N-Radix Project
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend for headless runs
+import matplotlib.pyplot as plt
+from scipy.signal import lfilter
+
+from thermal_sweep_9x9 import (SFG_PAIRS, SFG_PAIR_NAMES, N_GROUP_1550, DN_DT_1550,
+                               ring_resonance_shift, ppln_phase_match_efficiency,
+                               calculate_ppln_period)
+
+
+# =============================================================================
+# PARAMETERS
+# =============================================================================
+
+N_ROWS = 9
+N_COLS = 9
+N_PE = N_ROWS * N_COLS
+
+# Ring lock temperature [degC] — above the worst expected ambient so that
+# heat-only tuning always has headroom
+T_SETPOINT_C = 40.0
+
+# Ring resonance drift per degree at 1550 nm [nm/C]
+RING_NM_PER_C = ring_resonance_shift(1550.0, N_GROUP_1550, DN_DT_1550, 1.0)
+
+# Detuning that still counts as "on channel" [nm] — 10% of a ~0.5 nm
+# ring FWHM
+LOCK_TOLERANCE_NM = 0.05
+
+
+@dataclass
+class ThermalNetwork:
+    """Lumped RC parameters of the chip (powers in mW, so R in K/mW)."""
+    # Package to heatsink/ambient: < 5 C/W (PACKAGING_SPEC.md)
+    r_package_k_per_mw: float = 0.005
+    tau_substrate_s: float = 60.0
+    # Heater tuning of 0.01 nm/mW (thermal_sweep_9x9.py) -> R = 0.01 / RING_NM_PER_C
+    r_heater_k_per_mw: float = 0.01 / RING_NM_PER_C
+    tau_ring_s: float = 100e-6
+    # Ring-to-ring lateral coupling through the slab (weak crosstalk)
+    r_lateral_k_per_mw: float = 5.0
+    # Static per-PE dissipation [mW]: base + gradient across the columns
+    load_base_mw: float = 1.0
+    load_gradient_mw: float = 2.0
+    # Heater limit [mW] — PACKAGING_SPEC.md: 10-50 mW per heater
+    heater_max_mw: float = 50.0
+
+    def pe_load_mw(self) -> np.ndarray:
+        cols = np.tile(np.arange(N_COLS), N_ROWS)
+        return self.load_base_mw + self.load_gradient_mw * cols / (N_COLS - 1)
+
+
+@dataclass
+class PIDGains:
+    """Per-PE heater controller on ring detuning [nm] -> heater power [mW]."""
+    kp_mw_per_nm: float = 20.0
+    ki_mw_per_nm_s: float = 800.0
+    kd_mw_s_per_nm: float = 0.0
+    sensor_noise_nm: float = 0.0
+
+
+def build_network(net: ThermalNetwork):
+    """
+    Conductance matrix G [mW/K] and heat capacities C [mJ/K].
+
+    Node 0 is the substrate, nodes 1..81 the rings in row-major PE order.
+    The ambient is a boundary: it enters through g_ambient on node 0.
+
+    Returns:
+        (G, C, g_ambient)
+    """
+    n = N_PE + 1
+    G = np.zeros((n, n))
+
+    def connect(i, j, g):
+        G[i, i] += g
+        G[j, j] += g
+        G[i, j] -= g
+        G[j, i] -= g
+
+    g_heater = 1.0 / net.r_heater_k_per_mw
+    g_lateral = 1.0 / net.r_lateral_k_per_mw
+    for pe in range(N_PE):
+        r, c = divmod(pe, N_COLS)
+        connect(0, pe + 1, g_heater)
+        if c + 1 < N_COLS:
+            connect(pe + 1, pe + 2, g_lateral)
+        if r + 1 < N_ROWS:
+            connect(pe + 1, pe + 1 + N_COLS, g_lateral)
+
+    g_ambient = 1.0 / net.r_package_k_per_mw
+    G[0, 0] += g_ambient
+
+    C = np.empty(n)
+    C[0] = net.tau_substrate_s * g_ambient
+    C[1:] = net.tau_ring_s * g_heater
+    return G, C, g_ambient
+
+
+def discretize(G: np.ndarray, C: np.ndarray, dt: float):
+    """
+    Exact zero-order-hold discretization of C dT/dt = -G T + P.
+
+    With S = C^-1/2 G C^-1/2 = V diag(lam) V^T (symmetric, lam > 0):
+        A_d = C^-1/2 V diag(exp(-lam dt)) V^T C^1/2
+        B_d = C^-1/2 V diag((1 - exp(-lam dt)) / lam) V^T C^-1/2
+
+    Returns:
+        (A_d, B_d) so that T[k+1] = A_d T[k] + B_d P[k]
+    """
+    c_isqrt = 1.0 / np.sqrt(C)
+    lam, V = np.linalg.eigh(c_isqrt[:, None] * G * c_isqrt[None, :])
+    decay = np.exp(-lam * dt)
+    left = c_isqrt[:, None] * V
+    A_d = (left * decay) @ (V.T * np.sqrt(C)[None, :])
+    B_d = (left * (-np.expm1(-lam * dt) / lam)) @ (V.T * c_isqrt[None, :])
+    return A_d, B_d
+
+
+# =============================================================================
+# AMBIENT DISTURBANCE PROFILES
+# =============================================================================
+#
+# Each profile maps a time vector [s] (and a generator, for the stochastic
+# ones) to the ambient temperature [degC] at every step.
+
+def _step(t, rng):
+    return np.where(t < 60.0, 22.0, 27.0)
+
+
+def _hvac(t, rng):
+    # HVAC cycling: +/-1 C triangle wave, 15-minute cycle
+    phase = (t / 900.0) % 1.0
+    return 23.0 + 2.0 * np.abs(2.0 * phase - 1.0) - 1.0
+
+
+def _ramp(t, rng):
+    return 18.0 + 10.0 * t / max(t[-1], 1.0)
+
+
+def _diurnal(t, rng):
+    # 24-hour cycle, coolest at 04:00, +/-4 C around 23 C (sim starts at 00:00)
+    return 23.0 - 4.0 * np.cos(2.0 * np.pi * (t / 3600.0 - 4.0) / 24.0)
+
+
+def _random_walk(t, rng, tau_s=600.0, sigma_c=1.5):
+    # Ornstein-Uhlenbeck drift around 23 C, stationary std sigma_c
+    dt = t[1] - t[0] if len(t) > 1 else 1.0
+    a = np.exp(-dt / tau_s)
+    kicks = rng.standard_normal(len(t)) * sigma_c * np.sqrt(1.0 - a * a)
+    return 23.0 + lfilter([1.0], [1.0, -a], kicks)
+
+
+AMBIENT_PROFILES: Dict[str, Callable] = {
+    'step': _step,
+    'hvac': _hvac,
+    'ramp': _ramp,
+    'diurnal': _diurnal,
+    'random_walk': _random_walk,
+}
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+@dataclass
+class TransientResult:
+    """Decimated traces, shape (n_records, ..., n_profiles)."""
+    profiles: List[str]
+    t_s: np.ndarray                 # (n_rec,)
+    ambient_c: np.ndarray           # (n_rec, n_profiles)
+    substrate_c: np.ndarray         # (n_rec, n_profiles)
+    ring_c: np.ndarray              # (n_rec, 81, n_profiles)
+    detuning_nm: np.ndarray         # (n_rec, 81, n_profiles)
+    heater_mw: np.ndarray           # (n_rec, 81, n_profiles)
+    sfg_efficiency_min: np.ndarray  # (n_rec, n_profiles), worst PE and SFG pair
+    dt: float
+    n_steps: int
+    elapsed_s: float
+    # Step-resolution worst case (not decimated)
+    max_abs_detuning_nm: np.ndarray = field(default=None)   # (n_profiles,)
+    saturated_fraction: np.ndarray = field(default=None)    # (n_profiles,)
+    # Detuning correction per step from the integral term alone (ki * dt *
+    # heater tuning nm/mW); above ~1 the sampled loop overshoots and rings
+    integral_step_gain: float = 0.0
+
+
+def steady_heater_power(G: np.ndarray, g_ambient: float, load_mw: np.ndarray,
+                        t_ambient: np.ndarray) -> np.ndarray:
+    """
+    Heater powers [mW] that hold every ring exactly at T_SETPOINT_C.
+
+    Returns:
+        (81, n_profiles) — negative entries mean the ambient is too hot
+        for heat-only tuning
+    """
+    g_rs = -G[0, 1:]
+    t_sub = (g_rs.sum() * T_SETPOINT_C + g_ambient * t_ambient) / (g_rs.sum() + g_ambient)
+    x = np.vstack([t_sub[None, :], np.full((N_PE, len(t_ambient)), T_SETPOINT_C)])
+    return (G @ x)[1:] - load_mw[:, None]
+
+
+def simulate(profiles: List[str], duration_s: float = 3600.0, dt: float = 0.05,
+             net: Optional[ThermalNetwork] = None, gains: Optional[PIDGains] = None,
+             record_every_s: float = 1.0, seed: int = 0,
+             interaction_length_um: float = 26.0) -> TransientResult:
+    """
+    Closed-loop transient of all 81 ring heaters under each ambient profile.
+
+    All profiles run side by side as columns of one state matrix. The loop
+    starts in steady state at each profile's initial ambient (integrators
+    preloaded with the holding power).
+
+    Args:
+        profiles: Names from AMBIENT_PROFILES
+        duration_s: Simulated time [s]
+        dt: Fixed integrator and controller step [s]
+        net: Thermal network parameters (defaults if None)
+        gains: PID gains (defaults if None)
+        record_every_s: Trace decimation [s]
+        seed: Seed for stochastic profiles and sensor noise
+        interaction_length_um: PPLN length for the SFG efficiency trace
+
+    Returns:
+        TransientResult
+    """
+    net = net or ThermalNetwork()
+    gains = gains or PIDGains()
+    rng = np.random.default_rng(seed)
+
+    n_steps = int(round(duration_s / dt))
+    t = np.arange(n_steps + 1) * dt
+    ambient = np.column_stack([AMBIENT_PROFILES[name](t, rng) for name in profiles])
+    n_prof = len(profiles)
+
+    G, C, g_ambient = build_network(net)
+    A_d, B_d = discretize(G, C, dt)
+    # One step matrix acting on z = [T (82 nodes); ambient; heaters (81)]:
+    # T[k+1] = A_d T + B_d (g_amb T_amb, heaters) + B_d load
+    n_nodes = N_PE + 1
+    step_matrix = np.hstack([A_d, B_d])
+    step_matrix[:, n_nodes] *= g_ambient
+    load = net.pe_load_mw()
+    b_load = (B_d[:, 1:] @ load)[:, None]
+
+    # Steady state at the initial ambient, integrators holding that power
+    heater = np.clip(steady_heater_power(G, g_ambient, load, ambient[0]), 0.0, net.heater_max_mw)
+    p0 = np.zeros((n_nodes, n_prof))
+    p0[0] = g_ambient * ambient[0]
+    p0[1:] = heater + load[:, None]
+    z = np.empty((2 * n_nodes, n_prof))
+    x, u_ambient, u_heater = z[:n_nodes], z[n_nodes], z[n_nodes + 1:]
+    x[:] = np.linalg.solve(G, p0)
+    u_heater[:] = heater
+    integral = heater.copy()
+
+    record = max(1, int(round(record_every_s / dt)))
+    n_rec = n_steps // record + 1
+    rec_x = np.empty((n_rec, n_nodes, n_prof))
+    rec_heater = np.empty((n_rec, N_PE, n_prof))
+    ring_max = x[1:].copy()
+    ring_min = x[1:].copy()
+    saturated_steps = np.zeros(n_prof)
+    command = np.empty((N_PE, n_prof))
+    prev_error = None
+    noise = gains.sensor_noise_nm
+    ki_dt = gains.ki_mw_per_nm_s * dt
+    kd_per_dt = gains.kd_mw_s_per_nm / dt
+
+    # ring_resonance_shift() is linear in delta_t, so the per-step detuning
+    # is RING_NM_PER_C * (T_ring - T_set)
+    t_start = time.time()
+    for k in range(n_steps + 1):
+        ring = x[1:]
+        np.maximum(ring_max, ring, out=ring_max)
+        np.minimum(ring_min, ring, out=ring_min)
+        if k % record == 0:
+            rec_x[k // record] = x
+            rec_heater[k // record] = u_heater
+        if k == n_steps:
+            break
+
+        # --- PID (heat raises the resonance: error = -detuning) ---
+        error = RING_NM_PER_C * (T_SETPOINT_C - ring)
+        if noise:
+            error -= noise * rng.standard_normal(error.shape)
+        trial = integral + ki_dt * error
+        np.multiply(gains.kp_mw_per_nm, error, out=command)
+        command += trial
+        if kd_per_dt and prev_error is not None:
+            command += kd_per_dt * (error - prev_error)
+        prev_error = error
+        np.maximum(command, 0.0, out=u_heater)
+        np.minimum(u_heater, net.heater_max_mw, out=u_heater)
+        # Conditional integration: freeze the integrator while saturated
+        saturated = u_heater != command
+        if saturated.any():
+            integral = np.where(saturated, integral, trial)
+            saturated_steps += saturated.mean(axis=0)
+        else:
+            integral = trial
+
+        # --- Plant: exact ZOH step of the RC network ---
+        u_ambient[:] = ambient[k]
+        x[:] = step_matrix @ z + b_load
+    elapsed = time.time() - t_start
+
+    ring = rec_x[:, 1:]
+    # PPLN periods designed for the lock temperature
+    lam_a = np.array([SFG_PAIRS[name]['lam_a'] for name in SFG_PAIR_NAMES])
+    lam_b = np.array([SFG_PAIRS[name]['lam_b'] for name in SFG_PAIR_NAMES])
+    periods = calculate_ppln_period(lam_a, lam_b, T_SETPOINT_C)
+    ring_extremes = np.stack([ring.min(axis=1), ring.max(axis=1)], axis=-1)  # (n_rec, n_prof, 2)
+    efficiency, _ = ppln_phase_match_efficiency(lam_a, lam_b, ring_extremes[..., None],
+                                                periods, interaction_length_um)
+
+    return TransientResult(
+        profiles=list(profiles),
+        t_s=t[::record][:n_rec],
+        ambient_c=ambient[::record][:n_rec],
+        substrate_c=rec_x[:, 0],
+        ring_c=ring,
+        detuning_nm=ring_resonance_shift(1550.0, N_GROUP_1550, DN_DT_1550, ring - T_SETPOINT_C),
+        heater_mw=rec_heater,
+        sfg_efficiency_min=efficiency.min(axis=(-2, -1)),
+        dt=dt,
+        n_steps=n_steps,
+        elapsed_s=elapsed,
+        max_abs_detuning_nm=RING_NM_PER_C * np.maximum(ring_max - T_SETPOINT_C,
+                                                        T_SETPOINT_C - ring_min).max(axis=0),
+        saturated_fraction=saturated_steps / n_steps,
+        integral_step_gain=ki_dt * RING_NM_PER_C * net.r_heater_k_per_mw,
+    )
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def print_transient_summary(result: TransientResult, gains: Optional[PIDGains] = None) -> None:
+    """Tracking performance of the heater loops for every ambient profile."""
+    gains = gains or PIDGains()
+    duration = result.n_steps * result.dt
+    print()
+    print("=" * 78)
+    print("  THERMAL TRANSIENT — HEATER-LOOP RING TRACKING, MONOLITHIC 9x9 N-RADIX")
+    print("=" * 78)
+    print(f"  Lock: {T_SETPOINT_C:.0f} C   Ring drift: {RING_NM_PER_C:.4f} nm/C   "
+          f"Tolerance: +/-{LOCK_TOLERANCE_NM} nm")
+    print(f"  PID: kp={gains.kp_mw_per_nm:g} mW/nm  ki={gains.ki_mw_per_nm_s:g} mW/(nm s)  "
+          f"kd={gains.kd_mw_s_per_nm:g} mW s/nm   "
+          f"integral step gain {result.integral_step_gain:.2f}"
+          f"{'  (> 1: loop will ring — lower ki or dt)' if result.integral_step_gain > 1 else ''}")
+    print(f"  Simulated {duration / 3600:.2f} h x {len(result.profiles)} profiles x 81 PEs "
+          f"at dt = {result.dt * 1e3:g} ms ({result.n_steps:,} steps) in {result.elapsed_s:.2f}s")
+    print()
+    print(f"  {'Profile':<12} {'Ambient (C)':>13} {'Max |det|':>10} {'RMS det':>9} "
+          f"{'On-chan':>8} {'Heater mW':>15} {'Sat.':>6} {'Min SFG':>8}")
+    print(f"  {'':<12} {'min-max':>13} {'(nm)':>10} {'(nm)':>9} {'(%)':>8} "
+          f"{'mean / peak':>15} {'(%)':>6} {'eff':>8}")
+    print(f"  {'-' * 86}")
+    for i, name in enumerate(result.profiles):
+        det = result.detuning_nm[..., i]
+        amb = result.ambient_c[:, i]
+        heat = result.heater_mw[..., i]
+        on_channel = np.mean(np.abs(det) < LOCK_TOLERANCE_NM) * 100
+        print(f"  {name:<12} {f'{amb.min():.1f}-{amb.max():.1f}':>13} "
+              f"{result.max_abs_detuning_nm[i]:>10.4f} {np.sqrt(np.mean(det ** 2)):>9.5f} "
+              f"{on_channel:>8.2f} {f'{heat.mean():.1f} / {heat.max():.1f}':>15} "
+              f"{result.saturated_fraction[i] * 100:>6.2f} {result.sfg_efficiency_min[:, i].min():>8.5f}")
+    print(f"  {'-' * 86}")
+    print("  Max |det| is at step resolution; other columns use the recorded trace.")
+    print("  Sat. = share of PE-steps with the heater pinned at 0 or P_max.")
+    print("=" * 78)
+
+
+def generate_transient_plot(result: TransientResult, output_dir: str) -> str:
+    """Ambient, worst-PE detuning and heater power for every profile."""
+    os.makedirs(output_dir, exist_ok=True)
+    n = len(result.profiles)
+    fig, axes = plt.subplots(3, n, figsize=(4.5 * n, 9), sharex='col', squeeze=False)
+    t_h = result.t_s / 3600.0
+    for i, name in enumerate(result.profiles):
+        ax_amb, ax_det, ax_heat = axes[:, i]
+        ax_amb.plot(t_h, result.ambient_c[:, i], color='#F57C00', label='Ambient')
+        ax_amb.plot(t_h, result.substrate_c[:, i], color='#7B1FA2', label='Substrate')
+        ax_amb.set_title(name)
+        det = result.detuning_nm[..., i]
+        worst = np.abs(det).max(axis=1)
+        ax_det.plot(t_h, worst, color='#D32F2F')
+        ax_det.axhline(LOCK_TOLERANCE_NM, color='gray', linestyle='--', alpha=0.7)
+        ax_det.set_yscale('log')
+        heat = result.heater_mw[..., i]
+        ax_heat.fill_between(t_h, heat.min(axis=1), heat.max(axis=1), color='#1976D2', alpha=0.3)
+        ax_heat.plot(t_h, heat.mean(axis=1), color='#1976D2')
+        ax_heat.set_xlabel('Time (h)')
+        for ax in (ax_amb, ax_det, ax_heat):
+            ax.grid(True, alpha=0.3)
+    axes[0, 0].set_ylabel('Temperature (C)')
+    axes[0, 0].legend(fontsize=8)
+    axes[1, 0].set_ylabel('Worst-PE |detuning| (nm)')
+    axes[2, 0].set_ylabel('Heater power (mW)\nmean, min-max band')
+    fig.suptitle('Heater-Loop Ring Tracking — Monolithic 9x9 N-Radix', fontsize=14)
+    fig.tight_layout()
+    path = os.path.join(output_dir, 'thermal_transient.png')
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+    return path
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Thermal transient / heater-loop simulation, 9x9 N-Radix chip")
+    parser.add_argument('--hours', type=float, default=1.0, help='Simulated time [h] (default: 1)')
+    parser.add_argument('--dt', type=float, default=0.05, help='Integrator/controller step [s] (default: 0.05)')
+    parser.add_argument('--profiles', nargs='+', choices=list(AMBIENT_PROFILES),
+                        default=list(AMBIENT_PROFILES), metavar='PROFILE',
+                        help=f"Ambient profiles to run: {', '.join(AMBIENT_PROFILES)} (default: all)")
+    parser.add_argument('--kp', type=float, default=PIDGains.kp_mw_per_nm, help='Proportional gain [mW/nm]')
+    parser.add_argument('--ki', type=float, default=PIDGains.ki_mw_per_nm_s, help='Integral gain [mW/(nm s)]')
+    parser.add_argument('--kd', type=float, default=PIDGains.kd_mw_s_per_nm, help='Derivative gain [mW s/nm]')
+    parser.add_argument('--sensor-noise', type=float, default=0.0, help='Detuning sensor noise, 1-sigma [nm]')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for random_walk and sensor noise')
+    args = parser.parse_args()
+
+    profiles = list(dict.fromkeys(args.profiles))
+    gains = PIDGains(args.kp, args.ki, args.kd, args.sensor_noise)
+    result = simulate(profiles, duration_s=args.hours * 3600.0, dt=args.dt,
+                      gains=gains, seed=args.seed)
+    print_transient_summary(result, gains)
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output_dir = os.path.join(base_dir, '..', 'Research', 'data', 'thermal_analysis')
+    print(f"\nPlot saved to {generate_transient_plot(result, output_dir)}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
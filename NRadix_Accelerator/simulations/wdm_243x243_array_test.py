@@ -19,8 +19,13 @@ Note: For 243 output ports, we use summary visualizations:
 - Aggregate statistics rather than 243 individual plots
 
 Performance Note:
-    Use MPI for parallelism:
-    mpirun -np 176 python wdm_243x243_array_test.py
+    Use MPI for parallelism (through the launcher, which sets threads per
+    rank, the chunk decomposition and logs scaling efficiency):
+    mpirun -np 176 python fdtd_parallel.py wdm_243x243_array_test.py
+
+    Reduced domain (one periodic row verified against a full 9x9, plus
+    extrapolation from short rows; minutes instead of the full cell):
+    python wdm_243x243_array_test.py --reduced
 
 Author: N-Radix Project
 Date: February 5, 2026
@@ -32,25 +37,14 @@ import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 from datetime import datetime
+import argparse
 import os
 import sys
 
-# MPI support
-try:
-    from mpi4py import MPI
-    RANK = MPI.COMM_WORLD.Get_rank()
-    SIZE = MPI.COMM_WORLD.Get_size()
-    IS_PARALLEL = SIZE > 1
-except ImportError:
-    RANK = 0
-    SIZE = 1
-    IS_PARALLEL = False
-
-def print_master(msg):
-    """Only print from rank 0."""
-    if RANK == 0:
-        print(msg)
-        sys.stdout.flush()
+# MPI detection and rank-0 printing are shared by all FDTD scripts
+from fdtd_parallel import RANK, SIZE, IS_PARALLEL, print_master
+
+import fdtd_stop
 
 # =============================================================================
 # WDM TRIPLET DEFINITIONS
@@ -239,16 +233,15 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
     nfreq = len(wavelengths)
 
     flux_monitors = []
+    output_regions = []
     for row in range(ARRAY_SIZE):
         cy = row * PE_PITCH - array_span / 2
-        mon = sim.add_flux(
-            f_center, f_width * 1.2, nfreq,
-            mp.FluxRegion(
-                center=mp.Vector3(flux_x, cy, 0),
-                size=mp.Vector3(0, WG_WIDTH * 3, 0)
-            )
+        region = mp.FluxRegion(
+            center=mp.Vector3(flux_x, cy, 0),
+            size=mp.Vector3(0, WG_WIDTH * 3, 0)
         )
-        flux_monitors.append(mon)
+        output_regions.append(region)
+        flux_monitors.append(sim.add_flux(f_center, f_width * 1.2, nfreq, region))
 
     print_master(f"Flux monitors: {len(flux_monitors)} output ports")
     print_master("\nRunning simulation...")
@@ -262,8 +255,10 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
             progress_pct = sim.round_time() / RUN_TIME * 100
             print(f"  Progress: {progress_pct:.0f}% ({elapsed:.0f}s elapsed)", flush=True)
 
-    # Run
-    sim.run(mp.at_every(50, progress), until=RUN_TIME)
+    # Run until the energy at the outputs decays, RUN_TIME at most. The pulse
+    # cannot reach the outputs before the transit time at the core index.
+    stop = fdtd_stop.DecayStop(output_regions, cap=RUN_TIME, min_time=N_CORE * total_span)
+    fdtd_stop.run_until_decayed(sim, stop, [mp.at_every(50, progress)])
 
     elapsed = (datetime.now() - start_time).total_seconds()
     print_master(f"\nSimulation complete in {elapsed:.1f} seconds")
@@ -471,11 +466,21 @@ def main():
         print_master(f"Running with MPI: {SIZE} processes")
     print_master("=" * 70)
 
+    parser = argparse.ArgumentParser(description=f'WDM {ARRAY_SIZE}x{ARRAY_SIZE} array validation')
+    parser.add_argument('--reduced', action='store_true',
+                        help='Reduced domain: one periodic row verified against a full 9x9, '
+                             'plus extrapolation (see wdm_reduced_domain.py)')
+    args = parser.parse_args()
+
     # Output directory
     output_dir = OUTPUT_DIR
     if RANK == 0:
         os.makedirs(output_dir, exist_ok=True)
 
+    if args.reduced:
+        from wdm_reduced_domain import run_reduced_validation
+        return run_reduced_validation(ARRAY_SIZE, output_dir, resolution=RESOLUTION)
+
     # Get wavelengths
     wavelengths = get_all_wavelengths()
 
@@ -21,9 +21,19 @@ Note: For 81 output ports, we use summary visualizations:
 - Aggregate statistics rather than 81 individual plots
 
 Performance Note:
-    Use OpenMP for parallelism (MPI unavailable with Python 3.13):
-    export OMP_NUM_THREADS=12
-    /home/jackwayne/miniconda/envs/meep_env/bin/python wdm_81x81_array_test.py
+    Run through the launcher, which sets OpenMP threads (or MPI ranks x
+    threads under mpirun), picks the chunk decomposition and logs
+    timesteps/s and scaling efficiency:
+    python fdtd_parallel.py wdm_81x81_array_test.py
+    mpirun -np 4 python fdtd_parallel.py wdm_81x81_array_test.py
+
+    Reduced domain (one periodic row verified against a full 9x9, plus
+    extrapolation from short rows; minutes instead of the full cell):
+    python wdm_81x81_array_test.py --reduced
+
+    Full runs checkpoint fields and flux monitors every 200 time units
+    (--checkpoint-interval) and resume automatically when relaunched with
+    the same spec; --restart ignores existing checkpoints.
 
 Author: N-Radix Project
 Date: February 5, 2026
@@ -35,25 +45,16 @@ import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 from datetime import datetime
+import argparse
 import os
 import sys
 
-# MPI support
-try:
-    from mpi4py import MPI
-    RANK = MPI.COMM_WORLD.Get_rank()
-    SIZE = MPI.COMM_WORLD.Get_size()
-    IS_PARALLEL = SIZE > 1
-except ImportError:
-    RANK = 0
-    SIZE = 1
-    IS_PARALLEL = False
-
-def print_master(msg):
-    """Only print from rank 0."""
-    if RANK == 0:
-        print(msg)
-        sys.stdout.flush()
+# MPI detection and rank-0 printing are shared by all FDTD scripts
+from fdtd_parallel import RANK, SIZE, IS_PARALLEL, print_master
+
+import fdtd_cache
+import fdtd_checkpoint
+import fdtd_stop
 
 # =============================================================================
 # WDM TRIPLET DEFINITIONS
@@ -102,6 +103,7 @@ PADDING = 2.0         # um
 # 81×81 array span = 800 µm, light in LiNbO3 (n=2.2) travels at c/2.2
 # Need at least 800 * 2.2 ≈ 1760 time units, use 2000 for margin
 RUN_TIME = 2000       # Meep time units
+CHECKPOINT_INTERVAL = 200   # time units between checkpoints (~10% of the run)
 
 # =============================================================================
 # GEOMETRY CREATION
@@ -175,8 +177,16 @@ def create_81x81_array():
 
     return geometry, array_span
 
-def run_wdm_array_simulation(wavelengths, verbose=True):
-    """Run WDM simulation through 81x81 array."""
+def run_wdm_array_simulation(wavelengths, verbose=True, checkpoint_dir=None,
+                             checkpoint_interval=CHECKPOINT_INTERVAL, resume=True):
+    """
+    Run WDM simulation through 81x81 array.
+
+    With checkpoint_dir set, fields and flux monitors are checkpointed every
+    checkpoint_interval time units, and a relaunch with the same spec resumes
+    from the newest checkpoint. Returns the RunCheckpoint (or None) last, so
+    the caller can clear it once the results are written.
+    """
 
     print_master(f"\n{'='*70}")
     print_master("WDM 81x81 SYSTOLIC ARRAY SIMULATION - FULL CHIP VALIDATION")
@@ -226,7 +236,7 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
     print_master(f"Sources: {len(sources)} input ports")
 
     # Create simulation
-    sim = mp.Simulation(
+    sim_kwargs = dict(
         cell_size=cell,
         geometry=geometry,
         sources=sources,
@@ -234,22 +244,23 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
         resolution=RESOLUTION,
         default_material=mp.Medium(index=N_CLAD)
     )
+    sim = mp.Simulation(**sim_kwargs)
 
     # Flux monitors at output edge
     flux_x = total_span/2 + PADDING/2
     nfreq = len(wavelengths)
 
-    flux_monitors = []
+    monitor_specs = {}
     for row in range(ARRAY_SIZE):
         cy = row * PE_PITCH - array_span / 2
-        mon = sim.add_flux(
+        monitor_specs[f"row{row}"] = (
             f_center, f_width * 1.2, nfreq,
             mp.FluxRegion(
                 center=mp.Vector3(flux_x, cy, 0),
                 size=mp.Vector3(0, WG_WIDTH * 3, 0)
             )
         )
-        flux_monitors.append(mon)
+    flux_monitors = [sim.add_flux(*spec) for spec in monitor_specs.values()]
 
     print_master(f"Flux monitors: {len(flux_monitors)} output ports")
     print_master("\nRunning simulation...")
@@ -263,8 +274,20 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
             progress_pct = sim.round_time() / RUN_TIME * 100
             print(f"  Progress: {progress_pct:.0f}% ({elapsed:.0f}s elapsed)", flush=True)
 
-    # Run
-    sim.run(mp.at_every(10, progress), until=RUN_TIME)
+    # Run until the energy at the outputs decays, RUN_TIME at most. The pulse
+    # cannot reach the outputs before the transit time at the core index.
+    output_regions = [spec[3] for spec in monitor_specs.values()]
+    stop = fdtd_stop.DecayStop(output_regions, cap=RUN_TIME, min_time=N_CORE * total_span)
+    checkpoint = None
+    if checkpoint_dir and checkpoint_interval:
+        spec = fdtd_cache.simulation_spec(sim_kwargs, monitor_specs, stop.describe())
+        checkpoint = fdtd_checkpoint.RunCheckpoint(checkpoint_dir, spec, checkpoint_interval,
+                                                   name=f"wdm_{ARRAY_SIZE}x{ARRAY_SIZE}")
+        checkpoint.run(sim, flux_monitors, RUN_TIME, [mp.at_every(10, progress)],
+                       resume=resume, stop=stop)
+        stop.report(sim, (datetime.now() - start_time).total_seconds())
+    else:
+        fdtd_stop.run_until_decayed(sim, stop, [mp.at_every(10, progress)])
 
     elapsed = (datetime.now() - start_time).total_seconds()
     print_master(f"\nSimulation complete in {elapsed:.1f} seconds")
@@ -280,7 +303,7 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
             all_flux_freqs = flux_freqs
         all_flux_data.append(flux_data)
 
-    return all_flux_freqs, all_flux_data, sim
+    return all_flux_freqs, all_flux_data, sim, checkpoint
 
 def analyze_array_results(wavelengths, flux_freqs, flux_data_list, output_dir):
     """Analyze and report results from 81x81 array simulation."""
@@ -486,19 +509,35 @@ def main():
         print_master(f"Running with MPI: {SIZE} processes")
     print_master("=" * 70)
 
+    parser = argparse.ArgumentParser(description=f'WDM {ARRAY_SIZE}x{ARRAY_SIZE} array validation')
+    parser.add_argument('--reduced', action='store_true',
+                        help='Reduced domain: one periodic row verified against a full 9x9, '
+                             'plus extrapolation (see wdm_reduced_domain.py)')
+    fdtd_checkpoint.add_arguments(parser, default_interval=CHECKPOINT_INTERVAL)
+    args = parser.parse_args()
+
     # Output directory
     output_dir = "/home/jackwayne/Desktop/Optical_computing/Research/data/wdm_validation"
     if RANK == 0:
         os.makedirs(output_dir, exist_ok=True)
 
+    if args.reduced:
+        from wdm_reduced_domain import run_reduced_validation
+        return run_reduced_validation(ARRAY_SIZE, output_dir, resolution=RESOLUTION)
+
     # Get wavelengths
     wavelengths = get_all_wavelengths()
 
     # Run simulation
-    flux_freqs, flux_data_list, sim = run_wdm_array_simulation(wavelengths)
+    checkpoint_dir = args.checkpoint_dir or os.path.join(output_dir, "checkpoints")
+    flux_freqs, flux_data_list, sim, checkpoint = run_wdm_array_simulation(
+        wavelengths, checkpoint_dir=checkpoint_dir,
+        checkpoint_interval=args.checkpoint_interval, resume=not args.restart)
 
     # Analyze
     passed = analyze_array_results(wavelengths, flux_freqs, flux_data_list, output_dir)
+    if checkpoint is not None and not args.keep_checkpoint:
+        checkpoint.clear()
 
     print_master(f"\nCompleted: {datetime.now()}")
     print_master("=" * 70 + "\n")
@@ -17,9 +17,11 @@ The simulation:
 5. Verifies all channels arrive independently
 
 Performance Note:
-    Use OpenMP for parallelism (MPI unavailable with Python 3.13):
-    export OMP_NUM_THREADS=12
-    /home/jackwayne/miniconda/envs/meep_env/bin/python wdm_9x9_array_test.py
+    Run through the launcher, which sets OpenMP threads (or MPI ranks x
+    threads under mpirun), picks the chunk decomposition and logs
+    timesteps/s and scaling efficiency:
+    python fdtd_parallel.py wdm_9x9_array_test.py
+    mpirun -np 4 python fdtd_parallel.py wdm_9x9_array_test.py
 
 Author: N-Radix Project
 Date: February 5, 2026
@@ -34,22 +36,10 @@ from datetime import datetime
 import os
 import sys
 
-# MPI support
-try:
-    from mpi4py import MPI
-    RANK = MPI.COMM_WORLD.Get_rank()
-    SIZE = MPI.COMM_WORLD.Get_size()
-    IS_PARALLEL = SIZE > 1
-except (ImportError, RuntimeError, OSError):
-    RANK = 0
-    SIZE = 1
-    IS_PARALLEL = False
-
-def print_master(msg):
-    """Only print from rank 0."""
-    if RANK == 0:
-        print(msg)
-        sys.stdout.flush()
+# MPI detection and rank-0 printing are shared by all FDTD scripts
+from fdtd_parallel import RANK, SIZE, IS_PARALLEL, print_master
+
+import fdtd_stop
 
 # =============================================================================
 # WDM TRIPLET DEFINITIONS
@@ -233,16 +223,15 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
     nfreq = len(wavelengths)
 
     flux_monitors = []
+    output_regions = []
     for row in range(ARRAY_SIZE):
         cy = row * PE_PITCH - array_span / 2
-        mon = sim.add_flux(
-            f_center, f_width * 1.2, nfreq,
-            mp.FluxRegion(
-                center=mp.Vector3(flux_x, cy, 0),
-                size=mp.Vector3(0, WG_WIDTH * 3, 0)
-            )
+        region = mp.FluxRegion(
+            center=mp.Vector3(flux_x, cy, 0),
+            size=mp.Vector3(0, WG_WIDTH * 3, 0)
         )
-        flux_monitors.append(mon)
+        output_regions.append(region)
+        flux_monitors.append(sim.add_flux(f_center, f_width * 1.2, nfreq, region))
 
     print_master(f"Flux monitors: {len(flux_monitors)} output ports")
     print_master("\nRunning simulation...")
@@ -256,8 +245,10 @@ def run_wdm_array_simulation(wavelengths, verbose=True):
             progress_pct = sim.round_time() / RUN_TIME * 100
             print(f"  Progress: {progress_pct:.0f}% ({elapsed:.0f}s elapsed)", flush=True)
 
-    # Run
-    sim.run(mp.at_every(10, progress), until=RUN_TIME)
+    # Run until the energy at the outputs decays, RUN_TIME at most. The pulse
+    # cannot reach the outputs before the transit time at the core index.
+    stop = fdtd_stop.DecayStop(output_regions, cap=RUN_TIME, min_time=N_CORE * total_span)
+    fdtd_stop.run_until_decayed(sim, stop, [mp.at_every(10, progress)])
 
     elapsed = (datetime.now() - start_time).total_seconds()
     print_master(f"\nSimulation complete in {elapsed:.1f} seconds")
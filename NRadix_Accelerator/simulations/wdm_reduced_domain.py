@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Reduced-Domain WDM Array Validation
+===================================
+
+The wdm_NxN_array_test.py scripts simulate the whole 2D array: N rows of
+PEs, one broadband source per row and one output flux monitor per row. The
+array is periodic with pitch PE_PITCH in y, every row is driven by the same
+source, and rows couple only weakly (through the vertical PE stubs), so an
+interior row sees exactly the fields of its neighbours. This module
+replaces the full N x N cell with a supercell of n_rows rows (default 1)
+and a periodic (k = 0) boundary in y, PML only in x:
+
+    full 81x81:     ~815 x 815 um cell
+    reduced 81x1:   ~815 x  10 um cell      (81x fewer grid points)
+
+Three steps:
+
+1. verify()       - full 9x9 vs reduced 9x1 at the same resolution and run
+                    time; per-wavelength deviation of the interior rows
+                    and of the edge rows (which the periodic cell cannot
+                    represent) in dB
+2. run_row()      - the representative row at the full array length
+                    (81 or 243 PEs): exact for interior rows
+3. extrapolate()  - short periodic rows (9, 27 PEs) give a per-PE loss in
+                    dB per wavelength; a linear fit in dB predicts the
+                    transmission at 81 and 243 PEs in seconds
+
+Usage:
+    python wdm_reduced_domain.py --size 81                  # verify, row, extrapolate
+    python wdm_reduced_domain.py --size 243 --skip-row      # verify + extrapolate only
+    python wdm_reduced_domain.py --size 81 --rows 3         # 3-row supercell
+
+    wdm_81x81_array_test.py --reduced and wdm_243x243_array_test.py
+    --reduced run the same validation for their array size.
+
+Author: N-Radix Project
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import meep as mp
+import numpy as np
+
+# Geometry and wavelengths are those of the full-array tests
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from wdm_81x81_array_test import (
+    N_CLAD, N_CORE, PADDING, PE_PITCH, PML_THICKNESS, WG_WIDTH,
+    create_pe_cell, get_all_wavelengths, wavelength_to_frequency,
+)
+
+# MPI detection and rank-0 printing are shared by all FDTD scripts
+from fdtd_parallel import RANK, print_master
+
+import fdtd_stop
+
+# =============================================================================
+# PARAMETERS
+# =============================================================================
+
+RESOLUTION = 20           # pixels/um, as in the 81x81 / 243x243 tests
+VERIFY_SIZE = 9           # full array used to validate the reduced domain
+EXTRAPOLATION_LENGTHS = (9, 27)
+DETECTION_FLOOR_DB = -30.0  # predicted transmission below this counts as lost
+MAX_INTERIOR_DEVIATION_DB = 0.5  # reduced vs full interior rows
+
+
+def run_time_for(n_cols):
+    """Meep time for the pulse to cross n_cols PEs in LiNbO3, plus margin."""
+    return (n_cols * PE_PITCH + 2 * (PADDING + PML_THICKNESS)) * N_CORE + 100
+
+# =============================================================================
+# GEOMETRY AND SIMULATION
+# =============================================================================
+
+def create_array(n_rows, n_cols):
+    """PE grid plus input/output waveguides, laid out like create_81x81_array()."""
+    geometry = []
+    span_x = (n_cols - 1) * PE_PITCH
+    span_y = (n_rows - 1) * PE_PITCH
+
+    for row in range(n_rows):
+        cy = row * PE_PITCH - span_y / 2
+        for col in range(n_cols):
+            geometry.extend(create_pe_cell(col * PE_PITCH - span_x / 2, cy))
+        for side in (-1, 1):
+            geometry.append(
+                mp.Block(
+                    size=mp.Vector3(PADDING + PML_THICKNESS, WG_WIDTH, mp.inf),
+                    center=mp.Vector3(side * (span_x/2 + PE_PITCH/2 + (PADDING + PML_THICKNESS)/2), cy, 0),
+                    material=mp.Medium(index=N_CORE)
+                )
+            )
+
+    return geometry, span_x, span_y
+
+
+@dataclass
+class DomainResult:
+    """Per-row spectra of one (full or reduced) array simulation."""
+    n_rows: int
+    n_cols: int
+    periodic: bool
+    freqs: np.ndarray          # (nfreq,)
+    input_flux: np.ndarray     # (n_rows, nfreq) launched into each row
+    output_flux: np.ndarray    # (n_rows, nfreq) at each output port
+    cell_area_um2: float
+    wall_s: float
+
+    @property
+    def transmission(self):
+        return self.output_flux / np.maximum(np.abs(self.input_flux), 1e-20)
+
+
+def run_domain(wavelengths, n_cols, n_rows, periodic, resolution=RESOLUTION, run_time=None):
+    """
+    Simulate n_rows x n_cols PEs.
+
+    periodic=True is the reduced domain: the cell is exactly n_rows pitches
+    tall with a k = 0 periodic boundary in y and PML only in x. Otherwise
+    the cell is padded and PML-bounded on all sides, as in the full tests.
+    """
+    geometry, span_x, span_y = create_array(n_rows, n_cols)
+    run_time = run_time or run_time_for(n_cols)
+
+    total_x = span_x + PE_PITCH
+    sx = total_x + 2 * (PADDING + PML_THICKNESS)
+    if periodic:
+        sy = n_rows * PE_PITCH
+        boundary = dict(boundary_layers=[mp.PML(thickness=PML_THICKNESS, direction=mp.X)],
+                        k_point=mp.Vector3())
+    else:
+        sy = span_y + PE_PITCH + 2 * (PADDING + PML_THICKNESS)
+        boundary = dict(boundary_layers=[mp.PML(thickness=PML_THICKNESS)])
+
+    freqs = [wavelength_to_frequency(w) for w in wavelengths]
+    f_center = np.mean(freqs)
+    f_width = max(freqs) - min(freqs)
+    src_x = -total_x/2 - PADDING/2
+    rows_y = [row * PE_PITCH - span_y / 2 for row in range(n_rows)]
+
+    sources = [
+        mp.Source(
+            src=mp.GaussianSource(frequency=f_center, fwidth=f_width * 1.5),
+            component=mp.Ez,
+            center=mp.Vector3(src_x, cy, 0),
+            size=mp.Vector3(0, WG_WIDTH * 2, 0)
+        )
+        for cy in rows_y
+    ]
+
+    sim = mp.Simulation(
+        cell_size=mp.Vector3(sx, sy, 0),
+        geometry=geometry,
+        sources=sources,
+        resolution=resolution,
+        default_material=mp.Medium(index=N_CLAD),
+        **boundary
+    )
+
+    nfreq = len(wavelengths)
+    region = lambda x, cy: mp.FluxRegion(center=mp.Vector3(x, cy, 0),
+                                         size=mp.Vector3(0, WG_WIDTH * 3, 0))
+    in_mons = [sim.add_flux(f_center, f_width * 1.2, nfreq, region(src_x + PADDING/4, cy))
+               for cy in rows_y]
+    out_regions = [region(total_x/2 + PADDING/2, cy) for cy in rows_y]
+    out_mons = [sim.add_flux(f_center, f_width * 1.2, nfreq, r) for r in out_regions]
+
+    kind = "reduced (periodic y)" if periodic else "full"
+    print_master(f"  {kind} {n_rows}x{n_cols}: cell {sx:.1f} x {sy:.1f} um, "
+                 f"res {resolution}, until t={run_time:.0f}")
+    t0 = time.time()
+    stop = fdtd_stop.DecayStop(out_regions, cap=run_time, min_time=N_CORE * total_x)
+    fdtd_stop.run_until_decayed(sim, stop, label=f"{n_rows}x{n_cols}")
+    wall = time.time() - t0
+    print_master(f"    done in {wall:.1f} s")
+
+    return DomainResult(
+        n_rows=n_rows, n_cols=n_cols, periodic=periodic,
+        freqs=np.array(mp.get_flux_freqs(out_mons[0])),
+        input_flux=np.array([mp.get_fluxes(m) for m in in_mons]),
+        output_flux=np.array([mp.get_fluxes(m) for m in out_mons]),
+        cell_area_um2=sx * sy, wall_s=wall,
+    )
+
+
+def _at_wavelengths(result, values, wavelengths):
+    """Sample a per-frequency array at the monitor bins nearest each wavelength."""
+    measured = 1.0 / result.freqs
+    idx = [int(np.argmin(np.abs(measured - wl))) for wl in wavelengths]
+    return values[..., idx]
+
+# =============================================================================
+# VERIFICATION, ROW RUN AND EXTRAPOLATION
+# =============================================================================
+
+@dataclass
+class Verification:
+    size: int
+    interior_dev_db: np.ndarray    # per wavelength: reduced vs mean interior full row
+    edge_dev_db: np.ndarray        # per wavelength: reduced vs mean edge full row
+    speedup: float                 # full wall time / reduced wall time
+    area_ratio: float
+
+    @property
+    def passed(self):
+        return bool(np.max(np.abs(self.interior_dev_db)) <= MAX_INTERIOR_DEVIATION_DB)
+
+
+def verify(wavelengths, size=VERIFY_SIZE, n_rows=1, resolution=RESOLUTION):
+    """Full size x size array vs the reduced n_rows x size supercell."""
+    print_master(f"\n--- Verifying reduced domain against full {size}x{size} ---")
+    run_time = run_time_for(size)
+    full = run_domain(wavelengths, size, size, periodic=False,
+                      resolution=resolution, run_time=run_time)
+    reduced = run_domain(wavelengths, size, n_rows, periodic=True,
+                         resolution=resolution, run_time=run_time)
+
+    full_out = _at_wavelengths(full, full.output_flux, wavelengths)
+    red_out = _at_wavelengths(reduced, reduced.output_flux, wavelengths).mean(axis=0)
+
+    def dev_db(rows):
+        ref = np.maximum(full_out[rows].mean(axis=0), 1e-20)
+        return 10 * np.log10(np.maximum(red_out, 1e-20) / ref)
+
+    return Verification(
+        size=size,
+        interior_dev_db=dev_db(slice(1, size - 1)),
+        edge_dev_db=dev_db([0, size - 1]),
+        speedup=full.wall_s / max(reduced.wall_s, 1e-9),
+        area_ratio=full.cell_area_um2 / reduced.cell_area_um2,
+    )
+
+
+def run_row(wavelengths, size, n_rows=1, resolution=RESOLUTION):
+    """The representative row(s) at the full array length."""
+    print_master(f"\n--- Representative {n_rows}-row supercell, {size} PEs long ---")
+    return run_domain(wavelengths, size, n_rows, periodic=True, resolution=resolution)
+
+
+@dataclass
+class Extrapolation:
+    lengths: tuple
+    loss_per_pe_db: np.ndarray     # per wavelength
+    offset_db: np.ndarray          # per wavelength (coupling in/out)
+
+    def transmission_db(self, n_cols):
+        return self.offset_db - self.loss_per_pe_db * n_cols
+
+
+def extrapolate(wavelengths, lengths=EXTRAPOLATION_LENGTHS, n_rows=1, resolution=RESOLUTION):
+    """Fit transmission (dB) = offset - loss_per_pe * n over short periodic rows."""
+    print_master(f"\n--- Extrapolation rows: {', '.join(str(n) for n in lengths)} PEs ---")
+    t_db = []
+    for n in lengths:
+        res = run_domain(wavelengths, n, n_rows, periodic=True, resolution=resolution)
+        t = _at_wavelengths(res, res.transmission, wavelengths).mean(axis=0)
+        t_db.append(10 * np.log10(np.maximum(t, 1e-20)))
+    t_db = np.array(t_db)                       # (n_lengths, n_wavelengths)
+    slope, offset = np.polyfit(np.array(lengths, dtype=float), t_db, 1)
+    return Extrapolation(lengths=tuple(lengths), loss_per_pe_db=-slope, offset_db=offset)
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def run_reduced_validation(size, output_dir, n_rows=1, resolution=RESOLUTION,
+                           verify_size=VERIFY_SIZE, lengths=EXTRAPOLATION_LENGTHS,
+                           skip_verify=False, skip_row=False):
+    """Verify, run the representative row and extrapolate; True if all pass."""
+    wavelengths = get_all_wavelengths()
+    targets = sorted({size, 81, 243})
+
+    print_master("\n" + "=" * 70)
+    print_master(f"REDUCED-DOMAIN WDM VALIDATION: {size}x{size} ARRAY")
+    print_master("=" * 70)
+    print_master(f"Supercell: {n_rows} row(s), periodic in y; {len(wavelengths)} wavelengths")
+
+    lines = []
+    passed = True
+
+    if not skip_verify:
+        v = verify(wavelengths, verify_size, n_rows, resolution)
+        passed &= v.passed
+        lines += [f"Verification vs full {v.size}x{v.size}: {'PASS' if v.passed else 'FAIL'}",
+                  f"  interior rows: max |dev| = {np.max(np.abs(v.interior_dev_db)):.3f} dB "
+                  f"(limit {MAX_INTERIOR_DEVIATION_DB} dB)",
+                  f"  edge rows:     max |dev| = {np.max(np.abs(v.edge_dev_db)):.3f} dB "
+                  f"(not modelled by the periodic cell)",
+                  f"  cell area {v.area_ratio:.1f}x smaller, {v.speedup:.1f}x faster"]
+
+    if not skip_row:
+        row = run_row(wavelengths, size, n_rows, resolution)
+        out = _at_wavelengths(row, row.output_flux, wavelengths)
+        t_db = 10 * np.log10(np.maximum(_at_wavelengths(row, row.transmission, wavelengths), 1e-20))
+        detected = bool(np.all(out > 0)) and bool(np.all(t_db > DETECTION_FLOOR_DB))
+        passed &= detected
+        lines += [f"Representative row, {size} PEs: "
+                  f"{'ALL 18 WAVELENGTHS DETECTED' if detected else 'CHANNELS LOST'} "
+                  f"({row.wall_s:.0f} s, cell {row.cell_area_um2:.0f} um^2)",
+                  f"  transmission {t_db.min():.2f} .. {t_db.max():.2f} dB"]
+
+    ext = extrapolate(wavelengths, lengths, n_rows, resolution)
+    lines.append(f"Extrapolation from {', '.join(str(n) for n in ext.lengths)}-PE rows:")
+    lines.append(f"  loss per PE: {ext.loss_per_pe_db.min():.4f} .. "
+                 f"{ext.loss_per_pe_db.max():.4f} dB")
+    for n in targets:
+        t = ext.transmission_db(n)
+        ok = bool(np.all(t > DETECTION_FLOOR_DB))
+        if n == size:
+            passed &= ok
+        lines.append(f"  {n:3d} PEs: predicted transmission {t.min():.2f} .. {t.max():.2f} dB "
+                     f"[{'OK' if ok else 'BELOW FLOOR'}]")
+
+    print_master("\n" + "=" * 70)
+    for line in lines:
+        print_master(line)
+    print_master(f"\nOverall: {'PASSED' if passed else 'NEEDS REVIEW'}")
+    print_master("=" * 70)
+
+    if RANK == 0:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"wdm_{size}x{size}_reduced_results.txt")
+        with open(path, 'w') as f:
+            f.write("=" * 70 + "\n")
+            f.write(f"WDM {size}x{size} REDUCED-DOMAIN VALIDATION\n")
+            f.write("=" * 70 + "\n")
+            f.write(f"Date: {datetime.now()}\n")
+            f.write(f"Supercell rows: {n_rows}\n")
+            f.write(f"Resolution: {resolution}\n")
+            f.write(f"Detection floor: {DETECTION_FLOOR_DB} dB\n\n")
+            f.write("\n".join(lines) + "\n")
+            f.write(f"\nStatus: {'PASSED' if passed else 'NEEDS REVIEW'}\n")
+            f.write("\nPer-wavelength extrapolation (um, loss/PE dB, "
+                    + ", ".join(f"T@{n} dB" for n in targets) + "):\n")
+            for i, wl in enumerate(wavelengths):
+                f.write(f"  {wl:.3f}  {ext.loss_per_pe_db[i]:.5f}  "
+                        + "  ".join(f"{ext.transmission_db(n)[i]:.2f}" for n in targets) + "\n")
+        print_master(f"Results saved: {path}")
+
+    return passed
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Reduced-domain WDM array validation')
+    parser.add_argument('--size', type=int, default=81, help='Array size N (N x N PEs)')
+    parser.add_argument('--rows', type=int, default=1, help='Rows in the periodic supercell')
+    parser.add_argument('--resolution', type=int, default=RESOLUTION, help='pixels/um')
+    parser.add_argument('--verify-size', type=int, default=VERIFY_SIZE,
+                        help='Full array run to verify the reduced domain against')
+    parser.add_argument('--lengths', type=str, default=",".join(map(str, EXTRAPOLATION_LENGTHS)),
+                        help='Row lengths (PEs) used for extrapolation')
+    parser.add_argument('--skip-verify', action='store_true', help='Skip the full-array check')
+    parser.add_argument('--skip-row', action='store_true',
+                        help='Skip the full-length row; extrapolate only')
+    parser.add_argument('--output', type=str,
+                        default=os.environ.get('WDM_OUTPUT_DIR', './results'),
+                        help='Output directory')
+    args = parser.parse_args()
+
+    passed = run_reduced_validation(
+        args.size, args.output, n_rows=args.rows, resolution=args.resolution,
+        verify_size=args.verify_size,
+        lengths=tuple(int(n) for n in args.lengths.split(",") if n.strip()),
+        skip_verify=args.skip_verify, skip_row=args.skip_row,
+    )
+    return passed
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -19,9 +19,11 @@ Expected result: Each wavelength should arrive at output with minimal loss,
 independent of other wavelengths present.
 
 Performance Note:
-    Use OpenMP for parallelism (MPI unavailable with Python 3.13):
-    export OMP_NUM_THREADS=12
-    /home/jackwayne/miniconda/envs/meep_env/bin/python wdm_waveguide_test.py
+    Run through the launcher, which sets OpenMP threads (or MPI ranks x
+    threads under mpirun), picks the chunk decomposition and logs
+    timesteps/s and scaling efficiency:
+    python fdtd_parallel.py wdm_waveguide_test.py
+    mpirun -np 4 python fdtd_parallel.py wdm_waveguide_test.py
 
 Author: N-Radix Project
 Date: February 5, 2026
@@ -36,21 +38,10 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 import os
 
-# Check if running with MPI
-try:
-    from mpi4py import MPI
-    RANK = MPI.COMM_WORLD.Get_rank()
-    SIZE = MPI.COMM_WORLD.Get_size()
-    IS_PARALLEL = SIZE > 1
-except ImportError:
-    RANK = 0
-    SIZE = 1
-    IS_PARALLEL = False
-
-def print_master(msg):
-    """Only print from rank 0 to avoid duplicate output."""
-    if RANK == 0:
-        print(msg)
+# MPI detection and rank-0 printing are shared by all FDTD scripts
+from fdtd_parallel import RANK, SIZE, IS_PARALLEL, print_master
+
+import fdtd_stop
 
 # =============================================================================
 # WDM TRIPLET DEFINITIONS (from collision-free search)
@@ -196,19 +187,19 @@ def run_wdm_simulation(wavelengths, verbose=True):
 
     # Also add a broadband flux monitor
     nfreq = len(wavelengths)
-    broadband_flux = sim.add_flux(
-        f_center, f_width * 1.2, nfreq,
-        mp.FluxRegion(
-            center=mp.Vector3(flux_x, 0, 0),
-            size=mp.Vector3(0, WG_WIDTH * 2, 0)
-        )
+    output_region = mp.FluxRegion(
+        center=mp.Vector3(flux_x, 0, 0),
+        size=mp.Vector3(0, WG_WIDTH * 2, 0)
     )
+    broadband_flux = sim.add_flux(f_center, f_width * 1.2, nfreq, output_region)
 
     if verbose:
         print("Running simulation...")
 
-    # Run simulation
-    sim.run(until=RUN_TIME)
+    # Run until the energy at the output decays, RUN_TIME at most
+    stop = fdtd_stop.DecayStop([output_region], cap=RUN_TIME, check_every=5,
+                               min_time=N_CORE * WG_LENGTH)
+    fdtd_stop.run_until_decayed(sim, stop)
 
     if verbose:
         print("Simulation complete. Analyzing results...\n")
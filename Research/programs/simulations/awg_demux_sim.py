@@ -9,7 +9,13 @@ and SFG outputs for 5-level detection.
 Usage:
     python awg_demux_sim.py                     # Run broadband test
     python awg_demux_sim.py --wavelength 1.55   # Single wavelength routing
-    python awg_demux_sim.py --sweep             # Full wavelength sweep
+    python awg_demux_sim.py --sweep             # Routing of every wavelength (one broadband run)
+    python awg_demux_sim.py --sweep --per-wavelength
+                                                # Same, one narrowband run per wavelength
+    python awg_demux_sim.py --optimize --tolerance -20
+                                                # Adaptive pitch/FPR search for -20 dB crosstalk
+    python awg_demux_sim.py --sweep-layout --screen-resolution 8 --top-k 3
+                                                # Screen layouts at res 8, confirm 3 at res 15
 """
 
 import os
@@ -19,6 +25,16 @@ import meep as mp
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Sweep scheduler, adaptive search, multi-fidelity screening and batched
+# excitation shared with the N-Radix simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'NRadix_Accelerator', 'simulations'))
+import fdtd_broadband
+import fdtd_fidelity
+import fdtd_optimize
+import fdtd_stop
+import fdtd_sweep
+
 # Ternary wavelengths (um) - sorted by wavelength for channel assignment
 WAVELENGTHS = {
     'SFG_RB': 0.608,   # RED + BLUE sum frequency (shortest)
@@ -33,7 +49,8 @@ N_CHANNELS = 5
 
 
 def calculate_awg_parameters(wavelengths: dict, n_eff: float = 1.8,
-                             n_group: float = 1.9):
+                             n_group: float = 1.9, array_pitch: float = 0.8,
+                             fpr_radius: float = 20.0):
     """
     Calculate proper AWG design parameters for the target wavelengths.
 
@@ -48,6 +65,8 @@ def calculate_awg_parameters(wavelengths: dict, n_eff: float = 1.8,
         wavelengths: dict of target wavelengths (um)
         n_eff: Effective index of arrayed waveguides
         n_group: Group index for dispersion
+        array_pitch: Arrayed waveguide pitch (um)
+        fpr_radius: Free propagation region radius (um)
 
     Returns:
         dict with calculated AWG parameters
@@ -73,8 +92,7 @@ def calculate_awg_parameters(wavelengths: dict, n_eff: float = 1.8,
     # dispersion = m / (n_s * d)
     # Smaller pitch = more dispersion, but limited by waveguide width
 
-    # Array pitch - small but practical
-    array_pitch = 0.8  # um
+    # Array pitch - small but practical (array_pitch, default 0.8 um)
 
     # Path length difference
     delta_L = diffraction_order * lambda_center / n_eff
@@ -91,7 +109,6 @@ def calculate_awg_parameters(wavelengths: dict, n_eff: float = 1.8,
     theta_max = dispersion * delta_lambda_total / 2
     # We want output span ~ 2 * R * tan(theta_max) to fit all channels
     # For theta_max ~ 0.32 rad (18 deg), tan ~ 0.33, so R=20 gives span ~ 13um
-    fpr_radius = 20.0  # um
 
     print(f"\n  AWG Design Parameters:")
     print(f"    Center wavelength: {lambda_center:.3f} um")
@@ -344,14 +361,21 @@ def create_awg_geometry(n_channels: int = 5, awg_params: dict = None):
 
 
 def run_awg_simulation(wavelength: float = None, resolution: int = 15,
-                       n_channels: int = 5):
+                       n_channels: int = 5, array_pitch: float = 0.8,
+                       fpr_radius: float = 20.0):
     """
     Run AWG demultiplexer simulation.
 
+    Broadband (wavelength None) runs one pulse covering every ternary
+    wavelength, with the monitors sampling each of them exactly, so the
+    result's 'transfer' matrix holds all channel responses from one run.
+
     Args:
         wavelength: Test wavelength (um), None for broadband
         resolution: FDTD resolution (pixels/um)
         n_channels: Number of output channels
+        array_pitch: Arrayed waveguide pitch (um)
+        fpr_radius: Free propagation region radius (um)
 
     Returns:
         dict with channel responses
@@ -363,7 +387,8 @@ def run_awg_simulation(wavelength: float = None, resolution: int = 15,
         print("Broadband simulation")
 
     # Calculate proper AWG parameters first
-    awg_params = calculate_awg_parameters(WAVELENGTHS)
+    awg_params = calculate_awg_parameters(WAVELENGTHS, array_pitch=array_pitch,
+                                          fpr_radius=fpr_radius)
 
     # Create AWG geometry with calculated parameters
     awg = create_awg_geometry(n_channels=n_channels, awg_params=awg_params)
@@ -387,19 +412,16 @@ def run_awg_simulation(wavelength: float = None, resolution: int = 15,
         )
         sim_time_factor = 2.0
     else:
-        # Broadband source covering all ternary wavelengths (0.55 to 1.7 um)
-        freq_min = 1.0 / 1.7
-        freq_max = 1.0 / 0.55
-        freq_center = (freq_min + freq_max) / 2
-        freq_width = (freq_max - freq_min) * 0.8
+        # Broadband source covering all ternary wavelengths
+        band = fdtd_broadband.Band.covering(WAVELENGTHS, nfreq=200)
         source = mp.Source(
-            mp.GaussianSource(freq_center, fwidth=freq_width),
+            mp.GaussianSource(band.fcen, fwidth=band.fwidth),
             component=mp.Ez,
             center=mp.Vector3(awg['input_pos'][0], awg['input_pos'][1]),
             size=mp.Vector3(0, awg['wg_width'] * 2, 0)
         )
         sim_time_factor = 3.0
-        print(f"  Source freq: {freq_center:.3f} +/- {freq_width:.3f}")
+        print(f"  {band.describe()}")
 
     # Create simulation with cladding background
     sim = mp.Simulation(
@@ -416,26 +438,28 @@ def run_awg_simulation(wavelength: float = None, resolution: int = 15,
         mon_freq = 1.0 / wavelength
         mon_df = 0.3 * mon_freq
         nfreq = 100
+        flux_freqs = (mon_freq, mon_df, nfreq)
+        measured = ({name: wvl for name, wvl in WAVELENGTHS.items() if wvl == wavelength}
+                    or {f"{wavelength} um": wavelength})
     else:
-        mon_freq = freq_center
-        mon_df = freq_width
-        nfreq = 200
+        # Uniform grid over the band plus each ternary wavelength exactly
+        flux_freqs = (band.frequencies,)
+        measured = WAVELENGTHS
 
     # Add flux monitors at each output channel
     channel_monitors = []
+    channel_regions = []
     for out in awg['output_positions']:
-        mon = sim.add_flux(
-            mon_freq, mon_df, nfreq,
-            mp.FluxRegion(
-                center=mp.Vector3(out['x'] - 1, out['y']),
-                size=mp.Vector3(0, awg['wg_width'] * 3, 0)
-            )
+        region = mp.FluxRegion(
+            center=mp.Vector3(out['x'] - 1, out['y']),
+            size=mp.Vector3(0, awg['wg_width'] * 3, 0)
         )
-        channel_monitors.append(mon)
+        channel_regions.append(region)
+        channel_monitors.append(sim.add_flux(*flux_freqs, region))
 
     # Input monitor for normalization
     input_mon = sim.add_flux(
-        mon_freq, mon_df, nfreq,
+        *flux_freqs,
         mp.FluxRegion(
             center=mp.Vector3(awg['input_pos'][0] + 2, awg['input_pos'][1]),
             size=mp.Vector3(0, awg['wg_width'] * 3, 0)
@@ -449,10 +473,12 @@ def run_awg_simulation(wavelength: float = None, resolution: int = 15,
     min_time = cell_x * n_g * sim_time_factor
 
     print(f"\n  Running FDTD simulation...")
-    print(f"  Estimated time: {min_time:.1f} Meep units")
+    print(f"  Estimated time: {min_time:.1f} Meep units (cap)")
 
-    # Run for fixed time to ensure light propagates through
-    sim.run(until=min_time)
+    # Run until the energy at the output channels decays, min_time at most;
+    # never before one transit of the cell at the group index
+    stop = fdtd_stop.DecayStop(channel_regions, cap=min_time, min_time=cell_x * n_g)
+    fdtd_stop.run_until_decayed(sim, stop)
 
     actual_time = sim.meep_time()
     print(f"  Completed at t = {actual_time:.1f}")
@@ -512,12 +538,17 @@ def run_awg_simulation(wavelength: float = None, resolution: int = 15,
     else:
         print(f"\n  Crosstalk: negligible")
 
+    # Channel x wavelength transmission (every ternary wavelength when broadband)
+    transfer = fdtd_broadband.TransferMatrix.from_spectra(
+        freqs, {f"Ch{ch['channel']}": ch['transmission'] for ch in channel_results}, measured)
+
     return {
         'frequencies': freqs,
         'wavelengths': wavelengths_out,
         'input_flux': input_flux,
         'channels': channel_results,
         'crosstalk_matrix': crosstalk_matrix,
+        'transfer': transfer,
         'n_channels': n_channels,
         'test_wavelength': wavelength,
         'awg_params': awg_params,
@@ -525,36 +556,152 @@ def run_awg_simulation(wavelength: float = None, resolution: int = 15,
     }
 
 
-def run_wavelength_routing_test():
+def run_wavelength_routing_test(resolution: int = 12, per_wavelength: bool = False):
     """
     Test AWG routing for each ternary wavelength.
+
+    The AWG is linear, so by default one broadband run measures every
+    wavelength (N_CHANNELS times fewer FDTD runs); per_wavelength runs one
+    narrowband simulation per wavelength instead, for validation.
+
+    Returns:
+        (dict per wavelength name, channel x wavelength TransferMatrix)
     """
     print("\n=== AWG WAVELENGTH ROUTING TEST ===")
 
+    if per_wavelength:
+        runs = {}
+        for name, wvl in WAVELENGTHS.items():
+            print(f"\n--- Testing {name} ({wvl} um) ---")
+            runs[name] = run_awg_simulation(wavelength=wvl, resolution=resolution)
+        transfer = fdtd_broadband.TransferMatrix.concat([r['transfer'] for r in runs.values()])
+    else:
+        print(f"\n--- Testing all {len(WAVELENGTHS)} wavelengths in one broadband run ---")
+        result = run_awg_simulation(wavelength=None, resolution=resolution)
+        runs = {name: result for name in WAVELENGTHS}
+        transfer = result['transfer']
+    transfer.print_table("AWG routing")
+
+    # Channel with the maximum response at each wavelength
+    routed = transfer.routed()
     results = {}
     for name, wvl in WAVELENGTHS.items():
-        print(f"\n--- Testing {name} ({wvl} um) ---")
-        result = run_awg_simulation(wavelength=wvl, resolution=12)
-
-        # Find which channel has maximum response at this wavelength
-        max_ch = -1
-        max_T = 0
-        for ch in result['channels']:
-            idx = np.argmin(np.abs(result['wavelengths'] - wvl))
-            T = ch['transmission'][idx]
-            if T > max_T:
-                max_T = T
-                max_ch = ch['channel']
-
+        port, max_T = routed[name]
+        max_ch = transfer.ports.index(port)
         results[name] = {
             'wavelength': wvl,
             'routed_to_channel': max_ch,
             'transmission': max_T,
-            'full_result': result
+            'full_result': runs[name]
         }
         print(f"  {name} ({wvl} um) -> Channel {max_ch}, T = {max_T:.4f}")
 
-    return results
+    return results, transfer
+
+
+def worst_crosstalk_db(result: dict) -> float:
+    """Largest off-diagonal crosstalk of a simulation result, in dB."""
+    return 10 * np.log10(max(np.max(result['crosstalk_matrix']), 1e-10))
+
+
+def run_layout_sweep(pitches: list = None, radii: list = None, resolution: int = 12,
+                     n_channels: int = 5, sweep: fdtd_sweep.SweepOptions = None,
+                     screen_resolution: int = None, top_k: int = 3,
+                     calibration_points: int = 3):
+    """
+    Grid sweep of array pitch x FPR radius, ranked by worst-case crosstalk.
+
+    Each layout is one broadband run. With screen_resolution set, every
+    layout is screened at that resolution and only the top_k (plus
+    calibration_points others) are re-run at `resolution` (fdtd_fidelity).
+    """
+    if pitches is None:
+        pitches = [0.6, 0.7, 0.8, 0.9, 1.0]
+    if radii is None:
+        radii = [15.0, 20.0, 25.0]
+
+    print(f"\n=== AWG LAYOUT SWEEP ===")
+    print(f"Pitches: {pitches} um")
+    print(f"FPR radii: {radii} um")
+
+    layouts = [dict(array_pitch=p, fpr_radius=r) for p in pitches for r in radii]
+    fixed = dict(wavelength=None, n_channels=n_channels)
+    report = None
+    if screen_resolution:
+        report = fdtd_fidelity.screen_and_confirm(
+            run_awg_simulation, layouts, objective=worst_crosstalk_db, fixed=fixed,
+            screen_resolution=screen_resolution, resolution=resolution,
+            top_k=top_k, calibration_points=calibration_points, sweep=sweep,
+        )
+        ranked = [(layouts[i], report.fine_values[i]) for i in report.top_k
+                  if i in report.fine_values]
+        best_result = report.best_result
+    else:
+        results = fdtd_sweep.run_sweep(
+            run_awg_simulation, [{**fixed, **l, 'resolution': resolution} for l in layouts],
+            sweep,
+            describe=lambda point, r: (f"pitch = {point['array_pitch']} um, "
+                                       f"R = {point['fpr_radius']} um: "
+                                       f"worst crosstalk {worst_crosstalk_db(r):.1f} dB"))
+        ranked = [(l, worst_crosstalk_db(r)) for l, r in zip(layouts, results) if r is not None]
+        best_result = min((r for r in results if r is not None), key=worst_crosstalk_db,
+                          default=None)
+    if best_result is None:
+        raise RuntimeError(f"All {len(layouts)} layout points failed; see the tracebacks above")
+    ranked.sort(key=lambda item: item[1])
+
+    print(f"\n  Best layouts (resolution {resolution}):")
+    for layout, xt in ranked[:top_k]:
+        print(f"    pitch = {layout['array_pitch']} um, R = {layout['fpr_radius']} um: "
+              f"worst crosstalk {xt:.1f} dB")
+
+    return {
+        'ranked': ranked,
+        'best_result': best_result,
+        'fidelity': report
+    }
+
+
+def optimize_awg_layout(pitch_range: tuple = (0.6, 1.2), fpr_range: tuple = (12.0, 30.0),
+                        resolution: int = 12, n_channels: int = 5,
+                        target_crosstalk_db: float = -20.0, max_rounds: int = 6,
+                        max_evaluations: int = None,
+                        sweep: fdtd_sweep.SweepOptions = None):
+    """
+    Adaptive search over array pitch and FPR radius for low crosstalk.
+
+    Each candidate is one broadband run (all channels at once). Successive
+    grid refinement (fdtd_optimize) spends further runs only around the
+    best layout, stopping once the worst-case crosstalk is at or below
+    target_crosstalk_db. Pitch is resolved to 20 nm and radius to 0.5 um.
+    """
+    print(f"\n=== ADAPTIVE AWG LAYOUT SEARCH ===")
+    print(f"Pitch range: {pitch_range} um, FPR radius range: {fpr_range} um, "
+          f"target crosstalk <= {target_crosstalk_db} dB")
+
+    search = fdtd_optimize.refine_search(
+        run_awg_simulation,
+        axes=[fdtd_optimize.Axis('array_pitch', *pitch_range, resolution=0.02),
+              fdtd_optimize.Axis('fpr_radius', *fpr_range, resolution=0.5)],
+        objective=worst_crosstalk_db,
+        fixed=dict(wavelength=None, resolution=resolution, n_channels=n_channels),
+        tolerance=target_crosstalk_db, max_rounds=max_rounds,
+        max_evaluations=max_evaluations, sweep=sweep,
+    )
+
+    print(f"\n  Best layout ({search.n_evaluations} FDTD runs): "
+          f"pitch = {search.best_params['array_pitch']} um, "
+          f"FPR radius = {search.best_params['fpr_radius']} um, "
+          f"worst crosstalk = {search.best_value:.1f} dB"
+          f"{'' if search.converged else ' (target not reached)'}")
+
+    return {
+        'target_crosstalk_db': target_crosstalk_db,
+        'converged': search.converged,
+        'evaluations': search.evaluations,
+        'best_params': search.best_params,
+        'best_result': search.best_result
+    }
 
 
 def save_results(result: dict, output_dir: str, label: str = ""):
@@ -631,15 +778,27 @@ def save_results(result: dict, output_dir: str, label: str = ""):
                comments='')
     print(f"Saved: {xtalk_path}")
 
+    if not result.get('test_wavelength'):
+        result['transfer'].save_csv(os.path.join(output_dir, f"{base_name}_transfer.csv"))
+
 
 def main():
     parser = argparse.ArgumentParser(description='AWG Demultiplexer Meep FDTD Simulation')
     parser.add_argument('--wavelength', type=float, help='Test single wavelength (um)')
     parser.add_argument('--sweep', action='store_true', help='Test all ternary wavelengths')
     parser.add_argument('--broadband', action='store_true', help='Broadband simulation (default)')
+    parser.add_argument('--sweep-layout', action='store_true',
+                        help='Grid sweep of array pitch and FPR radius (broadband runs)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Adaptive array pitch / FPR radius search to the --tolerance crosstalk (dB)')
     parser.add_argument('--channels', type=int, default=5, help='Number of output channels')
     parser.add_argument('--resolution', type=int, default=15, help='FDTD resolution')
     parser.add_argument('--output', type=str, default=None, help='Output directory')
+    fdtd_sweep.add_arguments(parser)
+    fdtd_fidelity.add_arguments(parser)
+    fdtd_broadband.add_arguments(parser)
+    fdtd_optimize.add_arguments(parser, default_tolerance=-20.0,
+                                tolerance_help='Target worst-case crosstalk in dB')
 
     args = parser.parse_args()
 
@@ -656,8 +815,47 @@ def main():
         print(f"    {name}: {wvl} um")
     print(f"  Output channels: {args.channels}")
 
-    if args.sweep:
-        results = run_wavelength_routing_test()
+    if args.sweep_layout:
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, "awg_layout_sweep_checkpoint.jsonl"))
+        result = run_layout_sweep(resolution=args.resolution, n_channels=args.channels,
+                                  sweep=sweep, screen_resolution=args.screen_resolution,
+                                  top_k=args.top_k, calibration_points=args.calibration_points)
+
+        sweep_path = os.path.join(output_dir, "awg_layout_sweep.csv")
+        os.makedirs(output_dir, exist_ok=True)
+        np.savetxt(sweep_path,
+                   [[l['array_pitch'], l['fpr_radius'], xt] for l, xt in result['ranked']],
+                   delimiter=",", header="Array Pitch (um),FPR Radius (um),Worst Crosstalk (dB)",
+                   comments='')
+        print(f"\nSaved layout sweep: {sweep_path}")
+        if result['fidelity'] is not None:
+            fdtd_fidelity.save_report(result['fidelity'],
+                                      os.path.join(output_dir, "awg_layout_sweep_fidelity.csv"))
+        save_results(result['best_result'], output_dir, label="_best_layout")
+        fdtd_sweep.finish(sweep)
+
+    elif args.optimize:
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, "awg_layout_search_checkpoint.jsonl"))
+        result = optimize_awg_layout(resolution=args.resolution, n_channels=args.channels,
+                                     target_crosstalk_db=args.tolerance,
+                                     max_rounds=args.max_rounds,
+                                     max_evaluations=args.max_evaluations, sweep=sweep)
+
+        search_path = os.path.join(output_dir, "awg_layout_search.csv")
+        os.makedirs(output_dir, exist_ok=True)
+        np.savetxt(search_path,
+                   [[i, p['array_pitch'], p['fpr_radius'], xt]
+                    for i, (p, xt) in enumerate(result['evaluations'])],
+                   delimiter=",", header="Run,Array Pitch (um),FPR Radius (um),Worst Crosstalk (dB)",
+                   comments='')
+        print(f"\nSaved layout search: {search_path}")
+        save_results(result['best_result'], output_dir, label="_optimized")
+        fdtd_sweep.finish(sweep)
+
+    elif args.sweep:
+        results, transfer = run_wavelength_routing_test(per_wavelength=args.per_wavelength)
 
         summary_path = os.path.join(output_dir, "awg_routing_summary.csv")
         os.makedirs(output_dir, exist_ok=True)
@@ -666,6 +864,7 @@ def main():
             for name, data in results.items():
                 f.write(f"{name},{data['wavelength']},{data['routed_to_channel']},{data['transmission']:.4f}\n")
         print(f"\nSaved routing summary: {summary_path}")
+        transfer.save_csv(os.path.join(output_dir, "awg_transfer_matrix.csv"))
 
     elif args.wavelength:
         result = run_awg_simulation(args.wavelength, args.resolution, args.channels)
@@ -10,7 +10,15 @@ Usage:
     python directional_coupler_sim.py --wavelength 1.55  # Single wavelength
     python directional_coupler_sim.py --sweep-gap        # Gap sweep for optimization
     python directional_coupler_sim.py --sweep-params     # 2D parameter sweep
-    python directional_coupler_sim.py --all-wavelengths  # Test all ternary wavelengths
+    python directional_coupler_sim.py --all-wavelengths  # All ternary wavelengths, one broadband run
+    python directional_coupler_sim.py --all-wavelengths --per-wavelength
+                                                         # Same, one narrowband run per wavelength
+    python directional_coupler_sim.py --sweep-params --jobs 4 --cores 12
+                                                         # 4 points at a time, 3 threads each
+    python directional_coupler_sim.py --optimize --tolerance 1.0
+                                                         # Adaptive gap/length search
+    python directional_coupler_sim.py --sweep-params --screen-resolution 10 --top-k 5
+                                                         # Screen at res 10, confirm 5 at res 20
 
 Theory:
     For 50% coupling, the coupling length L should satisfy: L = pi / (2 * kappa)
@@ -25,6 +33,16 @@ import meep as mp
 import numpy as np
 import matplotlib.pyplot as plt
 
+# FDTD result cache, sweep scheduler and batched excitation shared with the N-Radix simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'NRadix_Accelerator', 'simulations'))
+import fdtd_broadband
+import fdtd_cache
+import fdtd_fidelity
+import fdtd_optimize
+import fdtd_stop
+import fdtd_sweep
+
 # Ternary wavelengths (um)
 WAVELENGTHS = {
     'RED': 1.55,
@@ -35,7 +53,7 @@ WAVELENGTHS = {
 
 def run_coupler_simulation(wavelength: float, gap: float = 0.25,
                            coupling_length: float = 6.0,
-                           resolution: int = 25):
+                           resolution: int = 25, wavelengths: dict = None):
     """
     Simulate directional coupler at given wavelength.
 
@@ -44,6 +62,9 @@ def run_coupler_simulation(wavelength: float, gap: float = 0.25,
         gap: Gap between waveguides (um) - default tuned for 50/50 split
         coupling_length: Length of coupling region (um) - default tuned for 50/50 split
         resolution: FDTD resolution (pixels/um)
+        wavelengths: name -> wavelength (um) to measure in the same run with
+            one broadband pulse (fdtd_broadband); the result then also holds
+            their 'transfer' matrix. The centre values stay at `wavelength`.
 
     Returns:
         dict with through/cross port power and coupling ratio
@@ -52,6 +73,9 @@ def run_coupler_simulation(wavelength: float, gap: float = 0.25,
     print(f"Wavelength: {wavelength} um, Gap: {gap} um, Length: {coupling_length} um")
 
     freq = 1.0 / wavelength
+    band = fdtd_broadband.Band.covering(wavelengths) if wavelengths else None
+    if band:
+        print(band.describe())
 
     # Geometry parameters (um)
     wg_width = 0.5
@@ -181,18 +205,20 @@ def run_coupler_simulation(wavelength: float, gap: float = 0.25,
         )
     )
 
-    # Source - inject into upper waveguide only
+    # Source - inject into upper waveguide only (one pulse spanning every
+    # measured wavelength when broadband)
+    pulse = (mp.GaussianSource(band.fcen, fwidth=band.fwidth) if band
+             else mp.GaussianSource(freq, fwidth=0.1 * freq))
     sources = [
         mp.Source(
-            mp.GaussianSource(freq, fwidth=0.1 * freq),
+            pulse,
             component=mp.Ez,
             center=mp.Vector3(x_start + 1, input_sep/2),
             size=mp.Vector3(0, wg_width * 1.5, 0)
         )
     ]
 
-    # Simulation
-    sim = mp.Simulation(
+    sim_kwargs = dict(
         cell_size=cell_size,
         boundary_layers=[mp.PML(pml_thickness)],
         geometry=geometry,
@@ -203,53 +229,62 @@ def run_coupler_simulation(wavelength: float, gap: float = 0.25,
     # Flux monitors
     nfreq = 50
     df = 0.15 * freq
-
-    # Through port (upper output)
-    through_mon = sim.add_flux(
-        freq, df, nfreq,
-        mp.FluxRegion(
+    flux_freqs = (band.frequencies,) if band else (freq, df, nfreq)
+    monitors = {
+        # Through port (upper output)
+        'through': (*flux_freqs, mp.FluxRegion(
             center=mp.Vector3(cell_x/2 - pml_thickness - 1, input_sep/2),
             size=mp.Vector3(0, wg_width * 2, 0)
-        )
-    )
-
-    # Cross port (lower output)
-    cross_mon = sim.add_flux(
-        freq, df, nfreq,
-        mp.FluxRegion(
+        )),
+        # Cross port (lower output)
+        'cross': (*flux_freqs, mp.FluxRegion(
             center=mp.Vector3(cell_x/2 - pml_thickness - 1, -input_sep/2),
             size=mp.Vector3(0, wg_width * 2, 0)
-        )
-    )
-
-    # Input monitor
-    input_mon = sim.add_flux(
-        freq, df, nfreq,
-        mp.FluxRegion(
+        )),
+        # Input monitor
+        'input': (*flux_freqs, mp.FluxRegion(
             center=mp.Vector3(x_start + 2, input_sep/2),
             size=mp.Vector3(0, wg_width * 2, 0)
-        )
-    )
+        )),
+    }
 
-    # Run
-    print("Running FDTD simulation...")
-    sim.run(until_after_sources=mp.stop_when_fields_decayed(
-        50, mp.Ez, mp.Vector3(cell_x/2 - pml_thickness - 2, 0), 1e-4
-    ))
+    # Stop once the energy at both output ports decays; the cap (ten
+    # transits of the cell at the core index) only guards a run that doesn't
+    stop = fdtd_stop.DecayStop([monitors['through'][-1], monitors['cross'][-1]],
+                               cap=10 * cell_x * n_core, decay_by=1e-4, check_every=50,
+                               after_sources=True)
+    run = stop.describe()
+
+    def fresh():
+        sim = mp.Simulation(**sim_kwargs)
+        mons = {name: sim.add_flux(*args) for name, args in monitors.items()}
+
+        print("Running FDTD simulation...")
+        fdtd_stop.run_until_decayed(sim, stop)
+        return {
+            'freqs': mp.get_flux_freqs(mons['through']),
+            **{f'{name}_flux': mp.get_fluxes(mon) for name, mon in mons.items()},
+        }
+
+    spec = fdtd_cache.simulation_spec(sim_kwargs, monitors, run)
+    cache = fdtd_cache.default_cache()
+    arrays = cache.fetch(spec, fresh)
+    if cache.last_hit:
+        print(f"FDTD result loaded from cache ({cache.path_for(spec).name})")
 
     # Results
-    freqs = np.array(mp.get_flux_freqs(through_mon))
+    freqs = np.array(arrays['freqs'])
     wavelengths = 1.0 / freqs
-    through_flux = np.array(mp.get_fluxes(through_mon))
-    cross_flux = np.array(mp.get_fluxes(cross_mon))
-    input_flux = np.array(mp.get_fluxes(input_mon))
+    through_flux = np.array(arrays['through_flux'])
+    cross_flux = np.array(arrays['cross_flux'])
+    input_flux = np.array(arrays['input_flux'])
 
     # Normalize
     through_T = through_flux / (input_flux + 1e-20)
     cross_T = cross_flux / (input_flux + 1e-20)
 
     # Values at center frequency
-    center_idx = len(freqs) // 2
+    center_idx = band.index_of(wavelength) if band else len(freqs) // 2
     through_center = through_T[center_idx]
     cross_center = cross_T[center_idx]
     total = through_center + cross_center
@@ -269,7 +304,7 @@ def run_coupler_simulation(wavelength: float, gap: float = 0.25,
     print(f"  Coupling ratio: {coupling_ratio:.4f} ({coupling_ratio*100:.1f}%)")
     print(f"  Split error from 50/50: {split_error:.1f}%")
 
-    return {
+    result = {
         'wavelength': wavelength,
         'gap': gap,
         'coupling_length': coupling_length,
@@ -284,21 +319,101 @@ def run_coupler_simulation(wavelength: float, gap: float = 0.25,
         'coupling_ratio': coupling_ratio,
         'split_error_percent': split_error
     }
+    if band:
+        result['transfer'] = fdtd_broadband.TransferMatrix.from_spectra(
+            freqs, {'through': through_T, 'cross': cross_T}, band.wavelengths)
+        result['transfer'].print_table("Directional coupler, upper input")
+    return result
+
+
+def coupler_matrices(transfer: fdtd_broadband.TransferMatrix) -> dict:
+    """
+    Full 2x2 power transfer matrix per wavelength from an upper-input run.
+
+    The coupler is mirror-symmetric about its axis, so the lower input sees
+    the same through/cross transmission: [[through, cross], [cross, through]]
+    with rows = output (upper, lower) and columns = input (upper, lower).
+    """
+    matrices = {}
+    for name in transfer.names:
+        t = transfer.column(name)
+        matrices[name] = np.array([[t['through'], t['cross']], [t['cross'], t['through']]])
+    return matrices
 
 
-def run_gap_sweep(wavelength: float, gaps: list = None):
+def run_all_wavelengths(gap: float = 0.25, coupling_length: float = 6.0,
+                        resolution: int = 25, per_wavelength: bool = False,
+                        wavelength: float = 1.55):
+    """
+    Coupler response at every ternary wavelength.
+
+    The coupler is linear, so by default one broadband run measures all of
+    them (len(WAVELENGTHS) times fewer FDTD runs, centre values reported at
+    `wavelength`); per_wavelength runs one narrowband simulation per
+    wavelength instead, for validation.
+
+    Returns:
+        (list of run_coupler_simulation results, through/cross x wavelength
+        TransferMatrix)
+    """
+    if not per_wavelength:
+        print(f"\n  Testing all {len(WAVELENGTHS)} wavelengths in one broadband run")
+        result = run_coupler_simulation(wavelength, gap, coupling_length, resolution,
+                                        wavelengths=WAVELENGTHS)
+        return [result], result['transfer']
+
+    results = []
+    for name, wvl in WAVELENGTHS.items():
+        print(f"\n{'='*50}")
+        print(f"  Testing {name}: {wvl} um")
+        print('='*50)
+        results.append(run_coupler_simulation(wvl, gap, coupling_length, resolution))
+    transfer = fdtd_broadband.TransferMatrix.concat([
+        fdtd_broadband.TransferMatrix.from_spectra(
+            r['frequencies'], {'through': r['through_T'], 'cross': r['cross_T']}, {name: wvl})
+        for r, (name, wvl) in zip(results, WAVELENGTHS.items())])
+    transfer.print_table("Directional coupler, upper input")
+    return results, transfer
+
+
+def save_transfer_matrices(transfer: fdtd_broadband.TransferMatrix, gap: float,
+                           coupling_length: float, output_dir: str):
+    """Save the per-wavelength 2x2 power transfer matrices (coupler_matrices)."""
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, f"coupler_transfer_gap{int(gap * 1000)}nm"
+                                        f"_L{coupling_length:g}um.csv")
+    with open(csv_path, 'w') as f:
+        f.write("Wavelength Name,Wavelength (um),T11,T12,T21,T22,Coupling Ratio,FDTD Runs\n")
+        for (name, m), wvl in zip(coupler_matrices(transfer).items(), transfer.wavelengths):
+            ratio = m[1, 0] / (m[0, 0] + m[1, 0]) if m[0, 0] + m[1, 0] > 0 else 0
+            f.write(f"{name},{wvl},{m[0, 0]},{m[0, 1]},{m[1, 0]},{m[1, 1]},{ratio},"
+                    f"{transfer.runs}\n")
+    print(f"Saved: {csv_path}")
+
+
+def _describe_split(point: dict, result: dict) -> str:
+    return (f"gap={result['gap']} um, L={result['coupling_length']} um: "
+            f"{result['coupling_ratio']*100:.1f}% cross, "
+            f"error {result['split_error_percent']:.1f}%")
+
+
+def run_gap_sweep(wavelength: float, gaps: list = None,
+                  sweep: fdtd_sweep.SweepOptions = None):
     """
     Sweep coupling gap to find optimal 50/50 splitting.
+
+    Gap points run concurrently under the fdtd_sweep core budget.
     """
     if gaps is None:
         gaps = [0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]
 
     print(f"\n=== GAP SWEEP at lambda = {wavelength} um ===")
 
-    results = []
-    for gap in gaps:
-        result = run_coupler_simulation(wavelength, gap=gap, resolution=20)
-        results.append(result)
+    points = [dict(wavelength=wavelength, gap=gap, resolution=20) for gap in gaps]
+    results = fdtd_sweep.run_sweep(run_coupler_simulation, points, sweep,
+                                   describe=_describe_split)
+    gaps = [gap for gap, r in zip(gaps, results) if r is not None]
+    results = [r for r in results if r is not None]
 
     return {
         'wavelength': wavelength,
@@ -307,11 +422,20 @@ def run_gap_sweep(wavelength: float, gaps: list = None):
     }
 
 
-def run_parameter_sweep(wavelength: float, gaps: list = None, lengths: list = None):
+def run_parameter_sweep(wavelength: float, gaps: list = None, lengths: list = None,
+                        sweep: fdtd_sweep.SweepOptions = None,
+                        screen_resolution: int = None, top_k: int = 5,
+                        calibration_points: int = 3):
     """
     2D parameter sweep over gap and coupling length to find optimal 50/50 splitting.
 
     For 50% coupling: L = pi / (2 * kappa), where kappa decreases with larger gap.
+    Grid points run concurrently under the fdtd_sweep core budget.
+
+    With screen_resolution set, the grid is screened at that resolution and
+    only the top_k (plus calibration_points others) are re-run at the
+    production resolution 20 (fdtd_fidelity); the heatmap then shows the
+    screening pass and the best point comes from the production runs.
     """
     if gaps is None:
         gaps = [0.2, 0.22, 0.25, 0.27, 0.3]
@@ -322,20 +446,29 @@ def run_parameter_sweep(wavelength: float, gaps: list = None, lengths: list = No
     print(f"Gaps: {gaps}")
     print(f"Lengths: {lengths}")
 
-    results = []
-    best_result = None
-    best_error = float('inf')
-
-    for gap in gaps:
-        for length in lengths:
-            print(f"\n--- Testing gap={gap} um, length={length} um ---")
-            result = run_coupler_simulation(wavelength, gap=gap,
-                                            coupling_length=length, resolution=20)
-            results.append(result)
-
-            if result['split_error_percent'] < best_error:
-                best_error = result['split_error_percent']
-                best_result = result
+    report = None
+    if screen_resolution:
+        report = fdtd_fidelity.screen_and_confirm(
+            run_coupler_simulation,
+            [dict(gap=gap, coupling_length=length) for gap in gaps for length in lengths],
+            objective=lambda r: r['split_error_percent'],
+            fixed=dict(wavelength=wavelength),
+            screen_resolution=screen_resolution, resolution=20,
+            top_k=top_k, calibration_points=calibration_points, sweep=sweep,
+        )
+        results = [r for r in report.screen_results if r is not None]
+        best_result = report.best_result
+    else:
+        points = [dict(wavelength=wavelength, gap=gap, coupling_length=length, resolution=20)
+                  for gap in gaps for length in lengths]
+        results = fdtd_sweep.run_sweep(run_coupler_simulation, points, sweep,
+                                       describe=_describe_split)
+        results = [r for r in results if r is not None]
+        best_result = (min(results, key=lambda r: r['split_error_percent'])
+                       if results else None)
+    if best_result is None:
+        raise RuntimeError(f"All {len(gaps) * len(lengths)} sweep points failed; "
+                           f"see the tracebacks above")
 
     print(f"\n{'='*60}")
     print(f"BEST PARAMETERS FOUND:")
@@ -350,6 +483,52 @@ def run_parameter_sweep(wavelength: float, gaps: list = None, lengths: list = No
         'gaps': gaps,
         'lengths': lengths,
         'results': results,
+        'best_result': best_result,
+        'fidelity': report
+    }
+
+
+def optimize_coupler(wavelength: float, gap_range: tuple = (0.2, 0.3),
+                     length_range: tuple = (6.0, 10.0), tolerance: float = 1.0,
+                     max_rounds: int = 8, max_evaluations: int = None,
+                     sweep: fdtd_sweep.SweepOptions = None):
+    """
+    Adaptive search for the 50/50 gap and coupling length.
+
+    Covers the same box as run_parameter_sweep, but with successive grid
+    refinement (fdtd_optimize): a coarse 3x3 grid, then finer grids around
+    the best point only, stopping once split_error_percent <= tolerance.
+    Gap is resolved to 5 nm and length to 50 nm.
+    """
+    print(f"\n=== ADAPTIVE 50/50 SEARCH at lambda = {wavelength} um ===")
+    print(f"Gap range: {gap_range} um, length range: {length_range} um, "
+          f"target split error <= {tolerance}%")
+
+    search = fdtd_optimize.refine_search(
+        run_coupler_simulation,
+        axes=[fdtd_optimize.Axis('gap', *gap_range, resolution=0.005),
+              fdtd_optimize.Axis('coupling_length', *length_range, resolution=0.05)],
+        objective=lambda r: r['split_error_percent'],
+        fixed=dict(wavelength=wavelength, resolution=20),
+        tolerance=tolerance, max_rounds=max_rounds,
+        max_evaluations=max_evaluations, sweep=sweep,
+    )
+    best_result = search.best_result
+
+    print(f"\n{'='*60}")
+    print(f"BEST PARAMETERS FOUND ({search.n_evaluations} FDTD runs):")
+    print(f"  Gap: {best_result['gap']} um")
+    print(f"  Coupling length: {best_result['coupling_length']} um")
+    print(f"  Coupling ratio: {best_result['coupling_ratio']*100:.1f}%")
+    print(f"  Error from 50/50: {best_result['split_error_percent']:.1f}%"
+          f"{'' if search.converged else f' (tolerance {tolerance}% not reached)'}")
+    print(f"{'='*60}")
+
+    return {
+        'wavelength': wavelength,
+        'tolerance': tolerance,
+        'converged': search.converged,
+        'evaluations': search.evaluations,
         'best_result': best_result
     }
 
@@ -358,7 +537,41 @@ def save_results(result: dict, output_dir: str):
     """Save coupler simulation results."""
     os.makedirs(output_dir, exist_ok=True)
 
-    if 'gaps' in result and 'lengths' in result:
+    if 'evaluations' in result:
+        # Adaptive search: every evaluated point, then the best design's spectra
+        wvl_nm = int(result['wavelength'] * 1000)
+
+        csv_path = os.path.join(output_dir, f"coupler_adaptive_search_{wvl_nm}nm.csv")
+        header = "Run,Gap (um),Length (um),Split Error (%)"
+        data = [[i, p['gap'], p['coupling_length'], err]
+                for i, (p, err) in enumerate(result['evaluations'])]
+        np.savetxt(csv_path, data, delimiter=",", header=header, comments='')
+        print(f"Saved: {csv_path}")
+
+        fig, ax = plt.subplots(figsize=(8, 6))
+        gaps = [p['gap'] for p, _ in result['evaluations']]
+        lengths = [p['coupling_length'] for p, _ in result['evaluations']]
+        errors = [err for _, err in result['evaluations']]
+        sc = ax.scatter(gaps, lengths, c=errors, cmap='viridis_r', s=60, edgecolors='k')
+        plt.colorbar(sc, ax=ax, label='Split error (%)')
+        best = result['best_result']
+        ax.plot(best['gap'], best['coupling_length'], 'r*', markersize=20, label='Best 50/50')
+        ax.set_xlabel('Gap (um)', fontsize=12)
+        ax.set_ylabel('Coupling Length (um)', fontsize=12)
+        ax.set_title(f'Adaptive 50/50 Search (lambda = {result["wavelength"]} um, '
+                     f'{len(errors)} runs)', fontsize=12)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+        plot_path = os.path.join(output_dir, f"coupler_adaptive_search_{wvl_nm}nm.png")
+        plt.savefig(plot_path, dpi=300)
+        print(f"Saved: {plot_path}")
+        plt.close()
+
+        save_results(best, output_dir)
+
+    elif 'gaps' in result and 'lengths' in result:
         # 2D parameter sweep results
         wvl_nm = int(result['wavelength'] * 1000)
 
@@ -370,6 +583,10 @@ def save_results(result: dict, output_dir: str):
                          r['cross_center'], r['coupling_ratio'], r['split_error_percent']])
         np.savetxt(csv_path, data, delimiter=",", header=header, comments='')
         print(f"Saved: {csv_path}")
+        if result.get('fidelity') is not None:
+            fdtd_fidelity.save_report(
+                result['fidelity'],
+                os.path.join(output_dir, f"coupler_param_sweep_{wvl_nm}nm_fidelity.csv"))
 
         # Plot 2D heatmap of coupling ratio
         gaps = result['gaps']
@@ -459,11 +676,13 @@ def save_results(result: dict, output_dir: str):
         plt.close()
 
     else:
-        # Single simulation
+        # Single simulation (broadband runs span every measured wavelength)
         wvl_nm = int(result['wavelength'] * 1000)
         gap_nm = int(result['gap'] * 1000)
+        base_name = (f"coupler_broadband_gap{gap_nm}nm" if 'transfer' in result
+                     else f"coupler_{wvl_nm}nm_gap{gap_nm}nm")
 
-        csv_path = os.path.join(output_dir, f"coupler_{wvl_nm}nm_gap{gap_nm}nm.csv")
+        csv_path = os.path.join(output_dir, f"{base_name}.csv")
         header = "Frequency (Meep),Wavelength (um),Through Flux,Cross Flux,Through T,Cross T"
         data = np.column_stack((
             result['frequencies'], result['wavelengths'],
@@ -477,7 +696,11 @@ def save_results(result: dict, output_dir: str):
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(result['wavelengths'], result['through_T'], 'b-', linewidth=2, label='Through port')
         ax.plot(result['wavelengths'], result['cross_T'], 'r--', linewidth=2, label='Cross port')
-        ax.axvline(x=result['wavelength'], color='green', linestyle=':', label=f'lambda = {result["wavelength"]} um')
+        if 'transfer' in result:
+            for wvl in result['transfer'].wavelengths:
+                ax.axvline(x=wvl, color='green', linestyle=':', alpha=0.6)
+        else:
+            ax.axvline(x=result['wavelength'], color='green', linestyle=':', label=f'lambda = {result["wavelength"]} um')
         ax.axhline(y=0.5, color='gray', linestyle=':', alpha=0.5)
 
         ax.set_xlabel('Wavelength (um)', fontsize=12)
@@ -488,7 +711,7 @@ def save_results(result: dict, output_dir: str):
         ax.grid(True, alpha=0.3)
 
         plt.tight_layout()
-        plot_path = os.path.join(output_dir, f"coupler_{wvl_nm}nm_gap{gap_nm}nm.png")
+        plot_path = os.path.join(output_dir, f"{base_name}.png")
         plt.savefig(plot_path, dpi=300)
         print(f"Saved: {plot_path}")
         plt.close()
@@ -501,11 +724,22 @@ def main():
     parser.add_argument('--length', type=float, default=6.0, help='Coupling length (um) - tuned for 50/50')
     parser.add_argument('--sweep-gap', action='store_true', help='Sweep gap for optimization')
     parser.add_argument('--sweep-params', action='store_true', help='2D sweep of gap and length')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Adaptive gap/length search to the --tolerance split error')
     parser.add_argument('--all-wavelengths', action='store_true', help='Test all ternary wavelengths')
     parser.add_argument('--resolution', type=int, default=25, help='FDTD resolution')
     parser.add_argument('--output', type=str, default=None, help='Output directory')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-run FDTD instead of reusing cached results')
+    fdtd_sweep.add_arguments(parser)
+    fdtd_fidelity.add_arguments(parser)
+    fdtd_broadband.add_arguments(parser)
+    fdtd_optimize.add_arguments(parser, default_tolerance=1.0,
+                                tolerance_help='Target split error from 50/50 in percent')
 
     args = parser.parse_args()
+    if args.no_cache:
+        fdtd_cache.disable()
 
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     output_dir = args.output or os.path.join(base_dir, 'data', 'csv')
@@ -515,21 +749,39 @@ def main():
     print("  For 50/50 Beam Splitting in Ternary Optical Computer")
     print("=" * 60)
 
-    if args.sweep_params:
-        result = run_parameter_sweep(args.wavelength)
+    if args.optimize:
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, f"coupler_adaptive_search_{int(args.wavelength * 1000)}nm_checkpoint.jsonl"))
+        result = optimize_coupler(args.wavelength, tolerance=args.tolerance,
+                                  max_rounds=args.max_rounds,
+                                  max_evaluations=args.max_evaluations, sweep=sweep)
+        save_results(result, output_dir)
+        fdtd_sweep.finish(sweep)
+
+    elif args.sweep_params:
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, f"coupler_param_sweep_{int(args.wavelength * 1000)}nm_checkpoint.jsonl"))
+        result = run_parameter_sweep(args.wavelength, sweep=sweep,
+                                     screen_resolution=args.screen_resolution,
+                                     top_k=args.top_k,
+                                     calibration_points=args.calibration_points)
         save_results(result, output_dir)
+        fdtd_sweep.finish(sweep)
 
     elif args.sweep_gap:
-        result = run_gap_sweep(args.wavelength)
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, f"coupler_gap_sweep_{int(args.wavelength * 1000)}nm_checkpoint.jsonl"))
+        result = run_gap_sweep(args.wavelength, sweep=sweep)
         save_results(result, output_dir)
+        fdtd_sweep.finish(sweep)
 
     elif args.all_wavelengths:
-        for name, wvl in WAVELENGTHS.items():
-            print(f"\n{'='*50}")
-            print(f"  Testing {name}: {wvl} um")
-            print('='*50)
-            result = run_coupler_simulation(wvl, args.gap, args.length, args.resolution)
+        results, transfer = run_all_wavelengths(args.gap, args.length, args.resolution,
+                                                per_wavelength=args.per_wavelength,
+                                                wavelength=args.wavelength)
+        for result in results:
             save_results(result, output_dir)
+        save_transfer_matrices(transfer, args.gap, args.length, output_dir)
 
     else:
         result = run_coupler_simulation(args.wavelength, args.gap, args.length, args.resolution)
@@ -16,7 +16,13 @@ Usage:
     python mzi_switch_sim.py                    # Run ON/OFF comparison at 1.55um
     python mzi_switch_sim.py --wavelength 1.55  # Single wavelength
     python mzi_switch_sim.py --phase-sweep      # Sweep phase for switching curve
+    python mzi_switch_sim.py --optimize --tolerance 25
+                                                # Adaptive search for a 25 dB null
+    python mzi_switch_sim.py --phase-sweep --screen-resolution 20
+                                                # Screen at res 20, confirm the null at res 40
     python mzi_switch_sim.py --all-wavelengths  # Test all ternary wavelengths
+    python mzi_switch_sim.py --all-wavelengths --broadband
+                                                # The 1.55um design at every wavelength, 2 runs
 """
 
 import os
@@ -26,6 +32,16 @@ import meep as mp
 import numpy as np
 import matplotlib.pyplot as plt
 
+# FDTD result cache and batched excitation shared with the N-Radix simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'NRadix_Accelerator', 'simulations'))
+import fdtd_broadband
+import fdtd_cache
+import fdtd_fidelity
+import fdtd_optimize
+import fdtd_stop
+import fdtd_sweep
+
 # Ternary wavelengths (um)
 WAVELENGTHS = {
     'RED': 1.55,
@@ -35,7 +51,7 @@ WAVELENGTHS = {
 
 
 def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
-                       resolution: int = 40, label: str = ""):
+                       resolution: int = 40, label: str = "", wavelengths: dict = None):
     """
     Simulate MZI switch at given wavelength and phase shift.
 
@@ -49,6 +65,10 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
         phase_shift: Phase shift in one arm (radians), simulated via index change
         resolution: FDTD resolution (pixels/um) - 40 for good accuracy
         label: Label for output files
+        wavelengths: name -> wavelength (um) to measure in the same run with
+            one broadband pulse (fdtd_broadband); the device is still the one
+            designed for `wavelength`, and the result also holds the bar-port
+            'transfer' matrix over them
 
     Returns:
         dict with bar_flux, input_flux, bar_transmission, extinction info
@@ -58,6 +78,9 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
 
     # Physical parameters
     freq = 1.0 / wavelength
+    band = fdtd_broadband.Band.covering(wavelengths) if wavelengths else None
+    if band:
+        print(band.describe())
 
     # Material - Silicon nitride for broadband operation
     n_core = 2.0            # SiN refractive index
@@ -208,10 +231,13 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
         )
     )
 
-    # Source - Gaussian source with narrow bandwidth for cleaner excitation
+    # Source - Gaussian source with narrow bandwidth for cleaner excitation,
+    # or one pulse spanning every measured wavelength when broadband
+    pulse = (mp.GaussianSource(band.fcen, fwidth=band.fwidth) if band
+             else mp.GaussianSource(freq, fwidth=0.02 * freq))  # Very narrow bandwidth
     sources = [
         mp.Source(
-            mp.GaussianSource(freq, fwidth=0.02 * freq),  # Very narrow bandwidth
+            pulse,
             component=mp.Ez,
             center=mp.Vector3(x_left_edge + 0.5, 0),
             size=mp.Vector3(0, wg_width * 2, 0)
@@ -219,7 +245,7 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
     ]
 
     # Simulation with subpixel averaging for accuracy
-    sim = mp.Simulation(
+    sim_kwargs = dict(
         cell_size=cell_size,
         boundary_layers=[mp.PML(pml_thickness)],
         geometry=geometry,
@@ -232,35 +258,49 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
     # Flux monitors
     nfreq = 21  # Fewer frequency points for faster computation
     df = 0.05 * freq  # Narrow frequency range
-
-    # Bar port monitor (at y=0)
-    bar_mon = sim.add_flux(
-        freq, df, nfreq,
-        mp.FluxRegion(
+    flux_freqs = (band.frequencies,) if band else (freq, df, nfreq)
+    monitors = {
+        # Bar port monitor (at y=0)
+        'bar': (*flux_freqs, mp.FluxRegion(
             center=mp.Vector3(x_right_edge - 0.5, 0),
             size=mp.Vector3(0, wg_width * 2, 0)
-        )
-    )
-
-    # Input monitor (for normalization)
-    input_mon = sim.add_flux(
-        freq, df, nfreq,
-        mp.FluxRegion(
+        )),
+        # Input monitor (for normalization)
+        'input': (*flux_freqs, mp.FluxRegion(
             center=mp.Vector3(x_left_edge + 2, 0),
             size=mp.Vector3(0, wg_width * 2, 0)
-        )
-    )
+        )),
+    }
 
-    # Run simulation with field decay monitoring
-    print("Running FDTD simulation...")
-    sim.run(until_after_sources=mp.stop_when_fields_decayed(
-        100, mp.Ez, mp.Vector3(x_right_edge - 1, 0), 1e-5
-    ))
+    # Stop once the energy at the bar port decays; the cap (ten transits of
+    # the cell at the core index) only guards a run that doesn't
+    stop = fdtd_stop.DecayStop([monitors['bar'][-1]], cap=10 * cell_x * n_core,
+                               decay_by=1e-5, check_every=100, after_sources=True)
+    run = stop.describe()
+
+    def fresh():
+        sim = mp.Simulation(**sim_kwargs)
+        mons = {name: sim.add_flux(*args) for name, args in monitors.items()}
+
+        # Run simulation with field decay monitoring
+        print("Running FDTD simulation...")
+        fdtd_stop.run_until_decayed(sim, stop)
+        return {
+            'freqs': mp.get_flux_freqs(mons['bar']),
+            'bar_flux': mp.get_fluxes(mons['bar']),
+            'input_flux': mp.get_fluxes(mons['input']),
+        }
+
+    spec = fdtd_cache.simulation_spec(sim_kwargs, monitors, run)
+    cache = fdtd_cache.default_cache()
+    arrays = cache.fetch(spec, fresh)
+    if cache.last_hit:
+        print(f"FDTD result loaded from cache ({cache.path_for(spec).name})")
 
     # Get results
-    freqs = mp.get_flux_freqs(bar_mon)
-    bar_flux = np.array(mp.get_fluxes(bar_mon))
-    input_flux = np.array(mp.get_fluxes(input_mon))
+    freqs = arrays['freqs'].tolist()
+    bar_flux = np.array(arrays['bar_flux'])
+    input_flux = np.array(arrays['input_flux'])
 
     # Normalize - handle any negative flux
     bar_flux_abs = np.abs(bar_flux)
@@ -269,7 +309,7 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
     bar_transmission = bar_flux_abs / (input_flux_abs + 1e-20)
 
     # Find values at center frequency
-    center_idx = len(freqs) // 2
+    center_idx = band.index_of(wavelength) if band else len(freqs) // 2
     bar_T = bar_transmission[center_idx]
 
     print(f"\nResults at lambda = {wavelength} um:")
@@ -277,7 +317,7 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
     print(f"  Input flux: {input_flux[center_idx]:.6f}")
     print(f"  Bar flux: {bar_flux[center_idx]:.6f}")
 
-    return {
+    result = {
         'wavelength': wavelength,
         'phase_shift': phase_shift,
         'frequencies': freqs,
@@ -291,32 +331,63 @@ def run_mzi_simulation(wavelength: float, phase_shift: float = 0.0,
         'delta_n': delta_n,
         'mmi_length': mmi_length
     }
+    if band:
+        result['transfer'] = fdtd_broadband.TransferMatrix.from_spectra(
+            freqs, {'bar': bar_transmission}, band.wavelengths)
+    return result
 
 
-def run_phase_sweep(wavelength: float, n_points: int = 21, resolution: int = 30):
+def run_phase_sweep(wavelength: float, n_points: int = 21, resolution: int = 30,
+                    sweep: fdtd_sweep.SweepOptions = None,
+                    screen_resolution: int = None, top_k: int = 5,
+                    calibration_points: int = 3):
     """
     Sweep phase shift to generate MZI switching curve.
-    Measures bar port transmission as function of phase.
+    Measures bar port transmission as function of phase. Phase points run
+    concurrently under the fdtd_sweep core budget.
 
     For ideal MZI:
     - Phase = 0: constructive interference -> T_bar ~ 1
     - Phase = pi: destructive interference -> T_bar ~ 0
+
+    With screen_resolution set, the curve is taken at that resolution and
+    the top_k phases nearest the null (plus calibration_points others,
+    including the transmission peak) are re-run at `resolution`
+    (fdtd_fidelity). The extinction ratio then comes from those production
+    runs.
     """
     print(f"\n=== PHASE SWEEP at lambda = {wavelength} um ===")
 
     phases = np.linspace(0, 2 * np.pi, n_points)
-    bar_values = []
-
-    for i, phase in enumerate(phases):
-        print(f"\n[{i+1}/{n_points}] Phase = {phase:.3f} rad ({phase/np.pi:.2f} pi)")
-        result = run_mzi_simulation(wavelength, phase, resolution=resolution)
-        bar_values.append(result['bar_T_center'])
-
-    bar_values = np.array(bar_values)
-
-    # Calculate extinction ratio from max/min
-    T_max = np.max(bar_values)
-    T_min = np.min(bar_values)
+    report = None
+    if screen_resolution:
+        report = fdtd_fidelity.screen_and_confirm(
+            run_mzi_simulation,
+            [dict(phase_shift=float(phase)) for phase in phases],
+            objective=lambda r: r['bar_T_center'],
+            fixed=dict(wavelength=wavelength),
+            screen_resolution=screen_resolution, resolution=resolution,
+            top_k=top_k, calibration_points=calibration_points, sweep=sweep,
+        )
+        results = report.screen_results
+    else:
+        points = [dict(wavelength=wavelength, phase_shift=float(phase), resolution=resolution)
+                  for phase in phases]
+        results = fdtd_sweep.run_sweep(
+            run_mzi_simulation, points, sweep,
+            describe=lambda point, r: (f"phase = {r['phase_shift']/np.pi:.2f} pi: "
+                                       f"T_bar = {r['bar_T_center']:.4f}"))
+
+    phases = np.array([phase for phase, r in zip(phases, results) if r is not None])
+    bar_values = np.array([r['bar_T_center'] for r in results if r is not None])
+
+    # Calculate extinction ratio from max/min (production runs when screened)
+    production = (np.array(list(report.fine_values.values())) if report is not None
+                  else bar_values)
+    if len(production) == 0:
+        raise RuntimeError(f"All {n_points} phase points failed; see the tracebacks above")
+    T_max = np.max(production)
+    T_min = np.min(production)
     if T_min > 1e-10:
         extinction_db = 10 * np.log10(T_max / T_min)
     else:
@@ -333,7 +404,67 @@ def run_phase_sweep(wavelength: float, n_points: int = 21, resolution: int = 30)
         'bar_transmission': bar_values,
         'T_max': T_max,
         'T_min': T_min,
-        'extinction_ratio_db': extinction_db
+        'extinction_ratio_db': extinction_db,
+        'fidelity': report
+    }
+
+
+def optimize_phase_null(wavelength: float, resolution: int = 30,
+                        target_extinction_db: float = 20.0, max_rounds: int = 8,
+                        max_evaluations: int = None,
+                        sweep: fdtd_sweep.SweepOptions = None):
+    """
+    Adaptive search for the phase shift that nulls the bar port.
+
+    Instead of a uniform phase sweep, successive grid refinement
+    (fdtd_optimize) samples 0..2pi coarsely and then only around the
+    transmission minimum, stopping once the extinction ratio against the
+    phase = 0 state reaches target_extinction_db. Phase is resolved to
+    0.005 rad. Returns the phase sweep result format over the sampled phases.
+    """
+    print(f"\n=== ADAPTIVE PHASE NULL SEARCH at lambda = {wavelength} um ===")
+    print(f"Target extinction ratio: {target_extinction_db} dB")
+
+    on_state = fdtd_sweep.run_sweep(
+        run_mzi_simulation,
+        [dict(wavelength=wavelength, phase_shift=0.0, resolution=resolution)], sweep)[0]
+    if on_state is None:
+        raise RuntimeError("The phase = 0 reference point failed; see the traceback above")
+    T_on = on_state['bar_T_center']
+
+    search = fdtd_optimize.refine_search(
+        run_mzi_simulation,
+        axes=[fdtd_optimize.Axis('phase_shift', 0.0, 2 * np.pi, resolution=0.005)],
+        objective=lambda r: 10 * np.log10(max(r['bar_T_center'], 1e-10) / T_on),
+        fixed=dict(wavelength=wavelength, resolution=resolution),
+        tolerance=-target_extinction_db, points_per_axis=5, max_rounds=max_rounds,
+        max_evaluations=max_evaluations, sweep=sweep,
+    )
+
+    samples = sorted((p['phase_shift'], T_on * 10 ** (db / 10))
+                     for p, db in search.evaluations if np.isfinite(db))
+    phases = np.array([phase for phase, _ in samples])
+    bar_values = np.array([T for _, T in samples])
+    T_max = max(np.max(bar_values), T_on)
+    T_min = search.best_result['bar_T_center']
+    extinction_db = 10 * np.log10(T_max / max(T_min, 1e-10))
+
+    print(f"\n=== PHASE NULL SEARCH RESULTS ({search.n_evaluations + 1} FDTD runs) ===")
+    print(f"  Null at phase: {search.best_params['phase_shift']:.3f} rad "
+          f"({search.best_params['phase_shift']/np.pi:.3f} pi)")
+    print(f"  Min transmission: {T_min:.6f}")
+    print(f"  EXTINCTION RATIO: {extinction_db:.2f} dB"
+          f"{'' if search.converged else ' (target not reached)'}")
+
+    return {
+        'wavelength': wavelength,
+        'phases': phases,
+        'bar_transmission': bar_values,
+        'T_max': T_max,
+        'T_min': T_min,
+        'extinction_ratio_db': extinction_db,
+        'null_phase': search.best_params['phase_shift'],
+        'file_tag': '_adaptive'
     }
 
 
@@ -382,6 +513,47 @@ def run_on_off_comparison(wavelength: float, resolution: int = 40):
     }
 
 
+def run_broadband_on_off(wavelength: float = 1.55, resolution: int = 40):
+    """
+    ON/OFF extinction of the MZI designed for `wavelength`, at every ternary
+    wavelength, from one broadband run per state.
+
+    Two FDTD runs instead of two per wavelength. Unlike --all-wavelengths,
+    which re-designs the arms and MMIs for each wavelength, this measures one
+    device gating every channel: the pi design phase shift is
+    pi * wavelength / lambda at the other wavelengths.
+    """
+    print(f"\n{'='*60}")
+    print(f"  MZI BROADBAND ON/OFF (design lambda = {wavelength} um)")
+    print(f"{'='*60}")
+
+    print("\n>>> ON STATE (phase = 0)")
+    result_on = run_mzi_simulation(wavelength, 0.0, resolution, wavelengths=WAVELENGTHS)
+    print("\n>>> OFF STATE (phase = pi)")
+    result_off = run_mzi_simulation(wavelength, np.pi, resolution, wavelengths=WAVELENGTHS)
+
+    transfer = fdtd_broadband.TransferMatrix(
+        ports=['on', 'off'], names=result_on['transfer'].names,
+        wavelengths=result_on['transfer'].wavelengths,
+        power=np.vstack([result_on['transfer'].power, result_off['transfer'].power]),
+        runs=2, unbatched_runs=2 * len(WAVELENGTHS))
+    transfer.print_table("MZI bar port, ON / OFF")
+
+    extinction_db = {}
+    for name in transfer.names:
+        t = transfer.column(name)
+        extinction_db[name] = 10 * np.log10(t['on'] / max(t['off'], 1e-10))
+        print(f"  {name}: extinction ratio {extinction_db[name]:.2f} dB")
+
+    return {
+        'wavelength': wavelength,
+        'transfer': transfer,
+        'extinction_by_wavelength': extinction_db,
+        'arm_length': result_on['arm_length'],
+        'arm_separation': result_on['arm_separation']
+    }
+
+
 def save_results(result: dict, output_dir: str):
     """Save simulation results to CSV and PNG."""
     os.makedirs(output_dir, exist_ok=True)
@@ -391,7 +563,8 @@ def save_results(result: dict, output_dir: str):
         wvl_nm = int(result['wavelength'] * 1000)
 
         # Save CSV
-        csv_path = os.path.join(output_dir, f"mzi_phase_sweep_{wvl_nm}nm.csv")
+        tag = result.get('file_tag', '')
+        csv_path = os.path.join(output_dir, f"mzi_phase_sweep_{wvl_nm}nm{tag}.csv")
         header = "Phase (rad),Phase (pi),Bar Transmission"
         data = np.column_stack((
             result['phases'],
@@ -400,6 +573,10 @@ def save_results(result: dict, output_dir: str):
         ))
         np.savetxt(csv_path, data, delimiter=",", header=header, comments='')
         print(f"Saved: {csv_path}")
+        if result.get('fidelity') is not None:
+            fdtd_fidelity.save_report(
+                result['fidelity'],
+                os.path.join(output_dir, f"mzi_phase_sweep_{wvl_nm}nm{tag}_fidelity.csv"))
 
         # Plot
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -417,11 +594,25 @@ def save_results(result: dict, output_dir: str):
         ax.set_ylim(0, max(1.1, np.max(result['bar_transmission']) * 1.1))
 
         plt.tight_layout()
-        plot_path = os.path.join(output_dir, f"mzi_switching_curve_{wvl_nm}nm.png")
+        plot_path = os.path.join(output_dir, f"mzi_switching_curve_{wvl_nm}nm{tag}.png")
         plt.savefig(plot_path, dpi=300)
         print(f"Saved: {plot_path}")
         plt.close()
 
+    elif 'extinction_by_wavelength' in result:
+        # Broadband ON/OFF of one design at every wavelength
+        wvl_nm = int(result['wavelength'] * 1000)
+        transfer = result['transfer']
+
+        csv_path = os.path.join(output_dir, f"mzi_broadband_extinction_{wvl_nm}nm_design.csv")
+        with open(csv_path, 'w') as f:
+            f.write("Wavelength Name,Wavelength (um),T_on,T_off,Extinction Ratio (dB),FDTD Runs\n")
+            for name, wvl in zip(transfer.names, transfer.wavelengths):
+                t = transfer.column(name)
+                f.write(f"{name},{wvl},{t['on']},{t['off']},"
+                        f"{result['extinction_by_wavelength'][name]},{transfer.runs}\n")
+        print(f"Saved: {csv_path}")
+
     elif 'T_on' in result:
         # ON/OFF comparison results
         wvl_nm = int(result['wavelength'] * 1000)
@@ -482,11 +673,24 @@ def main():
     parser.add_argument('--wavelength', type=float, help='Single wavelength (um)')
     parser.add_argument('--phase', type=float, default=0.0, help='Phase shift (radians)')
     parser.add_argument('--phase-sweep', action='store_true', help='Run phase sweep')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Adaptive search for the bar-port null to the --tolerance extinction (dB)')
     parser.add_argument('--all-wavelengths', action='store_true', help='Test all ternary wavelengths')
+    parser.add_argument('--broadband', action='store_true',
+                        help='With --all-wavelengths: ON/OFF of the --wavelength design (default '
+                             '1.55) at every wavelength from one broadband run per state')
     parser.add_argument('--resolution', type=int, default=40, help='FDTD resolution (default: 40)')
     parser.add_argument('--output', type=str, default=None, help='Output directory')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-run FDTD instead of reusing cached results')
+    fdtd_sweep.add_arguments(parser)
+    fdtd_fidelity.add_arguments(parser)
+    fdtd_optimize.add_arguments(parser, default_tolerance=20.0,
+                                tolerance_help='Target extinction ratio in dB')
 
     args = parser.parse_args()
+    if args.no_cache:
+        fdtd_cache.disable()
 
     # Determine output directory
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -502,10 +706,33 @@ def main():
     print("  - Tapered transitions for reduced loss")
     print("  - Higher resolution for accuracy")
 
-    if args.phase_sweep:
+    if args.optimize:
+        # Adaptive search for the OFF-state phase
+        wvl = args.wavelength or 1.55
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, f"mzi_phase_null_{int(wvl * 1000)}nm_checkpoint.jsonl"))
+        result = optimize_phase_null(wvl, resolution=args.resolution,
+                                     target_extinction_db=args.tolerance,
+                                     max_rounds=args.max_rounds,
+                                     max_evaluations=args.max_evaluations, sweep=sweep)
+        save_results(result, output_dir)
+        fdtd_sweep.finish(sweep)
+
+    elif args.phase_sweep:
         # Run phase sweep
         wvl = args.wavelength or 1.55
-        result = run_phase_sweep(wvl, n_points=11, resolution=args.resolution)
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir, f"mzi_phase_sweep_{int(wvl * 1000)}nm_checkpoint.jsonl"))
+        result = run_phase_sweep(wvl, n_points=11, resolution=args.resolution, sweep=sweep,
+                                 screen_resolution=args.screen_resolution,
+                                 top_k=args.top_k,
+                                 calibration_points=args.calibration_points)
+        save_results(result, output_dir)
+        fdtd_sweep.finish(sweep)
+
+    elif args.all_wavelengths and args.broadband:
+        # One device, every ternary wavelength: two FDTD runs in total
+        result = run_broadband_on_off(args.wavelength or 1.55, args.resolution)
         save_results(result, output_dir)
 
     elif args.all_wavelengths:
@@ -24,6 +24,7 @@ C = 299792458  # Speed of light (m/s)
 # Data directory (relative to this file)
 DATA_DIR = Path(__file__).parent.parent / "data"
 CSV_DIR = DATA_DIR / "csv"
+NPY_CACHE_SUBDIR = ".npy_cache"   # per-CSV binary columns, next to the CSVs
 PNG_DIR = DATA_DIR / "png"
 
 # Wavelengths for ternary encoding (from your Meep simulations)
@@ -51,6 +52,22 @@ class TritValue(Enum):
         return self.value[2]
 
 
+def flux_at_wavelength(wavelengths: np.ndarray, flux: np.ndarray, target_wvl: float) -> float:
+    """
+    Flux at target_wvl, linearly interpolated between the neighbouring
+    samples. wavelengths must be sorted ascending; targets outside the
+    range take the nearest end value.
+    """
+    i = int(np.searchsorted(wavelengths, target_wvl))
+    if i == 0:
+        return float(flux[0])
+    if i == len(wavelengths):
+        return float(flux[-1])
+    w0, w1 = wavelengths[i - 1], wavelengths[i]
+    t = (target_wvl - w0) / (w1 - w0) if w1 != w0 else 0.0
+    return float(flux[i - 1] + t * (flux[i] - flux[i - 1]))
+
+
 @dataclass
 class MeepMixerResult:
     """Parsed result from a Meep SFG mixer simulation."""
@@ -59,7 +76,7 @@ class MeepMixerResult:
     wavelength1: float  # μm
     wavelength2: float
     frequencies: np.ndarray  # Meep frequency units
-    wavelengths: np.ndarray  # μm
+    wavelengths: np.ndarray  # μm, ascending
     flux: np.ndarray  # a.u.
     target_sum_wavelength: float  # μm
     peak_flux_at_sum: float
@@ -70,61 +87,85 @@ class MeepMixerResult:
 class MeepDataLoader:
     """
     Load and parse real Meep FDTD simulation results.
+
+    Construction only indexes the mixer_data_*.csv files by name. Each
+    mixer pair is parsed on first access, and only once per CSV: the
+    columns are saved wavelength-sorted as an .npy next to the CSV
+    (rebuilt when the CSV is newer) and memory-mapped from then on.
+    Wavelength lookups are a binary search plus linear interpolation.
     """
 
-    def __init__(self, csv_dir: Path = CSV_DIR):
+    COLOR_WAVELENGTHS = {
+        'RED': LAMBDA_RED,
+        'GREEN': LAMBDA_GREEN,
+        'BLUE': LAMBDA_BLUE
+    }
+
+    def __init__(self, csv_dir: Path = CSV_DIR, cache_dir: Optional[Path] = None):
         self.csv_dir = Path(csv_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.csv_dir / NPY_CACHE_SUBDIR
         self._mixer_cache: Dict[str, MeepMixerResult] = {}
-        self._load_all_mixer_data()
-
-    def _load_all_mixer_data(self):
-        """Load all available mixer CSV files."""
-        color_wavelengths = {
-            'RED': LAMBDA_RED,
-            'GREEN': LAMBDA_GREEN,
-            'BLUE': LAMBDA_BLUE
-        }
+        self._index: Dict[str, Path] = self._index_mixer_files()
 
-        # Find all mixer data files
-        for csv_file in self.csv_dir.glob("mixer_data_*.csv"):
-            # Parse filename: mixer_data_COLOR1_COLOR2.csv
+    def _index_mixer_files(self) -> Dict[str, Path]:
+        """Map COLOR1_COLOR2 -> CSV path for every mixer file present."""
+        index = {}
+        # Parse filename: mixer_data_COLOR1_COLOR2.csv
+        for csv_file in sorted(self.csv_dir.glob("mixer_data_*.csv")):
             parts = csv_file.stem.replace("mixer_data_", "").split("_")
-            if len(parts) == 2:
-                color1, color2 = parts
-                if color1 in color_wavelengths and color2 in color_wavelengths:
-                    result = self._load_mixer_csv(
-                        csv_file,
-                        color1, color2,
-                        color_wavelengths[color1],
-                        color_wavelengths[color2]
-                    )
-                    if result:
-                        key = f"{color1}_{color2}"
-                        self._mixer_cache[key] = result
+            if len(parts) == 2 and all(p in self.COLOR_WAVELENGTHS for p in parts):
+                index[f"{parts[0]}_{parts[1]}"] = csv_file
+        return index
+
+    def _columns(self, csv_file: Path) -> np.ndarray:
+        """
+        (3, N) read-only array of frequency, wavelength, flux sorted by
+        wavelength, from the .npy cache when it is at least as new as the CSV.
+        The array is a plain ndarray whether freshly parsed or memory-mapped.
+
+        Raises:
+            ValueError: If the CSV has fewer than three columns
+        """
+        npy_file = self.cache_dir / f"{csv_file.stem}.npy"
+        if npy_file.exists() and npy_file.stat().st_mtime >= csv_file.stat().st_mtime:
+            cached = np.asarray(np.load(npy_file, mmap_mode='r'))
+            if cached.ndim == 2 and cached.shape[0] == 3:
+                return cached
+
+        data = np.genfromtxt(csv_file, delimiter=',', skip_header=1, ndmin=2)
+        if data.size == 0:
+            return np.empty((3, 0))
+        if data.shape[1] < 3:
+            raise ValueError(f"{csv_file.name}: expected frequency, wavelength, flux "
+                             f"columns, found {data.shape[1]}")
+        data = data[np.isfinite(data[:, :3]).all(axis=1)]
+        columns = np.ascontiguousarray(data[np.argsort(data[:, 1], kind='stable'), :3].T)
+        columns.flags.writeable = False
+        if columns.shape[1] == 0:
+            return columns
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = npy_file.with_suffix('.tmp.npy')
+            np.save(tmp, columns)
+            os.replace(tmp, npy_file)
+        except OSError as e:
+            print(f"Warning: Could not cache {csv_file.name}: {e}")
+        return columns
 
     def _load_mixer_csv(self, filepath: Path, color1: str, color2: str,
                         wvl1: float, wvl2: float) -> Optional[MeepMixerResult]:
         """Load a single mixer CSV file."""
         try:
-            data = np.genfromtxt(filepath, delimiter=',', skip_header=1)
-            if data.size == 0:
+            frequencies, wavelengths, flux = self._columns(filepath)
+            if wavelengths.size == 0:
                 return None
 
-            frequencies = data[:, 0]
-            wavelengths = data[:, 1]
-            flux = data[:, 2]
-
             # Calculate target sum wavelength
             freq1 = 1.0 / wvl1
             freq2 = 1.0 / wvl2
             freq_sum = freq1 + freq2
             wvl_sum = 1.0 / freq_sum
 
-            # Find peak flux at key wavelengths
-            def flux_at_wavelength(target_wvl):
-                idx = np.argmin(np.abs(wavelengths - target_wvl))
-                return flux[idx]
-
             return MeepMixerResult(
                 input1=color1,
                 input2=color2,
@@ -134,14 +175,30 @@ class MeepDataLoader:
                 wavelengths=wavelengths,
                 flux=flux,
                 target_sum_wavelength=wvl_sum,
-                peak_flux_at_sum=flux_at_wavelength(wvl_sum),
-                peak_flux_at_input1=flux_at_wavelength(wvl1),
-                peak_flux_at_input2=flux_at_wavelength(wvl2)
+                peak_flux_at_sum=flux_at_wavelength(wavelengths, flux, wvl_sum),
+                peak_flux_at_input1=flux_at_wavelength(wavelengths, flux, wvl1),
+                peak_flux_at_input2=flux_at_wavelength(wavelengths, flux, wvl2)
             )
         except Exception as e:
             print(f"Warning: Could not load {filepath}: {e}")
             return None
 
+    def _load(self, key: str) -> Optional[MeepMixerResult]:
+        """Parse one indexed pair on first access."""
+        if key not in self._mixer_cache:
+            color1, color2 = key.split("_")
+            result = self._load_mixer_csv(
+                self._index[key],
+                color1, color2,
+                self.COLOR_WAVELENGTHS[color1],
+                self.COLOR_WAVELENGTHS[color2]
+            )
+            if result is None:
+                del self._index[key]
+                return None
+            self._mixer_cache[key] = result
+        return self._mixer_cache[key]
+
     def get_mixer_result(self, color1: str, color2: str) -> Optional[MeepMixerResult]:
         """
         Get mixer result for two input colors.
@@ -156,15 +213,15 @@ class MeepDataLoader:
         key1 = f"{color1}_{color2}"
         key2 = f"{color2}_{color1}"
 
-        if key1 in self._mixer_cache:
-            return self._mixer_cache[key1]
-        elif key2 in self._mixer_cache:
-            return self._mixer_cache[key2]
+        if key1 in self._index:
+            return self._load(key1)
+        elif key2 in self._index:
+            return self._load(key2)
         return None
 
     def list_available_combinations(self) -> List[str]:
-        """List all available mixer combinations."""
-        return list(self._mixer_cache.keys())
+        """List all available mixer combinations (found on disk; not yet parsed)."""
+        return list(self._index.keys())
 
 
 class TernaryMixerSimulator:
@@ -249,19 +306,19 @@ class TernaryMixerSimulator:
         # Identify which peaks correspond to which trit values
         trit_peaks = {}
         for trit in TritValue:
-            idx = np.argmin(np.abs(wavelengths - trit.wavelength))
+            trit_flux = flux_at_wavelength(wavelengths, flux, trit.wavelength)
             trit_peaks[trit.color_name] = {
                 'wavelength': trit.wavelength,
-                'flux': flux[idx],
-                'relative': flux[idx] / np.max(flux) if np.max(flux) > 0 else 0
+                'flux': trit_flux,
+                'relative': trit_flux / np.max(flux) if np.max(flux) > 0 else 0
             }
 
         # Sum frequency peak
-        sum_idx = np.argmin(np.abs(wavelengths - meep_result.target_sum_wavelength))
+        sum_flux = flux_at_wavelength(wavelengths, flux, meep_result.target_sum_wavelength)
         sum_peak = {
             'wavelength': meep_result.target_sum_wavelength,
-            'flux': flux[sum_idx],
-            'relative': flux[sum_idx] / np.max(flux) if np.max(flux) > 0 else 0
+            'flux': sum_flux,
+            'relative': sum_flux / np.max(flux) if np.max(flux) > 0 else 0
         }
 
         return {
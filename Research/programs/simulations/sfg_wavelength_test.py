@@ -24,6 +24,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+# Shared FDTD run helpers from the N-Radix simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'NRadix_Accelerator', 'simulations'))
+import fdtd_stop
+
 # NEW RECOMMENDED WAVELENGTHS (all outputs distinguishable)
 NEW_WAVELENGTHS = {
     'RED': 1.550,    # C-band telecom
@@ -117,18 +122,17 @@ def run_sfg_test(wvl1: float, wvl2: float, label1: str, label2: str,
     fcen_mon = (f_min + f_max) / 2
     df_mon = (f_max - f_min)
 
-    trans = sim.add_flux(
-        fcen_mon, df_mon, 600,
-        mp.FluxRegion(
-            center=mp.Vector3(0.5 * cell_x - pml_thickness - 0.5, 0),
-            size=mp.Vector3(0, 2*wg_width, 0)
-        )
+    output_region = mp.FluxRegion(
+        center=mp.Vector3(0.5 * cell_x - pml_thickness - 0.5, 0),
+        size=mp.Vector3(0, 2*wg_width, 0)
     )
+    trans = sim.add_flux(fcen_mon, df_mon, 600, output_region)
 
+    # Run until the energy at the output (inputs and generated SFG) decays;
+    # the cap only guards a run that never does
     print("Running FDTD simulation...")
-    sim.run(until_after_sources=mp.stop_when_fields_decayed(
-        50, mp.Ez, mp.Vector3(0, 0, 0), 1e-4
-    ))
+    fdtd_stop.run_until_decayed(sim, fdtd_stop.DecayStop(
+        [output_region], cap=2000, decay_by=1e-4, check_every=50, after_sources=True))
 
     freqs = np.array(mp.get_flux_freqs(trans))
     flux = np.array(mp.get_fluxes(trans))
@@ -29,6 +29,12 @@ import meep as mp
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Sweep scheduler shared with the N-Radix simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'NRadix_Accelerator', 'simulations'))
+import fdtd_stop
+import fdtd_sweep
+
 # Ternary wavelengths (um)
 WAVELENGTHS = {
     'RED': 1.55,
@@ -190,17 +196,17 @@ def run_soa_simulation(wavelength: float, soa_length: float = 30.0,
         )
     )
 
-    output_mon = sim.add_flux(
-        freq, df, nfreq,
-        mp.FluxRegion(
-            center=mp.Vector3(output_mon_x, 0),
-            size=mp.Vector3(0, wg_width * 3)
-        )
+    output_region = mp.FluxRegion(
+        center=mp.Vector3(output_mon_x, 0),
+        size=mp.Vector3(0, wg_width * 3)
     )
+    output_mon = sim.add_flux(freq, df, nfreq, output_region)
 
-    # Run simulation
+    # Run until the energy at the output decays, 200 at most; never before
+    # one transit of the SOA at the core index
     print("Running FDTD simulation...")
-    sim.run(until=200)
+    fdtd_stop.run_until_decayed(sim, fdtd_stop.DecayStop([output_region], cap=200,
+                                                         min_time=n_core * soa_length))
 
     # Results
     freqs = np.array(mp.get_flux_freqs(output_mon))
@@ -251,20 +257,25 @@ def run_soa_simulation(wavelength: float, soa_length: float = 30.0,
 
 
 def run_gain_sweep(wavelength: float, target_gains_dB: list = None,
-                   soa_length: float = 30.0):
+                   soa_length: float = 30.0, sweep: fdtd_sweep.SweepOptions = None):
     """
     Sweep target gain levels to characterize SOA.
+
+    Gain points run concurrently under the fdtd_sweep core budget.
     """
     if target_gains_dB is None:
         target_gains_dB = [5.0, 10.0, 15.0, 20.0, 25.0]
 
     print(f"\n=== GAIN LEVEL SWEEP at wavelength = {wavelength} um ===")
 
-    results = []
-    for g_dB in target_gains_dB:
-        result = run_soa_simulation(wavelength, soa_length=soa_length,
-                                     target_gain_dB=g_dB, resolution=20)
-        results.append(result)
+    points = [dict(wavelength=wavelength, soa_length=soa_length,
+                   target_gain_dB=g_dB, resolution=20) for g_dB in target_gains_dB]
+    results = fdtd_sweep.run_sweep(
+        run_soa_simulation, points, sweep,
+        describe=lambda point, r: (f"target {r['target_gain_dB']:.1f} dB: "
+                                   f"measured {r['gain_dB']:.2f} dB"))
+    target_gains_dB = [g for g, r in zip(target_gains_dB, results) if r is not None]
+    results = [r for r in results if r is not None]
 
     return {
         'wavelength': wavelength,
@@ -422,6 +433,7 @@ def main():
     parser.add_argument('--all-wavelengths', action='store_true', help='Test all ternary wavelengths')
     parser.add_argument('--resolution', type=int, default=20, help='FDTD resolution')
     parser.add_argument('--output', type=str, default=None, help='Output directory')
+    fdtd_sweep.add_arguments(parser)
 
     args = parser.parse_args()
 
@@ -435,8 +447,12 @@ def main():
     print("=" * 60)
 
     if args.sweep_gain:
-        result = run_gain_sweep(args.wavelength, soa_length=args.length)
+        sweep = fdtd_sweep.options_from_args(
+            args, os.path.join(output_dir,
+                               f"soa_gain_sweep_{int(args.wavelength * 1000)}nm_checkpoint.jsonl"))
+        result = run_gain_sweep(args.wavelength, soa_length=args.length, sweep=sweep)
         save_results(result, output_dir)
+        fdtd_sweep.finish(sweep)
 
     elif args.switching:
         result = run_switching_test(args.wavelength, soa_length=args.length)
@@ -19,6 +19,11 @@ import meep as mp
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Shared FDTD run helpers from the N-Radix simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'NRadix_Accelerator', 'simulations'))
+import fdtd_stop
+
 # Ternary wavelengths (μm)
 WAVELENGTHS = {
     'RED': 1.55,
@@ -198,11 +203,12 @@ def run_bend_simulation(wavelength: float, bend_radius: float = 5.0,
         )
     )
 
-    # Run
+    # Run until the energy at the output decays; the cap only guards a run
+    # that never does
     print("Running FDTD simulation...")
-    sim.run(until_after_sources=mp.stop_when_fields_decayed(
-        50, mp.Ez, output_pos, 1e-4
-    ))
+    fdtd_stop.run_until_decayed(sim, fdtd_stop.DecayStop(
+        [mp.FluxRegion(center=output_pos, size=output_size)], cap=2000, decay_by=1e-4,
+        check_every=50, after_sources=True))
 
     # Results
     freqs = np.array(mp.get_flux_freqs(output_mon))